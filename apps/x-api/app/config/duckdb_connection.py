@@ -0,0 +1,114 @@
+"""
+DuckDB connections bounded by the DUCKDB_* settings.
+
+By default DuckDB uses every core of the machine and up to 80% of its memory, per connection owner. With
+one server worker per CPU that oversubscribes the CPU many times over and lets a single heavy query get
+the container OOM-killed. `connect_duckdb` gives each worker of `common_fastapi.server` its share instead:
+the CPUs and memory of the container divided by the server's workers. Other processes, command line scripts
+and background job processes, run alone and get the whole container. DUCKDB_THREADS and DUCKDB_MEMORY_LIMIT
+override both. Queries exceeding the memory limit spill to a temporary directory of the process.
+"""
+
+import os
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+import duckdb
+
+from common_fastapi import QueryTimeoutException
+
+from .settings import app_settings
+
+
+# Fraction of the memory the DuckDB connections of all workers may use together, as DuckDB's own default
+MEMORY_FRACTION = 0.8
+
+
+def _cpus_and_workers() -> tuple[int, int]:
+    """CPUs of the container and the server workers sharing them; 1 outside a server worker."""
+    # Imported here: the server module imports uvicorn
+    from common_fastapi.server import available_cpus, server_workers
+
+    return available_cpus(), server_workers() or 1
+
+
+def _available_memory() -> int:
+    """Bytes of memory available to the container: its cgroup (v2 or v1) limit, or the physical memory."""
+    memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            limit = Path(path).read_text(encoding="ascii").strip()
+        except OSError:
+            continue
+        if limit.isdigit():
+            memory = min(memory, int(limit))
+        break
+    return memory
+
+
+def duckdb_config() -> dict[str, Any]:
+    """Configuration of the connections of this process, from the DUCKDB_* settings."""
+    cpus, workers = _cpus_and_workers()
+    temp_directory = Path(app_settings.DUCKDB_TEMP_DIRECTORY)
+    # DuckDB creates the spill directory, not its parents
+    temp_directory.mkdir(parents=True, exist_ok=True)
+    config: dict[str, Any] = {
+        "threads": app_settings.DUCKDB_THREADS or max(1, cpus // workers),
+        "memory_limit": app_settings.DUCKDB_MEMORY_LIMIT or f"{int(_available_memory() * MEMORY_FRACTION / workers) // 2**20}MB",
+        # One directory per process: concurrent processes would otherwise write the same spill files
+        "temp_directory": str(temp_directory / str(os.getpid())),
+    }
+    if app_settings.DUCKDB_MAX_TEMP_DIRECTORY_SIZE:
+        config["max_temp_directory_size"] = app_settings.DUCKDB_MAX_TEMP_DIRECTORY_SIZE
+    return config
+
+
+def connect_duckdb(database: str | None = None, read_only: bool = False) -> duckdb.DuckDBPyConnection:
+    """
+    Open a DuckDB connection bounded by the DUCKDB_* settings.
+
+    Args:
+    ----
+    database (str | None): Database file, or ":memory:"; defaults to DUCKDB_DATABASE.
+    read_only (bool): Open the database file read-only, which several processes may do at once.
+
+    Returns:
+    -------
+    duckdb.DuckDBPyConnection: The connection.
+
+    """
+    return duckdb.connect(database or app_settings.DUCKDB_DATABASE, read_only=read_only, config=duckdb_config())
+
+
+@contextmanager
+def query_timeout(conn: duckdb.DuckDBPyConnection, timeout: float | None = None) -> Iterator[duckdb.DuckDBPyConnection]:
+    """
+    Cursor of `conn` whose query is interrupted after `timeout` seconds, raising `QueryTimeoutException`.
+
+    Fetch the results inside the block: DuckDB may run part of the query while they are fetched. The
+    cursor is a connection of its own, so it may be used while other threads use `conn`.
+
+    Args:
+    ----
+    conn (duckdb.DuckDBPyConnection): The connection to open the cursor on.
+    timeout (float | None): Seconds before the query is interrupted; defaults to DUCKDB_QUERY_TIMEOUT, 0 disables it.
+
+    """
+    timeout = app_settings.DUCKDB_QUERY_TIMEOUT if timeout is None else timeout
+    cursor = conn.cursor()
+    timer = None
+    if timeout:
+        timer = threading.Timer(timeout, cursor.interrupt)
+        timer.daemon = True
+        timer.start()
+    try:
+        yield cursor
+    except duckdb.InterruptException as exc:
+        raise QueryTimeoutException(timeout) from exc
+    finally:
+        if timer is not None:
+            timer.cancel()
+        cursor.close()
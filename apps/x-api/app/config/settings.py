@@ -1,7 +1,9 @@
 import logging
-from typing import Any
+import os
+import tempfile
+from typing import Any, Literal
 
-from pydantic import PostgresDsn, field_validator
+from pydantic import Field, PostgresDsn, field_validator
 
 from common_fastapi import EnvSettings
 
@@ -20,6 +22,35 @@ class AppSettings(EnvSettings):
         POSTGRES_HOST (str): PostgreSQL host.
         POSTGRES_PORT (int): PostgreSQL port.
         DATABASE_URL (str): Constructed PostgreSQL DSN as a string.
+        INFERENCE_BATCH_CHUNK_SIZE (int): Rows scored per vectorized pass by the batch prediction endpoint.
+        INFERENCE_ENGINE (str): "sklearn" runs the pickled pipeline, "compiled" evaluates flattened NumPy
+            node arrays built at load time (falls back to sklearn if they fail validation).
+        INFERENCE_EXECUTOR (str): Where predictions run: "inline" on the event loop, a "thread" pool,
+            or a "process" pool that loads the model once per child process.
+        INFERENCE_WORKERS (int): Thread or process pool size.
+        INFERENCE_MAX_PENDING (int): Running plus queued inference calls allowed per app process.
+        INFERENCE_QUEUE_TIMEOUT (float): Seconds a call waits for a free slot before a 503 is returned.
+        INFERENCE_CACHE_SIZE (int): Maximum cached single-row predictions; 0 disables the cache.
+        INFERENCE_CACHE_TTL (float): Seconds a cached prediction stays valid.
+        INFERENCE_CACHE_QUANTIZATION (dict[str, float]): Grid step per feature used to build cache keys,
+            e.g. '{"voltage": 0.5, "temperature": 0.5}'. Features not listed are matched exactly.
+        INFERENCE_MODEL_MMAP_MODE (str | None): joblib mmap mode for model arrays ("r" read-only, "c"
+            copy-on-write); None loads private copies into every process. Processes share the forest only
+            with the "compiled" engine: sklearn copies its trees when the model is unpickled.
+        INFERENCE_MODEL_POLL_INTERVAL (float): Seconds between checks for a new model version; 0 disables hot reload.
+        INFERENCE_MODEL_MAX_LOADED (int): Model versions kept in memory at once, including the active one.
+        DUCKDB_DATABASE (str): DuckDB database file, or ":memory:". Only one process can open a file for
+            writing, so a file cannot be shared by several workers.
+        DUCKDB_THREADS (int): Threads per DuckDB connection; 0 means the container's CPUs, divided by the
+            workers in a worker of common_fastapi.server.
+        DUCKDB_MEMORY_LIMIT (str | None): Memory per DuckDB connection before queries spill to disk, e.g.
+            "2GB"; None means 80% of the container's memory, divided by the workers in a worker of
+            common_fastapi.server.
+        DUCKDB_TEMP_DIRECTORY (str): Directory DuckDB spills to, in a subdirectory per process.
+        DUCKDB_MAX_TEMP_DIRECTORY_SIZE (str | None): Disk space a connection may spill, e.g. "20GB"; None
+            keeps DuckDB's default of 90% of the free space.
+        DUCKDB_QUERY_TIMEOUT (float): Seconds after which a query of a request is interrupted with a 504;
+            0 disables it. Exports run by background jobs are not limited.
 
     """
 
@@ -37,6 +68,28 @@ class AppSettings(EnvSettings):
 
     DATABASE_URL: str | None = None  # Make DATABASE_URL a string
 
+    # Model inference configuration
+    INFERENCE_BATCH_CHUNK_SIZE: int = 10_000
+    INFERENCE_ENGINE: Literal["sklearn", "compiled"] = "sklearn"
+    INFERENCE_EXECUTOR: Literal["inline", "thread", "process"] = "thread"
+    INFERENCE_WORKERS: int = 2
+    INFERENCE_MAX_PENDING: int = 64
+    INFERENCE_QUEUE_TIMEOUT: float = 1.0
+    INFERENCE_CACHE_SIZE: int = 10_000
+    INFERENCE_CACHE_TTL: float = 300.0
+    INFERENCE_CACHE_QUANTIZATION: dict[str, float] = {}
+    INFERENCE_MODEL_MMAP_MODE: Literal["r", "c"] | None = "r"
+    INFERENCE_MODEL_POLL_INTERVAL: float = 5.0
+    INFERENCE_MODEL_MAX_LOADED: int = Field(default=3, ge=1)
+
+    # DuckDB configuration
+    DUCKDB_DATABASE: str = ":memory:"
+    DUCKDB_THREADS: int = Field(default=0, ge=0)
+    DUCKDB_MEMORY_LIMIT: str | None = None
+    DUCKDB_TEMP_DIRECTORY: str = os.path.join(tempfile.gettempdir(), "duckdb")
+    DUCKDB_MAX_TEMP_DIRECTORY_SIZE: str | None = None
+    DUCKDB_QUERY_TIMEOUT: float = Field(default=30.0, ge=0.0)
+
     @field_validator("DATABASE_URL", mode="before")
     def assemble_db_connection(cls, _: Any, info: Any) -> str:  # pylint: disable=no-self-argument
         """
@@ -9,28 +9,71 @@ Modules:
 - sqlmodel: A library for working with SQL databases using Python objects.
 """
 
+import time
 from collections.abc import AsyncGenerator
 from typing import Annotated, cast
 
 from fastapi import Depends
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, PoolProxiedConnection
 from sqlmodel import SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.config import app_settings
-from common_fastapi import APP_ENV, AppEnv, DbConnectionException
+from common_fastapi import APP_ENV, AppEnv, DbConnectionException, metrics_registry
+
+
+# Checkouts of idle connections take well under a millisecond, pre-ping included; the higher buckets mean the pool
+# is too small, or connections are being opened (see db_pool_connections_opened_total)
+POOL_CHECKOUT_BUCKETS = (0.0001, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+pool_checkout_seconds = metrics_registry.histogram(
+    "db_pool_checkout_seconds",
+    "Time to check out a database connection: waiting for a free one, opening a new one and the pre-ping",
+    buckets=POOL_CHECKOUT_BUCKETS,
+)
+pool_connections_opened = metrics_registry.counter("db_pool_connections_opened_total", "Database connections opened by the pool")
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each connection checkout takes"""
+
+    def connect(self) -> PoolProxiedConnection:
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            pool_checkout_seconds.observe(time.perf_counter() - start)
 
 
 # Create the async engine for database connection
 async_engine = create_async_engine(
     url=cast(str, app_settings.DATABASE_URL),  # Database URL from application settings
     echo=True,  # Enable SQLAlchemy query logging for debugging purposes
-    poolclass=NullPool if APP_ENV == AppEnv.TESTING else AsyncAdaptedQueuePool,  # pytest-asyncio works with NullPool
+    poolclass=NullPool if APP_ENV == AppEnv.TESTING else InstrumentedAsyncAdaptedQueuePool,  # pytest-asyncio works with NullPool
     pool_pre_ping=True,
 )
 
+if isinstance(async_engine.pool, AsyncAdaptedQueuePool):
+    event.listen(async_engine.pool, "connect", lambda *_: pool_connections_opened.inc())
+
+metrics_registry.gauge(
+    "db_pool_connections",
+    "Database connections held by the pool, by state",
+    ("state",),
+    collect=lambda: {("checked_out",): async_engine.pool.checkedout(), ("idle",): async_engine.pool.checkedin()}
+    if isinstance(async_engine.pool, AsyncAdaptedQueuePool)
+    else {},
+)
+
+# Session factory bound to the async engine, for code running outside a request, e.g. background jobs
+async_session_factory = sessionmaker(
+    bind=async_engine,           # Bind the session to the async engine
+    class_=AsyncSession,         # Use the async session class
+    expire_on_commit=False,      # Prevent automatic expiration of instances after commit
+)
+
 async def init_db() -> None:
     """
     Initialize the database by creating all the tables defined in the SQLModel metadata.
@@ -61,13 +104,6 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
     AsyncSession: An active session for executing database operations.
 
     """
-    # Create a session factory with the async engine
-    async_session_factory = sessionmaker(
-        bind=async_engine,           # Bind the session to the async engine
-        class_=AsyncSession,         # Use the async session class
-        expire_on_commit=False,      # Prevent automatic expiration of instances after commit
-    )
-
     # Provide the session to the caller and clean up after use
     try:
         async with async_session_factory() as session:
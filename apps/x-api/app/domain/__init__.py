@@ -1,9 +1,18 @@
 from .book.book_router import book_router
 from .publisher.publisher_router import publisher_router
 from .solar_panel.solar_panel_router import solar_panel_router
+from .dashboard_widget.dashboard_widget_router import dashboard_widget_router
 from .model_inference.model_inference_router import model_inference_router
 from .health.health_router import health_router
 from .test.test_router import test_router
 
 
-__all__ = ["book_router", "test_router", "health_router", "publisher_router", "solar_panel_router", "model_inference_router"]
+__all__ = [
+    "book_router",
+    "test_router",
+    "health_router",
+    "publisher_router",
+    "solar_panel_router",
+    "dashboard_widget_router",
+    "model_inference_router",
+]
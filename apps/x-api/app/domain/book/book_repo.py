@@ -3,7 +3,7 @@ from collections.abc import Sequence
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from common_fastapi import ResourceNotFoundException
+from common_fastapi import ResourceNotFoundException, response_cache
 
 from .book_dto import BookCreateForm
 from .book_entity import Book
@@ -22,6 +22,7 @@ class BookRepository:
         self.session.add(new_item)
         await self.session.commit()
         await self.session.refresh(new_item)
+        await response_cache.invalidate("book:list")
         return new_item
 
     async def find_all(self) -> Sequence[Book]:
@@ -46,6 +47,7 @@ class BookRepository:
             setattr(item, key, value)
         await self.session.commit()
         await self.session.refresh(item)
+        await response_cache.invalidate("book:list", f"book:{uid}")
         return item
 
     async def remove(self, uid: str) -> None:
@@ -53,3 +55,4 @@ class BookRepository:
         item = await self.find_one(uid)
         await self.session.delete(item)
         await self.session.commit()
+        await response_cache.invalidate("book:list", f"book:{uid}")
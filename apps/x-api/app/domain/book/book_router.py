@@ -9,6 +9,7 @@ from http import HTTPStatus
 from fastapi import APIRouter
 
 from app.db import AsyncSessionDep
+from common_fastapi import cache_response, trusted_response
 
 from .book_dto import BookCreateForm, BookResult
 from .book_entity import Book
@@ -18,9 +19,13 @@ from .book_service import BookService
 # Router for book-related endpoints
 book_router = APIRouter(
     prefix="/book",
-    tags=["Books"]  # Tag for OpenAPI documentation
+    tags=["Books"],  # Tag for OpenAPI documentation
 )
 
+# Seconds GET responses are cached; the repository invalidates them on every write
+CACHE_TTL = 300
+
+
 @book_router.post(
     "",
     response_model=BookResult,
@@ -43,6 +48,7 @@ async def create(form: BookCreateForm, session: AsyncSessionDep) -> Book:
     service = BookService(session)
     return await service.create(form)
 
+
 @book_router.get(
     "",
     response_model=list[BookResult],
@@ -50,6 +56,8 @@ async def create(form: BookCreateForm, session: AsyncSessionDep) -> Book:
     summary="Get All Books",
     description="Retrieve a list of all books.",
 )
+@cache_response(ttl=CACHE_TTL, tags=("book", "book:list"))
+@trusted_response()
 async def find_all(session: AsyncSessionDep) -> Sequence[Book]:
     """
     Retrieve all books.
@@ -64,6 +72,7 @@ async def find_all(session: AsyncSessionDep) -> Sequence[Book]:
     service = BookService(session)
     return await service.find_all()
 
+
 @book_router.get(
     "/{uid}",
     response_model=BookResult,
@@ -71,6 +80,7 @@ async def find_all(session: AsyncSessionDep) -> Sequence[Book]:
     summary="Get Book by ID",
     description="Retrieve a book by its unique identifier (UID).",
 )
+@cache_response(ttl=CACHE_TTL, tags=("book", "book:{uid}"))
 async def find_one(uid: str, session: AsyncSessionDep) -> Book:
     """
     Retrieve a book by its unique identifier.
@@ -86,6 +96,7 @@ async def find_one(uid: str, session: AsyncSessionDep) -> Book:
     service = BookService(session)
     return await service.find_one(uid)
 
+
 @book_router.put(
     "/{uid}",
     response_model=BookResult,
@@ -109,6 +120,7 @@ async def update(uid: str, form: BookCreateForm, session: AsyncSessionDep) -> Bo
     service = BookService(session)
     return await service.update(uid, form)
 
+
 @book_router.delete(
     "/{uid}",
     status_code=HTTPStatus.NO_CONTENT,
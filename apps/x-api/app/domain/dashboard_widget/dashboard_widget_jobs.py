@@ -0,0 +1,18 @@
+"""Background jobs of the dashboard widget domain, registered with `common_fastapi.job_runner`."""
+
+from common_fastapi import JobContext, job_runner, service_registry
+
+
+dashboard_widget_service = service_registry.dependency("dashboard_widget")
+
+
+async def create_dashboard_widgets(context: JobContext) -> dict[str, str]:
+    """Initialize the DashboardWidget collection from windmill.json; the repository invalidates cached responses"""
+    service = await dashboard_widget_service()
+    context.progress(0.0, "Loading windmill.json into MongoDB")
+    await service.create()
+    return {"message": "DashboardWidget collection created and populated"}
+
+
+# One at a time: every run replaces the whole collection
+job_runner.register("dashboard_widget.create", create_dashboard_widgets, executor="async", concurrency=1)
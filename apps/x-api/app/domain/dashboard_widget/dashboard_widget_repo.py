@@ -2,7 +2,7 @@ import json
 from pathlib import Path
 from datetime import datetime
 from motor.motor_asyncio import AsyncIOMotorClient
-from common_fastapi import ResourceNotFoundException
+from common_fastapi import ResourceNotFoundException, response_cache
 from .dashboard_widget_entity import DashboardWidget
 from .dashboard_widget_dto import DashboardWidgetCreateForm
 
@@ -18,6 +18,10 @@ class DashboardWidgetRepository:
         self.db = self.client["Widget"]
         self.collection = self.db["DashboardWidget"]
 
+    async def ping(self) -> None:
+        """Round trip to the server on the pooled client"""
+        await self.client.admin.command("ping")
+
     async def create(self) -> None:
         # ensure collection exists
         names = await self.db.list_collection_names()
@@ -33,6 +37,7 @@ class DashboardWidgetRepository:
             documents.append(doc)
         # insert many, ignoring duplicates on id
         await self.collection.insert_many(documents)
+        await response_cache.invalidate("dashboard_widget:list")
 
     async def find_all(self) -> list[DashboardWidget]:
         cursor = self.collection.find({})
@@ -54,12 +59,15 @@ class DashboardWidgetRepository:
         result = await self.collection.update_one({"id": uid}, {"$set": data})
         if result.matched_count == 0:
             raise ResourceNotFoundException(f"DashboardWidget with id {uid} not found")
+        await response_cache.invalidate("dashboard_widget:list", f"dashboard_widget:{uid}")
         return await self.find_one(uid)
 
     async def remove(self, uid: str) -> None:
         result = await self.collection.delete_one({"id": uid})
         if result.deleted_count == 0:
             raise ResourceNotFoundException(f"DashboardWidget with id {uid} not found")
+        await response_cache.invalidate("dashboard_widget:list", f"dashboard_widget:{uid}")
 
     async def remove_all(self) -> None:
-        await self.collection.delete_many({})
\ No newline at end of file
+        await self.collection.delete_many({})
+        await response_cache.invalidate("dashboard_widget")
\ No newline at end of file
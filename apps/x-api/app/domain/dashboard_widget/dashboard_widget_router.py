@@ -1,29 +1,49 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import TYPE_CHECKING, Annotated, Any, List
 from http import HTTPStatus
 
-from common_fastapi import ResourceNotFoundException
-from .dashboard_widget_service import DashboardWidgetService
+from common_fastapi import Job, ResourceNotFoundException, cache_response, job_runner, service_registry, trusted_response
 from .dashboard_widget_dto import DashboardWidgetResult, DashboardWidgetCreateForm
+from . import dashboard_widget_jobs  # noqa: F401  # registers the background jobs
+
+if TYPE_CHECKING:
+    from .dashboard_widget_service import DashboardWidgetService
+else:
+    DashboardWidgetService = Any
 
 dashboard_widget_router = APIRouter(prefix="/dashboard-widget", tags=["DashboardWidget"])
-service = DashboardWidgetService()
 
-@dashboard_widget_router.post("/", status_code=HTTPStatus.CREATED)
+# Seconds GET responses are cached; the repository invalidates them on every write
+CACHE_TTL = 300
+
+
+def build_service() -> "DashboardWidgetService":
+    """Build the service; imported here so importing the router does not load the MongoDB driver"""
+    from .dashboard_widget_service import DashboardWidgetService
+
+    return DashboardWidgetService()
+
+
+service_registry.register("dashboard_widget", build_service)
+ServiceDep = Annotated[DashboardWidgetService, Depends(service_registry.dependency("dashboard_widget"))]
+
+@dashboard_widget_router.post("/", response_model=Job, status_code=HTTPStatus.ACCEPTED)
 async def create_dashboard_widget():
     """
-    Initialize the DashboardWidget collection from windmill.json
+    Start initializing the DashboardWidget collection from windmill.json; follow the job at /jobs/{id}
     """
-    await service.create()
-    return {"message": "DashboardWidget collection created and populated"}
+    return await job_runner.submit("dashboard_widget.create")
 
 @dashboard_widget_router.get("/", response_model=List[DashboardWidgetResult])
-async def read_dashboard_widgets():
+@cache_response(ttl=CACHE_TTL, tags=("dashboard_widget", "dashboard_widget:list"))
+@trusted_response()
+async def read_dashboard_widgets(service: ServiceDep):
     """Retrieve all dashboard widgets"""
     return await service.find_all()
 
 @dashboard_widget_router.get("/{uid}", response_model=DashboardWidgetResult)
-async def read_dashboard_widget(uid: str):
+@cache_response(ttl=CACHE_TTL, tags=("dashboard_widget", "dashboard_widget:{uid}"))
+async def read_dashboard_widget(uid: str, service: ServiceDep):
     """Retrieve a single dashboard widget by ID"""
     try:
         return await service.find_one(uid)
@@ -31,7 +51,7 @@ async def read_dashboard_widget(uid: str):
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail=str(e))
 
 @dashboard_widget_router.put("/{uid}", response_model=DashboardWidgetResult)
-async def update_dashboard_widget(uid: str, form: DashboardWidgetCreateForm):
+async def update_dashboard_widget(uid: str, form: DashboardWidgetCreateForm, service: ServiceDep):
     """Update a dashboard widget by ID"""
     try:
         return await service.update(uid, form)
@@ -39,7 +59,7 @@ async def update_dashboard_widget(uid: str, form: DashboardWidgetCreateForm):
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail=str(e))
 
 @dashboard_widget_router.delete("/{uid}", status_code=HTTPStatus.NO_CONTENT)
-async def delete_dashboard_widget(uid: str):
+async def delete_dashboard_widget(uid: str, service: ServiceDep):
     """Delete a dashboard widget by ID"""
     try:
         await service.remove(uid)
@@ -47,6 +67,6 @@ async def delete_dashboard_widget(uid: str):
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail=str(e))
 
 @dashboard_widget_router.delete("/", status_code=HTTPStatus.NO_CONTENT)
-async def delete_all_dashboard_widgets():
+async def delete_all_dashboard_widgets(service: ServiceDep):
     """Truncate the DashboardWidget collection"""
     await service.remove_all()
\ No newline at end of file
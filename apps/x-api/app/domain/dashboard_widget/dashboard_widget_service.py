@@ -1,3 +1,5 @@
+from common_fastapi import coalesce
+
 from .dashboard_widget_repo import DashboardWidgetRepository
 from .dashboard_widget_dto import DashboardWidgetCreateForm
 from .dashboard_widget_entity import DashboardWidget
@@ -11,9 +13,11 @@ class DashboardWidgetService:
     async def create(self) -> None:
         return await self.repo.create()
 
+    @coalesce()
     async def find_all(self) -> list[DashboardWidget]:
         return await self.repo.find_all()
 
+    @coalesce()
     async def find_one(self, uid: str) -> DashboardWidget:
         return await self.repo.find_one(uid)
 
@@ -24,4 +28,10 @@ class DashboardWidgetService:
         return await self.repo.remove(uid)
 
     async def remove_all(self) -> None:
-        return await self.repo.remove_all()
\ No newline at end of file
+        return await self.repo.remove_all()
+
+    async def ping(self) -> None:
+        return await self.repo.ping()
+
+    def close(self) -> None:
+        self.repo.client.close()
\ No newline at end of file
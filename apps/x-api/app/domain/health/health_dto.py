@@ -5,8 +5,13 @@ from pydantic import BaseModel, Field
 
 class HealthIndicator(BaseModel):
     status: str = Field(..., description="The status of the health indicator ('up' or 'down').")
-    message: str | None = Field(None, description="Optional error message for unhealthy indicators.")
+    message: str | None = Field(None, description="Optional detail, such as the error of an unhealthy indicator.")
     latency: int | None = Field(None, description="Latency in milliseconds, if applicable.")
+    critical: bool = Field(True, description="Whether the indicator being down makes the application unready.")
+
+
+class LivenessResult(BaseModel):
+    status: str = Field(..., description="Always 'ok': the process is serving requests.")
 
 
 class HealthCheckResult(BaseModel):
@@ -0,0 +1,46 @@
+"""
+Health checks of the backends the API depends on, registered with `common_fastapi.health_checks`.
+
+Every check goes through the client the application already holds (the SQLAlchemy pool, the Motor client
+of the dashboard widget service, the DuckDB connection of the solar panel service, the loaded model) so a
+probe costs a round trip, not a new connection. Services not built yet are built by their first check.
+
+Only Postgres and the model are critical: without them most endpoints fail, so the instance should stop
+receiving traffic. MongoDB, the parquet files and the Iceberg catalog each back a few endpoints, are
+reported, but do not make the instance unready.
+"""
+
+from sqlalchemy import text
+
+from app.db.main import async_engine
+from common_fastapi import health_checks, service_registry
+
+from ..publisher.publisher_repo import PublisherRepository
+
+
+dashboard_widget_service = service_registry.dependency("dashboard_widget")
+
+
+async def check_database() -> None:
+    async with async_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def check_mongodb() -> None:
+    service = await dashboard_widget_service()
+    await service.ping()
+
+
+def check_duckdb_files() -> None:
+    service_registry.get("solar_panel").check_files()
+
+
+def check_model() -> str:
+    return service_registry.get("model_inference").check_model()
+
+
+health_checks.register("database", check_database)
+health_checks.register("model", check_model)
+health_checks.register("mongodb", check_mongodb, critical=False)
+health_checks.register("duckdb_files", check_duckdb_files, critical=False)
+health_checks.register("iceberg_catalog", PublisherRepository.check_iceberg_catalog, critical=False)
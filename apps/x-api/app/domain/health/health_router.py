@@ -1,14 +1,11 @@
-import time
 from http import HTTPStatus
-from typing import cast
-from urllib.parse import urlparse, urlunparse
 
-import asyncpg
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 
-from app.config import app_settings
+from common_fastapi import HealthChecks, health_checks
 
-from .health_dto import HealthCheckResult, HealthIndicator
+from . import health_indicators  # noqa: F401  # registers the backend checks
+from .health_dto import HealthCheckResult, HealthIndicator, LivenessResult
 
 
 # Router for health-related endpoints
@@ -17,63 +14,54 @@ health_router = APIRouter(
     tags=["Health"],  # Tag for OpenAPI documentation
 )
 
+
 @health_router.get(
-    "",
-    response_model=HealthCheckResult,
-    response_model_exclude_none=True,
+    "/live",
+    response_model=LivenessResult,
     status_code=HTTPStatus.OK,
-    summary="Get Book by ID",
-    description="Retrieve a book by its unique identifier (UID).",
+    summary="Liveness probe",
+    description="Answers as long as the process serves requests; no backend is checked, so an outage of a "
+    "dependency never gets the instance restarted.",
 )
-async def check() -> HealthCheckResult:
-    db_status = await check_database(cast(str, app_settings.DATABASE_URL))
-
-    # Determine overall status
-    overall_status = "error" if db_status.status == "down" else "ok"
+async def live() -> LivenessResult:
+    return LivenessResult(status="ok")
 
-    # Serialize database status once
-    serialized_db_status = db_status.model_dump()
 
-    # Build response
-    response = HealthCheckResult(
-        status=overall_status,
-        info={"database": serialized_db_status} if db_status.status == "up" else {},
-        error={"database": serialized_db_status} if db_status.status == "down" else {},
-        details={"database": serialized_db_status},
+@health_router.get(
+    "/ready",
+    response_model=HealthCheckResult,
+    response_model_exclude_none=True,
+    status_code=HTTPStatus.OK,
+    summary="Readiness probe",
+    description="Checks every backend concurrently, reusing results for HEALTH_CACHE_TTL seconds. "
+    "Responds 503 when a critical backend is down.",
+    responses={HTTPStatus.SERVICE_UNAVAILABLE: {"model": HealthCheckResult}},
+)
+async def ready(response: Response) -> HealthCheckResult:
+    results = await health_checks.run()
+    indicators = {
+        name: HealthIndicator(status=result.status, message=result.message, latency=result.latency_ms, critical=result.critical)
+        for name, result in results.items()
+    }
+    is_ready = HealthChecks.is_ready(results)
+    if not is_ready:
+        response.status_code = HTTPStatus.SERVICE_UNAVAILABLE
+    return HealthCheckResult(
+        status="ok" if is_ready else "error",
+        info={name: indicator for name, indicator in indicators.items() if indicator.status == "up"},
+        error={name: indicator for name, indicator in indicators.items() if indicator.status == "down"},
+        details=indicators,
     )
 
-    return response
 
-
-# Database health checker using SQLModel
-async def check_database(url: str) -> HealthIndicator:
-    """
-    Check the health of the database by attempting a connection.
-
-    Parameters
-    ----------
-    url : str
-        The database connection URL.
-
-    Returns
-    -------
-    HealthIndicator
-        The health status of the database.
-
-    """
-    try:
-        # Parse and adapt the database URL
-        parsed_url = urlparse(url)
-        if parsed_url.scheme == "postgresql+asyncpg":
-            modified_url = urlunparse(parsed_url._replace(scheme="postgresql"))
-        else:
-            modified_url = url
-
-        start_time = time.time()
-        conn = await asyncpg.connect(modified_url)
-        await conn.close()
-        latency = int((time.time() - start_time) * 1000)  # Convert to milliseconds
-        return HealthIndicator(status="up", latency=latency)
-    except Exception as e:  # pylint: disable=broad-except
-        # Return database down status with the error message
-        return HealthIndicator(status="down", message=str(e))
+# Kept for existing probes and dashboards; same as /health/ready
+health_router.add_api_route(
+    "",
+    ready,
+    methods=["GET"],
+    response_model=HealthCheckResult,
+    response_model_exclude_none=True,
+    status_code=HTTPStatus.OK,
+    summary="Readiness probe (alias of /health/ready)",
+    responses={HTTPStatus.SERVICE_UNAVAILABLE: {"model": HealthCheckResult}},
+)
@@ -0,0 +1,238 @@
+"""
+Build compacted variants of a trained solar status model and report their accuracy/latency/size trade-off.
+
+Run from `apps/x-api`:
+
+    uv run python -m app.domain.model_inference.compact_solar_panel_model \
+        [--model-version 20261019T120000Z] [--variant trees=50] [--variant trees=25,max_depth=10,min_samples_leaf=5]
+
+Each --variant is a comma-separated list of forest settings:
+- trees=N              keep N trees. On its own this slices the trained forest and needs no retraining.
+- max_depth=N          depth limit
+- min_samples_leaf=N   minimum samples per leaf (prunes small leaves)
+- ccp_alpha=X          minimal cost-complexity pruning
+Any setting other than `trees` retrains the forest on the base model's training split. Retraining reuses the
+base model's scaler and the chunked fit from train_solar_panel_model.
+
+Compiled node arrays always store float32 thresholds (rounded so predictions stay identical) and int32
+indexes; the report shows their size as compiled_mb.
+
+Every variant, including the base model, is loaded in a fresh process to measure the following:
+- test accuracy, on the same hashed test split as training
+- load time and resident memory added by loading the pickle
+- p50/p99 single-row latency of the sklearn and compiled engines
+
+Variants and report.json are written to models/solar_status_model_variants/<base version>/. To serve a variant,
+copy its .pkl into models/solar_status_model/ under a new version name.
+"""
+
+# ruff: noqa: T201
+
+import argparse
+import copy
+import json
+import multiprocessing
+import os
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import duckdb
+import joblib
+import numpy as np
+
+from app.config.duckdb_connection import connect_duckdb
+
+from . import train_solar_panel_model as train
+from .model_inference_compiled import CompiledForest
+from .model_inference_entity import FEATURE_COLUMNS
+from .model_inference_features import as_of_timestamp
+from .model_inference_registry import ModelRegistry
+from .model_inference_repo import ModelInferenceRepository
+
+
+VARIANTS_DIR = train.MODEL_DIR / "solar_status_model_variants"
+DEFAULT_VARIANTS = [
+    "trees=50",
+    "trees=25",
+    "max_depth=12",
+    "trees=50,max_depth=10,min_samples_leaf=5",
+    "trees=25,max_depth=8,min_samples_leaf=10",
+]
+VARIANT_SETTINGS = {"trees": int, "max_depth": int, "min_samples_leaf": int, "ccp_alpha": float}
+
+
+def parse_variant(spec: str) -> dict[str, Any]:
+    settings = {}
+    for item in spec.split(","):
+        key, sep, value = item.partition("=")
+        key = key.strip()
+        if not sep or key not in VARIANT_SETTINGS:
+            raise argparse.ArgumentTypeError(f"Invalid variant setting {item!r}; expected one of {', '.join(VARIANT_SETTINGS)}")
+        settings[key] = VARIANT_SETTINGS[key](value)
+    return settings
+
+
+def variant_name(settings: dict[str, Any]) -> str:
+    return "-".join(f"{key.replace('_', '')}{value}" for key, value in settings.items()) or "base"
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-version", help="Base model version (default: the active one)")
+    parser.add_argument("--variant", dest="variants", type=parse_variant, action="append", help="Variant settings, repeatable")
+    parser.add_argument("--sample-rows", type=int, help="Retrain and evaluate on a reservoir sample of this many panels")
+    parser.add_argument("--iterations", type=int, default=2000, help="Single-row predictions timed per engine")
+    parser.add_argument("--output-dir", type=Path, default=VARIANTS_DIR)
+    return parser.parse_args(argv)
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # Peak rather than current RSS, in KiB on Linux and bytes on macOS; good enough off Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _percentiles_us(fn, rows: np.ndarray, iterations: int) -> tuple[float, float]:
+    for i in range(min(50, iterations)):
+        fn(rows[i % len(rows) : i % len(rows) + 1])
+    samples = np.empty(iterations)
+    for i in range(iterations):
+        row = rows[i % len(rows) : i % len(rows) + 1]
+        start = time.perf_counter()
+        fn(row)
+        samples[i] = time.perf_counter() - start
+    return float(np.percentile(samples, 50) * 1e6), float(np.percentile(samples, 99) * 1e6)
+
+
+def measure(path: str, rows: np.ndarray, iterations: int) -> dict[str, Any]:
+    """Load one model artifact and time it; runs in a fresh process so memory and caches start cold"""
+    rss_before = _rss_bytes()
+    start = time.perf_counter()
+    repo = ModelInferenceRepository(Path(path), engine="sklearn")
+    load_seconds = time.perf_counter() - start
+    rss_mb = (_rss_bytes() - rss_before) / 2**20
+
+    start = time.perf_counter()
+    compiled = CompiledForest(repo.pipeline)
+    compile_seconds = time.perf_counter() - start
+    sklearn_p50, sklearn_p99 = _percentiles_us(repo.predict_matrix, rows, iterations)
+    compiled_p50, compiled_p99 = _percentiles_us(compiled.predict_proba, rows, iterations)
+    return {
+        "load_seconds": load_seconds,
+        "rss_mb": rss_mb,
+        "compile_seconds": compile_seconds,
+        "compiled_mb": compiled.nbytes / 2**20,
+        "sklearn_p50_us": sklearn_p50,
+        "sklearn_p99_us": sklearn_p99,
+        "compiled_p50_us": compiled_p50,
+        "compiled_p99_us": compiled_p99,
+    }
+
+
+def build_variant(
+    base: dict[str, Any],
+    settings: dict[str, Any],
+    con: duckdb.DuckDBPyConnection,
+    train_args: argparse.Namespace,
+    split: dict[str, int],
+    n_train: int,
+) -> dict[str, Any]:
+    """Return a model bundle for one variant of the base bundle"""
+    pipeline = base["pipeline"]
+    forest = pipeline.named_steps["classifier"]
+    n_trees = settings.get("trees", len(forest.estimators_))
+    if set(settings) <= {"trees"}:
+        # The first N trees of a random forest are themselves a valid, smaller random forest
+        sliced = copy.copy(forest)
+        sliced.estimators_ = forest.estimators_[:n_trees]
+        sliced.n_estimators = len(sliced.estimators_)
+        variant = copy.copy(pipeline)
+        variant.steps = [(name, sliced if step is forest else step) for name, step in pipeline.steps]
+    else:
+        args = copy.copy(train_args)
+        args.n_estimators = n_trees
+        args.max_depth = settings.get("max_depth", forest.max_depth)
+        args.min_samples_leaf = settings.get("min_samples_leaf", forest.min_samples_leaf)
+        args.ccp_alpha = settings.get("ccp_alpha", forest.ccp_alpha)
+        scaler = pipeline.named_steps["scaler"]
+        retrained, _ = train.fit_forest(con, args, split, n_train, scaler, base["label_encoder"])
+        variant = copy.copy(pipeline)
+        variant.steps = [(name, retrained if step is forest else step) for name, step in pipeline.steps]
+    return {"pipeline": variant, "label_encoder": base["label_encoder"]}
+
+
+def main(argv: list[str] | None = None) -> list[dict[str, Any]]:
+    args = parse_args(argv)
+    registry = ModelRegistry(poll_interval=0)
+    base_model = registry.get(args.model_version)
+    base = joblib.load(base_model.model_path)
+    base_params = base.get("metadata", {}).get("params", {})
+    if not base_params:
+        print(f"Model {base_model.version} has no training metadata; its test split is unknown, so accuracies may be optimistic")
+
+    # Rebuild the base model's train/test split so variants are trained and scored on the same rows
+    train_args = train.parse_args([])
+    train_args.random_state = base_params.get("random_state", train_args.random_state)
+    train_args.test_percent = base_params.get("test_percent", train_args.test_percent)
+    train_args.sample_rows = args.sample_rows
+    as_of = as_of_timestamp(base.get("metadata", {}).get("as_of"))
+    split = {"seed": train_args.random_state, "test_percent": train_args.test_percent}
+    con = connect_duckdb()
+    train.prepare_panels(con, train_args, as_of)
+    n_train = con.execute(f"SELECT count(*) FROM panels WHERE {train.TRAIN_WHERE}", split).fetchone()[0]  # noqa: S608  # module constant only
+    rows_query = f"SELECT {', '.join(FEATURE_COLUMNS)} FROM panels WHERE {train.TEST_WHERE} LIMIT 1000"  # noqa: S608  # module constants only
+    rows = con.execute(rows_query, split).df().to_numpy(np.float64)
+
+    out_dir = args.output_dir / base_model.version
+    out_dir.mkdir(parents=True, exist_ok=True)
+    report = []
+    for settings in [{}, *(args.variants or [parse_variant(spec) for spec in DEFAULT_VARIANTS])]:
+        name = variant_name(settings)
+        start = time.perf_counter()
+        if settings:
+            bundle = build_variant(base, settings, con, train_args, split, n_train)
+            path = out_dir / f"{name}.pkl"
+            joblib.dump(bundle, path)
+        else:
+            bundle, path = base, base_model.model_path
+        build_seconds = time.perf_counter() - start
+        forest = bundle["pipeline"].named_steps["classifier"]
+        metrics = train.evaluate(con, bundle["pipeline"], bundle["label_encoder"], train.TEST_WHERE, split, train_args.chunk_size)
+
+        # A fresh spawned process per variant, so load time and RSS are not skewed by earlier variants
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            timings = pool.submit(measure, str(path), rows, args.iterations).result()
+        entry = {
+            "name": name,
+            "settings": settings,
+            "path": str(path),
+            "trees": len(forest.estimators_),
+            "nodes": int(sum(tree.tree_.node_count for tree in forest.estimators_)),
+            "max_depth": int(max(tree.tree_.max_depth for tree in forest.estimators_)),
+            "accuracy": metrics["accuracy"],
+            "pickle_mb": path.stat().st_size / 2**20,
+            "build_seconds": build_seconds,
+            **timings,
+        }
+        report.append(entry)
+        print(
+            f"{name:<40} acc={entry['accuracy']:.4f} trees={entry['trees']:>3} nodes={entry['nodes']:>8,} "
+            f"pickle={entry['pickle_mb']:6.1f}MB rss={entry['rss_mb']:6.1f}MB load={entry['load_seconds'] * 1e3:6.1f}ms "
+            f"sklearn p50/p99={entry['sklearn_p50_us']:,.0f}/{entry['sklearn_p99_us']:,.0f}us "
+            f"compiled p50/p99={entry['compiled_p50_us']:,.0f}/{entry['compiled_p99_us']:,.0f}us compiled={entry['compiled_mb']:.1f}MB"
+        )
+
+    report_path = out_dir / "report.json"
+    report_path.write_text(json.dumps({"base_version": base_model.version, "variants": report}, indent=2), encoding="utf-8")
+    print(f"Report written to {report_path}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+Readers and writers for the batch prediction endpoint.
+
+Requests are decoded into feature chunks of at most `chunk_size` rows, each chunk is scored in one
+vectorized pass, and predictions are streamed back in the same format the client sent:
+
+- application/json: a JSON array of feature objects, answered with a JSON array
+- application/x-ndjson: one feature object per line, answered line by line while the body is still arriving
+- application/vnd.apache.parquet: a parquet file, answered with a parquet file (one row group per chunk)
+- application/vnd.apache.arrow.stream: an Arrow IPC stream, answered with an Arrow IPC stream
+
+An optional `id` field is echoed back on every prediction so results can be joined to their inputs.
+"""
+
+import asyncio
+import io
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Iterator
+from typing import Any
+
+import numpy as np
+import orjson
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from common_fastapi.exceptions.error_code import ErrorCode
+
+from .model_inference_entity import FEATURE_COLUMNS
+from .model_inference_formats import ARROW_STREAM, CONTENT_TYPES, JSON, NDJSON, PARQUET, BatchFormatError, resolve_format  # noqa: F401
+
+
+ID_COLUMN = "id"
+
+# (features, ids) for one chunk; ids is None when the client did not send an id column
+FeatureChunk = tuple[pd.DataFrame, pd.Series | None]
+Scorer = Callable[[pd.DataFrame], Awaitable[tuple[np.ndarray, np.ndarray]]]
+
+
+def split_features(frame: pd.DataFrame, offset: int = 0) -> FeatureChunk:
+    """Validate a decoded chunk and split it into the float feature matrix and the optional id column"""
+    missing = [col for col in FEATURE_COLUMNS if col not in frame.columns]
+    if missing:
+        raise BatchFormatError(f"Missing feature columns: {', '.join(missing)}")
+    features = frame[FEATURE_COLUMNS].apply(pd.to_numeric, errors="coerce").astype("float64")
+    invalid = features.isna().any(axis=1).to_numpy()
+    if invalid.any():
+        row = offset + int(np.argmax(invalid))
+        raise BatchFormatError(f"Row {row} has missing or non-numeric feature values")
+    ids = frame[ID_COLUMN].reset_index(drop=True) if ID_COLUMN in frame.columns else None
+    return features.reset_index(drop=True), ids
+
+
+# ---------------------------------------------------------------------------
+# Readers
+# ---------------------------------------------------------------------------
+
+def read_json(body: bytes, chunk_size: int) -> Iterator[FeatureChunk]:
+    """Decode a JSON array of feature objects"""
+    try:
+        rows = orjson.loads(body)
+    except orjson.JSONDecodeError as e:
+        raise BatchFormatError(f"Invalid JSON: {e}") from e
+    if not isinstance(rows, list):
+        raise BatchFormatError("Expected a JSON array of feature objects")
+    for start in range(0, len(rows), chunk_size):
+        yield split_features(pd.DataFrame.from_records(rows[start:start + chunk_size]), start)
+
+
+async def read_ndjson(stream: AsyncIterator[bytes], chunk_size: int) -> AsyncIterator[FeatureChunk]:
+    """Decode newline-delimited feature objects as the request body arrives, one chunk at a time in a thread"""
+    pending = b""
+    lines: list[bytes] = []
+    offset = 0
+    async for data in stream:
+        *complete, pending = (pending + data).split(b"\n")
+        for line in complete:
+            if line.strip():
+                lines.append(line)
+            if len(lines) >= chunk_size:
+                yield await asyncio.to_thread(_decode_lines, lines, offset)
+                offset += len(lines)
+                lines = []
+    if pending.strip():
+        lines.append(pending)
+    if lines:
+        yield await asyncio.to_thread(_decode_lines, lines, offset)
+
+
+def _decode_lines(lines: list[bytes], offset: int) -> FeatureChunk:
+    return split_features(pd.DataFrame.from_records([_load_line(line, offset + i) for i, line in enumerate(lines)]), offset)
+
+
+def _load_line(line: bytes, row: int) -> dict[str, Any]:
+    try:
+        obj = orjson.loads(line)
+    except orjson.JSONDecodeError as e:
+        raise BatchFormatError(f"Row {row} is not valid JSON: {e}") from e
+    if not isinstance(obj, dict):
+        raise BatchFormatError(f"Row {row} is not a JSON object")
+    return obj
+
+
+def read_parquet(body: bytes, chunk_size: int) -> Iterator[FeatureChunk]:
+    """Decode an uploaded parquet file one record batch at a time"""
+    try:
+        parquet_file = pq.ParquetFile(pa.BufferReader(body))
+    except pa.ArrowException as e:
+        raise BatchFormatError(f"Invalid parquet payload: {e}") from e
+    columns = [col for col in [*FEATURE_COLUMNS, ID_COLUMN] if col in parquet_file.schema_arrow.names]
+    offset = 0
+    for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+        yield split_features(batch.to_pandas(), offset)
+        offset += batch.num_rows
+
+
+def read_arrow_stream(body: bytes, chunk_size: int) -> Iterator[FeatureChunk]:
+    """Decode an Arrow IPC stream, re-slicing record batches into chunks of at most `chunk_size` rows"""
+    try:
+        reader = pa.ipc.open_stream(pa.BufferReader(body))
+    except pa.ArrowException as e:
+        raise BatchFormatError(f"Invalid Arrow IPC stream: {e}") from e
+    offset = 0
+    for batch in reader:
+        for start in range(0, batch.num_rows, chunk_size):
+            piece = batch.slice(start, chunk_size)
+            yield split_features(piece.to_pandas(), offset)
+            offset += piece.num_rows
+
+
+READERS: dict[str, Callable[[bytes, int], Iterator[FeatureChunk]]] = {
+    JSON: read_json,
+    PARQUET: read_parquet,
+    ARROW_STREAM: read_arrow_stream,
+}
+
+
+def read_body(fmt: str, body: bytes, chunk_size: int) -> list[FeatureChunk]:
+    """Decode and validate a whole in-memory body, so a bad row is a 422 rather than a truncated stream"""
+    return list(READERS[fmt](body, chunk_size))
+
+
+# ---------------------------------------------------------------------------
+# Writers
+# ---------------------------------------------------------------------------
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file object whose contents can be taken after every write, so Arrow writers can stream"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._parts: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        out, self._parts = b"".join(self._parts), []
+        return out
+
+
+def to_records(ids: pd.Series | None, labels: np.ndarray, proba: np.ndarray, classes: np.ndarray) -> list[dict[str, Any]]:
+    """Build InferenceResultDTO-shaped dicts for one scored chunk"""
+    class_names = [str(c) for c in classes]
+    probabilities = [dict(zip(class_names, row, strict=True)) for row in proba.tolist()]
+    records = [
+        {"predicted_status": str(label), "probabilities": probs}
+        for label, probs in zip(labels.tolist(), probabilities, strict=True)
+    ]
+    if ids is not None:
+        for record, id_ in zip(records, ids.tolist(), strict=True):
+            record[ID_COLUMN] = id_
+    return records
+
+
+def to_table(ids: pd.Series | None, labels: np.ndarray, proba: np.ndarray, classes: np.ndarray) -> pa.Table:
+    """Build a flat Arrow table for one scored chunk, one probability column per status"""
+    columns: dict[str, Any] = {}
+    if ids is not None:
+        columns[ID_COLUMN] = pa.array(ids)
+    columns["predicted_status"] = pa.array(labels.astype(str), type=pa.string())
+    for i, name in enumerate(classes):
+        columns[f"probability_{name}"] = pa.array(proba[:, i], type=pa.float64())
+    return pa.table(columns)
+
+
+async def write_json(scored: AsyncIterator[tuple[Any, ...]]) -> AsyncIterator[bytes]:
+    yield b"["
+    first = True
+    async for chunk in scored:
+        records = to_records(*chunk)
+        if not records:
+            continue
+        body = b",".join(orjson.dumps(record) for record in records)
+        yield body if first else b"," + body
+        first = False
+    yield b"]"
+
+
+async def write_ndjson(scored: AsyncIterator[tuple[Any, ...]]) -> AsyncIterator[bytes]:
+    try:
+        async for chunk in scored:
+            yield b"".join(orjson.dumps(record) + b"\n" for record in to_records(*chunk))
+    except BatchFormatError as e:
+        # The response is already streaming, so report the bad row in-band and stop
+        yield orjson.dumps({"error": str(e), "error_code": ErrorCode.REQUEST_VALIDATION}) + b"\n"
+
+
+async def write_parquet(scored: AsyncIterator[tuple[Any, ...]]) -> AsyncIterator[bytes]:
+    sink = _DrainableSink()
+    writer: pq.ParquetWriter | None = None
+    async for chunk in scored:
+        table = to_table(*chunk)
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema)
+        writer.write_table(table)
+        yield sink.drain()
+    if writer is not None:
+        writer.close()
+    yield sink.drain()
+
+
+async def write_arrow_stream(scored: AsyncIterator[tuple[Any, ...]]) -> AsyncIterator[bytes]:
+    sink = _DrainableSink()
+    writer: pa.ipc.RecordBatchStreamWriter | None = None
+    async for chunk in scored:
+        table = to_table(*chunk)
+        if writer is None:
+            writer = pa.ipc.new_stream(sink, table.schema)
+        writer.write_table(table)
+        yield sink.drain()
+    if writer is not None:
+        writer.close()
+    yield sink.drain()
+
+
+WRITERS = {
+    JSON: write_json,
+    NDJSON: write_ndjson,
+    PARQUET: write_parquet,
+    ARROW_STREAM: write_arrow_stream,
+}
+
+
+async def aiter_chunks(chunks: Iterable[FeatureChunk]) -> AsyncIterator[FeatureChunk]:
+    """Adapt a synchronous chunk reader to the async pipeline used by the writers"""
+    for chunk in chunks:
+        yield chunk
+
+
+async def score_chunks(
+    chunks: AsyncIterator[FeatureChunk], score: Scorer, classes: np.ndarray
+) -> AsyncIterator[tuple[pd.Series | None, np.ndarray, np.ndarray, np.ndarray]]:
+    """Score each chunk in one vectorized pass"""
+    async for features, ids in chunks:
+        labels, proba = await score(features)
+        yield ids, labels, proba, classes
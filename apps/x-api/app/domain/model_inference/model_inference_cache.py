@@ -0,0 +1,102 @@
+"""
+LRU + TTL cache of single-row predictions, keyed on quantized feature vectors.
+
+Gateways resend the same, or nearly the same, (voltage, temperature, latitude, longitude, panel_age_days)
+tuples. Each feature can be given a quantization step (INFERENCE_CACHE_QUANTIZATION); inputs are snapped to
+that grid before both the cache lookup and the prediction, so every input in a grid cell gets the same,
+deterministic result regardless of which one arrived first. Features without a step are matched exactly.
+
+Keys include the model version and file fingerprint, so a pinned version never sees another version's
+results. Entries are dropped when they outlive the TTL, when the cache is full (least recently used first),
+and all at once whenever the registry swaps in a new active model.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any
+
+import numpy as np
+
+from .model_inference_entity import FEATURE_COLUMNS
+
+
+class PredictionCache:
+    """In-process LRU/TTL cache for predictions"""
+
+    def __init__(self, max_entries: int, ttl: float, quantization: dict[str, float]) -> None:
+        unknown = set(quantization) - set(FEATURE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown features in cache quantization: {', '.join(sorted(unknown))}")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._steps = np.array([float(quantization.get(col, 0.0)) for col in FEATURE_COLUMNS])
+        self._quantized = self._steps > 0
+        self._entries: OrderedDict[tuple[Any, ...], tuple[float, Any]] = OrderedDict()
+        self._model_token: tuple[Any, ...] | None = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def quantize(self, X: np.ndarray) -> np.ndarray:
+        """Snap feature rows onto the configured grid; features without a step are left untouched"""
+        if not self._quantized.any():
+            return X
+        Xq = np.array(X, dtype=np.float64)
+        steps = self._steps[self._quantized]
+        Xq[..., self._quantized] = np.round(Xq[..., self._quantized] / steps) * steps
+        return Xq
+
+    @staticmethod
+    def key(x: np.ndarray, model_token: tuple[Any, ...] = ()) -> tuple[Any, ...]:
+        """Cache key of an already-quantized feature row scored by the model identified by `model_token`"""
+        return (*model_token, *x.tolist())
+
+    def sync_model(self, model_token: tuple[Any, ...]) -> None:
+        """Drop every entry when the active model changes"""
+        if model_token != self._model_token:
+            if self._model_token is not None:
+                self.clear()
+            self._model_token = model_token
+
+    def get(self, key: tuple[Any, ...]) -> Any | None:
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= now:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: tuple[Any, ...], value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.invalidations += 1
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
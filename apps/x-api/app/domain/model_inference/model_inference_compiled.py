@@ -0,0 +1,192 @@
+"""
+Compiled evaluator for the solar status model.
+
+`CompiledForest` flattens a trained `StandardScaler` + `RandomForestClassifier` pipeline into a handful of
+NumPy node arrays at load time, then walks every tree of the forest for every row level by level in one
+vectorized loop. A single pass yields both the class probabilities and the predicted class, with no pandas, no
+sklearn input validation and no per-call label decoding.
+
+The arithmetic deliberately mirrors sklearn so results are bit-for-bit identical:
+- scaling is `(X - mean_) / scale_` in float64, then cast to float32 like `BaseDecisionTree` does,
+- split tests compare the float32 feature against the threshold with `<=`; thresholds are stored as float32
+  rounded towards -inf, which is exact for float32 inputs (x <= t  <=>  x <= largest float32 not above t),
+- NaN features follow each node's `missing_go_to_left`, the side sklearn sends missing values to,
+- node indexes are stored as int32, halving the size of the node arrays,
+- leaf values are normalised per tree and accumulated in estimator order before dividing by the tree count.
+
+The flat arrays can be saved next to the model and loaded back with `mmap_mode`, so every worker process
+maps the same pages instead of holding a private copy of the forest.
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from .model_inference_entity import FEATURE_COLUMNS
+
+
+logger = logging.getLogger(__name__)
+
+# sklearn's marker for "no child"; compiled leaves point back at themselves instead
+_TREE_LEAF = -1
+
+
+def float32_floor(values: np.ndarray) -> np.ndarray:
+    """Round float64 values down to the nearest float32, so `x32 <= t` keeps its outcome for every float32 x"""
+    rounded = values.astype(np.float32)
+    too_high = rounded.astype(np.float64) > values
+    rounded[too_high] = np.nextafter(rounded[too_high], np.float32(-np.inf))
+    return rounded
+
+
+class CompiledModelMismatch(RuntimeError):
+    """Raised when the compiled evaluator does not reproduce the sklearn pipeline's predictions"""
+
+
+class CompiledForest:
+    """Flat NumPy representation of a scaler + random forest pipeline"""
+
+    # Bumped whenever the node arrays change, so arrays saved by an older version are compiled again
+    FORMAT = 2
+
+    def __init__(self, pipeline: Pipeline) -> None:
+        steps = list(pipeline.named_steps.values())
+        scaler = steps[0] if len(steps) == 2 else None
+        forest = steps[-1]
+        if not isinstance(forest, RandomForestClassifier) or (scaler is not None and not isinstance(scaler, StandardScaler)):
+            raise TypeError(f"Unsupported pipeline for compilation: {[type(s).__name__ for s in steps]}")
+        if forest.n_outputs_ != 1:
+            raise TypeError("Only single-output forests can be compiled")
+
+        self.n_features = int(forest.n_features_in_)
+        self.classes = forest.classes_
+        self.n_classes = len(self.classes)
+        self.n_trees = len(forest.estimators_)
+
+        # Scaler parameters; None means the corresponding sklearn step is a no-op
+        self.mean = scaler.mean_ if scaler is not None and scaler.with_mean else None
+        self.scale = scaler.scale_ if scaler is not None and scaler.with_std else None
+
+        lefts, rights, features, thresholds, missing_lefts, values, roots = [], [], [], [], [], [], []
+        offset = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            index = np.arange(tree.node_count, dtype=np.intp) + offset
+            is_leaf = tree.children_left == _TREE_LEAF
+            lefts.append(np.where(is_leaf, index, tree.children_left + offset))
+            rights.append(np.where(is_leaf, index, tree.children_right + offset))
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.intp))
+            thresholds.append(tree.threshold.astype(np.float64))
+            missing_lefts.append(tree.missing_go_to_left.astype(bool))
+            # Same normalisation as DecisionTreeClassifier.predict_proba
+            proba = tree.value[:, 0, : self.n_classes].astype(np.float64)
+            normalizer = proba.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(proba / normalizer)
+            roots.append(offset)
+            offset += tree.node_count
+
+        index_dtype = np.int32 if offset < np.iinfo(np.int32).max else np.intp
+        self.left = np.concatenate(lefts).astype(index_dtype)
+        self.right = np.concatenate(rights).astype(index_dtype)
+        self.feature = np.concatenate(features).astype(index_dtype)
+        self.threshold = float32_floor(np.concatenate(thresholds))
+        self.missing_left = np.concatenate(missing_lefts)
+        self.value = np.concatenate(values)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.is_leaf = self.left == np.arange(len(self.left))
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the node arrays"""
+        return sum(a.nbytes for a in (self.left, self.right, self.feature, self.threshold, self.missing_left, self.value, self.roots, self.is_leaf))
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        """Apply the scaler and cast to the float32 precision the trees split on"""
+        X = np.array(X, dtype=np.float64)
+        if self.mean is not None:
+            X -= self.mean
+        if self.scale is not None:
+            X /= self.scale
+        return X.astype(np.float32)
+
+    def leaves(self, X32: np.ndarray) -> np.ndarray:
+        """Return the global leaf index reached in every tree, shape (n_samples, n_trees)"""
+        n_samples = X32.shape[0]
+        node = np.tile(self.roots, n_samples)
+        row = np.repeat(np.arange(n_samples), self.n_trees)
+        # Only (row, tree) walks that have not reached a leaf yet are advanced on each level
+        active = np.arange(node.size)
+        while active.size:
+            current = node[active]
+            x = X32[row[active], self.feature[current]]
+            go_left = (x <= self.threshold[current]) | (np.isnan(x) & self.missing_left[current])
+            node[active] = following = np.where(go_left, self.left[current], self.right[current])
+            active = active[~self.is_leaf[following]]
+        return node.reshape(n_samples, self.n_trees)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Class probabilities for raw (unscaled) feature rows"""
+        leaf_values = self.value[self.leaves(self.transform(X))]
+        # cumsum accumulates strictly in estimator order, like RandomForestClassifier's `out += prediction`
+        return np.cumsum(leaf_values, axis=1)[:, -1, :] / self.n_trees
+
+    def predict(self, X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Encoded class predictions and class probabilities from a single pass"""
+        proba = self.predict_proba(X)
+        return self.classes.take(proba.argmax(axis=1)), proba
+
+    def probe_inputs(self, n_samples: int = 2048, seed: int = 0) -> np.ndarray:
+        """
+        Build validation inputs: random rows spread around the training distribution, plus rows placed
+        exactly on split thresholds, where a precision mismatch would flip a branch.
+        """
+        rng = np.random.default_rng(seed)
+        mean = self.mean if self.mean is not None else np.zeros(self.n_features)
+        scale = self.scale if self.scale is not None else np.ones(self.n_features)
+        random_rows = mean + scale * rng.normal(0.0, 2.0, size=(n_samples, self.n_features))
+
+        split_nodes = np.flatnonzero(~self.is_leaf)
+        picked = rng.choice(split_nodes, size=min(n_samples, len(split_nodes)), replace=False)
+        boundary_rows = mean + scale * rng.normal(0.0, 2.0, size=(len(picked), self.n_features))
+        boundary_rows[np.arange(len(picked)), self.feature[picked]] = (
+            self.threshold[picked] * scale[self.feature[picked]] + mean[self.feature[picked]]
+        )
+        return np.vstack([random_rows, boundary_rows])
+
+    def validate(self, pipeline: Pipeline, X: np.ndarray) -> None:
+        """Check that predictions on `X` are identical to the sklearn pipeline's"""
+        frame = pd.DataFrame(X, columns=FEATURE_COLUMNS)
+        expected_proba = pipeline.predict_proba(frame)
+        expected = pipeline.predict(frame)
+        predicted, proba = self.predict(X)
+        if not np.array_equal(predicted, expected):
+            raise CompiledModelMismatch(f"{int((predicted != expected).sum())} of {len(X)} labels differ from sklearn")
+        if not np.array_equal(proba, expected_proba):
+            max_diff = float(np.abs(proba - expected_proba).max())
+            raise CompiledModelMismatch(f"Probabilities differ from sklearn (max abs diff {max_diff:.3e})")
+        logger.info("Compiled forest matches sklearn on %d probe rows", len(X))
+
+    def save(self, path: Path, source: Any) -> None:
+        """Persist the node arrays uncompressed (so they can be memory-mapped), tagged with the source model identity"""
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        joblib.dump({"source": source, "format": self.FORMAT, "state": self.__dict__}, tmp_path)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path, source: Any, mmap_mode: str | None = None) -> "CompiledForest | None":
+        """Load saved node arrays, or return None if they were compiled from a different model file or format"""
+        data = joblib.load(path, mmap_mode=mmap_mode)
+        if data.get("source") != source or data.get("format") != cls.FORMAT:
+            return None
+        compiled = cls.__new__(cls)
+        compiled.__dict__.update(data["state"])
+        return compiled
@@ -1,3 +1,5 @@
+from pydantic import BaseModel, Field
+
 from .model_inference_entity import InferenceInputEntity, InferenceResultEntity
 
 class InferenceInputDTO(InferenceInputEntity):
@@ -6,4 +8,47 @@ class InferenceInputDTO(InferenceInputEntity):
 
 class InferenceResultDTO(InferenceResultEntity):
     """Response DTO for model inference"""
-    pass
\ No newline at end of file
+    pass
+
+class PredictionCacheStatsDTO(BaseModel):
+    """Response DTO for prediction cache counters"""
+    enabled: bool
+    size: int
+    max_entries: int
+    ttl_seconds: float
+    hits: int
+    misses: int
+    hit_ratio: float
+    evictions: int
+    invalidations: int
+
+class ModelRegistryDTO(BaseModel):
+    """Response DTO for the model registry state"""
+    active_version: str
+    available_versions: list[str]
+    loaded_versions: list[str]
+    swaps: int
+
+class PanelPredictionDTO(InferenceResultDTO):
+    """Response DTO for the prediction of a single panel, with the features it was scored on"""
+    id: int
+    features: InferenceInputDTO
+
+class PanelPredictionRequestDTO(BaseModel):
+    """Request DTO for predicting several panels at once"""
+    ids: list[int] = Field(min_length=1, max_length=1000)
+
+class PanelPredictionsDTO(BaseModel):
+    """Response DTO for multi-panel predictions; ids without panel data are listed in missing_ids"""
+    predictions: list[PanelPredictionDTO]
+    missing_ids: list[int]
+
+class TrainModelDTO(BaseModel):
+    """Request DTO for training a model version in the background; options of train_solar_panel_model"""
+    sample_rows: int | None = Field(default=None, gt=0)
+    n_estimators: int = Field(default=100, ge=1)
+    max_depth: int | None = Field(default=None, ge=1)
+    # One core by default: the job shares the machine with the workers serving requests
+    n_jobs: int = 1
+    activate: bool = False
+
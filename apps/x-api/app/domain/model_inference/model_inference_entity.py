@@ -11,4 +11,7 @@ class InferenceInputEntity(BaseModel):
 class InferenceResultEntity(BaseModel):
     """Domain entity for inference output"""
     predicted_status: str
-    probabilities: dict[str, float]
\ No newline at end of file
+    probabilities: dict[str, float]
+
+# Column order the model pipeline was trained on
+FEATURE_COLUMNS = list(InferenceInputEntity.model_fields)
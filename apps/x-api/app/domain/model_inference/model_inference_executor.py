@@ -0,0 +1,133 @@
+"""
+Runs model inference off the event loop.
+
+Modes (INFERENCE_EXECUTOR):
+- inline:  call the repository directly on the event loop (lowest overhead, blocks other requests)
+- thread:  run on a dedicated thread pool; NumPy and sklearn release the GIL for most of the tree walk
+- process: run on a process pool whose children each load a model version once, on first use
+
+Every mode shares the same admission control: at most INFERENCE_MAX_PENDING calls may be running or
+queued at once. Callers beyond that wait up to INFERENCE_QUEUE_TIMEOUT seconds for a slot and are then
+rejected with a 503 + Retry-After, so a burst of inference traffic queues here instead of piling onto
+the event loop and starving the other routers.
+"""
+
+import asyncio
+import logging
+import math
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import numpy as np
+
+from app.config import app_settings
+from common_fastapi import ServiceOverloadedException
+
+from .model_inference_repo import ModelInferenceRepository
+
+
+logger = logging.getLogger(__name__)
+
+# Models loaded by a process-pool child, keyed by (path, fingerprint) so a rewritten file is reloaded
+_worker_models: dict[tuple[str, object], ModelInferenceRepository] = {}
+
+
+def _init_worker(spec: tuple[str, str, str | None, str], fingerprint: object) -> None:
+    _worker_model(spec, fingerprint)
+
+
+def _worker_model(spec: tuple[str, str, str | None, str], fingerprint: object) -> ModelInferenceRepository:
+    path, engine, mmap_mode, version = spec
+    key = (path, fingerprint)
+    model = _worker_models.get(key)
+    if model is None:
+        model = ModelInferenceRepository(Path(path), engine=engine, mmap_mode=mmap_mode, version=version)
+        # Children hold the active model plus, at most, a few pinned versions
+        while len(_worker_models) >= app_settings.INFERENCE_MODEL_MAX_LOADED:
+            del _worker_models[next(iter(_worker_models))]
+        _worker_models[key] = model
+    return model
+
+
+def _worker_predict_matrix(
+    spec: tuple[str, str, str | None, str], fingerprint: object, X: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    return _worker_model(spec, fingerprint).predict_matrix(X)
+
+
+class InferenceExecutor:
+    """Admission-controlled dispatcher for repository predictions"""
+
+    def __init__(
+        self,
+        initial_model: ModelInferenceRepository,
+        mode: str = app_settings.INFERENCE_EXECUTOR,
+        workers: int = app_settings.INFERENCE_WORKERS,
+        max_pending: int = app_settings.INFERENCE_MAX_PENDING,
+        queue_timeout: float = app_settings.INFERENCE_QUEUE_TIMEOUT,
+    ) -> None:
+        self.initial_model = initial_model
+        self.mode = mode
+        self.workers = workers
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(max_pending)
+        self._pool: Executor | None = None
+        # Exposed for monitoring
+        self.pending = 0
+        self.rejected = 0
+
+    def _get_pool(self) -> Executor | None:
+        if self.mode == "inline":
+            return None
+        if self._pool is None:
+            if self.mode == "process":
+                # spawn, not fork: the parent holds an event loop, DB pools and client threads that must not be cloned
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.initial_model.spec, self.initial_model.fingerprint),
+                )
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+            logger.info("Started %s inference pool with %d workers", self.mode, self.workers)
+        return self._pool
+
+    async def predict_matrix(self, X: np.ndarray, model: ModelInferenceRepository) -> tuple[np.ndarray, np.ndarray]:
+        """Score a raw feature matrix with `model`, waiting for a free slot if the executor is saturated"""
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except TimeoutError as e:
+            self.rejected += 1
+            raise ServiceOverloadedException(retry_after=max(1, math.ceil(self.queue_timeout))) from e
+
+        self.pending += 1
+        pool = None
+        try:
+            pool = self._get_pool()
+            if pool is None:
+                return model.predict_matrix(X)
+            loop = asyncio.get_running_loop()
+            if self.mode == "process":
+                return await loop.run_in_executor(pool, _worker_predict_matrix, model.spec, model.fingerprint, X)
+            return await loop.run_in_executor(pool, model.predict_matrix, X)
+        except BrokenProcessPool:
+            # A child died (e.g. OOM-killed); drop the pool so the next call starts a fresh one. Calls that
+            # failed on the same pool must not shut down the one a later call may have started since.
+            if pool is not None and pool is self._pool:
+                logger.exception("Inference process pool is broken, restarting it")
+                pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+            raise
+        finally:
+            self.pending -= 1
+            self._slots.release()
+
+    def shutdown(self) -> None:
+        """Stop the worker pool, waiting for running predictions to finish"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
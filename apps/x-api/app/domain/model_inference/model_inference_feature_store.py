@@ -0,0 +1,115 @@
+"""
+In-memory feature store for per-panel predictions.
+
+Panel information and location are joined once in DuckDB into NumPy columns sorted by id. Looking up
+a panel is then a binary search (np.searchsorted), with no parquet scan or join per request. The
+installation time is kept as epoch nanoseconds, and panel_age_days is derived from it at lookup time
+with the training formula, so features do not go stale while the snapshot is held.
+
+The source files are stat()ed at most once every check_interval seconds. If either changed, a new snapshot
+is built and swapped in with a single reference assignment, so readers never see a half-built snapshot.
+"""
+
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from app.config.duckdb_connection import connect_duckdb
+
+from .model_inference_entity import FEATURE_COLUMNS
+from .model_inference_features import INFO_FILE, LOC_FILE, as_of_timestamp, panel_age_days_from_ns
+
+
+logger = logging.getLogger(__name__)
+
+# Features read from the source as-is; panel_age_days is computed per lookup
+STATIC_COLUMNS = [col for col in FEATURE_COLUMNS if col != "panel_age_days"]
+AGE_INDEX = FEATURE_COLUMNS.index("panel_age_days")
+
+
+class _Snapshot(NamedTuple):
+    fingerprint: tuple[tuple[int, int], ...]
+    ids: np.ndarray  # int64, ascending
+    static: np.ndarray  # float64, (n, len(STATIC_COLUMNS))
+    installed_ns: np.ndarray  # int64 epoch nanoseconds
+
+
+class PanelFeatureStore:
+    """Id-indexed model features of every solar panel"""
+
+    def __init__(self, info_file: Path = INFO_FILE, loc_file: Path = LOC_FILE, check_interval: float = 1.0) -> None:
+        self.info_file = info_file
+        self.loc_file = loc_file
+        self.check_interval = check_interval
+        self.reloads = 0
+        self._snapshot: _Snapshot | None = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def _fingerprint(self) -> tuple[tuple[int, int], ...]:
+        stats = (os.stat(self.info_file), os.stat(self.loc_file))
+        return tuple((stat.st_size, stat.st_mtime_ns) for stat in stats)
+
+    def needs_reload(self) -> bool:
+        """Cheap, throttled check for whether reload() has work to do"""
+        if self._snapshot is None:
+            return True
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        self._next_check = now + self.check_interval
+        return self._fingerprint() != self._snapshot.fingerprint
+
+    def reload(self) -> None:
+        """Rebuild the snapshot if the source files changed since it was built"""
+        with self._lock:
+            fingerprint = self._fingerprint()
+            if self._snapshot is not None and self._snapshot.fingerprint == fingerprint:
+                return
+            start = time.perf_counter()
+            with connect_duckdb() as con:
+                columns = con.execute(
+                    f"""
+                    SELECT info.id, {', '.join(STATIC_COLUMNS)}, epoch_ns(info.installation_timestamp) AS installed_ns
+                    FROM read_parquet($info_file) AS info
+                    JOIN read_parquet($loc_file) AS loc
+                    USING (id)
+                    ORDER BY info.id
+                    """,  # noqa: S608  # module constant only
+                    {"info_file": str(self.info_file), "loc_file": str(self.loc_file)},
+                ).fetchnumpy()
+            self._snapshot = _Snapshot(
+                fingerprint=fingerprint,
+                ids=np.asarray(columns["id"], dtype=np.int64),
+                static=np.column_stack([np.asarray(columns[col], dtype=np.float64) for col in STATIC_COLUMNS]),
+                installed_ns=np.asarray(columns["installed_ns"], dtype=np.int64),
+            )
+            self.reloads += 1
+            logger.info(f"Loaded features of {len(self._snapshot.ids)} panels in {time.perf_counter() - start:.3f}s")
+
+    def __len__(self) -> int:
+        """Number of panels in the loaded snapshot"""
+        return 0 if self._snapshot is None else len(self._snapshot.ids)
+
+    def lookup(self, ids: np.ndarray, as_of: pd.Timestamp | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Feature rows, in FEATURE_COLUMNS order, for the known ids, plus a mask of which ids were found"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            raise RuntimeError("PanelFeatureStore.reload() must run before lookups")
+        ids = np.asarray(ids, dtype=np.int64)
+        pos = np.searchsorted(snapshot.ids, ids)
+        found = pos < len(snapshot.ids)
+        found[found] = snapshot.ids[pos[found]] == ids[found]
+        pos = pos[found]
+
+        as_of = as_of_timestamp(as_of)
+        X = np.empty((len(pos), len(FEATURE_COLUMNS)), dtype=np.float64)
+        X[:, [FEATURE_COLUMNS.index(col) for col in STATIC_COLUMNS]] = snapshot.static[pos]
+        X[:, AGE_INDEX] = panel_age_days_from_ns(snapshot.installed_ns[pos], as_of)
+        return found, X
@@ -0,0 +1,81 @@
+"""
+Feature derivation shared by training, batch scoring and per-panel lookups.
+
+Every consumer must turn raw panel data into model inputs the same way the model was trained, so both the
+DuckDB (SQL pushdown) and the pandas/Arrow forms of the derivation live here side by side.
+
+panel_age_days is the number of whole days between installation_timestamp and a reference time `as_of`,
+floored like pandas `Timedelta.days`. Training records its `as_of` in the model metadata.
+
+The SQL only interpolates identifiers and numbers defined in this module; file paths and the reference time
+are bound as the named parameters returned by `panels_params`.
+"""
+
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from .model_inference_entity import FEATURE_COLUMNS
+
+
+DATA_DIR = Path(__file__).resolve().parent.parent.parent / "solar_panel_data"
+INFO_FILE = DATA_DIR / "solar_panel_information.parquet"
+LOC_FILE = DATA_DIR / "solar_panel_location.parquet"
+JOINED_FILE = DATA_DIR / "solar_panel_data.parquet"
+
+TARGET_COLUMN = "status"
+NS_PER_DAY = 86_400 * 10**9
+
+
+def as_of_timestamp(as_of: pd.Timestamp | str | None = None) -> pd.Timestamp:
+    """Reference time for panel_age_days as a naive UTC timestamp (the parquet timestamps are naive UTC)"""
+    ts = pd.Timestamp.now(tz="UTC") if as_of is None else pd.Timestamp(as_of)
+    return ts.tz_convert("UTC").tz_localize(None) if ts.tzinfo is not None else ts
+
+
+def panel_age_days_sql(column: str = "installation_timestamp") -> str:
+    """DuckDB expression for panel_age_days, relative to the `$as_of_ns` parameter"""
+    return f"CAST(floor(($as_of_ns - epoch_ns({column})) / {NS_PER_DAY}) AS BIGINT)"
+
+
+def panel_age_days_from_ns(installed_ns: np.ndarray, as_of: pd.Timestamp) -> np.ndarray:
+    """panel_age_days from installation times given as epoch nanoseconds"""
+    return np.floor((as_of.value - installed_ns) / NS_PER_DAY).astype(np.int64)
+
+
+def panel_age_days(installation: pd.Series, as_of: pd.Timestamp) -> pd.Series:
+    """Equivalent of panel_age_days_sql in pandas; integer inputs are read as epoch milliseconds"""
+    if not pd.api.types.is_datetime64_any_dtype(installation):
+        installation = pd.to_datetime(installation, unit="ms")
+    installed_ns = installation.astype("datetime64[ns]").astype(np.int64)
+    return pd.Series(panel_age_days_from_ns(installed_ns.to_numpy(), as_of), index=installation.index)
+
+
+def panels_sql(with_target: bool = True) -> str:
+    """Join panel information and location into one row per panel id with model features; binds `panels_params`"""
+    target = f", info.{TARGET_COLUMN}" if with_target else ""
+    return f"""
+        SELECT info.id,
+               info.voltage,
+               info.temperature,
+               loc.latitude,
+               loc.longitude,
+               {panel_age_days_sql("info.installation_timestamp")} AS panel_age_days{target}
+        FROM read_parquet($info_file) AS info
+        JOIN read_parquet($loc_file) AS loc
+        USING (id)
+    """  # noqa: S608  # only module expressions and column names are interpolated
+
+
+def panels_params(as_of: pd.Timestamp, info_file: Path = INFO_FILE, loc_file: Path = LOC_FILE) -> dict[str, Any]:
+    """Values of the named parameters of `panels_sql`"""
+    return {"as_of_ns": as_of.value, "info_file": str(info_file), "loc_file": str(loc_file)}
+
+
+def derive_features(panels: pd.DataFrame, as_of: pd.Timestamp) -> pd.DataFrame:
+    """Model input columns, in FEATURE_COLUMNS order, from joined panel rows (id, voltage, ..., installation_timestamp)"""
+    features = panels[[col for col in FEATURE_COLUMNS if col != "panel_age_days"]].astype(np.float64)
+    features["panel_age_days"] = panel_age_days(panels["installation_timestamp"], as_of)
+    return features[FEATURE_COLUMNS]
@@ -0,0 +1,33 @@
+"""
+Content types accepted by the batch prediction endpoint.
+
+Kept apart from model_inference_batch, which needs pandas and pyarrow, so the router can declare the
+endpoint without importing them.
+"""
+
+JSON = "application/json"
+NDJSON = "application/x-ndjson"
+PARQUET = "application/vnd.apache.parquet"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+# Accepted request content types, mapped onto the canonical format used for the response
+CONTENT_TYPES = {
+    JSON: JSON,
+    NDJSON: NDJSON,
+    "application/jsonl": NDJSON,
+    PARQUET: PARQUET,
+    "application/x-parquet": PARQUET,
+    ARROW_STREAM: ARROW_STREAM,
+}
+
+
+class BatchFormatError(ValueError):
+    """Raised when a batch payload cannot be decoded into feature rows"""
+
+
+def resolve_format(content_type: str | None) -> str:
+    """Map a request Content-Type header onto one of the supported batch formats"""
+    media_type = (content_type or JSON).split(";")[0].strip().lower()
+    if media_type not in CONTENT_TYPES:
+        raise BatchFormatError(f"Unsupported content type '{media_type}', expected one of: {', '.join(CONTENT_TYPES)}")
+    return CONTENT_TYPES[media_type]
@@ -0,0 +1,28 @@
+"""Background jobs of the model inference domain, registered with `common_fastapi.job_runner`."""
+
+from typing import Any
+
+from common_fastapi import JobContext, job_runner
+
+
+def train_model(context: JobContext, **options: Any) -> dict[str, Any]:
+    """
+    Train a model version with train_solar_panel_model, in a process of its own: fitting holds the GIL for
+    minutes, which would stall every request of the worker. Versions saved with `activate` are picked up by
+    the model registry of every worker.
+    """
+    # Imported in the job process only: DuckDB, pandas and scikit-learn are not needed by the server to submit it
+    from .train_solar_panel_model import main
+
+    argv = []
+    for name, value in options.items():
+        if value is None or value is False:
+            continue
+        argv.append(f"--{name.replace('_', '-')}")
+        if value is not True:
+            argv.append(str(value))
+    return main(argv, progress=context.progress)
+
+
+# One at a time: training uses every core it is given and as much memory as a chunk of features
+job_runner.register("model_inference.train", train_model, executor="process", concurrency=1)
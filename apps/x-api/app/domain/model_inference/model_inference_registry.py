@@ -0,0 +1,185 @@
+"""
+Versioned model registry with memory-mapped loading and hot swapping.
+
+Layout under `app/models`:
+
+    solar_status_model.pkl                      # single unversioned model, served as version "legacy"
+    solar_status_model/
+        <version>.pkl                           # versioned artifacts, e.g. 20261019T120000Z.pkl
+        <version>.json                          # optional training metrics
+        <version>.compiled.joblib               # compiled node arrays cached by the "compiled" engine
+        CURRENT                                 # optional: version to serve; defaults to the newest version
+
+Models are loaded with joblib `mmap_mode`. Only the "compiled" engine (INFERENCE_ENGINE) shares memory that
+way: its node arrays are mapped from the OS page cache and shared by every worker process. With the default
+"sklearn" engine each process still holds a private copy of the forest, because sklearn copies the tree
+arrays into its own buffers when the pipeline is unpickled; only plain NumPy attributes such as the scaler's
+are mapped.
+
+A daemon thread polls the directory every INFERENCE_MODEL_POLL_INTERVAL seconds. When CURRENT changes, a
+newer version appears or the active file is rewritten, the new model is fully loaded first and then swapped
+in with a single reference assignment; requests already holding the previous model finish on it. Requests
+may pin any available version, and up to INFERENCE_MODEL_MAX_LOADED versions are kept loaded.
+
+The registry survives `fork()`, as when the production server preloads it before forking its workers: each
+child gets a fresh lock and, if the parent was watching, its own watcher thread.
+"""
+
+import logging
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+
+from app.config import app_settings
+from common_fastapi import ResourceNotFoundException
+
+from .model_inference_repo import ModelInferenceRepository, model_fingerprint
+
+
+logger = logging.getLogger(__name__)
+
+
+def _after_fork(ref: "weakref.ref[ModelRegistry]") -> None:
+    registry = ref()
+    if registry is not None:
+        registry._after_fork()  # pylint: disable=protected-access
+
+
+class ModelRegistry:
+    """Loads, tracks and hot-swaps versions of the solar status model"""
+
+    MODELS_DIR = ModelInferenceRepository.MODEL_PATH.parent
+    MODEL_NAME = "solar_status_model"
+    LEGACY_VERSION = "legacy"
+    CURRENT_FILE = "CURRENT"
+
+    def __init__(
+        self,
+        models_dir: Path | None = None,
+        engine: str = app_settings.INFERENCE_ENGINE,
+        mmap_mode: str | None = app_settings.INFERENCE_MODEL_MMAP_MODE,
+        poll_interval: float = app_settings.INFERENCE_MODEL_POLL_INTERVAL,
+        max_loaded: int = app_settings.INFERENCE_MODEL_MAX_LOADED,
+    ) -> None:
+        self.models_dir = models_dir or self.MODELS_DIR
+        self.versions_dir = self.models_dir / self.MODEL_NAME
+        self.engine = engine
+        self.mmap_mode = mmap_mode
+        self.poll_interval = poll_interval
+        self.max_loaded = max(1, max_loaded)
+        self.swaps = 0
+
+        self._lock = threading.Lock()
+        self._active = self._open(self._resolve_active_version())
+        self._loaded: OrderedDict[str, ModelInferenceRepository] = OrderedDict({self._active.version: self._active})
+        self._stop = threading.Event()
+        self._watcher: threading.Thread | None = None
+        if hasattr(os, "register_at_fork"):
+            ref = weakref.ref(self)
+            os.register_at_fork(after_in_child=lambda: _after_fork(ref))
+
+    @property
+    def active(self) -> ModelInferenceRepository:
+        """Model currently served to requests that do not pin a version"""
+        return self._active
+
+    def model_path(self, version: str) -> Path:
+        if version == self.LEGACY_VERSION:
+            return self.models_dir / f"{self.MODEL_NAME}.pkl"
+        return self.versions_dir / f"{version}.pkl"
+
+    def available_versions(self) -> list[str]:
+        """All versions on disk, oldest first; the legacy model, if present, sorts first"""
+        versions = sorted(p.stem for p in self.versions_dir.glob("*.pkl")) if self.versions_dir.is_dir() else []
+        if self.model_path(self.LEGACY_VERSION).exists():
+            versions.insert(0, self.LEGACY_VERSION)
+        return versions
+
+    def loaded_versions(self) -> list[str]:
+        with self._lock:
+            return list(self._loaded)
+
+    def _resolve_active_version(self) -> str:
+        available = self.available_versions()
+        current_file = self.versions_dir / self.CURRENT_FILE
+        if current_file.exists():
+            pinned = current_file.read_text(encoding="utf-8").strip()
+            if pinned in available:
+                return pinned
+            logger.warning("%s names unknown model version %r, serving the newest version", current_file, pinned)
+        if not available:
+            raise FileNotFoundError(f"No model found in {self.models_dir}")
+        versioned = [v for v in available if v != self.LEGACY_VERSION]
+        return versioned[-1] if versioned else self.LEGACY_VERSION
+
+    def _open(self, version: str) -> ModelInferenceRepository:
+        return ModelInferenceRepository(self.model_path(version), engine=self.engine, mmap_mode=self.mmap_mode, version=version)
+
+    def _load(self, version: str) -> ModelInferenceRepository:
+        with self._lock:
+            cached = self._loaded.get(version)
+            if cached is not None and cached.fingerprint == model_fingerprint(cached.model_path):
+                self._loaded.move_to_end(version)
+                return cached
+        # Load outside the lock so a slow load never blocks requests for already-loaded versions
+        model = self._open(version)
+        with self._lock:
+            self._loaded[version] = model
+            self._loaded.move_to_end(version)
+            # Least recently used first; the active model is never evicted
+            evictable = [v for v in self._loaded if v not in (version, self._active.version)]
+            while len(self._loaded) > self.max_loaded and evictable:
+                del self._loaded[evictable.pop(0)]
+        return model
+
+    def get(self, version: str | None = None) -> ModelInferenceRepository:
+        """Return the active model, or a specific version (loading it on first use)"""
+        active = self._active
+        if version is None or version == active.version:
+            return active
+        if version not in self.available_versions():
+            raise ResourceNotFoundException(resource_name=f"Model version {version}")
+        return self._load(version)
+
+    def refresh(self) -> bool:
+        """Swap in the version that should be active if it differs from the one being served"""
+        version = self._resolve_active_version()
+        active = self._active
+        if version == active.version and model_fingerprint(self.model_path(version)) == active.fingerprint:
+            return False
+        model = self._load(version)
+        self._active = model
+        self.swaps += 1
+        logger.info("Swapped active model %s -> %s", active.version, model.version)
+        return True
+
+    def start_watching(self) -> None:
+        if self.poll_interval <= 0 or self._watcher is not None:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="model-registry-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=self.poll_interval)
+            self._watcher = None
+
+    def _after_fork(self) -> None:
+        # Threads do not survive fork, and the lock may have been held by the parent's watcher
+        self._lock = threading.Lock()
+        if self._watcher is not None:
+            self._watcher = None
+            self._stop = threading.Event()
+            self.start_watching()
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception:  # pylint: disable=broad-except
+                # Keep serving the current model; a half-written or broken artifact must not take the API down
+                logger.exception("Model registry refresh failed")
@@ -1,62 +1,118 @@
-import joblib
-import pandas as pd
+import logging
+import os
 from pathlib import Path
-from .model_inference_entity import InferenceInputEntity
 
 import joblib
+import numpy as np
 import pandas as pd
-import logging
-from pathlib import Path
-from .model_inference_entity import InferenceInputEntity
+
+from app.config import app_settings
+
+from .model_inference_compiled import CompiledForest, CompiledModelMismatch
+from .model_inference_entity import FEATURE_COLUMNS, InferenceInputEntity
+
 
 logger = logging.getLogger(__name__)
 
+
+def model_fingerprint(path: Path) -> tuple[int, int] | None:
+    """Identity of a model file on disk; changes whenever the file is rewritten or replaced"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
 class ModelInferenceRepository:
     """Loads a trained model pipeline and performs predictions"""
 
     # Assuming project structure: project_root/models/solar_status_model.pkl
     BASE_DIR = Path(__file__).resolve().parent.parent.parent
     MODEL_PATH = BASE_DIR / "models" / "solar_status_model.pkl"
+    # The compiled walk wins on latency for small inputs; sklearn's C tree traversal has better throughput above this
+    COMPILED_MAX_ROWS = 256
 
-    def __init__(self):
-        if not self.MODEL_PATH.exists():
-            logger.error(f"Model file not found at {self.MODEL_PATH}")
-            raise FileNotFoundError(f"Model file missing: {self.MODEL_PATH}")
-        bundle = joblib.load(self.MODEL_PATH)
+    def __init__(
+        self,
+        model_path: Path | None = None,
+        engine: str = app_settings.INFERENCE_ENGINE,
+        mmap_mode: str | None = None,
+        version: str = "legacy",
+    ):
+        self.model_path = model_path or self.MODEL_PATH
+        if not self.model_path.exists():
+            logger.error(f"Model file not found at {self.model_path}")
+            raise FileNotFoundError(f"Model file missing: {self.model_path}")
+        self.version = version
+        self.fingerprint = model_fingerprint(self.model_path)
+        self.mmap_mode = mmap_mode
+        # With mmap_mode, plain NumPy arrays in the bundle are mapped from the page cache; the trees are not, as
+        # sklearn copies their node arrays on unpickle. The compiled engine's node arrays are the ones shared.
+        bundle = joblib.load(self.model_path, mmap_mode=mmap_mode)
         self.pipeline = bundle.get("pipeline")
         self.label_encoder = bundle.get("label_encoder")
-        logger.info(f"Loaded model from {self.MODEL_PATH}")
+        # Decoded status strings in the column order of predict_proba
+        enc_classes = self.pipeline.named_steps["classifier"].classes_
+        self.labels = np.asarray(self.label_encoder.inverse_transform(enc_classes))
+        self.label_names = [str(label) for label in self.labels]
+        self.engine = engine
+        self.compiled = self._compile() if engine == "compiled" else None
+        logger.info(f"Loaded model {version} from {self.model_path} (engine={'compiled' if self.compiled else 'sklearn'})")
+
+    @property
+    def spec(self) -> tuple[str, str, str | None, str]:
+        """Picklable arguments to load this same model in another process"""
+        return str(self.model_path), self.engine, self.mmap_mode, self.version
+
+    @property
+    def compiled_path(self) -> Path:
+        return self.model_path.with_name(f"{self.model_path.stem}.compiled.joblib")
+
+    def _compile(self) -> CompiledForest | None:
+        """Flatten the pipeline into NumPy node arrays, keeping sklearn if the result is not identical"""
+        # sklearn copies tree nodes into private buffers on unpickle, so the flat arrays are what workers can share
+        if self.mmap_mode and self.compiled_path.exists():
+            try:
+                compiled = CompiledForest.load(self.compiled_path, self.fingerprint, self.mmap_mode)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception(f"Ignoring unreadable compiled model {self.compiled_path}")
+                compiled = None
+            if compiled is not None:
+                return compiled
+        try:
+            compiled = CompiledForest(self.pipeline)
+            compiled.validate(self.pipeline, compiled.probe_inputs())
+        except (TypeError, CompiledModelMismatch):
+            logger.exception("Compiled inference engine unavailable, falling back to sklearn")
+            return None
+        if self.mmap_mode:
+            try:
+                compiled.save(self.compiled_path, self.fingerprint)
+                return CompiledForest.load(self.compiled_path, self.fingerprint, self.mmap_mode) or compiled
+            except OSError:
+                logger.warning(f"Could not write {self.compiled_path}; compiled arrays stay private to this process")
+        return compiled
+
+    def predict_matrix(self, X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Score a raw float matrix in FEATURE_COLUMNS order, returning decoded labels and class probabilities"""
+        if self.compiled is not None and len(X) <= self.COMPILED_MAX_ROWS:
+            proba = self.compiled.predict_proba(X)
+        else:
+            proba = self.pipeline.predict_proba(pd.DataFrame(X, columns=FEATURE_COLUMNS))
+        # Same decision rule as RandomForestClassifier.predict, without a second pass over the forest
+        return self.labels[proba.argmax(axis=1)], proba
+
+    def predict_batch(self, features: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+        """Score many rows in one vectorized pass, returning decoded labels and the class probability matrix"""
+        if self.compiled is not None and len(features) <= self.COMPILED_MAX_ROWS:
+            return self.predict_matrix(features[FEATURE_COLUMNS].to_numpy(dtype=np.float64))
+        proba = self.pipeline.predict_proba(features[FEATURE_COLUMNS])
+        return self.labels[proba.argmax(axis=1)], proba
 
     def predict(self, inp: InferenceInputEntity) -> tuple[str, dict[str, float]]:
         """Run inference and return predicted label plus class probabilities"""
-        df = pd.DataFrame([inp.model_dump()])
-        # Predict probabilities and convert to Python floats
-        proba_list = self.pipeline.predict_proba(df)[0].tolist()
-        # Get encoded class labels from classifier, then decode to original status strings
-        enc_classes = self.pipeline.named_steps["classifier"].classes_
-        labels = self.label_encoder.inverse_transform(enc_classes)
-        # Build a dict[str, float] mapping status->probability
-        prob_dict = { label: float(proba_list[i]) for i, label in enumerate(labels) }
-        # Predict encoded class and decode to status
-        pred_enc = self.pipeline.predict(df)[0]
-        pred = self.label_encoder.inverse_transform([pred_enc])[0]
-        print(f"pred - {pred}, prob_dict - {prob_dict}")
-        return pred, prob_dict
-        try:
-            # Create DataFrame preserving feature names for sklearn
-            df = pd.DataFrame([inp.model_dump()])
-            # Predict probabilities and convert to Python floats
-            proba_list = self.pipeline.predict_proba(df)[0].tolist()
-            # Get encoded class labels from classifier, then decode to original status strings
-            enc_classes = self.pipeline.named_steps["classifier"].classes_
-            labels = self.label_encoder.inverse_transform(enc_classes)
-            # Build a dict[str, float] mapping status->probability
-            prob_dict = { label: float(proba_list[i]) for i, label in enumerate(labels) }
-            # Predict encoded class and decode to status
-            pred_enc = self.pipeline.predict(df)[0]
-            pred = self.label_encoder.inverse_transform([pred_enc])[0]
-            print(f"pred - {pred}, prob_dict - {prob_dict}")
-            return pred, prob_dict
-        except Exception as e:
-            logger.exception("Error during model inference")
-            raise
\ No newline at end of file
+        X = np.array([[getattr(inp, col) for col in FEATURE_COLUMNS]], dtype=np.float64)
+        labels, proba = self.predict_matrix(X)
+        prob_dict = dict(zip(self.label_names, proba[0].tolist(), strict=True))
+        return str(labels[0]), prob_dict
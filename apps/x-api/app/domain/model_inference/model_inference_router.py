@@ -1,17 +1,154 @@
-from fastapi import APIRouter, HTTPException, status
-from .model_inference_service import ModelInferenceService
-from .model_inference_dto import InferenceInputDTO, InferenceResultDTO
+import asyncio
+from collections.abc import AsyncIterator
+from functools import partial
+from typing import TYPE_CHECKING, Annotated, Any
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+
+from app.config import app_settings
+from common_fastapi import Job, job_runner, service_registry
+
+from . import model_inference_formats as formats
+from . import model_inference_jobs  # noqa: F401  # registers the background jobs
+from .model_inference_dto import (
+    InferenceInputDTO,
+    InferenceResultDTO,
+    ModelRegistryDTO,
+    PanelPredictionDTO,
+    PanelPredictionRequestDTO,
+    PanelPredictionsDTO,
+    PredictionCacheStatsDTO,
+    TrainModelDTO,
+)
+
+if TYPE_CHECKING:
+    from .model_inference_service import ModelInferenceService
+else:
+    ModelInferenceService = Any
 
 model_inference_router = APIRouter(prefix="/model-inference", tags=["ModelInference"])
-service = ModelInferenceService()
+
+
+def build_service() -> "ModelInferenceService":
+    """Build the service; imported here so importing the router does not load pandas, pyarrow or scikit-learn"""
+    from . import model_inference_batch  # noqa: F401  # warm the batch readers' imports before the first batch request
+    from .model_inference_service import ModelInferenceService
+
+    return ModelInferenceService()
+
+
+# Eager: loading the model takes seconds and should happen before the first request, not during it
+service_registry.register("model_inference", build_service, eager=True)
+ServiceDep = Annotated[ModelInferenceService, Depends(service_registry.dependency("model_inference"))]
+
+_BINARY_BODY = {"schema": {"type": "string", "format": "binary"}}
+MODEL_VERSION_HEADER = "X-Model-Version"
 
 @model_inference_router.post("/predict", response_model=InferenceResultDTO, status_code=status.HTTP_200_OK)
-async def predict_model(input_dto: InferenceInputDTO):
+async def predict_model(
+    input_dto: InferenceInputDTO,
+    response: Response,
+    service: ServiceDep,
+    model_version: str | None = Header(default=None, alias=MODEL_VERSION_HEADER),
+):
     """Endpoint to run model inference on provided features"""
-    return service.infer(input_dto)
+    model = await service.model(model_version)
+    response.headers[MODEL_VERSION_HEADER] = model.version
+    return await service.infer(input_dto, model)
+
+@model_inference_router.get("/panel/{panel_id}", response_model=PanelPredictionDTO, status_code=status.HTTP_200_OK)
+async def predict_panel(
+    panel_id: int,
+    response: Response,
+    service: ServiceDep,
+    model_version: str | None = Header(default=None, alias=MODEL_VERSION_HEADER),
+):
+    """Endpoint to predict the status of a stored solar panel, assembling its features server-side"""
+    model = await service.model(model_version)
+    response.headers[MODEL_VERSION_HEADER] = model.version
+    return await service.infer_panel(panel_id, model)
+
+@model_inference_router.post("/panels", response_model=PanelPredictionsDTO, status_code=status.HTTP_200_OK)
+async def predict_panels(
+    request_dto: PanelPredictionRequestDTO,
+    response: Response,
+    service: ServiceDep,
+    model_version: str | None = Header(default=None, alias=MODEL_VERSION_HEADER),
+):
+    """Endpoint to predict the status of several stored solar panels in one pass"""
+    model = await service.model(model_version)
+    response.headers[MODEL_VERSION_HEADER] = model.version
+    return await service.infer_panels(request_dto.ids, model)
+
+@model_inference_router.get("/models", response_model=ModelRegistryDTO, status_code=status.HTTP_200_OK)
+async def model_versions(service: ServiceDep):
+    """Active, available and loaded model versions"""
+    return service.registry_state()
+
+@model_inference_router.post("/models/train", response_model=Job, status_code=status.HTTP_202_ACCEPTED)
+async def train_model(options: TrainModelDTO):
+    """Start training a model version in a background process; follow the job at /jobs/{id}, whose result is the version's metadata"""
+    return await job_runner.submit("model_inference.train", **options.model_dump())
+
+@model_inference_router.get("/cache", response_model=PredictionCacheStatsDTO, status_code=status.HTTP_200_OK)
+async def prediction_cache_stats(service: ServiceDep):
+    """Hit/miss counters of the single-row prediction cache"""
+    return service.cache_stats()
+
+@model_inference_router.post(
+    "/predict/batch",
+    status_code=status.HTTP_200_OK,
+    summary="Batch Model Inference",
+    description=(
+        "Score many feature rows in vectorized chunks. Send a JSON array, NDJSON, a parquet file or an Arrow IPC stream; "
+        "predictions are streamed back in the same format. An optional `id` field is echoed on every prediction. "
+        f"Send `{MODEL_VERSION_HEADER}` to score with a specific model version."
+    ),
+    response_class=StreamingResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                formats.JSON: {"schema": {"type": "array", "items": {"$ref": "#/components/schemas/InferenceInputDTO"}}},
+                formats.NDJSON: {"schema": {"$ref": "#/components/schemas/InferenceInputDTO"}},
+                formats.PARQUET: _BINARY_BODY,
+                formats.ARROW_STREAM: _BINARY_BODY,
+            },
+        }
+    },
+)
+async def predict_batch(request: Request, service: ServiceDep) -> StreamingResponse:
+    """Endpoint to run vectorized model inference over a batch of feature rows"""
+    from . import model_inference_batch as batch
+
+    # Resolve the model once so every chunk of the stream is scored by the same version
+    model = await service.model(request.headers.get(MODEL_VERSION_HEADER))
     try:
-        print("router")
-        print(f"input_dto --> ", input_dto)
-        return service.infer(input_dto)
-    except Exception:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Inference failed")
+        fmt = batch.resolve_format(request.headers.get("content-type"))
+    except batch.BatchFormatError as e:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(e)) from e
+
+    chunk_size = app_settings.INFERENCE_BATCH_CHUNK_SIZE
+    try:
+        if fmt == batch.NDJSON:
+            stream = batch.read_ndjson(request.stream(), chunk_size)
+            # Decode the first chunk up front so malformed payloads get a 422; later bad rows are reported in-band
+            first = await anext(stream, None)
+
+            async def ndjson_chunks() -> AsyncIterator[batch.FeatureChunk]:
+                if first is not None:
+                    yield first
+                async for chunk in stream:
+                    yield chunk
+
+            chunks = ndjson_chunks()
+        else:
+            # The whole body is already in memory, so decode and validate every row, in a thread, before streaming starts
+            body = await request.body()
+            chunks = batch.aiter_chunks(await asyncio.to_thread(batch.read_body, fmt, body, chunk_size))
+    except batch.BatchFormatError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)) from e
+
+    scored = batch.score_chunks(chunks, partial(service.infer_batch, model=model), model.labels)
+    return StreamingResponse(batch.WRITERS[fmt](scored), media_type=fmt, headers={MODEL_VERSION_HEADER: model.version})
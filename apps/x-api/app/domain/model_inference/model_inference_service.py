@@ -1,14 +1,130 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from app.config import app_settings
+from common_fastapi import ResourceNotFoundException, metrics_registry
+
+from .model_inference_cache import PredictionCache
+from .model_inference_entity import FEATURE_COLUMNS
+from .model_inference_executor import InferenceExecutor
+from .model_inference_feature_store import PanelFeatureStore
+from .model_inference_registry import ModelRegistry
 from .model_inference_repo import ModelInferenceRepository
-from .model_inference_dto import InferenceInputDTO, InferenceResultDTO
+from .model_inference_dto import (
+    InferenceInputDTO,
+    InferenceResultDTO,
+    ModelRegistryDTO,
+    PanelPredictionDTO,
+    PanelPredictionsDTO,
+    PredictionCacheStatsDTO,
+)
 
 class ModelInferenceService:
     """Service layer that applies business logic for model inference"""
 
     def __init__(self) -> None:
-        self.repo = ModelInferenceRepository()
+        self.registry = ModelRegistry()
+        self.registry.start_watching()
+        self.executor = InferenceExecutor(self.registry.active)
+        self.cache = PredictionCache(
+            max_entries=app_settings.INFERENCE_CACHE_SIZE,
+            ttl=app_settings.INFERENCE_CACHE_TTL,
+            quantization=app_settings.INFERENCE_CACHE_QUANTIZATION,
+        )
+        self.panels = PanelFeatureStore()
+        metrics_registry.gauge(
+            "inference_executor_pending", "Inference batches queued or running in the executor", collect=lambda: {(): self.executor.pending}
+        )
+
+    async def model(self, version: str | None = None) -> ModelInferenceRepository:
+        """Resolve the model to serve a request: the active one, or a pinned version"""
+        if version is None:
+            return self.registry.active
+        # A pinned version may have to be read from disk first
+        return await asyncio.to_thread(self.registry.get, version)
 
-    def infer(self, data: InferenceInputDTO) -> InferenceResultDTO:
+    async def infer_batch(self, features: pd.DataFrame, model: ModelInferenceRepository) -> tuple[np.ndarray, np.ndarray]:
+        """Perform vectorized inference over a chunk of feature rows"""
+        return await self.executor.predict_matrix(features[FEATURE_COLUMNS].to_numpy(dtype=np.float64), model)
+
+    async def infer(self, data: InferenceInputDTO, model: ModelInferenceRepository) -> InferenceResultDTO:
         """Perform model inference and wrap result in DTO"""
-        pred, prob_dict = self.repo.predict(data)
-        print(f"pred {pred}.. type is {type(pred)}, prob_dict {prob_dict}.. prob_dict is {type(prob_dict)}")
-        return InferenceResultDTO(predicted_status=pred, probabilities=prob_dict)
\ No newline at end of file
+        X = np.array([[getattr(data, col) for col in FEATURE_COLUMNS]], dtype=np.float64)
+        if not self.cache.enabled:
+            return await self._predict_one(X, model)
+        active = self.registry.active
+        self.cache.sync_model((active.version, active.fingerprint))
+        # Predict on the quantized row so every input in a grid cell gets the same cached answer
+        X = self.cache.quantize(X)
+        key = self.cache.key(X[0], (model.version, model.fingerprint))
+        result = self.cache.get(key)
+        if result is None:
+            result = await self._predict_one(X, model)
+            self.cache.put(key, result)
+        return result
+
+    async def _predict_one(self, X: np.ndarray, model: ModelInferenceRepository) -> InferenceResultDTO:
+        labels, proba = await self.executor.predict_matrix(X, model)
+        prob_dict = dict(zip(model.label_names, proba[0].tolist(), strict=True))
+        return InferenceResultDTO(predicted_status=str(labels[0]), probabilities=prob_dict)
+
+    async def _panel_features(self, ids: list[int]) -> tuple[np.ndarray, np.ndarray]:
+        if self.panels.needs_reload():
+            # First use or changed source files; the join runs off the event loop
+            await asyncio.to_thread(self.panels.reload)
+        return self.panels.lookup(np.asarray(ids, dtype=np.int64))
+
+    async def infer_panel(self, panel_id: int, model: ModelInferenceRepository) -> PanelPredictionDTO:
+        """Predict the status of one panel from its stored features"""
+        found, X = await self._panel_features([panel_id])
+        if not found[0]:
+            raise ResourceNotFoundException(resource_name=f"Solar panel {panel_id}")
+        features = InferenceInputDTO(**dict(zip(FEATURE_COLUMNS, X[0].tolist(), strict=True)))
+        result = await self.infer(features, model)
+        return PanelPredictionDTO(id=panel_id, features=features, **result.model_dump())
+
+    async def infer_panels(self, ids: list[int], model: ModelInferenceRepository) -> PanelPredictionsDTO:
+        """Predict the status of many panels in one vectorized pass"""
+        found, X = await self._panel_features(ids)
+        known = [i for i, ok in zip(ids, found.tolist(), strict=True) if ok]
+        predictions = []
+        if known:
+            labels, proba = await self.executor.predict_matrix(X, model)
+            for panel_id, row, label, probs in zip(known, X.tolist(), labels.tolist(), proba.tolist(), strict=True):
+                predictions.append(
+                    PanelPredictionDTO(
+                        id=panel_id,
+                        features=InferenceInputDTO(**dict(zip(FEATURE_COLUMNS, row, strict=True))),
+                        predicted_status=str(label),
+                        probabilities=dict(zip(model.label_names, probs, strict=True)),
+                    )
+                )
+        missing = [i for i, ok in zip(ids, found.tolist(), strict=True) if not ok]
+        return PanelPredictionsDTO(predictions=predictions, missing_ids=missing)
+
+    def cache_stats(self) -> PredictionCacheStatsDTO:
+        """Prediction cache hit/miss counters"""
+        return PredictionCacheStatsDTO(**self.cache.stats())
+
+    def registry_state(self) -> ModelRegistryDTO:
+        """Active, available and loaded model versions"""
+        return ModelRegistryDTO(
+            active_version=self.registry.active.version,
+            available_versions=self.registry.available_versions(),
+            loaded_versions=self.registry.loaded_versions(),
+            swaps=self.registry.swaps,
+        )
+
+    def check_model(self) -> str:
+        """Raise if the file of the active model is gone; returns the version being served"""
+        active = self.registry.active
+        if not active.model_path.exists():
+            raise FileNotFoundError(f"Model file missing: {active.model_path}")
+        return f"version {active.version}"
+
+    def shutdown(self) -> None:
+        """Stop watching for new models and release the inference worker pool"""
+        self.registry.stop_watching()
+        self.executor.shutdown()
@@ -0,0 +1,191 @@
+"""
+Score every solar panel with the active model and write solar_panel_predictions.parquet.
+
+Run from `apps/x-api`:
+
+    uv run python -m app.domain.model_inference.score_solar_panel_model [--workers 8] [--incremental]
+
+Panel information and location are joined in DuckDB and streamed out as Arrow record batches. Features come
+from model_inference_features, so they are derived exactly as in training. Chunks are scored on a process
+pool through InferenceExecutor, with at most two chunks in flight per worker, so memory stays flat. Results
+are written in input order. The output has the same columns as the parquet response of
+/model-inference/predict/batch, plus a feature_hash column.
+
+--incremental re-scores only panels that are new or whose input features changed since the previous output.
+It reuses that output's panel_age_days reference time, so an unchanged panel keeps its hash, and copies
+unchanged predictions through without scoring them. If the model version has changed since that run, or its
+reference time is older than --max-as-of-age days, every panel is scored again as of now, so panel_age_days
+does not fall further and further behind.
+"""
+
+# ruff: noqa: T201
+
+import argparse
+import asyncio
+import os
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.config import app_settings
+from app.config.duckdb_connection import connect_duckdb
+
+from .model_inference_batch import ID_COLUMN, to_table
+from .model_inference_entity import FEATURE_COLUMNS
+from .model_inference_executor import InferenceExecutor
+from .model_inference_features import DATA_DIR, INFO_FILE, LOC_FILE, as_of_timestamp, panels_params, panels_sql
+from .model_inference_registry import ModelRegistry
+from .model_inference_repo import ModelInferenceRepository
+
+
+PREDICTIONS_FILE = DATA_DIR / "solar_panel_predictions.parquet"
+HASH_COLUMN = "feature_hash"
+# Keys of the parquet key/value metadata describing how a predictions file was produced
+META_MODEL_VERSION = b"model_version"
+META_AS_OF = b"as_of"
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--info-file", type=Path, default=INFO_FILE)
+    parser.add_argument("--loc-file", type=Path, default=LOC_FILE)
+    parser.add_argument("--output", type=Path, default=PREDICTIONS_FILE)
+    parser.add_argument("--model-version", help="Score with this model version instead of the active one")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Scoring processes")
+    parser.add_argument("--chunk-size", type=int, default=app_settings.INFERENCE_BATCH_CHUNK_SIZE)
+    parser.add_argument("--as-of", help="Reference time for panel_age_days (default: now, or the previous run's with --incremental)")
+    parser.add_argument("--incremental", action="store_true", help="Only score panels that are new or changed since the previous output")
+    parser.add_argument(
+        "--max-as-of-age",
+        type=float,
+        default=7.0,
+        help="Days the previous run's reference time is reused by --incremental before every panel is scored again",
+    )
+    return parser.parse_args(argv)
+
+
+def read_run_metadata(path: Path) -> dict[bytes, bytes] | None:
+    if not path.exists():
+        return None
+    return pq.read_schema(path).metadata or {}
+
+
+def feature_sql() -> str:
+    """Panel features plus a hash of them, used to detect changed panels on the next incremental run; binds `panels_params`"""
+    return f"""
+        SELECT *, hash({', '.join(FEATURE_COLUMNS)}) AS {HASH_COLUMN}
+        FROM ({panels_sql(with_target=False)})
+    """  # noqa: S608  # module constants only
+
+
+async def score_batches(
+    reader: pa.RecordBatchReader, model: ModelInferenceRepository, executor: InferenceExecutor, writer_fn, max_in_flight: int
+) -> int:
+    """Score record batches on the executor, handing each result to writer_fn in input order"""
+    in_flight: deque[tuple[pa.RecordBatch, asyncio.Task]] = deque()
+    rows = 0
+
+    async def drain_one() -> None:
+        nonlocal rows
+        batch, task = in_flight.popleft()
+        labels, proba = await task
+        columns = batch.to_pandas()
+        table = to_table(columns[ID_COLUMN], labels, proba, model.labels)
+        writer_fn(table.append_column(HASH_COLUMN, batch.column(HASH_COLUMN)))
+        rows += batch.num_rows
+
+    for batch in reader:
+        if not batch.num_rows:
+            continue
+        X = batch.select(FEATURE_COLUMNS).to_pandas().to_numpy(dtype="float64")
+        in_flight.append((batch, asyncio.create_task(executor.predict_matrix(X, model))))
+        if len(in_flight) >= max_in_flight:
+            await drain_one()
+    while in_flight:
+        await drain_one()
+    return rows
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    registry = ModelRegistry(poll_interval=0)
+    model = registry.get(args.model_version)
+
+    previous = read_run_metadata(args.output) if args.incremental else None
+    incremental = previous is not None and previous.get(META_MODEL_VERSION) == model.version.encode()
+    if args.incremental and not incremental:
+        print("No previous predictions for this model version, scoring every panel")
+    if args.as_of or not incremental:
+        as_of = as_of_timestamp(args.as_of)
+    else:
+        as_of = pd.Timestamp(previous[META_AS_OF].decode())
+        age = as_of_timestamp() - as_of
+        if age > pd.Timedelta(days=args.max_as_of_age):
+            print(f"Previous reference time {as_of.isoformat()} is {age.days} days old, scoring every panel as of now")
+            incremental = False
+            as_of = as_of_timestamp()
+
+    con = connect_duckdb()
+    con.sql(feature_sql(), params=panels_params(as_of, args.info_file, args.loc_file)).create_view("panels")
+    if incremental:
+        con.read_parquet(str(args.output)).create_view("previous")
+        # Unchanged panels keep their previous prediction; removed panels are dropped
+        copy_query = f"SELECT previous.* FROM previous SEMI JOIN panels USING (id, {HASH_COLUMN})"  # noqa: S608  # module constant only
+        score_query = f"SELECT panels.* FROM panels ANTI JOIN previous USING (id, {HASH_COLUMN})"  # noqa: S608  # module constant only
+    else:
+        copy_query = None
+        score_query = "SELECT * FROM panels"
+
+    tmp = args.output.with_name(f".{args.output.name}.{os.getpid()}.tmp")
+    writer: pq.ParquetWriter | None = None
+    metadata = {META_MODEL_VERSION: model.version.encode(), META_AS_OF: as_of.isoformat().encode()}
+
+    def write(table: pa.Table) -> None:
+        nonlocal writer
+        if writer is None:
+            writer = pq.ParquetWriter(tmp, table.schema.with_metadata(metadata))
+        writer.write_table(table.cast(writer.schema))
+
+    executor = InferenceExecutor(model, mode="process", workers=args.workers, max_pending=2 * args.workers)
+    start = time.perf_counter()
+    copied = 0
+    try:
+        if copy_query is not None:
+            for batch in con.execute(copy_query).fetch_record_batch(args.chunk_size):
+                write(pa.Table.from_batches([batch]))
+                copied += batch.num_rows
+        reader = con.execute(score_query).fetch_record_batch(args.chunk_size)
+        scored = await score_batches(reader, model, executor, write, max_in_flight=2 * args.workers)
+        if writer is not None:
+            writer.close()
+            os.replace(tmp, args.output)
+    finally:
+        executor.shutdown()
+        tmp.unlink(missing_ok=True)
+    elapsed = time.perf_counter() - start
+
+    summary = {
+        "model_version": model.version,
+        "as_of": as_of.isoformat(),
+        "incremental": incremental,
+        "scored": scored,
+        "copied": copied,
+        "seconds": elapsed,
+    }
+    print(
+        f"Scored {scored:,} panels ({scored / elapsed:,.0f} rows/s), kept {copied:,} unchanged predictions "
+        f"with model {model.version} as of {as_of.isoformat()}, written to {args.output}"
+    )
+    return summary
+
+
+def main(argv: list[str] | None = None) -> dict[str, Any]:
+    return asyncio.run(run(parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,84 +1,313 @@
-# scripts/train_solar_status_model.py
+"""
+Train the solar status model.
+
+Run from `apps/x-api`:
+
+    uv run python -m app.domain.model_inference.train_solar_panel_model [--sample-rows 1000000] [--n-jobs -1]
+
+Features are derived inside DuckDB (see model_inference_features) and streamed to scikit-learn as Arrow
+record batches of --chunk-size rows, so peak memory follows the chunk size rather than the dataset size:
+- --sample-rows / --sample-percent push sampling down into the DuckDB query.
+- Rows are split into train/test by a hash of the panel id. The split is stable across runs and never
+  materialized.
+- StandardScaler statistics come from a single SQL aggregate over the training split.
+- Training sets that fit in one chunk are fitted in one call, building --n-jobs trees in parallel. Larger
+  sets grow the forest with warm_start: each chunk adds its share of --n-estimators trees, fitted in
+  parallel on that chunk only.
+
+Each run writes models/solar_status_model/<version>.pkl, where the model registry picks it up, and
+<version>.json with the parameters, metrics and timings of the run.
+"""
+
+# ruff: noqa: T201
+
+import argparse
+import json
+import math
+import os
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
 import duckdb
-import pandas as pd
 import joblib
-from pathlib import Path
-from datetime import datetime
-from sklearn.model_selection import train_test_split
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import StandardScaler, LabelEncoder
+import numpy as np
+import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import confusion_matrix
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+from app.config.duckdb_connection import connect_duckdb
+
+from .model_inference_entity import FEATURE_COLUMNS
+from .model_inference_features import INFO_FILE, JOINED_FILE, LOC_FILE, TARGET_COLUMN, as_of_timestamp, panels_params, panels_sql
+
 
-# Paths configuration
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
-DATA_DIR = BASE_DIR / "solar_panel_data"
-INFO_FILE = DATA_DIR / "solar_panel_information.parquet"
-LOC_FILE = DATA_DIR / "solar_panel_location.parquet"
-TARGET_FILE = DATA_DIR / "solar_panel_data.parquet"
 MODEL_DIR = BASE_DIR / "models"
-MODEL_PATH = MODEL_DIR / "solar_status_model.pkl"
-
-# Ensure model directory exists
-MODEL_DIR.mkdir(parents=True, exist_ok=True)
-
-# 1. Join Parquet sources via DuckDB
-con = duckdb.connect()
-join_query = f"""
-CREATE OR REPLACE TABLE solar_panel_data AS
-SELECT info.id,
-       info.voltage,
-       info.temperature,
-       info.status,
-       info.installation_timestamp,
-       loc.latitude,
-       loc.longitude
-FROM read_parquet('{INFO_FILE}') AS info
-JOIN read_parquet('{LOC_FILE}') AS loc
-USING (id);
-"""
-con.execute(join_query)
-# Export joined data
-con.execute(f"COPY solar_panel_data TO '{TARGET_FILE}' (FORMAT PARQUET)")
-print(f"Joined data written to {TARGET_FILE}")
-
-# 2. Load joined data into pandas
-df = pd.read_parquet(TARGET_FILE)
-
-# 3. Feature engineering: convert timestamp to panel_age_days
-# assuming installation_timestamp is in milliseconds
-df['installation_timestamp'] = pd.to_datetime(df['installation_timestamp'], unit='ms')
-current_time = pd.Timestamp.now()
-df['panel_age_days'] = (current_time - df['installation_timestamp']).dt.days
-
-# 4. Define feature matrix X and target y
-feature_cols = ['voltage', 'temperature', 'latitude', 'longitude', 'panel_age_days']
-X = df[feature_cols]
-y = df['status']
-
-# 5. Encode target labels
-label_encoder = LabelEncoder()
-y_enc = label_encoder.fit_transform(y)
-
-# 6. Train/test split
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y_enc, test_size=0.2, random_state=42, stratify=y_enc
-)
-
-# 7. Build ML pipeline
-pipeline = Pipeline([
-    ('scaler', StandardScaler()),
-    ('classifier', RandomForestClassifier(n_estimators=100, random_state=42))
-])
-
-# 8. Train model
-pipeline.fit(X_train, y_train)
-
-# 9. Evaluate (optional)
-train_score = pipeline.score(X_train, y_train)
-test_score = pipeline.score(X_test, y_test)
-print(f"Training accuracy: {train_score:.4f}")
-print(f"Test accuracy: {test_score:.4f}")
-
-# 10. Serialize pipeline + encoder
-joblib.dump({'pipeline': pipeline, 'label_encoder': label_encoder}, MODEL_PATH)
-print(f"Model & encoder saved to {MODEL_PATH}")
+VERSIONS_DIR = MODEL_DIR / "solar_status_model"
+CURRENT_FILE = VERSIONS_DIR / "CURRENT"
+
+# Train/test split by a hash of the panel id; binds $seed and $test_percent
+TEST_WHERE = f"{TARGET_COLUMN} IS NOT NULL AND hash(id, $seed) % 100 < $test_percent"
+TRAIN_WHERE = f"{TARGET_COLUMN} IS NOT NULL AND hash(id, $seed) % 100 >= $test_percent"
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--info-file", type=Path, default=INFO_FILE)
+    parser.add_argument("--loc-file", type=Path, default=LOC_FILE)
+    parser.add_argument("--output-dir", type=Path, default=VERSIONS_DIR)
+    sample = parser.add_mutually_exclusive_group()
+    sample.add_argument("--sample-rows", type=int, help="Train and evaluate on a reservoir sample of this many panels")
+    sample.add_argument("--sample-percent", type=float, help="Train and evaluate on a Bernoulli sample of this percentage of panels")
+    parser.add_argument("--test-percent", type=int, default=20, help="Share of panels held out for evaluation")
+    parser.add_argument("--chunk-size", type=int, default=1_000_000, help="Rows per training chunk; 0 fits everything in one pass")
+    parser.add_argument("--n-estimators", type=int, default=100)
+    parser.add_argument("--max-depth", type=int)
+    parser.add_argument("--min-samples-leaf", type=int, default=1)
+    parser.add_argument("--ccp-alpha", type=float, default=0.0, help="Minimal cost-complexity pruning strength")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Trees built in parallel (-1 = all cores)")
+    parser.add_argument("--random-state", type=int, default=42)
+    parser.add_argument("--as-of", help="Reference time for panel_age_days (default: now)")
+    parser.add_argument("--activate", action="store_true", help="Serve the new version immediately by writing CURRENT")
+    parser.add_argument("--export-joined", action="store_true", help=f"Also write the joined panel data to {JOINED_FILE.name}")
+    return parser.parse_args(argv)
+
+
+def prepare_panels(con: duckdb.DuckDBPyConnection, args: argparse.Namespace, as_of: pd.Timestamp) -> None:
+    """Expose the (optionally sampled) feature rows as the `panels` relation"""
+    params = panels_params(as_of, args.info_file, args.loc_file)
+    # DuckDB cannot bind sample sizes, so they are formatted from the numbers argparse parsed
+    if args.sample_rows:
+        sample = f"USING SAMPLE reservoir({int(args.sample_rows)} ROWS) REPEATABLE ({int(args.random_state)})"
+    elif args.sample_percent:
+        sample = f"USING SAMPLE {float(args.sample_percent)} PERCENT (bernoulli, {int(args.random_state)})"
+    else:
+        # A view keeps the full dataset on disk; every pass streams it straight from parquet. Views cannot be
+        # prepared, so it is created from a relation, which carries the bound parameters.
+        con.sql(panels_sql(), params=params).create_view("panels")
+        return
+    # Materialize the sample so the statistics, training and evaluation passes all see the same rows
+    con.execute(f"CREATE TEMP TABLE panels AS SELECT * FROM ({panels_sql()}) {sample}", params)  # noqa: S608  # sample clause built from numbers
+
+
+def fit_scaler(con: duckdb.DuckDBPyConnection, split: dict[str, int]) -> tuple[StandardScaler, int]:
+    """StandardScaler with the population mean and variance of the training split, computed in SQL"""
+    moments = ", ".join(f"avg({col}), var_pop({col})" for col in FEATURE_COLUMNS)
+    row = con.execute(f"SELECT count(*), {moments} FROM panels WHERE {TRAIN_WHERE}", split).fetchone()  # noqa: S608  # module constants only
+    n_rows = int(row[0])
+    if n_rows == 0:
+        raise ValueError("No training rows")
+    mean = np.array(row[1::2], dtype=np.float64)
+    var = np.array(row[2::2], dtype=np.float64)
+
+    scaler = StandardScaler()
+    scaler.n_features_in_ = len(FEATURE_COLUMNS)
+    scaler.feature_names_in_ = np.asarray(FEATURE_COLUMNS, dtype=object)
+    scaler.n_samples_seen_ = np.int64(n_rows)
+    scaler.mean_ = mean
+    scaler.var_ = var
+    # Same guard as StandardScaler.fit: constant features are left unscaled
+    scaler.scale_ = np.where(var > 10 * np.finfo(np.float64).eps, np.sqrt(var), 1.0)
+    return scaler, n_rows
+
+
+def iter_chunks(con: duckdb.DuckDBPyConnection, query: str, params: dict[str, Any], chunk_size: int):
+    """Stream a query result as DataFrames of at most chunk_size rows"""
+    reader = con.execute(query, params).fetch_record_batch(chunk_size)
+    for batch in reader:
+        if batch.num_rows:
+            yield batch.to_pandas()
+
+
+def fit_forest(
+    con: duckdb.DuckDBPyConnection,
+    args: argparse.Namespace,
+    split: dict[str, int],
+    n_rows: int,
+    scaler: StandardScaler,
+    label_encoder: LabelEncoder,
+) -> tuple[RandomForestClassifier, int]:
+    """Grow the forest chunk by chunk; returns the forest and the number of chunks it was fitted on"""
+    chunk_size = args.chunk_size or n_rows
+    n_chunks = math.ceil(n_rows / chunk_size)
+    forest = RandomForestClassifier(
+        n_estimators=0,
+        max_depth=args.max_depth,
+        min_samples_leaf=args.min_samples_leaf,
+        ccp_alpha=args.ccp_alpha,
+        n_jobs=args.n_jobs,
+        random_state=args.random_state,
+        warm_start=n_chunks > 1,
+    )
+    n_classes = len(label_encoder.classes_)
+    columns = ", ".join(FEATURE_COLUMNS)
+    # Shuffle by hash so every chunk is a representative slice of the training split
+    query = f"SELECT {columns}, {TARGET_COLUMN} FROM panels WHERE {TRAIN_WHERE} ORDER BY hash(id, $shuffle_seed)"  # noqa: S608  # module constants only
+    params = {**split, "shuffle_seed": args.random_state + 1}
+
+    pending: list[pd.DataFrame] = []
+    fitted_chunks = 0
+    for i, chunk in enumerate(iter_chunks(con, query, params, chunk_size)):
+        pending.append(chunk)
+        # Spread the trees evenly over the chunks
+        target = n_estimators_after(i, n_chunks, args.n_estimators)
+        data = pd.concat(pending, ignore_index=True) if len(pending) > 1 else chunk
+        y = label_encoder.transform(data[TARGET_COLUMN])
+        # Every tree must see every class or the forest's probability columns would not line up
+        if target <= forest.n_estimators or np.unique(y).size < n_classes:
+            continue
+        forest.n_estimators = target
+        forest.fit(scaler.transform(data[FEATURE_COLUMNS]), y)
+        fitted_chunks += 1
+        pending.clear()
+        print(f"  chunk {i + 1}/{n_chunks}: {len(data):,} rows, {len(forest.estimators_)} trees")
+    if not fitted_chunks:
+        raise ValueError("No training chunk contained every status class")
+    if pending:
+        print(f"  skipped {sum(len(p) for p in pending):,} trailing rows that did not cover every status class")
+    # Serving parallelism comes from the inference executor and the scoring job's processes, not from joblib threads
+    forest.set_params(n_jobs=None, warm_start=False)
+    return forest, fitted_chunks
+
+
+def n_estimators_after(chunk_index: int, n_chunks: int, n_estimators: int) -> int:
+    return max(1, round(n_estimators * (chunk_index + 1) / n_chunks))
+
+
+def evaluate(
+    con: duckdb.DuckDBPyConnection,
+    pipeline: Pipeline,
+    label_encoder: LabelEncoder,
+    where: str,
+    split: dict[str, int],
+    chunk_size: int,
+    limit: int | None = None,
+) -> dict[str, Any]:
+    """Accuracy, per-class recall and confusion matrix over the rows matching `where` (TEST_WHERE or TRAIN_WHERE)"""
+    labels = np.arange(len(label_encoder.classes_))
+    matrix = np.zeros((len(labels), len(labels)), dtype=np.int64)
+    query = f"SELECT {', '.join(FEATURE_COLUMNS)}, {TARGET_COLUMN} FROM panels WHERE {where}"  # noqa: S608  # module constants only
+    params: dict[str, Any] = dict(split)
+    if limit:
+        query += " LIMIT $limit"
+        params["limit"] = limit
+    for chunk in iter_chunks(con, query, params, chunk_size):
+        y = label_encoder.transform(chunk[TARGET_COLUMN])
+        matrix += confusion_matrix(y, pipeline.predict(chunk[FEATURE_COLUMNS]), labels=labels)
+    total = int(matrix.sum())
+    support = matrix.sum(axis=1)
+    return {
+        "rows": total,
+        "accuracy": float(np.trace(matrix) / total) if total else None,
+        "recall": {
+            str(label): float(matrix[i, i] / support[i]) if support[i] else None for i, label in enumerate(label_encoder.classes_)
+        },
+        "confusion_matrix": matrix.tolist(),
+    }
+
+
+def write_atomic(path: Path, write) -> None:
+    """Write via a hidden temp file and rename, so the registry never sees a partial artifact"""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def main(argv: list[str] | None = None, progress: Callable[[float, str], None] | None = None) -> dict[str, Any]:
+    """Train, evaluate and save a model version; `progress` is called with the fraction done and the current step"""
+    report = progress or (lambda fraction, step: None)
+    args = parse_args(argv)
+    as_of = as_of_timestamp(args.as_of)
+    version = datetime.now(UTC).strftime("%Y%m%dT%H%M%SZ")
+    timings: dict[str, float] = {}
+    split = {"seed": args.random_state, "test_percent": args.test_percent}
+
+    con = connect_duckdb()
+    report(0.0, "Preparing features")
+    start = time.perf_counter()
+    if args.export_joined:
+        con.execute(
+            """
+            COPY (
+                SELECT info.id, info.voltage, info.temperature, info.status, info.installation_timestamp, loc.latitude, loc.longitude
+                FROM read_parquet($info_file) AS info
+                JOIN read_parquet($loc_file) AS loc
+                USING (id)
+            ) TO $joined_file (FORMAT PARQUET)
+            """,
+            {"info_file": str(args.info_file), "loc_file": str(args.loc_file), "joined_file": str(JOINED_FILE)},
+        )
+        print(f"Joined data written to {JOINED_FILE}")
+    prepare_panels(con, args, as_of)
+    classes_query = f"SELECT DISTINCT {TARGET_COLUMN} FROM panels WHERE {TARGET_COLUMN} IS NOT NULL ORDER BY 1"  # noqa: S608  # module constants only
+    classes = [row[0] for row in con.execute(classes_query).fetchall()]
+    label_encoder = LabelEncoder().fit(classes)
+    scaler, n_train = fit_scaler(con, split)
+    timings["prepare_seconds"] = time.perf_counter() - start
+    print(f"Training on {n_train:,} rows, classes {classes}")
+
+    report(0.1, f"Training on {n_train:,} rows")
+    start = time.perf_counter()
+    forest, n_chunks = fit_forest(con, args, split, n_train, scaler, label_encoder)
+    timings["fit_seconds"] = time.perf_counter() - start
+    pipeline = Pipeline([("scaler", scaler), ("classifier", forest)])
+
+    report(0.8, "Evaluating")
+    start = time.perf_counter()
+    eval_chunk = args.chunk_size or 1_000_000
+    test_metrics = evaluate(con, pipeline, label_encoder, TEST_WHERE, split, eval_chunk)
+    # Training accuracy on at most one chunk; the full training split would cost as much as the fit
+    train_metrics = evaluate(con, pipeline, label_encoder, TRAIN_WHERE, split, eval_chunk, limit=eval_chunk)
+    timings["evaluate_seconds"] = time.perf_counter() - start
+
+    metadata = {
+        "version": version,
+        "trained_at": datetime.now(UTC).isoformat(),
+        "as_of": as_of.isoformat(),
+        "features": FEATURE_COLUMNS,
+        "classes": classes,
+        "params": {
+            "n_estimators": len(forest.estimators_),
+            "max_depth": args.max_depth,
+            "min_samples_leaf": args.min_samples_leaf,
+            "ccp_alpha": args.ccp_alpha,
+            "n_jobs": args.n_jobs,
+            "random_state": args.random_state,
+            "chunk_size": args.chunk_size,
+            "chunks": n_chunks,
+            "sample_rows": args.sample_rows,
+            "sample_percent": args.sample_percent,
+            "test_percent": args.test_percent,
+        },
+        "metrics": {"train_rows": n_train, "train_accuracy": train_metrics["accuracy"], "test": test_metrics},
+        "timings": timings,
+    }
+
+    report(0.95, "Saving")
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    model_path = args.output_dir / f"{version}.pkl"
+    start = time.perf_counter()
+    bundle = {"pipeline": pipeline, "label_encoder": label_encoder, "metadata": metadata}
+    write_atomic(model_path, lambda tmp: joblib.dump(bundle, tmp))
+    timings["save_seconds"] = time.perf_counter() - start
+    timings["model_bytes"] = model_path.stat().st_size
+    write_atomic(model_path.with_suffix(".json"), lambda tmp: tmp.write_text(json.dumps(metadata, indent=2), encoding="utf-8"))
+    if args.activate:
+        write_atomic(args.output_dir / CURRENT_FILE.name, lambda tmp: tmp.write_text(version, encoding="utf-8"))
+
+    print(f"Training accuracy: {train_metrics['accuracy']:.4f}")
+    print(f"Test accuracy: {test_metrics['accuracy']:.4f}")
+    print(f"Model version {version} saved to {model_path} ({', '.join(f'{k}={v:.2f}' for k, v in timings.items())})")
+    return metadata
+
+
+if __name__ == "__main__":
+    main()
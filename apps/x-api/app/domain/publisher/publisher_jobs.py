@@ -0,0 +1,31 @@
+"""Background jobs of the publisher domain, registered with `common_fastapi.job_runner`."""
+
+from collections.abc import Sequence
+from typing import Any
+
+from app.db.main import async_session_factory
+from common_fastapi import JobContext, job_runner
+
+from .publisher_dto import PublisherCreateForm
+from .publisher_entity import Publisher
+from .publisher_repo import PublisherRepository
+from .publisher_service import PublisherService
+
+
+async def create_publishers(forms: Sequence[PublisherCreateForm]) -> list[Publisher]:
+    # A session of its own: the request that submitted the job has closed its session
+    async with async_session_factory() as session:
+        return await PublisherService(session).create_many(forms)
+
+
+def create_publishers_from_parquet(context: JobContext, parquet_path: str) -> dict[str, Any]:
+    """Read the parquet file in a job thread, then insert the publishers on the event loop, where the database pool lives"""
+    context.progress(0.0, "Reading the parquet file")
+    forms = PublisherRepository.read_parquet(parquet_path)
+    context.raise_if_cancelled()
+    context.progress(0.5, f"Creating {len(forms)} publishers")
+    publishers = context.run_coroutine(create_publishers(forms))
+    return {"created": len(publishers), "uids": [str(publisher.uid) for publisher in publishers]}
+
+
+job_runner.register("publisher.create_from_parquet", create_publishers_from_parquet, executor="thread", concurrency=2)
@@ -1,18 +1,22 @@
+import sqlite3
 from collections.abc import Sequence
+from contextlib import closing
+from pathlib import Path
 
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from common_fastapi import ResourceNotFoundException
+from common_fastapi import ResourceNotFoundException, response_cache
 
 from .publisher_dto import PublisherCreateForm
 from .publisher_entity import Publisher
-import pyarrow.parquet as pq
-from pyiceberg.catalog import load_catalog
 
 class PublisherRepository:
     """Repository layer for publisher operations."""
 
+    ICEBERG_WAREHOUSE = Path("/tmp/warehouse")
+    ICEBERG_CATALOG = ICEBERG_WAREHOUSE / "pyiceberg_catalog.db"
+
     def __init__(self, session: AsyncSession):
         """Initialize the repository with a database session."""
         self.session = session
@@ -23,6 +27,7 @@ class PublisherRepository:
         self.session.add(new_item)
         await self.session.commit()
         await self.session.refresh(new_item)
+        await response_cache.invalidate("publisher:list")
         return new_item
     
     async def create_many(self, forms: Sequence[PublisherCreateForm]) -> list[Publisher]:
@@ -32,19 +37,26 @@ class PublisherRepository:
         await self.session.commit()
         for item in new_items:
             await self.session.refresh(item)
+        await response_cache.invalidate("publisher:list")
         return new_items
     
     async def create_from_parquet(self, parquet_path: str) -> list[Publisher]:
         """Create publishers from a parquet file."""
-        print("*******3")
-        
-        warehouse_path = "/tmp/warehouse"
+        return await self.create_many(self.read_parquet(parquet_path))
+
+    @classmethod
+    def read_parquet(cls, parquet_path: str) -> list[PublisherCreateForm]:
+        """Read the publishers of a parquet file; blocking, and CPU-bound for large files."""
+        # Imported here: pyarrow and pyiceberg are only needed by this method and slow to import
+        import pyarrow.parquet as pq
+        from pyiceberg.catalog import load_catalog
+
         catalog = load_catalog(
             "default",
             **{
                 "type": "sql",
-                "uri": f"sqlite:///{warehouse_path}/pyiceberg_catalog.db",
-                "warehouse": f"file://{warehouse_path}",
+                "uri": f"sqlite:///{cls.ICEBERG_CATALOG}",
+                "warehouse": f"file://{cls.ICEBERG_WAREHOUSE}",
             },
         )
         
@@ -52,25 +64,16 @@ class PublisherRepository:
         
         # Step 1: Read parquet into PyArrow Table
         # table = pq.read_table(parquet_path)
-        
-        print("*****3.1 ")
 
         # Step 2: Convert to Pandas DataFrame
         df = df.to_pandas()
-        
-        print("df contents :- -:- -:- -:")
-        #print(df)
-        print("*******4")
 
         # Step 3: Convert to list of PublisherCreateForm objects
-        forms = [
+        return [
             PublisherCreateForm(**record)
             for record in df.to_dict(orient="records")
         ]
 
-        # Step 4: Reuse existing create_many method
-        return await self.create_many(forms)
-
     async def find_all(self) -> Sequence[Publisher]:
         """Retrieve all publishers."""
         statement = select(Publisher).order_by(Publisher.created_at)
@@ -93,6 +96,7 @@ class PublisherRepository:
             setattr(item, key, value)
         await self.session.commit()
         await self.session.refresh(item)
+        await response_cache.invalidate("publisher:list", f"publisher:{uid}")
         return item
 
     async def remove(self, uid: str) -> None:
@@ -100,3 +104,14 @@ class PublisherRepository:
         item = await self.find_one(uid)
         await self.session.delete(item)
         await self.session.commit()
+        await response_cache.invalidate("publisher:list", f"publisher:{uid}")
+
+    @classmethod
+    def check_iceberg_catalog(cls) -> str | None:
+        """Raise if the Iceberg catalog exists but cannot be read; it is only created by the first parquet import."""
+        if not cls.ICEBERG_CATALOG.exists():
+            return "catalog not created yet"
+        # Read-only, and without importing pyiceberg: the SQL catalog is a plain SQLite database
+        with closing(sqlite3.connect(f"file:{cls.ICEBERG_CATALOG}?mode=ro", uri=True, timeout=1.0)) as conn:
+            conn.execute("SELECT count(*) FROM sqlite_master").fetchone()
+        return None
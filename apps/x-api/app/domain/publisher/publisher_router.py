@@ -9,7 +9,9 @@ from http import HTTPStatus
 from fastapi import APIRouter
 
 from app.db import AsyncSessionDep
+from common_fastapi import Job, cache_response, job_runner, trusted_response
 
+from . import publisher_jobs  # noqa: F401  # registers the background jobs
 from .publisher_dto import PublisherCreateForm, PublisherResult
 from .publisher_entity import Publisher
 from .publisher_service import PublisherService
@@ -18,9 +20,13 @@ from .publisher_service import PublisherService
 # Router for publisher-related endpoints
 publisher_router = APIRouter(
     prefix="/publisher",
-    tags=["Publishers"]  # Tag for OpenAPI documentation
+    tags=["Publishers"],  # Tag for OpenAPI documentation
 )
 
+# Seconds GET responses are cached; the repository invalidates them on every write
+CACHE_TTL = 300
+
+
 @publisher_router.post(
     "",
     response_model=PublisherResult,
@@ -43,6 +49,7 @@ async def create(form: PublisherCreateForm, session: AsyncSessionDep) -> Publish
     service = PublisherService(session)
     return await service.create(form)
 
+
 @publisher_router.post(
     "/create_many",
     response_model=list[PublisherResult],
@@ -65,28 +72,27 @@ async def create_many(forms: Sequence[PublisherCreateForm], session: AsyncSessio
     service = PublisherService(session)
     return await service.create_many(forms)
 
+
 @publisher_router.post(
     "/create_from_parquet",
-    response_model=list[PublisherResult],
-    status_code=HTTPStatus.CREATED,
+    response_model=Job,
+    status_code=HTTPStatus.ACCEPTED,
     summary="Load Publishers from a Parquet file.",
-    description="Load new publishers from a Parquet file.",
+    description="Start loading new publishers from a Parquet file; follow the job at /jobs/{id}.",
 )
-async def create_from_parquet(parquet_path: str, session: AsyncSessionDep) -> list[Publisher]:
+async def create_from_parquet(parquet_path: str) -> Job:
     """
-    Create a new publisher.
+    Start loading publishers from a Parquet file in the background.
 
     Args:
-        form (PublisherCreateForm): The details of the publisher to be created.
-        session (AsyncSessionDep): The database session dependency.
+        parquet_path (str): Path of the Parquet file.
 
     Returns:
-        PublisherResult: The created publisher's details.
+        Job: The queued job; its result holds the number and UIDs of the created publishers.
 
     """
-    print("*******1")
-    service = PublisherService(session)
-    return await service.create_from_parquet(parquet_path)
+    return await job_runner.submit("publisher.create_from_parquet", parquet_path=parquet_path)
+
 
 @publisher_router.get(
     "",
@@ -95,6 +101,8 @@ async def create_from_parquet(parquet_path: str, session: AsyncSessionDep) -> li
     summary="Get All Publishers",
     description="Retrieve a list of all publishers.",
 )
+@cache_response(ttl=CACHE_TTL, tags=("publisher", "publisher:list"))
+@trusted_response()
 async def find_all(session: AsyncSessionDep) -> Sequence[Publisher]:
     """
     Retrieve all publishers.
@@ -109,6 +117,7 @@ async def find_all(session: AsyncSessionDep) -> Sequence[Publisher]:
     service = PublisherService(session)
     return await service.find_all()
 
+
 @publisher_router.get(
     "/{uid}",
     response_model=PublisherResult,
@@ -116,6 +125,7 @@ async def find_all(session: AsyncSessionDep) -> Sequence[Publisher]:
     summary="Get Publisher by ID",
     description="Retrieve a publisher by its unique identifier (UID).",
 )
+@cache_response(ttl=CACHE_TTL, tags=("publisher", "publisher:{uid}"))
 async def find_one(uid: str, session: AsyncSessionDep) -> Publisher:
     """
     Retrieve a publisher by its unique identifier.
@@ -131,6 +141,7 @@ async def find_one(uid: str, session: AsyncSessionDep) -> Publisher:
     service = PublisherService(session)
     return await service.find_one(uid)
 
+
 @publisher_router.put(
     "/{uid}",
     response_model=PublisherResult,
@@ -154,6 +165,7 @@ async def update(uid: str, form: PublisherCreateForm, session: AsyncSessionDep)
     service = PublisherService(session)
     return await service.update(uid, form)
 
+
 @publisher_router.delete(
     "/{uid}",
     status_code=HTTPStatus.NO_CONTENT,
@@ -0,0 +1,16 @@
+"""Background jobs of the solar panel domain, registered with `common_fastapi.job_runner`."""
+
+from common_fastapi import JobContext, job_runner, response_cache, service_registry
+
+
+def create_solar_panels(context: JobContext) -> dict[str, str]:
+    """Write the joined solar_panel.parquet; DuckDB releases the GIL while it reads and writes parquet, so a thread is enough"""
+    service = service_registry.get("solar_panel")
+    context.progress(0.0, "Joining information and location data")
+    service.create()
+    context.run_coroutine(response_cache.invalidate("solar_panel"))
+    return {"message": "solar_panel.parquet created successfully"}
+
+
+# One at a time: every run overwrites the same file
+job_runner.register("solar_panel.create", create_solar_panels, executor="thread", concurrency=1)
@@ -1,7 +1,7 @@
-import duckdb
 import pandas as pd
 from pathlib import Path
 from common_fastapi import ResourceNotFoundException
+from app.config.duckdb_connection import connect_duckdb, query_timeout
 from .solar_panel_dto import SolarPanelCreateForm
 from .solar_panel_entity import SolarPanel
 
@@ -15,27 +15,37 @@ class SolarPanelRepository:
     JOINED_PATH = DATA_DIR / "solar_panel.parquet"
 
     def __init__(self):
-        self.conn = duckdb.connect()
+        self.conn = connect_duckdb()
 
     def create(self) -> None:
         """Create joined solar panel data from information and location parquet files."""
         info_file = str(self.INFO_PATH)
         loc_file = str(self.LOCATION_PATH)
         out_file = str(self.JOINED_PATH)
-        self.conn.execute(f"""
-            CREATE OR REPLACE TABLE joined AS
-            SELECT info.id,
-                   info.voltage,
-                   info.temperature,
-                   info.status,
-                   info.installation_timestamp,
-                   loc.latitude,
-                   loc.longitude
-            FROM read_parquet('{info_file}') AS info
-            JOIN read_parquet('{loc_file}') AS loc
-            USING (id)
-        """)
-        self.conn.execute(f"COPY joined TO '{out_file}' (FORMAT PARQUET)")
+        # Runs in a background job thread while requests use the connection: a cursor is a connection of its own.
+        # Not time-limited: the export is a background job, and spills to disk beyond DUCKDB_MEMORY_LIMIT
+        with query_timeout(self.conn, timeout=0) as cursor:
+            cursor.execute(f"""
+                CREATE OR REPLACE TABLE joined AS
+                SELECT info.id,
+                       info.voltage,
+                       info.temperature,
+                       info.status,
+                       info.installation_timestamp,
+                       loc.latitude,
+                       loc.longitude
+                FROM read_parquet('{info_file}') AS info
+                JOIN read_parquet('{loc_file}') AS loc
+                USING (id)
+            """)
+            cursor.execute(f"COPY joined TO '{out_file}' (FORMAT PARQUET)")
+
+    def check_files(self) -> None:
+        """Raise if a parquet file the queries read is missing or unreadable; only the file footers are read."""
+        # The connection must not be used from two threads at once; a cursor is a connection of its own
+        with query_timeout(self.conn) as cursor:
+            for path in (self.INFO_PATH, self.LOCATION_PATH):
+                cursor.execute("SELECT num_rows FROM parquet_file_metadata(?)", [str(path)]).fetchone()
 
     def find_all(self) -> list[SolarPanel]:
         """Retrieve all solar panel records from joined data."""
@@ -53,7 +63,8 @@ class SolarPanelRepository:
             JOIN read_parquet('{loc_file}') AS loc
             USING (id)
         """
-        df = self.conn.execute(query).df()
+        with query_timeout(self.conn) as cursor:
+            df = cursor.execute(query).df()
         return [SolarPanel(**row) for row in df.to_dict(orient='records')]
 
     def find_all_by_pagination(self, limit: int, page_number: int) -> tuple[list[SolarPanel], int]:
@@ -67,7 +78,8 @@ class SolarPanelRepository:
             JOIN read_parquet('{loc_file}') AS loc
             USING (id)
         """
-        total = self.conn.execute(count_query).fetchone()[0]
+        with query_timeout(self.conn) as cursor:
+            total = cursor.execute(count_query).fetchone()[0]
         # fetch page
         offset = (page_number - 1) * limit
         query = f"""
@@ -83,7 +95,8 @@ class SolarPanelRepository:
             USING (id)
             LIMIT {limit} OFFSET {offset}
         """
-        df = self.conn.execute(query).df()
+        with query_timeout(self.conn) as cursor:
+            df = cursor.execute(query).df()
         items = [SolarPanel(**row) for row in df.to_dict(orient='records')]
         return items, total
 
@@ -104,7 +117,8 @@ class SolarPanelRepository:
             USING (id)
             WHERE id = {uid}
         """
-        df = self.conn.execute(query).df()
+        with query_timeout(self.conn) as cursor:
+            df = cursor.execute(query).df()
         if df.empty:
             raise ResourceNotFoundException(f"SolarPanel with id {uid} not found")
         return SolarPanel(**df.iloc[0].to_dict())
@@ -112,7 +126,8 @@ class SolarPanelRepository:
     def update(self, uid: int, form: SolarPanelCreateForm) -> SolarPanel:
         """Update a solar panel record by ID in the joined parquet file."""
         jp = str(self.JOINED_PATH)
-        df = self.conn.execute(f"SELECT * FROM read_parquet('{jp}')").df()
+        with query_timeout(self.conn) as cursor:
+            df = cursor.execute(f"SELECT * FROM read_parquet('{jp}')").df()
         if uid not in df['id'].values:
             raise ResourceNotFoundException(f"SolarPanel with id {uid} not found")
         for field, value in form.model_dump().items():
@@ -124,7 +139,8 @@ class SolarPanelRepository:
     def remove(self, uid: int) -> None:
         """Delete a specific solar panel record by ID from the joined parquet file."""
         jp = str(self.JOINED_PATH)
-        df = self.conn.execute(f"SELECT * FROM read_parquet('{jp}')").df()
+        with query_timeout(self.conn) as cursor:
+            df = cursor.execute(f"SELECT * FROM read_parquet('{jp}')").df()
         if uid not in df['id'].values:
             raise ResourceNotFoundException(f"SolarPanel with id {uid} not found")
         df = df[df['id'] != uid]
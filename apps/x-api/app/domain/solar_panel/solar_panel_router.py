@@ -1,34 +1,60 @@
 from http import HTTPStatus
-from fastapi import APIRouter, HTTPException, Query
-from typing import List as _list
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import TYPE_CHECKING, Annotated, Any, List as _list
 
-from common_fastapi import ResourceNotFoundException
-from .solar_panel_service import SolarPanelService
+from common_fastapi import Job, ResourceNotFoundException, cache_response, job_runner, response_cache, service_registry, trusted_response
 from .solar_panel_dto import SolarPanelResult, SolarPanelCreateForm, PaginatedSolarPanel
+from . import solar_panel_jobs  # noqa: F401  # registers the background jobs
+
+if TYPE_CHECKING:
+    from .solar_panel_service import SolarPanelService
+else:
+    SolarPanelService = Any
 
 solar_panel_router = APIRouter(prefix="/solar-panel", tags=["SolarPanel"])
-service = SolarPanelService()
 
-@solar_panel_router.post("/", status_code=HTTPStatus.CREATED)
+# Seconds GET responses are cached; write endpoints invalidate them (the repository is synchronous)
+CACHE_TTL = 300
+
+# The read endpoints are plain functions, run in the threadpool: their DuckDB scans then leave the event loop
+# free, so identical concurrent reads are coalesced into one scan by the response cache middleware.
+
+
+def build_service() -> "SolarPanelService":
+    """Build the service; imported here so importing the router does not load DuckDB and pandas"""
+    from .solar_panel_service import SolarPanelService
+
+    return SolarPanelService()
+
+
+service_registry.register("solar_panel", build_service)
+ServiceDep = Annotated[SolarPanelService, Depends(service_registry.dependency("solar_panel"))]
+
+@solar_panel_router.post("/", response_model=Job, status_code=HTTPStatus.ACCEPTED)
 async def create_solar_panel():
-    """Create the joined solar_panel.parquet by combining information and location data."""
-    service.create()
-    return {"message": "solar_panel.parquet created successfully"}
+    """Start creating the joined solar_panel.parquet by combining information and location data; follow the job at /jobs/{id}."""
+    return await job_runner.submit("solar_panel.create")
 
 @solar_panel_router.get("/", response_model=_list[SolarPanelResult])
-async def read_solar_panels():
+@cache_response(ttl=CACHE_TTL, tags=("solar_panel", "solar_panel:list"))
+@trusted_response()
+def read_solar_panels(service: ServiceDep):
     """Retrieve all solar panel records."""
     return service.find_all()
 
 @solar_panel_router.get("/paginated", response_model=PaginatedSolarPanel)
-async def read_solar_panels_paginated(
+@cache_response(ttl=CACHE_TTL, tags=("solar_panel", "solar_panel:list"))
+@trusted_response()
+def read_solar_panels_paginated(
+    service: ServiceDep,
     limit: int = Query(50, ge=1),
     pageNumber: int = Query(1, ge=1)
 ):
     return service.find_all_by_pagination(limit, pageNumber)
 
 @solar_panel_router.get("/{uid}", response_model=SolarPanelResult)
-async def read_solar_panel(uid: int):
+@cache_response(ttl=CACHE_TTL, tags=("solar_panel", "solar_panel:{uid}"))
+def read_solar_panel(uid: int, service: ServiceDep):
     """Retrieve a solar panel record by ID."""
     try:
         return service.find_one(uid)
@@ -36,25 +62,29 @@ async def read_solar_panel(uid: int):
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail=str(e))
 
 @solar_panel_router.put("/{uid}", response_model=SolarPanelResult)
-async def update_solar_panel(uid: int, form: SolarPanelCreateForm):
+async def update_solar_panel(uid: int, form: SolarPanelCreateForm, service: ServiceDep):
     """Update a solar panel record by ID."""
     try:
-        return service.update(uid, form)
+        result = service.update(uid, form)
     except ResourceNotFoundException as e:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail=str(e))
+    await response_cache.invalidate("solar_panel:list", f"solar_panel:{uid}")
+    return result
 
 @solar_panel_router.delete("/{uid}", status_code=HTTPStatus.NO_CONTENT)
-async def delete_solar_panel(uid: int):
+async def delete_solar_panel(uid: int, service: ServiceDep):
     """Delete a solar panel record by ID."""
     try:
         service.remove(uid)
     except ResourceNotFoundException as e:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail=str(e))
+    await response_cache.invalidate("solar_panel:list", f"solar_panel:{uid}")
 
 @solar_panel_router.delete("/", status_code=HTTPStatus.NO_CONTENT)
-async def delete_all_solar_panels():
+async def delete_all_solar_panels(service: ServiceDep):
     """Delete the entire solar_panel.parquet file."""
     service.remove_all()
+    await response_cache.invalidate("solar_panel")
 
 # from http import HTTPStatus
 # from fastapi import APIRouter, HTTPException
@@ -1,4 +1,4 @@
-from .solar_panel_dto import SolarPanelCreateForm, PaginatedSolarPanel, SolarPanelResult
+from .solar_panel_dto import SolarPanelCreateForm, PaginatedSolarPanel
 from .solar_panel_entity import SolarPanel
 from .solar_panel_repo import SolarPanelRepository
 
@@ -11,21 +11,24 @@ class SolarPanelService:
     def create(self) -> None:
         return self.repo.create()
 
+    def check_files(self) -> None:
+        return self.repo.check_files()
+
     def find_all(self) -> list[SolarPanel]:
         return self.repo.find_all()
 
     def find_all_by_pagination(self, limit: int, page_number: int) -> PaginatedSolarPanel:
         entities, total = self.repo.find_all_by_pagination(limit, page_number)
-        items = [SolarPanelResult(**e.model_dump()) for e in entities]
         next_page = page_number + 1 if page_number * limit < total else None
         previous_page = page_number - 1 if page_number > 1 else None
-        return PaginatedSolarPanel(
+        # The entities were validated by the repository and have the fields of SolarPanelResult: don't copy them
+        return PaginatedSolarPanel.model_construct(
             page_size=limit,
             current_page=page_number,
             total_records=total,
             next_page=next_page,
             previous_page=previous_page,
-            SolarPanel=items
+            SolarPanel=entities
         )
 
     def find_one(self, uid: int) -> SolarPanel:
@@ -0,0 +1,65 @@
+"""
+Import-time budget of the API.
+
+Run from `apps/x-api`:
+
+    uv run python -m benchmarks.bench_import_time [--module app.main] [--budget-ms 2000] [--top 15] [--repeat 3]
+
+Imports the module in fresh interpreters with `-X importtime` and reports the best total, the slowest
+top-level packages (the self time of all their modules, so packages add up to the total), and whether any of the heavy libraries that should
+only load with a service (duckdb, pandas, scikit-learn, pyarrow, pyiceberg, motor) were imported. Exits
+non-zero when the total exceeds the budget or a heavy library is imported, so it can gate CI.
+"""
+
+# ruff: noqa: T201
+
+import argparse
+import subprocess
+import sys
+
+
+# Libraries that routers must not import; services import them when they are built
+HEAVY_PACKAGES = ("duckdb", "pandas", "sklearn", "scipy", "pyarrow", "pyiceberg", "motor", "joblib")
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Import time in microseconds of every top-level package imported by `module`"""
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True
+    )
+    packages: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, _, name = line.removeprefix("import time:").split("|")
+        if not self_us.strip().isdigit():
+            continue  # header line
+        package = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0) + int(self_us)
+    return packages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--budget-ms", type=float, default=2000.0)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs; the fastest is reported, the first one warms the disk cache")
+    args = parser.parse_args()
+
+    runs = [import_times(args.module) for _ in range(args.repeat)]
+    packages = min(runs, key=lambda run: sum(run.values()))
+    total_ms = sum(packages.values()) / 1000
+    print(f"import {args.module}: {total_ms:,.0f}ms (budget {args.budget_ms:,.0f}ms)")
+    for package, us in sorted(packages.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"  {us / 1000:8.1f}ms  {package}")
+
+    heavy = sorted(set(packages) & set(HEAVY_PACKAGES))
+    if heavy:
+        print(f"Heavy packages imported at startup: {', '.join(heavy)}")
+    if heavy or total_ms > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
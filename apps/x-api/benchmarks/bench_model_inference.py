@@ -0,0 +1,90 @@
+"""
+Single-row latency and batch throughput of the solar status model inference engines.
+
+Run from `apps/x-api` after training a model:
+
+    uv run python -m benchmarks.bench_model_inference [--iterations 2000] [--batch-size 10000]
+
+Engines compared:
+- legacy:   DataFrame + predict_proba + predict + inverse_transform per call (the original repository code)
+- sklearn:  ModelInferenceRepository(engine="sklearn"), one predict_proba pass per call
+- compiled: ModelInferenceRepository(engine="compiled"), flattened NumPy forest
+"""
+
+# ruff: noqa: T201
+
+import argparse
+import time
+from collections.abc import Callable
+
+import numpy as np
+import pandas as pd
+
+from app.domain.model_inference.model_inference_entity import FEATURE_COLUMNS, InferenceInputEntity
+from app.domain.model_inference.model_inference_repo import ModelInferenceRepository
+
+
+def percentile_us(samples: list[float], q: float) -> float:
+    return float(np.percentile(samples, q) * 1e6)
+
+
+def time_calls(fn: Callable[[], object], iterations: int) -> list[float]:
+    # Warm up caches and lazy imports before measuring
+    for _ in range(min(50, iterations)):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def legacy_predict(repo: ModelInferenceRepository, inp: InferenceInputEntity) -> tuple[str, dict[str, float]]:
+    df = pd.DataFrame([inp.model_dump()])
+    proba_list = repo.pipeline.predict_proba(df)[0].tolist()
+    labels = repo.label_encoder.inverse_transform(repo.pipeline.named_steps["classifier"].classes_)
+    prob_dict = {label: float(proba_list[i]) for i, label in enumerate(labels)}
+    pred = repo.label_encoder.inverse_transform([repo.pipeline.predict(df)[0]])[0]
+    return pred, prob_dict
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=ModelInferenceRepository.COMPILED_MAX_ROWS)
+    args = parser.parse_args()
+
+    sklearn_repo = ModelInferenceRepository(engine="sklearn")
+    compiled_repo = ModelInferenceRepository(engine="compiled")
+    if compiled_repo.compiled is None:
+        raise SystemExit("Compiled engine failed validation, see log output")
+
+    rng = np.random.default_rng(42)
+    batch = compiled_repo.compiled.probe_inputs(n_samples=args.batch_size, seed=1)[: args.batch_size]
+    batch[:, FEATURE_COLUMNS.index("panel_age_days")] = np.rint(batch[:, FEATURE_COLUMNS.index("panel_age_days")])
+    inp = InferenceInputEntity(**dict(zip(FEATURE_COLUMNS, batch[rng.integers(len(batch))].tolist(), strict=True)))
+
+    # Outputs must agree before timings mean anything
+    assert legacy_predict(sklearn_repo, inp) == sklearn_repo.predict(inp) == compiled_repo.predict(inp)  # noqa: S101
+
+    engines: dict[str, Callable[[], object]] = {
+        "legacy": lambda: legacy_predict(sklearn_repo, inp),
+        "sklearn": lambda: sklearn_repo.predict(inp),
+        "compiled": lambda: compiled_repo.predict(inp),
+    }
+    frame = pd.DataFrame(batch, columns=FEATURE_COLUMNS)
+
+    print(f"{'engine':<10} {'p50 (us)':>10} {'p99 (us)':>10} {'batch rows/s':>14}")
+    for name, fn in engines.items():
+        iterations = args.iterations if name == "compiled" else max(1, args.iterations // 10)
+        samples = time_calls(fn, iterations)
+        repo = compiled_repo if name == "compiled" else sklearn_repo
+        start = time.perf_counter()
+        repo.predict_batch(frame)
+        rows_per_s = len(frame) / (time.perf_counter() - start)
+        print(f"{name:<10} {percentile_us(samples, 50):>10.1f} {percentile_us(samples, 99):>10.1f} {rows_per_s:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Handler CPU time of the list endpoints: FastAPI's response_model validation against `trusted_response`.
+
+Run from `apps/x-api`:
+
+    uv run python -m benchmarks.bench_responses [--rows 1000] [--iterations 200]
+
+For each list endpoint (solar panels, paginated solar panels, publishers, books, dashboard widgets) the
+same pre-built repository entities are returned by two routes declaring the same `response_model`: one
+served the default way (validate, dump, render with orjson), one decorated with `trusted_response`. The
+requests are driven straight through the ASGI app, so the times are handler, validation and serialization
+CPU only, without database or network.
+"""
+
+# ruff: noqa: T201
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import datetime
+from typing import Any
+
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+
+from app.domain.book.book_dto import BookResult
+from app.domain.book.book_entity import Book
+from app.domain.dashboard_widget.dashboard_widget_dto import DashboardWidgetResult
+from app.domain.dashboard_widget.dashboard_widget_entity import DashboardWidget
+from app.domain.publisher.publisher_dto import PublisherResult
+from app.domain.publisher.publisher_entity import Publisher
+from app.domain.solar_panel.solar_panel_dto import PaginatedSolarPanel, SolarPanelResult
+from app.domain.solar_panel.solar_panel_entity import SolarPanel
+from common_fastapi import trusted_response
+
+
+def entities(rows: int) -> dict[str, tuple[Any, Any]]:
+    """Repository output and response model per endpoint"""
+    now = datetime.now()
+    panels = [
+        SolarPanel(id=i, voltage=230.5, temperature=31.2, status="active", installation_timestamp=now, latitude=52.1, longitude=4.3)
+        for i in range(rows)
+    ]
+    page = PaginatedSolarPanel.model_construct(page_size=rows, current_page=1, total_records=rows, next_page=2, previous_page=None, SolarPanel=panels)
+    publishers = [
+        Publisher(
+            uid=uuid.uuid4(), publisher_id=i, publisher_name="Wildlife Books", location="Madagascar",
+            registration_id=f"REG{i}", description="Only Madagascar-based book publisher.", created_at=now, updated_at=now,
+        )
+        for i in range(rows)
+    ]
+    books = [
+        Book(
+            uid=uuid.uuid4(), title="Sapiens", author="Yuval Noah Harari", isbn=f"978-{i}",
+            description="Earth is 4.5 billion years old.", created_at=now, updated_at=now,
+        )
+        for i in range(rows)
+    ]
+    widgets = [
+        DashboardWidget(
+            id=str(i), name="WT-1", capacity=3500.0, rotor_diameter=120.0, hub_height=90.0, manufacturer="Vestas",
+            country="DK", installation_date=now, status="Active",
+        )
+        for i in range(rows)
+    ]
+    return {
+        "solar_panels": (panels, list[SolarPanelResult]),
+        "solar_panels_paginated": (page, PaginatedSolarPanel),
+        "publishers": (publishers, list[PublisherResult]),
+        "books": (books, list[BookResult]),
+        "dashboard_widgets": (widgets, list[DashboardWidgetResult]),
+    }
+
+
+def build_app(data: dict[str, tuple[Any, Any]]) -> FastAPI:
+    app = FastAPI(default_response_class=ORJSONResponse)  # as create_app
+    for name, (content, model) in data.items():
+        app.get(f"/default/{name}", response_model=model)(returning(content))
+        app.get(f"/trusted/{name}", response_model=model)(trusted_response()(returning(content)))
+    return app
+
+
+def returning(content: Any) -> Any:
+    """An endpoint returning `content`, as a route returning its repository's result"""
+
+    async def endpoint() -> Any:
+        return content
+
+    return endpoint
+
+
+async def request(app: FastAPI, path: str) -> bytes:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "", "headers": [],
+        "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80), "app": app,
+    }
+    body: list[bytes] = []
+
+    async def receive() -> dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict[str, Any]) -> None:
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(body)
+
+
+async def time_requests(app: FastAPI, path: str, iterations: int) -> float:
+    """Median milliseconds per request"""
+    for _ in range(min(20, iterations)):
+        await request(app, path)
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await request(app, path)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+async def run(args: argparse.Namespace) -> None:
+    data = entities(args.rows)
+    app = build_app(data)
+    print(f"{args.rows} rows per response, median of {args.iterations} requests")
+    print(f"{'endpoint':<24} {'default':>10} {'trusted':>10} {'speedup':>8} {'saved':>7}")
+    for name in data:
+        default = await time_requests(app, f"/default/{name}", args.iterations)
+        trusted = await time_requests(app, f"/trusted/{name}", args.iterations)
+        if await request(app, f"/default/{name}") != await request(app, f"/trusted/{name}"):
+            print(f"  {name}: trusted response body differs from the default one")
+        print(f"{name:<24} {default:>8.2f}ms {trusted:>8.2f}ms {default / trusted:>7.1f}x {1 - trusted / default:>6.0%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=200)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
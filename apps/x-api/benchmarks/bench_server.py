@@ -0,0 +1,119 @@
+"""
+Requests per second of one container: plain uvicorn against the pre-forking production server.
+
+Run from `apps/x-api`:
+
+    uv run python -m benchmarks.bench_server [--path /] [--connections 64] [--duration 10] [--workers N]
+
+Starts each server on a free port, drives it with keep-alive HTTP/1.1 connections for `--duration` seconds
+and reports requests per second, p50/p99 latency and the memory of the server's processes. Memory is
+reported as PSS (proportional set size), which splits pages shared copy-on-write between the workers
+evenly, so the preloaded server's saving shows up instead of being counted once per worker.
+"""
+
+# ruff: noqa: T201
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(port: int, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError(f"Server on port {port} did not start within {timeout}s")
+
+
+def pss_mb(pid: int) -> float:
+    """PSS of a process and its children in MB (Linux only; 0 elsewhere)"""
+    pids = [pid]
+    children = Path(f"/proc/{pid}/task/{pid}/children")
+    if children.exists():
+        pids += [int(child) for child in children.read_text(encoding="ascii").split()]
+    total_kb = 0
+    for each in pids:
+        try:
+            for line in Path(f"/proc/{each}/smaps_rollup").read_text(encoding="ascii").splitlines():
+                if line.startswith("Pss:"):
+                    total_kb += int(line.split()[1])
+        except OSError:
+            pass
+    return total_kb / 1024
+
+
+async def client(port: int, request: bytes, deadline: float, latencies: list[float]) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            writer.write(request)
+            headers = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in headers.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def load(port: int, path: str, connections: int, duration: float) -> list[float]:
+    request = f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: keep-alive\r\n\r\n".encode("latin-1")
+    latencies: list[float] = []
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(client(port, request, deadline, latencies) for _ in range(connections)))
+    return latencies
+
+
+def run(name: str, command: list[str], port: int, args: argparse.Namespace) -> None:
+    env = {**os.environ, "LOG_LEVEL": "warning"}
+    server = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)  # noqa: S603
+    try:
+        wait_ready(port)
+        asyncio.run(load(port, args.path, args.connections, 1.0))  # warm up
+        latencies = sorted(asyncio.run(load(port, args.path, args.connections, args.duration)))
+        memory = pss_mb(server.pid)
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(f"{name:<22} {len(latencies) / args.duration:>10,.0f} req/s   p50 {p50:6.2f}ms   p99 {p99:6.2f}ms   PSS {memory:7.1f}MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default="app.main:app")
+    parser.add_argument("--path", default="/")
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, help="Workers of the production server (default: the available CPUs)")
+    args = parser.parse_args()
+
+    port = free_port()
+    run("uvicorn (1 worker)", [sys.executable, "-m", "uvicorn", args.app, "--port", str(port), "--no-access-log"], port, args)
+    port = free_port()
+    workers = ["--workers", str(args.workers)] if args.workers else []
+    command = [sys.executable, "-m", "common_fastapi.server", args.app, "--host", "127.0.0.1", "--port", str(port), *workers]
+    run("common_fastapi.server", command, port, args)
+
+
+if __name__ == "__main__":
+    main()
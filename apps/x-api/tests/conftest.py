@@ -0,0 +1,12 @@
+import os
+import tempfile
+from pathlib import Path
+
+
+# The settings are read from .env.development in the working directory when the app is imported. The tests run
+# from an empty one, with placeholder database credentials: none of them connects to PostgreSQL.
+_ENV_DIR = tempfile.mkdtemp(prefix="x-api-tests-")
+Path(_ENV_DIR, ".env.development").touch()
+os.chdir(_ENV_DIR)
+for _name in ("POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB"):
+    os.environ.setdefault(_name, "test")
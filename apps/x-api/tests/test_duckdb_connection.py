@@ -0,0 +1,63 @@
+import os
+import time
+from http import HTTPStatus
+from pathlib import Path
+
+import pytest
+
+from app.config import duckdb_connection
+from app.config.duckdb_connection import connect_duckdb, duckdb_config, query_timeout
+from app.config.settings import app_settings
+from common_fastapi import QueryTimeoutException
+
+
+GIB = 2**30
+
+
+@pytest.fixture
+def container(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    """8 CPUs and 10 GiB shared by 4 server workers, spilling under `tmp_path`."""
+    monkeypatch.setattr(duckdb_connection, "_cpus_and_workers", lambda: (8, 4))
+    monkeypatch.setattr(duckdb_connection, "_available_memory", lambda: 10 * GIB)
+    monkeypatch.setattr(app_settings, "DUCKDB_TEMP_DIRECTORY", str(tmp_path / "spill"))
+    return tmp_path / "spill"
+
+
+def test_workers_share_the_cpus_and_memory_of_the_container(container: Path) -> None:
+    config = duckdb_config()
+    assert config == {"threads": 2, "memory_limit": "2048MB", "temp_directory": str(container / str(os.getpid()))}
+    # DuckDB creates the spill directory itself, but not its parents
+    assert container.is_dir()
+
+
+def test_settings_override_the_shares(container: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(app_settings, "DUCKDB_THREADS", 3)
+    monkeypatch.setattr(app_settings, "DUCKDB_MEMORY_LIMIT", "1GB")
+    monkeypatch.setattr(app_settings, "DUCKDB_MAX_TEMP_DIRECTORY_SIZE", "5GB")
+    config = duckdb_config()
+    assert (config["threads"], config["memory_limit"], config["max_temp_directory_size"]) == (3, "1GB", "5GB")
+
+
+def test_connections_are_opened_with_the_configuration(container: Path) -> None:
+    conn = connect_duckdb()
+    try:
+        threads, temp_directory = conn.execute("SELECT current_setting('threads'), current_setting('temp_directory')").fetchone()  # type: ignore[misc]
+        assert (threads, temp_directory) == (2, str(container / str(os.getpid())))
+    finally:
+        conn.close()
+
+
+def test_queries_beyond_the_timeout_are_interrupted(container: Path) -> None:
+    conn = connect_duckdb()
+    try:
+        start = time.perf_counter()
+        with pytest.raises(QueryTimeoutException) as exc_info, query_timeout(conn, 0.2) as cursor:
+            cursor.execute("SELECT sum(a.range * b.range) FROM range(1000000) a, range(1000000) b").fetchone()
+        assert time.perf_counter() - start < 5
+        assert exc_info.value.status_code == HTTPStatus.GATEWAY_TIMEOUT
+        # Queries within the timeout, and the connection itself, are unaffected
+        with query_timeout(conn, 5) as cursor:
+            assert cursor.execute("SELECT 42").fetchone() == (42,)
+        assert conn.execute("SELECT 1").fetchone() == (1,)
+    finally:
+        conn.close()
@@ -0,0 +1,115 @@
+import asyncio
+import io
+from collections.abc import AsyncIterator
+from typing import Any
+
+import numpy as np
+import orjson
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from app.domain.model_inference import model_inference_batch as batch
+from app.domain.model_inference.model_inference_entity import FEATURE_COLUMNS
+from app.domain.model_inference.model_inference_formats import BatchFormatError
+
+
+ROWS = [{"id": i, "voltage": 200.0 + i, "temperature": 20.0, "latitude": 1.5, "longitude": -2.5, "panel_age_days": 100 + i} for i in range(5)]
+CLASSES = np.array(["faulty", "ok"])
+
+
+def encode(fmt: str, rows: list[dict[str, Any]]) -> bytes:
+    if fmt == batch.JSON:
+        return orjson.dumps(rows)
+    table = pa.Table.from_pylist(rows)
+    sink = io.BytesIO()
+    if fmt == batch.PARQUET:
+        pq.write_table(table, sink, row_group_size=2)
+    else:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=3)
+    return sink.getvalue()
+
+
+async def collect(chunks: AsyncIterator[Any]) -> list[Any]:
+    return [chunk async for chunk in chunks]
+
+
+async def stream(*parts: bytes) -> AsyncIterator[bytes]:
+    for part in parts:
+        yield part
+
+
+@pytest.mark.parametrize("fmt", [batch.JSON, batch.PARQUET, batch.ARROW_STREAM])
+def test_readers_split_bodies_into_chunks_of_features_and_ids(fmt: str) -> None:
+    chunks = batch.read_body(fmt, encode(fmt, ROWS), chunk_size=2)
+    # At most chunk_size rows each; Arrow record batches are re-sliced, so a chunk may be shorter
+    assert max(len(features) for features, _ in chunks) == 2
+    features = pd.concat([features for features, _ in chunks], ignore_index=True)
+    ids = pd.concat([ids for _, ids in chunks], ignore_index=True)
+    assert list(features.columns) == FEATURE_COLUMNS
+    assert (features.dtypes == "float64").all()
+    assert features["voltage"].tolist() == [200.0, 201.0, 202.0, 203.0, 204.0]
+    assert ids.tolist() == [0, 1, 2, 3, 4]
+
+
+def test_ndjson_lines_split_across_body_parts_are_joined() -> None:
+    body = b"\n".join(orjson.dumps(row) for row in ROWS)
+    # Cut the body in the middle of lines, and leave the last line without its newline
+    parts = [body[i : i + 17] for i in range(0, len(body), 17)]
+    chunks = asyncio.run(collect(batch.read_ndjson(stream(*parts), chunk_size=2)))
+    assert [ids.tolist() for _, ids in chunks] == [[0, 1], [2, 3], [4]]
+
+
+@pytest.mark.parametrize(
+    ("rows", "message"),
+    [
+        ([{"voltage": 1.0}], "Missing feature columns"),
+        ([*ROWS[:3], {**ROWS[3], "voltage": "high"}], "Row 3 has missing or non-numeric feature values"),
+    ],
+)
+def test_invalid_rows_are_reported_with_their_position(rows: list[dict[str, Any]], message: str) -> None:
+    with pytest.raises(BatchFormatError, match=message):
+        batch.read_body(batch.JSON, orjson.dumps(rows), chunk_size=2)
+
+
+def test_ndjson_errors_are_reported_in_band_after_the_rows_already_answered() -> None:
+    body = orjson.dumps(ROWS[0]) + b"\n" + orjson.dumps(ROWS[1]) + b"\nnot json\n"
+
+    async def score(features: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+        return np.full(len(features), "ok"), np.tile([0.25, 0.75], (len(features), 1))
+
+    async def scenario() -> list[dict[str, Any]]:
+        chunks = batch.read_ndjson(stream(body), chunk_size=2)
+        output = b"".join(await collect(batch.write_ndjson(batch.score_chunks(chunks, score, CLASSES))))
+        return [orjson.loads(line) for line in output.splitlines()]
+
+    first, second, error = asyncio.run(scenario())
+    assert first == {"predicted_status": "ok", "probabilities": {"faulty": 0.25, "ok": 0.75}, "id": 0}
+    assert second["id"] == 1
+    assert error["error"].startswith("Row 2 is not valid JSON")
+
+
+@pytest.mark.parametrize("fmt", [batch.JSON, batch.PARQUET, batch.ARROW_STREAM])
+def test_writers_answer_in_the_request_format(fmt: str) -> None:
+    async def score(features: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+        labels = np.where(features["voltage"] > 201, "ok", "faulty")
+        return labels, np.column_stack([labels == "faulty", labels == "ok"]).astype(np.float64)
+
+    async def scenario() -> bytes:
+        chunks = batch.aiter_chunks(batch.read_body(fmt, encode(fmt, ROWS), chunk_size=2))
+        return b"".join(await collect(batch.WRITERS[fmt](batch.score_chunks(chunks, score, CLASSES))))
+
+    body = asyncio.run(scenario())
+    if fmt == batch.JSON:
+        result = pd.DataFrame(orjson.loads(body))
+        assert result["probabilities"][0] == {"faulty": 1.0, "ok": 0.0}
+    elif fmt == batch.PARQUET:
+        result = pq.read_table(pa.BufferReader(body)).to_pandas()
+        assert result["probability_ok"].tolist() == [0.0, 0.0, 1.0, 1.0, 1.0]
+    else:
+        result = pa.ipc.open_stream(pa.BufferReader(body)).read_all().to_pandas()
+        assert result["probability_faulty"].tolist() == [1.0, 1.0, 0.0, 0.0, 0.0]
+    assert result["id"].tolist() == [0, 1, 2, 3, 4]
+    assert result["predicted_status"].tolist() == ["faulty", "faulty", "ok", "ok", "ok"]
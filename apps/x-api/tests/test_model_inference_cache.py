@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from app.domain.model_inference import model_inference_cache
+from app.domain.model_inference.model_inference_cache import PredictionCache
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(model_inference_cache.time, "monotonic", clock)
+    return clock
+
+
+def test_inputs_in_the_same_grid_cell_share_a_key() -> None:
+    cache = PredictionCache(10, 60, {"voltage": 0.5, "temperature": 2.0})
+    rows = cache.quantize(np.array([[230.1, 21.2, 1.23, 4.56, 100], [229.9, 21.4, 1.23, 4.56, 100], [230.1, 21.2, 1.24, 4.56, 100]]))
+    assert rows[0].tolist() == [230.0, 22.0, 1.23, 4.56, 100.0]
+    assert cache.key(rows[0], ("v1",)) == cache.key(rows[1], ("v1",))
+    # Features without a step are matched exactly
+    assert cache.key(rows[0], ("v1",)) != cache.key(rows[2], ("v1",))
+    assert cache.key(rows[0], ("v1",)) != cache.key(rows[0], ("v2",))
+
+
+def test_unknown_quantized_features_are_rejected() -> None:
+    with pytest.raises(ValueError, match="wattage"):
+        PredictionCache(10, 60, {"wattage": 1.0})
+
+
+def test_entries_expire_after_the_ttl(clock: Clock) -> None:
+    cache = PredictionCache(10, 60, {})
+    cache.put(("a",), "ok")
+    clock.now += 59
+    assert cache.get(("a",)) == "ok"
+    clock.now += 1
+    assert cache.get(("a",)) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_the_least_recently_used_entry_is_evicted(clock: Clock) -> None:
+    cache = PredictionCache(2, 60, {})
+    cache.put(("a",), 1)
+    cache.put(("b",), 2)
+    cache.get(("a",))
+    cache.put(("c",), 3)
+    assert (cache.get(("a",)), cache.get(("b",)), cache.get(("c",))) == (1, None, 3)
+    assert cache.evictions == 1
+
+
+def test_a_new_active_model_drops_every_entry(clock: Clock) -> None:
+    cache = PredictionCache(10, 60, {})
+    cache.sync_model(("v1", 1))
+    cache.put(("v1", 1, 0.0), "ok")
+    cache.sync_model(("v1", 1))
+    assert cache.get(("v1", 1, 0.0)) == "ok"
+    cache.sync_model(("v2", 1))
+    assert cache.stats()["size"] == 0
+    assert cache.invalidations == 1
@@ -0,0 +1,76 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from app.domain.model_inference.model_inference_compiled import CompiledForest, float32_floor
+from app.domain.model_inference.model_inference_entity import FEATURE_COLUMNS
+
+
+@pytest.fixture(scope="module")
+def pipeline() -> Pipeline:
+    """Small fixed forest; with two fully grown trees, rows the trees disagree on get tied probabilities."""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, len(FEATURE_COLUMNS))) * [10.0, 5.0, 1.0, 1.0, 100.0]
+    y = np.where(X[:, 0] + 2 * X[:, 1] > rng.normal(0.0, 5.0, size=len(X)), "ok", "faulty")
+    forest = RandomForestClassifier(n_estimators=2, random_state=0)
+    return Pipeline([("scaler", StandardScaler()), ("model", forest)]).fit(pd.DataFrame(X, columns=FEATURE_COLUMNS), y)
+
+
+def assert_matches_sklearn(pipeline: Pipeline, X: np.ndarray) -> np.ndarray:
+    frame = pd.DataFrame(X, columns=FEATURE_COLUMNS)
+    predicted, proba = CompiledForest(pipeline).predict(X)
+    np.testing.assert_array_equal(proba, pipeline.predict_proba(frame))
+    np.testing.assert_array_equal(predicted, pipeline.predict(frame))
+    return proba
+
+
+def test_predictions_match_sklearn_including_ties(pipeline: Pipeline) -> None:
+    compiled = CompiledForest(pipeline)
+    proba = assert_matches_sklearn(pipeline, compiled.probe_inputs(n_samples=512))
+    # Ties are broken towards the first class, like sklearn's argmax
+    assert (proba[:, 0] == proba[:, 1]).any()
+
+
+def test_rows_on_split_thresholds_match_sklearn(pipeline: Pipeline) -> None:
+    compiled = CompiledForest(pipeline)
+    split_nodes = np.flatnonzero(~compiled.is_leaf)
+    features = compiled.feature[split_nodes]
+    rows = np.tile(compiled.mean, (len(split_nodes), 1))
+    # Raw values whose scaled float32 value lands exactly on, or one float32 step either side of, each threshold
+    for step in (-np.inf, None, np.inf):
+        thresholds = compiled.threshold[split_nodes] if step is None else np.nextafter(compiled.threshold[split_nodes], np.float32(step))
+        rows[np.arange(len(split_nodes)), features] = thresholds.astype(np.float64) * compiled.scale[features] + compiled.mean[features]
+        assert_matches_sklearn(pipeline, rows)
+
+
+@pytest.mark.parametrize("feature", range(len(FEATURE_COLUMNS)))
+def test_missing_features_take_the_same_branch_as_sklearn(pipeline: Pipeline, feature: int) -> None:
+    X = CompiledForest(pipeline).probe_inputs(n_samples=256)
+    X[:, feature] = np.nan
+    assert_matches_sklearn(pipeline, X)
+
+
+def test_float32_floor_never_rounds_up() -> None:
+    values = np.array([0.1, -0.1, 1.0, 1e-40, 3.4e38, -0.0])
+    floored = float32_floor(values)
+    assert floored.dtype == np.float32
+    assert (floored.astype(np.float64) <= values).all()
+    # The next float32 up would be above the value
+    assert (np.nextafter(floored, np.float32(np.inf)).astype(np.float64) > values).all()
+
+
+def test_saved_arrays_load_memory_mapped(pipeline: Pipeline, tmp_path: Path) -> None:
+    compiled = CompiledForest(pipeline)
+    path = tmp_path / "model.compiled.joblib"
+    compiled.save(path, "fingerprint")
+    assert CompiledForest.load(path, "other fingerprint") is None
+    loaded = CompiledForest.load(path, "fingerprint", mmap_mode="r")
+    assert loaded is not None
+    assert isinstance(loaded.threshold, np.memmap)
+    X = compiled.probe_inputs(n_samples=64)
+    np.testing.assert_array_equal(loaded.predict_proba(X), compiled.predict_proba(X))
@@ -0,0 +1,73 @@
+import asyncio
+import os
+import signal
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from app.config.settings import AppSettings
+from app.domain.model_inference import model_inference_executor
+from app.domain.model_inference.model_inference_executor import InferenceExecutor, _worker_model
+
+
+class StubModel:
+    """Stands in for a loaded repository; only the attributes the executor reads."""
+
+    def __init__(self, path: Path, engine: str = "sklearn", mmap_mode: str | None = None, version: str = "v1") -> None:
+        self.spec = (str(path), engine, mmap_mode, version)
+        self.fingerprint = (1, 1)
+
+    def predict_matrix(self, X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        return X[:, 0], X
+
+
+def test_model_max_loaded_must_keep_at_least_one_model() -> None:
+    with pytest.raises(ValidationError):
+        AppSettings(INFERENCE_MODEL_MAX_LOADED=0)
+
+
+def test_worker_models_are_stored_under_the_key_they_are_looked_up_by(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    loads: list[str] = []
+
+    def load(path: Path, **kwargs: object) -> StubModel:
+        loads.append(str(path))
+        return StubModel(path)
+
+    monkeypatch.setattr(model_inference_executor, "ModelInferenceRepository", load)
+    monkeypatch.setattr(model_inference_executor, "_worker_models", {})
+    spec = (str(tmp_path / "model.joblib"), "sklearn", None, "v1")
+    first = _worker_model(spec, ("parent", "fingerprint"))
+    assert _worker_model(spec, ("parent", "fingerprint")) is first
+    assert loads == [spec[0]]
+
+
+def _skip_init(spec: tuple[str, str, str | None, str], fingerprint: object) -> None:
+    pass
+
+
+def _kill_worker(spec: tuple[str, str, str | None, str], fingerprint: object, X: np.ndarray) -> None:
+    os.kill(os.getpid(), signal.SIGKILL)
+
+
+def test_a_broken_process_pool_is_shut_down_and_replaced(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    # Module-level functions, so the spawned children can import them
+    monkeypatch.setattr(model_inference_executor, "_init_worker", _skip_init)
+    monkeypatch.setattr(model_inference_executor, "_worker_predict_matrix", _kill_worker)
+    model = StubModel(tmp_path / "model.joblib")
+    executor = InferenceExecutor(model, mode="process", workers=1)  # type: ignore[arg-type]
+
+    async def scenario() -> None:
+        with pytest.raises(BrokenProcessPool):
+            await executor.predict_matrix(np.ones((1, 1)), model)  # type: ignore[arg-type]
+        assert executor._pool is None
+        # The next call starts a fresh pool, which breaks again but is a different one
+        with pytest.raises(BrokenProcessPool):
+            await executor.predict_matrix(np.ones((1, 1)), model)  # type: ignore[arg-type]
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
@@ -0,0 +1,64 @@
+"""
+Events per second of the JSON and fast log profiles.
+
+common_fastapi loads its settings from the working directory, so run it from an app that has a `.env.development`:
+
+    cd apps/x-api && uv run python ../../libs/common-fastapi/benchmarks/bench_log_chain.py [--events 50000]
+
+Each profile is configured as create_app does, with output sent to /dev/null, and logs RESPONSE lines like
+ResponseTimeMiddleware with a request id in the log context. Logging is synchronous so the numbers are the full
+processing, rendering and write cost. A debug event, below the INFO level, shows the cost of a filtered call.
+"""
+
+# ruff: noqa: T201
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+from common_fastapi.config import LogProfile, add_to_log_context, app_settings, configure_logging, get_logger
+from common_fastapi.config.enums.log_level import LogLevel
+
+
+def run(profile: LogProfile, events: int) -> None:
+    root = logging.getLogger()
+    for handler in root.handlers:
+        root.removeHandler(handler)
+    configure_logging("bench", profile)
+    logger = get_logger(f"bench.{profile.value}")
+    res = {"url": "/model-inference/predict", "status_code": 200, "response_time": 0.00123}
+    add_to_log_context("req_id", "0f8fad5b-d9cb-469f-a165-70867728950e")
+
+    start = time.perf_counter()
+    for _ in range(events):
+        logger.info("RESPONSE", res=res)
+    rendered = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(events):
+        logger.debug("filtered")
+    filtered = time.perf_counter() - start
+    print(
+        f"{profile.value:<6} {events / rendered:>10,.0f} events/s ({rendered / events * 1e6:5.2f}us)"
+        f"   filtered debug: {filtered / events * 1e6:5.2f}us"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=50_000)
+    args = parser.parse_args()
+    app_settings.LOG_ASYNC = False
+    app_settings.LOG_LEVEL = LogLevel.INFO
+    stderr = sys.stderr
+    sys.stderr = open(os.devnull, "w", encoding="utf-8")  # noqa: SIM115
+    try:
+        for profile in (LogProfile.JSON, LogProfile.FAST):
+            run(profile, args.events)
+    finally:
+        sys.stderr = stderr
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Caller-side cost of a structured log line with synchronous and asynchronous logging.
+
+common_fastapi loads its settings from the working directory, so run it from an app that has a `.env.development`:
+
+    cd apps/x-api && uv run python ../../libs/common-fastapi/benchmarks/bench_logging.py [--events 50000]
+
+Each mode configures logging as create_app does, with output sent to /dev/null, and logs RESPONSE lines like
+ResponseTimeMiddleware. `caller` is the time the logging call blocks its thread (the event loop, in the API);
+`drained` includes waiting for the background writer to write everything that was queued. `async` drops records
+when the queue is full, `async-block` waits for room. Run with APP_ENV=production to benchmark the JSON renderer.
+"""
+
+# ruff: noqa: T201
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+from common_fastapi.config import LogDropPolicy, app_settings, configure_logging, get_logger
+
+
+def run(mode: str, events: int) -> None:
+    root = logging.getLogger()
+    for handler in root.handlers:
+        root.removeHandler(handler)
+    app_settings.LOG_ASYNC = mode != "sync"
+    app_settings.LOG_QUEUE_DROP_POLICY = LogDropPolicy.BLOCK if mode == "async-block" else LogDropPolicy.DROP_NEWEST
+    configure_logging("bench")
+    logger = get_logger(f"bench.{mode}")
+    res = {"url": "/model-inference/predict", "status_code": 200, "response_time": 0.00123}
+
+    start = time.perf_counter()
+    for _ in range(events):
+        logger.info("RESPONSE", res=res)
+    caller = time.perf_counter() - start
+    for handler in root.handlers:
+        handler.close()
+    drained = time.perf_counter() - start
+    dropped = sum(getattr(root.handlers[0], "dropped", {}).values())
+    print(f"{mode:<12} caller={caller / events * 1e6:7.2f}us/event drained={drained / events * 1e6:7.2f}us/event dropped={dropped}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=50_000)
+    args = parser.parse_args()
+    # StreamHandler writes to sys.stderr; discard the output but keep the write cost
+    sys.stderr = open(os.devnull, "w", encoding="utf-8")  # noqa: SIM115
+    try:
+        for mode in ("sync", "async", "async-block"):
+            run(mode, args.events)
+    finally:
+        sys.stderr = sys.__stderr__
+
+
+if __name__ == "__main__":
+    main()
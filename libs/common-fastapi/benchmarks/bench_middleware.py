@@ -0,0 +1,144 @@
+"""
+Per-request overhead of the common_fastapi middleware stack.
+
+common_fastapi loads its settings from the working directory, so run it from an app that has a `.env.development`:
+
+    cd apps/x-api && uv run python ../../libs/common-fastapi/benchmarks/bench_middleware.py [--requests 20000]
+
+The benchmark calls the ASGI apps directly, with no server or HTTP client, so the timings contain only the
+middleware and routing cost. It compares three stacks:
+- bare:    the FastAPI app without middlewares
+- legacy:  the previous BaseHTTPMiddleware implementations (kept below for reference)
+- current: the pure-ASGI middlewares installed by create_app
+
+Request and response logging is switched off in both stacks so the numbers are not dominated by log I/O.
+"""
+
+# ruff: noqa: T201
+
+import argparse
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+import structlog
+from asgi_correlation_id import CorrelationIdMiddleware
+from asgi_correlation_id.context import correlation_id
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from common_fastapi.config import add_to_log_context, clear_log_context
+from common_fastapi.middlewares import LogContextMiddleware, ResponseTimeMiddleware, SecurityHeadersMiddleware
+from common_fastapi.middlewares.response_time import SERVER_NAME_HEADER
+from common_fastapi.middlewares.security_headers import CSP_BY_PATH_PREFIX, CSP_DEFAULT, SECURITY_HEADERS
+
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+        response = await call_next(request)
+        csp = CSP_DEFAULT
+        for prefix, prefix_csp in CSP_BY_PATH_PREFIX.items():
+            if request.url.path.startswith(prefix):
+                csp = prefix_csp
+                break
+        response.headers["Content-Security-Policy"] = csp
+        for name, value in SECURITY_HEADERS.items():
+            response.headers[name] = value
+        return response
+
+
+class LegacyResponseTimeMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+        start_time = time.time()
+        response = await call_next(request)
+        response.headers["x-response-time"] = f"{(time.time() - start_time) * 1000:.3f}ms"
+        response.headers["x-server-name"] = SERVER_NAME_HEADER[1].decode()
+        return response
+
+
+class LegacyLogContextMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+        clear_log_context()
+        add_to_log_context(key="req_id", value=correlation_id.get())
+        return await call_next(request)
+
+
+def build_app(stack: str) -> FastAPI:
+    app = FastAPI(default_response_class=ORJSONResponse)
+
+    @app.get("/ping")
+    async def ping() -> dict[str, str]:
+        return {"status": "ok"}
+
+    if stack == "legacy":
+        app.add_middleware(LegacySecurityHeadersMiddleware)
+        app.add_middleware(LegacyResponseTimeMiddleware)
+        app.add_middleware(LegacyLogContextMiddleware)
+        app.add_middleware(CorrelationIdMiddleware)
+    elif stack == "current":
+        app.add_middleware(SecurityHeadersMiddleware)
+        app.add_middleware(ResponseTimeMiddleware)
+        app.add_middleware(LogContextMiddleware)
+        app.add_middleware(CorrelationIdMiddleware)
+    return app
+
+
+async def call(app: FastAPI) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 12345),
+        "server": ("bench", 80),
+    }
+    headers = 0
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        nonlocal headers
+        if message["type"] == "http.response.start":
+            headers = len(message["headers"])
+
+    await app(scope, receive, send)
+    return headers
+
+
+async def bench(app: FastAPI, requests: int) -> tuple[float, int]:
+    # Warm up routing, middleware stack construction and lazy imports
+    for _ in range(200):
+        await call(app)
+    start = time.perf_counter()
+    for _ in range(requests):
+        headers = await call(app)
+    return (time.perf_counter() - start) / requests, headers
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    results = {stack: asyncio.run(bench(build_app(stack), args.requests)) for stack in ("bare", "legacy", "current")}
+    bare = results["bare"][0]
+    print(f"{'stack':<10}{'per request':>14}{'overhead':>12}{'headers':>10}")
+    for stack, (per_request, headers) in results.items():
+        print(f"{stack:<10}{per_request * 1e6:>12.1f}us{(per_request - bare) * 1e6:>10.1f}us{headers:>10}")
+
+
+if __name__ == "__main__":
+    main()
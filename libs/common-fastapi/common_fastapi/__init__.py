@@ -1,7 +1,16 @@
 from .app_factory import create_app
+from .cache import cache_response, coalesce_requests, response_cache
+from .coalescing import SingleFlight, coalesce
 from .config import APP_ENV, AppEnv, EnvSettings
-from .exceptions.exception_4xx import ResourceNotFoundException
-from .exceptions.exception_5xx import DbConnectionException
+from .exceptions.exception_4xx import ForbiddenException, ResourceNotFoundException
+from .exceptions.exception_5xx import DbConnectionException, QueryTimeoutException, ServiceOverloadedException
+from .health import CheckResult, HealthChecks, health_checks
+from .jobs import Job, JobCancelledError, JobContext, JobError, JobRunner, JobStatus, job_runner
+from .metrics import metrics_registry
+from .middlewares import skip_compression
+from .profiling import sign_profile_token
+from .responses import TrustedJSONResponse, trusted_response
+from .service_registry import ServiceRegistry, service_registry
 
 
 # Define the public API
@@ -11,7 +20,41 @@ __all__ = [
     "APP_ENV",
     "AppEnv",
     "EnvSettings",
+    # Services
+    "ServiceRegistry",
+    "service_registry",
+    # Health checks
+    "CheckResult",
+    "HealthChecks",
+    "health_checks",
+    # Background jobs
+    "Job",
+    "JobCancelledError",
+    "JobContext",
+    "JobError",
+    "JobRunner",
+    "JobStatus",
+    "job_runner",
     # Exceptions
     "ResourceNotFoundException",
+    "ForbiddenException",
     "DbConnectionException",
+    "ServiceOverloadedException",
+    "QueryTimeoutException",
+    # Middlewares
+    "skip_compression",
+    # Responses
+    "TrustedJSONResponse",
+    "trusted_response",
+    # Response cache
+    "cache_response",
+    "response_cache",
+    # Request coalescing
+    "SingleFlight",
+    "coalesce",
+    "coalesce_requests",
+    # Metrics
+    "metrics_registry",
+    # Profiling
+    "sign_profile_token",
 ]
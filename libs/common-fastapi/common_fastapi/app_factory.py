@@ -1,19 +1,36 @@
+from collections.abc import AsyncGenerator, Callable, Sequence
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any
+
 from asgi_correlation_id import CorrelationIdMiddleware
 from fastapi import FastAPI
 from fastapi.responses import ORJSONResponse
 
 from ._build_info import BUILD_TIME
 from ._version import __version__
-from .config import OPEN_API_ENABLED, configure_logging
+from .cache import MemoryCacheBackend, RedisCacheBackend, ResponseCacheMiddleware, response_cache
+from .config import OPEN_API_ENABLED, app_settings, configure_logging, get_logger
 from .exceptions.exception_handler import register_exception_handlers
+from .jobs import job_runner, register_jobs_endpoints
+from .loop_monitor import LoopMonitor, LoopMonitorMiddleware
+from .metrics import MetricsMiddleware, get_collector, register_metrics_endpoint
 from .middlewares import (
+    CompressionMiddleware,
+    ConcurrencyLimitMiddleware,
     LogContextMiddleware,
     ResponseTimeMiddleware,
     SecurityHeadersMiddleware,
 )
+from .profiling import ProfileStore, ProfilingMiddleware, register_profiling_endpoints
+from .server import server_workers
+from .service_registry import service_registry
+
+
+logger = get_logger(__name__)
 
 
-def create_app(app_name: str, lifespan=None) -> FastAPI:  # type: ignore
+def create_app(app_name: str, lifespan=None, compression_exclude_paths: Sequence[str] = ()) -> FastAPI:  # type: ignore
     """
     Factory function to create a FastAPI application instance.
 
@@ -21,13 +38,19 @@ def create_app(app_name: str, lifespan=None) -> FastAPI:  # type: ignore
     ----
     app_name (str): The name of the application for logging and identification.
     lifespan: A callable that returns a Lifespan instance
-              for managing the app's lifespan events.
+              for managing the app's lifespan events. It runs after the eager services
+              of `service_registry` are built, and before every built service is shut down.
+    compression_exclude_paths (Sequence[str]): Path prefixes whose responses are never compressed,
+              in addition to COMPRESSION_EXCLUDE_PATHS. Single endpoints can opt out with `skip_compression`.
 
     Returns:
     -------
     FastAPI: Configured FastAPI application instance.
 
     """
+    loop_monitor = LoopMonitor(app_settings.LOOP_MONITOR_INTERVAL, app_settings.LOOP_MONITOR_THRESHOLD) if app_settings.LOOP_MONITOR_ENABLED else None
+    profile_store = ProfileStore(Path(app_settings.PROFILING_DIR), app_settings.PROFILING_MAX_PROFILES) if app_settings.PROFILING_ENABLED else None
+
     # Create FastAPI app instance
     OPEN_API_ENABLED=True
     app = FastAPI(
@@ -35,22 +58,130 @@ def create_app(app_name: str, lifespan=None) -> FastAPI:  # type: ignore
         docs_url="/openapi" if OPEN_API_ENABLED else None,
         redoc_url="/redoc" if OPEN_API_ENABLED else None,
         openapi_url="/openapi-json" if OPEN_API_ENABLED else None,
-        lifespan=lifespan,
+        lifespan=_lifespan(lifespan, loop_monitor),
     )
 
     configure_logging(app_name)
 
-    # Add middlewares
-    app.add_middleware(SecurityHeadersMiddleware)
-    app.add_middleware(ResponseTimeMiddleware)
-    app.add_middleware(LogContextMiddleware)
-    app.add_middleware(CorrelationIdMiddleware)  # This must be below LoggerMiddleware
+    _add_middlewares(app, _configure_response_cache(app_name), loop_monitor, profile_store, compression_exclude_paths)
 
     register_exception_handlers(app)
 
+    if app_settings.METRICS_ENABLED:
+        register_metrics_endpoint(app)
+    if profile_store is not None:
+        register_profiling_endpoints(app, profile_store, app_settings.PROFILING_SECRET)
+    register_jobs_endpoints(app, job_runner)
+
     # Root Endpoint for Health and Liveness Check.
     @app.get("/", summary="Root Endpoint", tags=["Health Check"])
     def root() -> dict[str, str]:
         return {"build": f"{__version__}/{BUILD_TIME}"}
 
     return app
+
+
+def _lifespan(lifespan: Callable[[FastAPI], Any] | None, loop_monitor: LoopMonitor | None) -> Callable[[FastAPI], Any]:
+    """Wrap the application's `lifespan` with the startup and shutdown of the library's services."""
+
+    @asynccontextmanager
+    async def lifespan_with_services(app: FastAPI) -> AsyncGenerator[Any, None]:
+        if loop_monitor is not None:
+            loop_monitor.start()
+        # Every worker of a multi-process server writes its metrics, not only those that served a scrape
+        if app_settings.METRICS_ENABLED:
+            get_collector()
+        await service_registry.startup(preload=app_settings.SERVICES_PRELOAD)
+        await job_runner.start()
+        try:
+            if lifespan is None:
+                yield
+            else:
+                async with lifespan(app) as state:
+                    yield state
+        finally:
+            # Before the services the jobs use are shut down
+            await job_runner.stop()
+            await service_registry.shutdown()
+            await response_cache.close()
+            if loop_monitor is not None:
+                await loop_monitor.stop()
+
+    return lifespan_with_services
+
+
+def _configure_response_cache(app_name: str) -> bool:
+    """
+    Point `response_cache` at the Redis or in-process backend, and return whether responses are cached.
+
+    An in-process cache is private to a worker: an invalidation in one worker leaves the others serving the stale
+    response until it expires. Unless CACHE_ENABLED says otherwise, it is therefore only used by a server with a
+    single worker, and explicitly enabling it for several workers logs a warning.
+    """
+    enabled = app_settings.CACHE_ENABLED
+    if app_settings.CACHE_REDIS_URL:
+        if enabled is False:
+            return False
+        response_cache.configure(RedisCacheBackend.from_url(app_settings.CACHE_REDIS_URL, prefix=f"{app_name}:cache:"))
+        return True
+    workers = server_workers()
+    if enabled is None:
+        enabled = workers == 1
+    elif enabled and workers is not None and workers > 1:
+        logger.warning(
+            "Every worker has its own response cache, and serves responses another worker invalidated until they "
+            "expire; set CACHE_REDIS_URL to share one cache",
+            workers=workers,
+        )
+    if enabled:
+        response_cache.configure(MemoryCacheBackend(app_settings.CACHE_MAX_BYTES))
+    return enabled
+
+
+def _add_middlewares(
+    app: FastAPI,
+    cache_enabled: bool,
+    loop_monitor: LoopMonitor | None,
+    profile_store: ProfileStore | None,
+    compression_exclude_paths: Sequence[str],
+) -> None:
+    """Add the enabled middlewares, innermost first."""
+    if cache_enabled or app_settings.COALESCING_ENABLED:
+        # Innermost, so cached and shared responses hold only what the endpoint produced
+        app.add_middleware(ResponseCacheMiddleware, cache=response_cache, store=cache_enabled, coalesce=app_settings.COALESCING_ENABLED)
+    app.add_middleware(SecurityHeadersMiddleware)
+    app.add_middleware(ResponseTimeMiddleware)
+    app.add_middleware(LogContextMiddleware)
+    if loop_monitor is not None:
+        app.add_middleware(LoopMonitorMiddleware, monitor=loop_monitor, strict=app_settings.LOOP_MONITOR_STRICT)
+    app.add_middleware(CorrelationIdMiddleware)  # This must be below LoggerMiddleware
+    if app_settings.COMPRESSION_ENABLED:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=app_settings.COMPRESSION_MINIMUM_SIZE,
+            exclude_paths=[*app_settings.COMPRESSION_EXCLUDE_PATHS, *compression_exclude_paths],
+        )
+    if profile_store is not None:
+        app.add_middleware(
+            ProfilingMiddleware,
+            store=profile_store,
+            secret=app_settings.PROFILING_SECRET,
+            sample_rate=app_settings.PROFILING_SAMPLE_RATE,
+            routes=app_settings.PROFILING_ROUTES,
+            mode=app_settings.PROFILING_MODE,
+            interval=app_settings.PROFILING_INTERVAL,
+        )
+    if app_settings.CONCURRENCY_LIMIT_ENABLED:
+        # Outside everything but metrics, so shedding a request costs as little as possible
+        app.add_middleware(
+            ConcurrencyLimitMiddleware,
+            initial_limit=app_settings.CONCURRENCY_LIMIT_INITIAL,
+            min_limit=app_settings.CONCURRENCY_LIMIT_MIN,
+            max_limit=app_settings.CONCURRENCY_LIMIT_MAX,
+            tolerance=app_settings.CONCURRENCY_LIMIT_TOLERANCE,
+            groups=app_settings.CONCURRENCY_LIMIT_GROUPS,
+            exclude_paths=app_settings.CONCURRENCY_LIMIT_EXCLUDE_PATHS,
+        )
+    if app_settings.METRICS_ENABLED:
+        # Outermost, so the recorded latency includes every other middleware
+        app.add_middleware(MetricsMiddleware)
@@ -0,0 +1,18 @@
+from .backends import CacheBackend, CachedResponse, MemoryCacheBackend, RedisCacheBackend
+from .middleware import CachePolicy, ResponseCacheMiddleware, cache_key, cache_response, coalesce_requests
+from .response_cache import ResponseCache, response_cache
+
+
+__all__ = [
+    "CacheBackend",
+    "CachedResponse",
+    "MemoryCacheBackend",
+    "RedisCacheBackend",
+    "CachePolicy",
+    "ResponseCacheMiddleware",
+    "cache_key",
+    "cache_response",
+    "coalesce_requests",
+    "ResponseCache",
+    "response_cache",
+]
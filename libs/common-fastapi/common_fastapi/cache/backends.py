@@ -0,0 +1,231 @@
+import struct
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any, NamedTuple, Protocol
+
+import orjson
+
+
+class CachedResponse(NamedTuple):
+    """A complete, serialized HTTP response as stored in the cache."""
+
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.body) + sum(len(name) + len(value) for name, value in self.headers)
+
+    def encode(self) -> bytes:
+        """Serialize to bytes: a length-prefixed JSON header block followed by the raw body."""
+        meta = orjson.dumps([self.status, [[name.decode("latin-1"), value.decode("latin-1")] for name, value in self.headers]])
+        return struct.pack(">I", len(meta)) + meta + self.body
+
+    @classmethod
+    def decode(cls, data: bytes) -> "CachedResponse":
+        (size,) = struct.unpack_from(">I", data)
+        status, headers = orjson.loads(data[4 : 4 + size])
+        return cls(status, [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers], data[4 + size :])
+
+
+class CacheBackend(Protocol):
+    """
+    Storage of cached responses.
+
+    Every tag has a version that `invalidate` increments. `set` is given the versions of the response's tags read
+    before it was computed, and drops the response if any of them changed since: a response computed from data
+    that a concurrent write has since changed is never stored.
+    """
+
+    max_entry_bytes: int
+
+    async def get(self, key: str) -> CachedResponse | None: ...
+
+    async def tag_versions(self, tags: tuple[str, ...]) -> tuple[int, ...]: ...
+
+    async def set(self, key: str, response: CachedResponse, ttl: float, tags: tuple[str, ...], versions: tuple[int, ...]) -> None: ...
+
+    async def invalidate(self, tags: Iterable[str]) -> None: ...
+
+    async def clear(self) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+class _Entry(NamedTuple):
+    response: CachedResponse
+    expires: float
+    size: int
+    tags: tuple[str, ...]
+
+
+class MemoryCacheBackend:
+    """
+    In-process LRU cache bounded by the total size of the stored responses.
+
+    Entries expire after their TTL and the least recently used entries are evicted once `max_bytes` is exceeded.
+    Every worker process has its own cache, so an invalidation only reaches the process it runs in; use
+    `RedisCacheBackend` when several workers must see each other's invalidations.
+
+    Attributes
+    ----------
+    max_bytes (int): Upper bound on the size of the stored responses.
+    max_entry_bytes (int): Responses larger than this are not stored.
+    nbytes (int): Current size of the stored responses.
+
+    """
+
+    # Rough per-entry bookkeeping cost (key, entry tuple, LRU and tag index slots)
+    ENTRY_OVERHEAD = 256
+
+    def __init__(self, max_bytes: int = 64 * 2**20, max_entry_bytes: int | None = None) -> None:
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_bytes // 8 if max_entry_bytes is None else max_entry_bytes
+        self.nbytes = 0
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._tag_keys: dict[str, set[str]] = {}
+        self._tag_versions: dict[str, int] = {}
+        self._generation = 0  # Incremented by clear, which invalidates every tag
+
+    def __len__(self) -> int:
+        """Number of stored responses, including expired ones not evicted yet."""
+        return len(self._entries)
+
+    async def get(self, key: str) -> CachedResponse | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry.response
+
+    async def tag_versions(self, tags: tuple[str, ...]) -> tuple[int, ...]:
+        return (self._generation, *(self._tag_versions.get(tag, 0) for tag in tags))
+
+    async def set(self, key: str, response: CachedResponse, ttl: float, tags: tuple[str, ...], versions: tuple[int, ...]) -> None:
+        size = response.nbytes + len(key) + self.ENTRY_OVERHEAD
+        if size > self.max_entry_bytes or await self.tag_versions(tags) != versions:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = _Entry(response, time.monotonic() + ttl, size, tags)
+        self.nbytes += size
+        for tag in tags:
+            self._tag_keys.setdefault(tag, set()).add(key)
+        while self.nbytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            self._tag_versions[tag] = self._tag_versions.get(tag, 0) + 1
+            for key in self._tag_keys.pop(tag, ()):
+                if key in self._entries:
+                    self._remove(key)
+
+    async def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+        self._tag_keys.clear()
+        self.nbytes = 0
+
+    async def close(self) -> None:
+        await self.clear()
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self.nbytes -= entry.size
+        for tag in entry.tags:
+            keys = self._tag_keys.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_keys[tag]
+
+
+def _as_bytes(key: bytes | str) -> bytes:
+    return key if isinstance(key, bytes) else key.encode()
+
+
+class RedisCacheBackend:
+    """
+    Cache shared by every worker through a Redis-protocol server.
+
+    Works with any `redis.asyncio`-compatible client returning bytes (the default), e.g. `fakeredis.FakeAsyncRedis()`
+    as a local stand-in in tests. Responses are stored with `SET ... EX`, every tag keeps a set of the keys stored under it, and a
+    version counter that `invalidate` increments before deleting those keys.
+
+    Attributes
+    ----------
+    client (Any): The `redis.asyncio` client.
+    prefix (str): Prefix of every key written, to share a server between applications.
+    max_entry_bytes (int): Responses larger than this are not stored.
+
+    """
+
+    def __init__(self, client: Any, prefix: str = "cache:", max_entry_bytes: int = 8 * 2**20) -> None:
+        self.client = client
+        self.prefix = prefix
+        self.max_entry_bytes = max_entry_bytes
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = "cache:", max_entry_bytes: int = 8 * 2**20) -> "RedisCacheBackend":
+        """Connect to `url`; needs the `cache` extra (redis)."""
+        import redis.asyncio
+
+        return cls(redis.asyncio.from_url(url), prefix, max_entry_bytes)
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    def _version_key(self, tag: str) -> str:
+        return f"{self.prefix}tag-version:{tag}"
+
+    async def get(self, key: str) -> CachedResponse | None:
+        data = await self.client.get(self.prefix + key)
+        return None if data is None else CachedResponse.decode(data)
+
+    async def tag_versions(self, tags: tuple[str, ...]) -> tuple[int, ...]:
+        if not tags:
+            return ()
+        versions = await self.client.mget([self._version_key(tag) for tag in tags])
+        return tuple(int(version or 0) for version in versions)
+
+    async def set(self, key: str, response: CachedResponse, ttl: float, tags: tuple[str, ...], versions: tuple[int, ...]) -> None:
+        data = response.encode()
+        if len(data) > self.max_entry_bytes or await self.tag_versions(tags) != versions:
+            return
+        seconds = max(1, round(ttl))
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.set(self.prefix + key, data, ex=seconds)
+            for tag in tags:
+                pipe.sadd(self._tag_key(tag), self.prefix + key)
+                # The key set lives as long as its longest-lived member
+                pipe.expire(self._tag_key(tag), seconds, nx=True)
+                pipe.expire(self._tag_key(tag), seconds, gt=True)
+            await pipe.execute()
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        tags = tuple(tags)
+        if not tags:
+            return
+        async with self.client.pipeline(transaction=True) as pipe:
+            for tag in tags:
+                pipe.incr(self._version_key(tag))
+                pipe.smembers(self._tag_key(tag))
+            results = await pipe.execute()
+        keys = {key for members in results[1::2] for key in members}
+        await self.client.delete(*keys, *(self._tag_key(tag) for tag in tags))
+
+    async def clear(self) -> None:
+        # Tag versions are kept, so responses computed before the clear are still not stored after it
+        version_prefix = self._version_key("").encode()
+        keys = [key async for key in self.client.scan_iter(match=f"{self.prefix}*") if not _as_bytes(key).startswith(version_prefix)]
+        if keys:
+            await self.client.delete(*keys)
+
+    async def close(self) -> None:
+        await self.client.aclose()
@@ -0,0 +1,303 @@
+from collections.abc import Callable, Iterable
+from typing import Any, NamedTuple, TypeVar
+
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from common_fastapi.coalescing import SingleFlight
+from common_fastapi.config import get_logger
+from common_fastapi.metrics import metrics_registry
+
+from .backends import CachedResponse
+from .response_cache import ResponseCache, response_cache
+
+
+logger = get_logger(__name__)
+
+try:
+    # Recent FastAPI versions keep included routers nested; their routes are reached through route contexts
+    from fastapi.routing import iter_route_contexts
+except ImportError:
+
+    def iter_route_contexts(routes: Iterable[BaseRoute]) -> Iterable[BaseRoute]:  # type: ignore[misc]
+        return routes
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+X_CACHE_HIT = (b"x-cache", b"HIT")
+X_CACHE_MISS = (b"x-cache", b"MISS")
+X_CACHE_COALESCED = (b"x-cache", b"COALESCED")
+
+# Requests carrying credentials are only cached when the policy varies by the header
+_CREDENTIAL_HEADERS = (b"authorization", b"cookie")
+
+
+class CachePolicy(NamedTuple):
+    """How the responses of one endpoint are cached; see `cache_response`."""
+
+    ttl: float
+    tags: tuple[str, ...]
+    vary_query: bool
+    vary_headers: tuple[bytes, ...]
+    coalesce: bool = True
+
+
+def cache_response(
+    ttl: float, tags: Iterable[str] = (), vary_query: bool = True, vary_headers: Iterable[str] = (), coalesce: bool = True
+) -> Callable[[F], F]:
+    """
+    Decorator caching the serialized responses of a GET endpoint.
+
+    Put it below the route decorator. Responses are cached per path, and by default per query string; list the
+    request headers the response depends on in `vary_headers`. Only 200 responses without Set-Cookie or a
+    `no-store`/`private` Cache-Control are stored. Concurrent misses of one key are coalesced, so an expired
+    entry is recomputed once rather than by every request arriving before it is stored again.
+
+    Args:
+    ----
+    ttl (float): Seconds a response is served from the cache.
+    tags (Iterable[str]): Tags to invalidate the responses by, through `response_cache.invalidate`. Tags may
+                          name path parameters, e.g. "publisher:{uid}".
+    vary_query (bool): Whether the query string is part of the cache key.
+    vary_headers (Iterable[str]): Request headers that are part of the cache key.
+    coalesce (bool): Whether concurrent misses of one key share one execution of the endpoint.
+
+    Returns:
+    -------
+    Callable[[F], F]: The decorator, returning the endpoint unchanged apart from its cache policy.
+
+    """
+    policy = CachePolicy(ttl, tuple(tags), vary_query, tuple(header.lower().encode("latin-1") for header in vary_headers), coalesce)
+
+    def decorator(endpoint: F) -> F:
+        endpoint.__cache_policy__ = policy  # type: ignore[attr-defined]
+        return endpoint
+
+    return decorator
+
+
+def coalesce_requests(vary_query: bool = True, vary_headers: Iterable[str] = ()) -> Callable[[F], F]:
+    """
+    Decorator coalescing identical concurrent requests of a GET endpoint whose responses are not cached.
+
+    Put it below the route decorator. While a request is being answered, identical requests, by path and by
+    default query string and `vary_headers`, wait for it and receive a copy of its response instead of running
+    the endpoint again. As for `cache_response`, only 200 responses that could be stored are shared; the other
+    requests run the endpoint themselves, and requests carrying credentials are never coalesced.
+
+    Args:
+    ----
+    vary_query (bool): Whether the query string tells requests apart.
+    vary_headers (Iterable[str]): Request headers that tell requests apart.
+
+    Returns:
+    -------
+    Callable[[F], F]: The decorator, returning the endpoint unchanged apart from its policy.
+
+    """
+    return cache_response(0, (), vary_query, vary_headers, coalesce=True)
+
+
+class ResponseCacheMiddleware:
+    """
+    Pure ASGI middleware serving GET responses of endpoints decorated with `cache_response` from a cache.
+
+    The middleware finds the route a request would reach, as the router does; only when that route has a cache
+    policy is the cache consulted. A hit is answered with the stored bytes, without running dependencies, the
+    endpoint or serialization. On a miss the response is streamed to the client as usual and stored once complete.
+    Identical requests missing meanwhile wait for that response and are answered with its bytes, as are the
+    identical concurrent requests of endpoints decorated with `coalesce_requests`, which are never stored.
+    Responses carry an `X-Cache: HIT`, `X-Cache: MISS` or `X-Cache: COALESCED` header.
+
+    Add it innermost, so that headers added by other middlewares (request ids, timings) are not stored.
+
+    Attributes
+    ----------
+    app (ASGIApp): The wrapped ASGI application.
+    cache (ResponseCache): Cache the responses are stored in.
+    store (bool): Whether responses are cached; when False, requests are only coalesced.
+    coalesce (bool): Whether identical concurrent misses are coalesced.
+
+    """
+
+    def __init__(self, app: ASGIApp, cache: ResponseCache = response_cache, store: bool = True, coalesce: bool = True) -> None:
+        self.app = app
+        self.cache = cache
+        self.store = store
+        self.coalesce = coalesce
+        self._flights = SingleFlight("response_cache")
+        # Routes, or the route contexts of nested routers, that `_match` tries in order
+        self._routes: list[Any] | None = None
+        self._requests_total = metrics_registry.counter(
+            "response_cache_requests_total", "Cacheable requests by route and result", ("route", "result")
+        )
+
+    def _match(self, scope: Scope) -> tuple[Any, CachePolicy, dict[str, Any]] | None:
+        if self._routes is None:
+            routes: list[Any] = list(iter_route_contexts(scope["app"].routes))
+            has_policy = any(getattr(getattr(route, "endpoint", None), "__cache_policy__", None) for route in routes)
+            self._routes = routes if has_policy else []
+        for route in self._routes:
+            match, child_scope = route.matches(scope)
+            if match == Match.FULL:
+                policy = getattr(getattr(route, "endpoint", None), "__cache_policy__", None)
+                return None if policy is None else (route, policy, child_scope.get("path_params", {}))
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET" or self._routes == []:
+            await self.app(scope, receive, send)
+            return
+        matched = self._match(scope)
+        if matched is None:
+            await self.app(scope, receive, send)
+            return
+        route, policy, path_params = matched
+        # Hits are answered before the router runs: set the route it sets, which outer middlewares (metrics) read
+        scope["route"] = getattr(route, "original_route", route)
+        key = cache_key(scope, policy)
+        store = self.store and policy.ttl > 0
+        coalesce = self.coalesce and policy.coalesce
+        if key is None or not (store or coalesce):
+            await self.app(scope, receive, send)
+            return
+        route_label: str = getattr(route, "path", None) or scope["path"]
+        tags = tuple(tag.format(**path_params) for tag in policy.tags)
+
+        versions: tuple[int, ...] = ()
+        if store:
+            backend = self.cache.backend
+            try:
+                cached = await backend.get(key)
+                versions = await backend.tag_versions(tags) if cached is None else ()
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.warning("Response cache lookup failed", key=key, error=repr(exc))
+                await self.app(scope, receive, send)
+                return
+            if cached is not None:
+                self._requests_total.inc((route_label, "hit"))
+                await send_cached(send, cached, X_CACHE_HIT)
+                return
+
+        if not coalesce:
+            self._requests_total.inc((route_label, "miss"))
+            await self._run_and_capture(scope, receive, send, key, policy, tags, versions, store)
+            return
+        await self._run_coalesced(scope, receive, send, key, route_label, policy, tags, versions, store)
+
+    async def _run_coalesced(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        key: str,
+        route_label: str,
+        policy: CachePolicy,
+        tags: tuple[str, ...],
+        versions: tuple[int, ...],
+        store: bool,
+    ) -> None:
+        """Run the app for the first of identical concurrent requests and answer the others with its response."""
+        led = False
+
+        async def lead() -> CachedResponse | None:
+            nonlocal led
+            led = True
+            self._requests_total.inc((route_label, "miss"))
+            return await self._run_and_capture(scope, receive, send, key, policy, tags, versions, store)
+
+        try:
+            shared = await self._flights.run(key, lead)
+        except Exception:
+            if led:
+                raise
+            # The request this one waited for failed: answer it on its own
+            shared = None
+        if led:
+            return
+        if shared is None:
+            self._requests_total.inc((route_label, "miss"))
+            await self.app(scope, receive, send)
+            return
+        self._requests_total.inc((route_label, "coalesced"))
+        await send_cached(send, shared, X_CACHE_COALESCED)
+
+    async def _run_and_capture(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        key: str,
+        policy: CachePolicy,
+        tags: tuple[str, ...],
+        versions: tuple[int, ...],
+        store: bool,
+    ) -> CachedResponse | None:
+        """Run the app, streaming its response to the client; return the response when it may be stored or shared."""
+        backend = self.cache.backend
+        max_bytes = backend.max_entry_bytes
+        status = 0
+        headers: list[tuple[bytes, bytes]] = []
+        chunks: list[bytes] = []
+        size = 0
+        storable = False
+        complete = False
+
+        async def send_and_capture(message: Message) -> None:
+            nonlocal status, headers, size, storable, complete
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                storable = status == 200 and is_storable(headers)
+                message["headers"] = [*headers, X_CACHE_MISS]
+            elif message["type"] == "http.response.body" and storable:
+                body = message.get("body", b"")
+                size += len(body)
+                if size > max_bytes:
+                    storable = False
+                    chunks.clear()
+                else:
+                    chunks.append(body)
+                    complete = not message.get("more_body", False)
+            await send(message)
+
+        await self.app(scope, receive, send_and_capture)
+        if not (storable and complete):
+            return None
+        response = CachedResponse(status, headers, b"".join(chunks))
+        if store:
+            try:
+                await backend.set(key, response, policy.ttl, tags, versions)
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.warning("Response cache store failed", key=key, error=repr(exc))
+        return response
+
+
+async def send_cached(send: Send, response: CachedResponse, x_cache: tuple[bytes, bytes]) -> None:
+    await send({"type": "http.response.start", "status": response.status, "headers": [*response.headers, x_cache]})
+    await send({"type": "http.response.body", "body": response.body})
+
+
+def cache_key(scope: Scope, policy: CachePolicy) -> str | None:
+    """Cache key of a request, or None when the request must not be served from the cache."""
+    parts = [scope["path"]]
+    if policy.vary_query and scope["query_string"]:
+        # Parameter order does not change the response
+        parts.append("?" + "&".join(sorted(scope["query_string"].decode("latin-1").split("&"))))
+    values = dict.fromkeys(policy.vary_headers, b"")
+    for name, value in scope["headers"]:
+        if name in values:
+            values[name] = value
+        elif name in _CREDENTIAL_HEADERS:
+            return None
+    for name, value in values.items():
+        parts.append(f"|{name.decode('latin-1')}={value.decode('latin-1')}")
+    return "".join(parts)
+
+
+def is_storable(headers: list[tuple[bytes, bytes]]) -> bool:
+    for name, value in headers:
+        name = name.lower()
+        if name == b"set-cookie" or (name == b"cache-control" and (b"no-store" in value or b"private" in value)):
+            return False
+    return True
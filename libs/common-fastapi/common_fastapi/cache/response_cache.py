@@ -0,0 +1,47 @@
+from common_fastapi.config import get_logger
+
+from .backends import CacheBackend, MemoryCacheBackend
+
+
+logger = get_logger(__name__)
+
+
+class ResponseCache:
+    """
+    Handle on the cache backend used by `ResponseCacheMiddleware`, through which write paths invalidate responses.
+
+    Invalidation failures are logged and not raised: the write that triggered them has already succeeded, and
+    the stale responses expire after their TTL.
+
+    Attributes
+    ----------
+    backend (CacheBackend): Where responses are stored; an in-process LRU until `configure` is called.
+
+    """
+
+    def __init__(self, backend: CacheBackend | None = None) -> None:
+        self.backend: CacheBackend = MemoryCacheBackend() if backend is None else backend
+
+    def configure(self, backend: CacheBackend) -> None:
+        self.backend = backend
+
+    async def invalidate(self, *tags: str) -> None:
+        """Drop every cached response stored under any of `tags`."""
+        try:
+            await self.backend.invalidate(tags)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Response cache invalidation failed", tags=tags)
+
+    async def clear(self) -> None:
+        """Drop every cached response."""
+        try:
+            await self.backend.clear()
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Response cache clear failed")
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+
+# Process-wide default cache, configured by create_app
+response_cache = ResponseCache()
@@ -0,0 +1,117 @@
+import asyncio
+import functools
+import inspect
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+from common_fastapi.metrics import metrics_registry
+
+
+T = TypeVar("T")
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class _LeaderCancelled(Exception):
+    """Set on a flight whose leader was cancelled: its followers start a new flight rather than fail."""
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls: while a call for a key is in flight, callers with the same key wait
+    for it and share its result, or its exception, instead of running their own.
+
+    The first caller, the leader, runs the call in its own task, so its context (request id, log context) and
+    cancellation apply as usual; if it is cancelled, one of the waiting callers runs the call again. Nothing
+    is kept once the call returns: this bounds concurrency, it is not a cache. Every caller receives the same
+    object, which must not be mutated.
+
+    Calls are counted in `single_flight_calls_total`, labelled by flight name and by role (leader or follower).
+
+    Attributes
+    ----------
+    name (str): Name of the flight in metrics.
+
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._flights: dict[Hashable, asyncio.Future[Any]] = {}
+        self._calls = metrics_registry.counter("single_flight_calls_total", "Coalesced calls by flight and role", ("flight", "role"))
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._flights
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Return the result of `call`, or of the identical call already in flight for `key`.
+
+        Args:
+        ----
+        key (Hashable): Identifies identical calls.
+        call (Callable[[], Awaitable[T]]): Runs the call; only awaited by the leader.
+
+        Returns:
+        -------
+        T: The result of the call.
+
+        """
+        while (flight := self._flights.get(key)) is not None:
+            self._calls.inc((self.name, "follower"))
+            try:
+                # Shielded: a follower that is cancelled must not cancel the flight the others wait for
+                return await asyncio.shield(flight)
+            except _LeaderCancelled:
+                continue
+
+        self._calls.inc((self.name, "leader"))
+        flight = asyncio.get_running_loop().create_future()
+        # Mark the exception retrieved, so a flight without followers is not reported as never retrieved
+        flight.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._flights[key] = flight
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            flight.set_exception(_LeaderCancelled())
+            raise
+        except BaseException as exc:
+            flight.set_exception(exc)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            del self._flights[key]
+
+
+def coalesce(key: Callable[..., Hashable] | None = None, name: str | None = None) -> Callable[[F], F]:
+    """
+    Decorator coalescing identical concurrent calls of a coroutine function, e.g. a read of a service.
+
+    Calls are identical when their arguments are equal, `self` included, so the calls of one service instance
+    are coalesced; pass `key` to build the key from the arguments when they are not hashable or when only some
+    of them matter. Only reads should be coalesced, and their results must not be mutated by callers.
+
+    Args:
+    ----
+    key (Callable[..., Hashable] | None): Called with the arguments of the call; returns its key.
+    name (str | None): Name of the flight in metrics; defaults to the qualified name of the function.
+
+    Returns:
+    -------
+    Callable[[F], F]: The decorator.
+
+    """
+
+    def decorator(func: F) -> F:
+        if not inspect.iscoroutinefunction(func):
+            raise TypeError(f"coalesce applies to coroutine functions, not {func.__qualname__}")
+        flights = SingleFlight(name or func.__qualname__)
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            flight_key = key(*args, **kwargs) if key is not None else (args, tuple(sorted(kwargs.items())))
+            return await flights.run(flight_key, functools.partial(func, *args, **kwargs))
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
@@ -1,5 +1,7 @@
 from .cli_env import APP_ENV, OPEN_API_ENABLED
 from .enums.app_env import AppEnv
+from .enums.log_drop_policy import LogDropPolicy
+from .enums.log_profile import LogProfile
 from .env_loader import EnvSettings
 from .log import add_to_log_context, clear_log_context, configure_logging, get_logger
 from .settings import app_settings
@@ -12,6 +14,8 @@ __all__ = [
 
     # Enums
     "AppEnv",
+    "LogDropPolicy",
+    "LogProfile",
 
     # Base env class
     "EnvSettings",
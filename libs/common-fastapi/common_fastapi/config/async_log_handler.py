@@ -0,0 +1,296 @@
+import logging
+import os
+import queue
+import threading
+from collections.abc import Callable, MutableMapping
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, BinaryIO
+
+import structlog
+
+from common_fastapi.metrics.registry import metrics_registry
+
+from .enums.log_drop_policy import LogDropPolicy
+
+
+# Size of every log queue of this process by queue name, reported by the log_queue_size gauge
+_queue_sizes: dict[str, Callable[[], int]] = {}
+
+
+def _collect_queue_sizes() -> dict[tuple[str, ...], float]:
+    return {(name,): size() for name, size in list(_queue_sizes.items())}
+
+
+metrics_registry.gauge("log_queue_size", "Log records waiting for the writer thread by queue", ("queue",), collect=_collect_queue_sizes)
+
+class _Listener(QueueListener):
+    queue: "queue.Queue[Any]"
+
+    def enqueue_sentinel(self) -> None:
+        # Wait for room: stopping must not fail, or lose the stop signal, because the queue is full.
+        # None is QueueListener's sentinel.
+        self.queue.put(None)
+
+
+class AsyncLogHandler(QueueHandler):
+    """
+    Logging handler that hands records to a background writer thread through a bounded queue.
+
+    The calling thread only runs the structlog processors that must see the call site (timestamp, context
+    variables, exception info) and enqueues the record. Rendering (JSON or console) and writing to the
+    stream happen in the writer thread, off the event loop.
+
+    When the queue is full, records are dropped according to `drop_policy`; every dropped record is counted
+    in `dropped` and in the `log_records_dropped_total` metric, by level.
+
+    Records of non-structlog loggers are rendered by `foreign_pre_chain` in the writer thread, where the
+    request's context variables are not set. Their context is therefore captured in `prepare` and stored on
+    the record as `log_context` (see `merge_record_contextvars`).
+
+    Attributes
+    ----------
+    handler (logging.Handler): The handler that formats and writes records in the writer thread.
+    maxsize (int): Maximum number of queued records.
+    queue_name (str): Value of the `queue` label of the `log_queue_size` metric.
+    drop_policy (LogDropPolicy): What to do when the queue is full.
+    dropped (dict[str, int]): Number of dropped records by level name.
+
+    """
+
+    queue: "queue.Queue[Any]"
+
+    def __init__(
+        self,
+        handler: logging.Handler,
+        maxsize: int = 10_000,
+        drop_policy: LogDropPolicy = LogDropPolicy.DROP_NEWEST,
+        queue_name: str = "logging",
+    ) -> None:
+        super().__init__(queue.Queue(maxsize))
+        self.handler = handler
+        self.maxsize = maxsize
+        self.queue_name = queue_name
+        self.drop_policy = drop_policy
+        self.dropped: dict[str, int] = {}
+        self.listener: _Listener | None = None
+        self._pid = -1
+        self._start_lock = threading.Lock()
+        self._dropped_total = metrics_registry.counter("log_records_dropped_total", "Log records dropped because the log queue was full", ("level",))
+        # The queue is replaced after a fork, so its size is looked up on every read
+        _queue_sizes[queue_name] = lambda: self.queue.qsize()
+
+    def start(self) -> None:
+        """Start the writer thread of the current process; after a fork, the child gets a new queue and thread."""
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid != -1:
+                # Forked: the parent's writer thread does not exist here, and its queue may hold a held lock
+                self.queue = queue.Queue(self.maxsize)
+            self._pid = os.getpid()
+            self.listener = _Listener(self.queue, self.handler, respect_handler_level=True)
+            self.listener.start()
+
+    def close(self) -> None:
+        """Write every queued record, then stop the writer thread."""
+        if self.listener is not None and self._pid == os.getpid():
+            self.listener.stop()
+            self.listener = None
+        self.handler.close()
+        super().close()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Unlike QueueHandler.prepare, do not format here: formatting is the work being moved off this thread
+        if not hasattr(record, "_logger"):
+            record.log_context = structlog.contextvars.get_contextvars()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self._pid != os.getpid():
+            self.start()
+        if self.drop_policy == LogDropPolicy.BLOCK:
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+        if self.drop_policy == LogDropPolicy.DROP_OLDEST:
+            try:
+                dropped = self.queue.get_nowait()
+                self.queue.put_nowait(record)
+            except (queue.Empty, queue.Full):
+                # Lost a race with the writer or another thread; drop the new record instead
+                dropped = record
+        else:
+            dropped = record
+        self._count_drop(dropped)
+
+    def _count_drop(self, record: logging.LogRecord) -> None:
+        level = record.levelname
+        self.dropped[level] = self.dropped.get(level, 0) + 1
+        self._dropped_total.inc((level,))
+
+
+def merge_record_contextvars(logger: Any, method_name: str, event_dict: MutableMapping[str, Any]) -> MutableMapping[str, Any]:
+    """
+    Like `structlog.contextvars.merge_contextvars`, but prefers the context captured by `AsyncLogHandler`.
+
+    Used in `foreign_pre_chain`, which runs in the writer thread for asynchronously handled records.
+    """
+    record = event_dict.get("_record")
+    context = getattr(record, "log_context", None)
+    if context is None:
+        return structlog.contextvars.merge_contextvars(logger, method_name, event_dict)
+    return {**context, **event_dict}
+
+
+def add_process(_: Any, __: Any, event_dict: MutableMapping[str, Any]) -> MutableMapping[str, Any]:
+    """Add the process id, as CallsiteParameterAdder(PROCESS) does, without inspecting the call stack."""
+    record = event_dict.get("_record")
+    event_dict["process"] = record.process if record is not None else os.getpid()
+    return event_dict
+
+
+class AsyncBytesWriter:
+    """
+    Structlog logger that writes pre-rendered lines from a background thread.
+
+    Used by the fast log profile, where events are rendered to bytes by the caller's processor chain and no
+    stdlib LogRecord is created. The writer thread writes queued lines in batches, one write per batch. Queue
+    bounds, drop policy and drop counters behave as in `AsyncLogHandler`.
+
+    Structlog calls the method named after the log level (`info`, `error`, ...) with the rendered line.
+
+    Attributes
+    ----------
+    file (BinaryIO): Binary stream the lines are written to.
+    maxsize (int): Maximum number of queued lines.
+    queue_name (str): Value of the `queue` label of the `log_queue_size` metric.
+    drop_policy (LogDropPolicy): What to do when the queue is full.
+    dropped (dict[str, int]): Number of dropped lines by level name.
+
+    """
+
+    # Lines written per write() call at most
+    BATCH_SIZE = 512
+
+    def __init__(
+        self,
+        file: BinaryIO,
+        maxsize: int = 10_000,
+        drop_policy: LogDropPolicy = LogDropPolicy.DROP_NEWEST,
+        queue_name: str = "structlog",
+    ) -> None:
+        self.file = file
+        self.maxsize = maxsize
+        self.queue_name = queue_name
+        self.drop_policy = drop_policy
+        self.dropped: dict[str, int] = {}
+        self.queue: queue.Queue[bytes | None] = queue.Queue(maxsize)
+        self._thread: threading.Thread | None = None
+        self._pid = -1
+        self._start_lock = threading.Lock()
+        self._dropped_total = metrics_registry.counter("log_records_dropped_total", "Log records dropped because the log queue was full", ("level",))
+        # The queue is replaced after a fork, so its size is looked up on every read
+        _queue_sizes[queue_name] = lambda: self.queue.qsize()
+
+    def debug(self, message: bytes) -> None:
+        self._enqueue("DEBUG", message + b"\n")
+
+    def info(self, message: bytes) -> None:
+        self._enqueue("INFO", message + b"\n")
+
+    def warning(self, message: bytes) -> None:
+        self._enqueue("WARNING", message + b"\n")
+
+    def error(self, message: bytes) -> None:
+        self._enqueue("ERROR", message + b"\n")
+
+    def critical(self, message: bytes) -> None:
+        self._enqueue("CRITICAL", message + b"\n")
+
+    warn = warning
+    exception = err = error
+    fatal = critical
+    msg = log = info
+
+    def start(self) -> None:
+        """Start the writer thread of the current process; after a fork, the child gets a new queue and thread."""
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid != -1:
+                self.queue = queue.Queue(self.maxsize)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+
+    def close(self) -> None:
+        """Write every queued line, then stop the writer thread."""
+        if self._thread is not None and self._pid == os.getpid():
+            self.queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        q = self.queue
+        while True:
+            line = q.get()
+            batch = []
+            while line is not None:
+                batch.append(line)
+                if len(batch) >= self.BATCH_SIZE:
+                    break
+                try:
+                    line = q.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self.file.write(b"".join(batch))
+                self.file.flush()
+            if line is None:
+                return
+
+    def _enqueue(self, level: str, line: bytes) -> None:
+        if self._pid != os.getpid():
+            self.start()
+        if self.drop_policy == LogDropPolicy.BLOCK:
+            self.queue.put(line)
+            return
+        try:
+            self.queue.put_nowait(line)
+            return
+        except queue.Full:
+            pass
+        if self.drop_policy == LogDropPolicy.DROP_OLDEST:
+            # Queued lines are already rendered, so an evicted line is counted under the new line's level
+            try:
+                self.queue.get_nowait()
+                self.queue.put_nowait(line)
+            except (queue.Empty, queue.Full):
+                pass
+        self.dropped[level] = self.dropped.get(level, 0) + 1
+        self._dropped_total.inc((level,))
+
+
+class NamedLogger:
+    """
+    Give a structlog output logger (such as `AsyncBytesWriter` or `structlog.BytesLogger`) a logger name.
+
+    The level methods are copied from the wrapped logger, so calls cost nothing extra.
+
+    Attributes
+    ----------
+    name (str | None): The logger name, read by `structlog.stdlib.add_logger_name`.
+
+    """
+
+    METHODS = ("msg", "log", "debug", "info", "warn", "warning", "err", "error", "exception", "critical", "fatal", "failure")
+
+    def __init__(self, logger: Any, name: str | None) -> None:
+        self.name = name
+        for method in self.METHODS:
+            if hasattr(logger, method):
+                setattr(self, method, getattr(logger, method))
@@ -0,0 +1,9 @@
+from enum import StrEnum
+
+
+class LogDropPolicy(StrEnum):
+    """Enum representing what the asynchronous log handler does when its queue is full."""
+
+    DROP_NEWEST = "drop_newest"  # Discard the record being logged; the caller never waits.
+    DROP_OLDEST = "drop_oldest"  # Discard the oldest queued record to make room; the caller never waits.
+    BLOCK = "block"              # Wait for room in the queue; nothing is lost, but the caller (and event loop) stalls.
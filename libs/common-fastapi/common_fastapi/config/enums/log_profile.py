@@ -0,0 +1,9 @@
+from enum import StrEnum
+
+
+class LogProfile(StrEnum):
+    """Enum representing the available log processing and rendering profiles."""
+
+    CONSOLE = "console"  # Colored, human-readable output through stdlib logging. Development default.
+    JSON = "json"        # JSON lines rendered by structlog's JSONRenderer through stdlib logging. Production default.
+    FAST = "fast"        # JSON lines rendered to bytes by orjson with a trimmed processor chain, bypassing stdlib logging.
@@ -0,0 +1,8 @@
+from enum import StrEnum
+
+
+class ProfileMode(StrEnum):
+    """Enum representing how a request is profiled by the profiling middleware."""
+
+    SAMPLE = "sample"      # Periodic stack samples of every busy thread, stored as collapsed stacks for flame graphs.
+    CPROFILE = "cprofile"  # Deterministic cProfile of the event loop thread, stored as pstats.
@@ -1,4 +1,12 @@
+import os
+import tempfile
+
+from pydantic import Field
+
+from .enums.log_drop_policy import LogDropPolicy  # Importing an Enum for full log queue behaviours
 from .enums.log_level import LogLevel  # Importing an Enum for predefined log levels
+from .enums.log_profile import LogProfile  # Importing an Enum for log processing profiles
+from .enums.profile_mode import ProfileMode  # Importing an Enum for request profiling modes
 from .env_loader import EnvSettings  # Importing the base environment settings class
 
 
@@ -11,6 +19,81 @@ class AppSettings(EnvSettings):
     LOG_LEVEL (LogLevel): Specifies the logging level for the application.
                           Defaults to LogLevel.DEBUG. This is an Enum field,
                           ensuring that only valid, predefined log levels are allowed.
+    LOG_PROFILE (LogProfile | None): Log processing and rendering profile; LogProfile.FAST renders JSON
+                          with orjson and a trimmed processor chain. Defaults to None, meaning
+                          LogProfile.CONSOLE in development and LogProfile.JSON in production.
+    LOG_ASYNC (bool): Whether log records are rendered and written by a background thread instead of
+                          the logging call. Defaults to False.
+    LOG_QUEUE_SIZE (int): Maximum number of log records waiting for the background thread. Defaults to 10000.
+    LOG_QUEUE_DROP_POLICY (LogDropPolicy): What happens to records when the queue is full.
+                          Defaults to LogDropPolicy.DROP_NEWEST.
+    LOG_ACCESS_SAMPLE_RATE (float): Fraction of successful (status < 400) requests whose REQUEST and
+                          RESPONSE lines are logged. Defaults to 1.0 (every request).
+    LOG_ACCESS_ERROR_SAMPLE_RATE (float): Fraction of failed (status >= 400) requests whose REQUEST and
+                          RESPONSE lines are logged. Defaults to 1.0 (every request).
+    COMPRESSION_ENABLED (bool): Whether responses are compressed with zstd, brotli or gzip, as negotiated
+                          from Accept-Encoding (zstd and brotli need the `compression` extra). Defaults to True.
+    COMPRESSION_MINIMUM_SIZE (int): Smallest response body, in bytes, that is compressed. Defaults to 1024.
+    COMPRESSION_EXCLUDE_PATHS (list[str]): Path prefixes whose responses are never compressed. Defaults to [].
+    CACHE_ENABLED (bool | None): Whether responses of endpoints decorated with `cache_response` are cached.
+                          Defaults to None: cached when CACHE_REDIS_URL is set or the server runs a single worker,
+                          since the in-process caches of several workers would serve each other's stale responses.
+    CACHE_MAX_BYTES (int): Size bound of the in-process response cache. Defaults to 64 MiB.
+    CACHE_REDIS_URL (str | None): Redis server shared by every worker to cache responses in, instead of an
+                          in-process cache per worker (needs the `cache` extra). Defaults to None.
+    COALESCING_ENABLED (bool): Whether identical concurrent GET requests of endpoints decorated with `cache_response`
+                          or `coalesce_requests` share one execution of the endpoint. Defaults to True.
+    CONCURRENCY_LIMIT_ENABLED (bool): Whether requests over the adaptive concurrency limit of the worker are
+                          rejected with 503 and Retry-After. Defaults to False.
+    CONCURRENCY_LIMIT_INITIAL (int): Concurrency limit at startup, globally and per route group. Defaults to 100.
+    CONCURRENCY_LIMIT_MIN (int): Lowest concurrency limit latency can shrink a limit to. Defaults to 10.
+    CONCURRENCY_LIMIT_MAX (int): Highest concurrency limit a limit can grow to. Defaults to 1000.
+    CONCURRENCY_LIMIT_TOLERANCE (float): Latency, relative to each route's average, above which limits shrink.
+                          Defaults to 2.0.
+    CONCURRENCY_LIMIT_GROUPS (dict[str, list[str]]): Path prefixes per route group limited on its own, in
+                          addition to the global limit, e.g. {"inference": ["/model-inference"]}. Defaults to {}.
+    CONCURRENCY_LIMIT_EXCLUDE_PATHS (list[str]): Path prefixes never limited. Defaults to ["/health", "/metrics"].
+    LOOP_MONITOR_ENABLED (bool): Whether event loop lag is measured and blocking calls are reported. Defaults to True.
+    LOOP_MONITOR_INTERVAL (float): Seconds between event loop heartbeats. Defaults to 0.05.
+    LOOP_MONITOR_THRESHOLD (float): Loop lag, in seconds, above which the loop counts as blocked and the blocking
+                          stack is logged. Defaults to 0.1.
+    LOOP_MONITOR_STRICT (bool): Whether a request that blocks the loop fails with EventLoopBlockedError; meant
+                          for tests. Defaults to False.
+    SERVICES_PRELOAD (bool): Whether services registered as eager are built at startup rather than on first
+                          use. Defaults to True; turn it off to start faster, e.g. in tests.
+    HEALTH_CHECK_TIMEOUT (float): Seconds after which a health check counts as down. Defaults to 2.0.
+    HEALTH_CACHE_TTL (float): Seconds health check results are reused by readiness probes. Defaults to 5.0.
+    PROFILING_ENABLED (bool): Whether the request profiling middleware and the /admin/profiles endpoints are
+                          installed. Defaults to False, in which case profiling has no overhead at all.
+    PROFILING_SECRET (str | None): Secret signing the X-Profile and X-Profile-Token headers. Without it,
+                          requests cannot be profiled on demand and stored profiles cannot be read. Defaults to None.
+    PROFILING_SAMPLE_RATE (float): Fraction of eligible requests profiled without a header. Defaults to 0.0.
+    PROFILING_ROUTES (list[str]): Path prefixes eligible for sampling; empty means every path. Defaults to [].
+    PROFILING_MODE (ProfileMode): Statistical stack sampling or cProfile. Defaults to ProfileMode.SAMPLE.
+    PROFILING_INTERVAL (float): Seconds between stack samples in sampling mode. Defaults to 0.001.
+    PROFILING_DIR (str): Directory the profiles are stored in. Defaults to "profiles" in the temp directory.
+    PROFILING_MAX_PROFILES (int): Number of profiles kept; older ones are deleted. Defaults to 50.
+    METRICS_ENABLED (bool): Whether request metrics are recorded and served at /metrics. Defaults to True.
+    METRICS_MULTIPROC_DIR (str | None): Directory where every worker process writes its metrics, so that
+                          /metrics reports all workers of a multi-process server. Must be emptied when the
+                          server starts. Defaults to None (single-process metrics).
+    METRICS_FLUSH_INTERVAL (float): Seconds between metrics snapshot writes in multi-process mode. Defaults to 5.0.
+    SERVER_WORKERS (int): Worker processes of `python -m common_fastapi.server`. Defaults to 0, meaning one per
+                          CPU available to the container.
+    SERVER_MAX_REQUESTS (int): Requests after which a worker is replaced, bounding the growth of leaked or
+                          fragmented memory; 0 means never. Defaults to 10000.
+    SERVER_MAX_REQUESTS_JITTER (int): Random number of extra requests, up to this, each worker serves before
+                          being replaced, so workers are not replaced all at once. Defaults to 1000.
+    SERVER_GRACEFUL_TIMEOUT (float): Seconds workers get to finish in-flight requests when stopping. Defaults to 30.0.
+    JOBS_DB_PATH (str): SQLite database holding background job states, shared by the workers of a server.
+                          Defaults to "jobs.sqlite3" in the temp directory.
+    JOBS_MAX_CONCURRENCY (int): Background jobs running at once in a worker process, whatever their kind.
+                          Defaults to 4.
+    JOBS_THREAD_WORKERS (int): Threads running thread jobs, apart from the threads serving requests. Defaults to 4.
+    JOBS_MAX_PENDING (int): Unfinished jobs a worker holds; further submissions get a 503. Defaults to 100.
+    JOBS_RETENTION (float): Seconds finished jobs are kept; older ones are deleted at startup. Defaults to 7 days.
+    JOBS_CANCEL_POLL_INTERVAL (float): Seconds between checks for cancellations requested through other workers.
+                          Defaults to 1.0.
 
     """
 
@@ -21,6 +104,65 @@ class AppSettings(EnvSettings):
     }
 
     LOG_LEVEL: LogLevel = LogLevel.DEBUG  # Define the default log level
+    LOG_PROFILE: LogProfile | None = None
+    LOG_ASYNC: bool = False
+    LOG_QUEUE_SIZE: int = 10_000
+    LOG_QUEUE_DROP_POLICY: LogDropPolicy = LogDropPolicy.DROP_NEWEST
+    LOG_ACCESS_SAMPLE_RATE: float = Field(default=1.0, ge=0.0, le=1.0)
+    LOG_ACCESS_ERROR_SAMPLE_RATE: float = Field(default=1.0, ge=0.0, le=1.0)
+
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_EXCLUDE_PATHS: list[str] = []
+
+    CACHE_ENABLED: bool | None = None
+    CACHE_MAX_BYTES: int = 64 * 2**20
+    CACHE_REDIS_URL: str | None = None
+
+    COALESCING_ENABLED: bool = True
+
+    CONCURRENCY_LIMIT_ENABLED: bool = False
+    CONCURRENCY_LIMIT_INITIAL: int = Field(default=100, ge=1)
+    CONCURRENCY_LIMIT_MIN: int = Field(default=10, ge=1)
+    CONCURRENCY_LIMIT_MAX: int = Field(default=1000, ge=1)
+    CONCURRENCY_LIMIT_TOLERANCE: float = Field(default=2.0, gt=1.0)
+    CONCURRENCY_LIMIT_GROUPS: dict[str, list[str]] = {}
+    CONCURRENCY_LIMIT_EXCLUDE_PATHS: list[str] = ["/health", "/metrics"]
+
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_MONITOR_INTERVAL: float = Field(default=0.05, gt=0.0)
+    LOOP_MONITOR_THRESHOLD: float = Field(default=0.1, gt=0.0)
+    LOOP_MONITOR_STRICT: bool = False
+
+    SERVICES_PRELOAD: bool = True
+
+    HEALTH_CHECK_TIMEOUT: float = Field(default=2.0, gt=0.0)
+    HEALTH_CACHE_TTL: float = Field(default=5.0, ge=0.0)
+
+    PROFILING_ENABLED: bool = False
+    PROFILING_SECRET: str | None = None
+    PROFILING_SAMPLE_RATE: float = Field(default=0.0, ge=0.0, le=1.0)
+    PROFILING_ROUTES: list[str] = []
+    PROFILING_MODE: ProfileMode = ProfileMode.SAMPLE
+    PROFILING_INTERVAL: float = 0.001
+    PROFILING_DIR: str = os.path.join(tempfile.gettempdir(), "profiles")
+    PROFILING_MAX_PROFILES: int = 50
+
+    METRICS_ENABLED: bool = True
+    METRICS_MULTIPROC_DIR: str | None = None
+    METRICS_FLUSH_INTERVAL: float = 5.0
+
+    SERVER_WORKERS: int = Field(default=0, ge=0)
+    SERVER_MAX_REQUESTS: int = Field(default=10000, ge=0)
+    SERVER_MAX_REQUESTS_JITTER: int = Field(default=1000, ge=0)
+    SERVER_GRACEFUL_TIMEOUT: float = Field(default=30.0, ge=0.0)
+
+    JOBS_DB_PATH: str = os.path.join(tempfile.gettempdir(), "jobs.sqlite3")
+    JOBS_MAX_CONCURRENCY: int = Field(default=4, ge=1)
+    JOBS_THREAD_WORKERS: int = Field(default=4, ge=1)
+    JOBS_MAX_PENDING: int = Field(default=100, ge=1)
+    JOBS_RETENTION: float = Field(default=7 * 24 * 3600.0, ge=0.0)
+    JOBS_CANCEL_POLL_INTERVAL: float = Field(default=1.0, gt=0.0)
 
 
 # Instantiate the settings object to make configurations accessible globally
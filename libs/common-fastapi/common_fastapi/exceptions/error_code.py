@@ -3,8 +3,11 @@ from enum import Enum
 
 class ErrorCode(str, Enum):
     RESOURCE_NOT_FOUND = "resource_not_found"
+    FORBIDDEN = "forbidden"
     PATH_NOT_FOUND = "path_not_found"
     DATABASE_CONNECTION = "database_connection"
     DATABASE_API_OPERATION = "database_api_operation"
+    SERVICE_OVERLOADED = "service_overloaded"
+    QUERY_TIMEOUT = "query_timeout"
     REQUEST_VALIDATION = "request_validation"
     UNCLASSIFIED = "unclassified"
@@ -11,3 +11,11 @@ class ResourceNotFoundException(HTTPException):
             status_code=HTTPStatus.NOT_FOUND,
             detail={"error": f"{resource_name} not found", "error_code": ErrorCode.RESOURCE_NOT_FOUND},
         )
+
+
+class ForbiddenException(HTTPException):
+    def __init__(self, reason: str = "Access denied") -> None:
+        super().__init__(
+            status_code=HTTPStatus.FORBIDDEN,
+            detail={"error": reason, "error_code": ErrorCode.FORBIDDEN},
+        )
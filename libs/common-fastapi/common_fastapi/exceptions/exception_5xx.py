@@ -11,3 +11,23 @@ class DbConnectionException(HTTPException):
             status_code=HTTPStatus.SERVICE_UNAVAILABLE,
             detail={"error": "Database is currently unreachable", "error_code": ErrorCode.DATABASE_CONNECTION},
         )
+
+
+class ServiceOverloadedException(HTTPException):
+    message = "Service is overloaded, please retry later"
+    error_code = ErrorCode.SERVICE_OVERLOADED
+
+    def __init__(self, retry_after: int = 1) -> None:
+        super().__init__(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail={"error": self.message, "error_code": self.error_code},
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class QueryTimeoutException(HTTPException):
+    def __init__(self, timeout: float) -> None:
+        super().__init__(
+            status_code=HTTPStatus.GATEWAY_TIMEOUT,
+            detail={"error": f"Query interrupted after {timeout:g}s", "error_code": ErrorCode.QUERY_TIMEOUT},
+        )
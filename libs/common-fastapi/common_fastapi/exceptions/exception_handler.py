@@ -35,6 +35,7 @@ async def http_exception_handler(_: Request, exc: HTTPException) -> ORJSONRespon
             "error": detail.get("error", "Unhandled request error occurred"),
             "error_code": detail.get("error_code", ErrorCode.UNCLASSIFIED),
         },
+        headers=getattr(exc, "headers", None),  # e.g. Retry-After on 503s
     )
 
 async def starlette_http_exception_handler(request: Request, exc: StarletteHTTPException) -> ORJSONResponse:
@@ -0,0 +1,140 @@
+import asyncio
+import inspect
+import time
+from collections.abc import Callable
+from typing import Any, NamedTuple
+
+from .config import get_logger
+from .config.settings import app_settings
+from .metrics import metrics_registry
+
+
+logger = get_logger(__name__)
+
+UP = "up"
+DOWN = "down"
+
+
+class CheckResult(NamedTuple):
+    """Outcome of one health check."""
+
+    status: str
+    latency_ms: int
+    message: str | None = None
+    critical: bool = True
+
+
+class _Check(NamedTuple):
+    check: Callable[[], Any]
+    timeout: float
+    critical: bool
+    is_async: bool
+
+
+def _is_async(check: Callable[[], Any]) -> bool:
+    """Whether `check` is a coroutine function or an object with an async `__call__`."""
+    return inspect.iscoroutinefunction(check) or inspect.iscoroutinefunction(type(check).__call__)
+
+
+class HealthChecks:
+    """
+    Registry of backend health checks, run concurrently and cached for readiness probes.
+
+    A check is a callable, sync or async, that returns when its backend is healthy and raises otherwise; an
+    optional string it returns is reported as the message. Checks should reuse the application's clients and
+    pools (a pooled `SELECT 1`, a ping on the existing client) rather than open connections of their own.
+
+    `run` runs every check at once, each bounded by its own timeout, so one hanging backend neither delays
+    nor hides the others; sync checks run in worker threads. Results are cached for `ttl` seconds and
+    concurrent callers share a single run, so a storm of probes costs one round of checks per `ttl`. A check
+    registered with `critical=False` is reported but does not make the application unready.
+
+    The last results are exported as the `health_check_up` gauge, labelled by check.
+
+    Attributes
+    ----------
+    ttl (float): Seconds results are reused.
+    default_timeout (float): Timeout of checks registered without one.
+
+    """
+
+    def __init__(self, ttl: float = app_settings.HEALTH_CACHE_TTL, default_timeout: float = app_settings.HEALTH_CHECK_TIMEOUT) -> None:
+        self.ttl = ttl
+        self.default_timeout = default_timeout
+        self._checks: dict[str, _Check] = {}
+        self._results: dict[str, CheckResult] = {}
+        self._expires = 0.0
+        self._running: asyncio.Task[dict[str, CheckResult]] | None = None
+        metrics_registry.gauge(
+            "health_check_up",
+            "Result of the last health check (1 up, 0 down) by check",
+            ("check",),
+            collect=lambda: {(name,): int(result.status == UP) for name, result in self._results.items()},
+        )
+
+    def register(self, name: str, check: Callable[[], Any], timeout: float | None = None, critical: bool = True) -> None:
+        """
+        Register a health check.
+
+        Args:
+        ----
+        name (str): Unique check name, reported as the indicator name.
+        check (Callable[[], Any]): Sync or async callable raising when the backend is unhealthy.
+        timeout (float | None): Seconds after which the check counts as down; defaults to HEALTH_CHECK_TIMEOUT.
+        critical (bool): Whether a failure makes the application unready.
+
+        """
+        self._checks[name] = _Check(check, self.default_timeout if timeout is None else timeout, critical, _is_async(check))
+        self._expires = 0.0
+
+    async def run(self) -> dict[str, CheckResult]:
+        """Return the result of every check, running them unless results younger than `ttl` are cached."""
+        if time.monotonic() < self._expires:
+            return self._results
+        if self._running is None:
+            self._running = asyncio.create_task(self._run_all())
+            self._running.add_done_callback(self._finished)
+        # Shielded: a probe that disconnects must not cancel the run the other probes are waiting for
+        return await asyncio.shield(self._running)
+
+    def _finished(self, task: "asyncio.Task[dict[str, CheckResult]]") -> None:
+        self._running = None
+        if not task.cancelled() and task.exception() is None:
+            self._results = task.result()
+            self._expires = time.monotonic() + self.ttl
+
+    async def _run_all(self) -> dict[str, CheckResult]:
+        names = list(self._checks)
+        results = await asyncio.gather(*(self._run_one(name, self._checks[name]) for name in names))
+        return dict(zip(names, results, strict=True))
+
+    async def _run_one(self, name: str, check: _Check) -> CheckResult:
+        start = time.perf_counter()
+        try:
+            async with asyncio.timeout(check.timeout):
+                if check.is_async:
+                    message = await check.check()
+                else:
+                    # Not through anyio's thread limiter, which a hanging check would hold a token of; a timed-out
+                    # sync check is left to finish in its thread
+                    message = await asyncio.to_thread(check.check)
+        except TimeoutError:
+            status, message = DOWN, f"Timed out after {check.timeout}s"
+        except Exception as exc:  # pylint: disable=broad-except
+            status, message = DOWN, str(exc) or type(exc).__name__
+        else:
+            status = UP
+            message = message if isinstance(message, str) else None
+        latency_ms = int((time.perf_counter() - start) * 1000)
+        if status == DOWN:
+            logger.warning("Health check failed", check=name, message=message, latency_ms=latency_ms)
+        return CheckResult(status, latency_ms, message, check.critical)
+
+    @staticmethod
+    def is_ready(results: dict[str, CheckResult]) -> bool:
+        """Whether every critical check is up."""
+        return all(result.status == UP for result in results.values() if result.critical)
+
+
+# Process-wide default health checks, served by the application's /health endpoints
+health_checks = HealthChecks()
@@ -0,0 +1,17 @@
+from .endpoint import register_jobs_endpoints
+from .runner import Executor, JobCancelledError, JobContext, JobError, JobRunner, job_runner
+from .store import Job, JobStatus, JobStore
+
+
+__all__ = [
+    "Executor",
+    "Job",
+    "JobCancelledError",
+    "JobContext",
+    "JobError",
+    "JobRunner",
+    "JobStatus",
+    "JobStore",
+    "job_runner",
+    "register_jobs_endpoints",
+]
@@ -0,0 +1,49 @@
+from http import HTTPStatus
+from typing import Annotated
+
+from fastapi import APIRouter, FastAPI, Query
+
+from common_fastapi.exceptions.exception_4xx import ResourceNotFoundException
+
+from .runner import JobRunner
+from .store import Job, JobStatus
+
+
+def register_jobs_endpoints(app: FastAPI, runner: JobRunner, prefix: str = "/jobs") -> None:
+    """
+    Add endpoints to list, follow and cancel background jobs.
+
+    Args:
+    ----
+    app (FastAPI): The application to add the endpoints to.
+    runner (JobRunner): The runner the application submits its jobs to.
+    prefix (str): Path of the list endpoint; jobs are read from `<prefix>/{job_id}`.
+
+    """
+    router = APIRouter(prefix=prefix, tags=["Jobs"])
+
+    @router.get("", response_model=list[Job], summary="List background jobs, most recent first")
+    async def list_jobs(kind: str | None = None, status: JobStatus | None = None, limit: Annotated[int, Query(ge=1, le=1000)] = 100) -> list[Job]:
+        return await runner.recent(kind, status, limit)
+
+    @router.get("/{job_id}", response_model=Job, summary="Status, progress and result of a background job")
+    async def get_job(job_id: str) -> Job:
+        job = await runner.get(job_id)
+        if job is None:
+            raise ResourceNotFoundException("Job")
+        return job
+
+    @router.post(
+        "/{job_id}/cancel",
+        response_model=Job,
+        status_code=HTTPStatus.ACCEPTED,
+        summary="Cancel a background job",
+        description="Cancellation is asynchronous: poll the job until its status is final. Finished jobs are left as they are.",
+    )
+    async def cancel_job(job_id: str) -> Job:
+        job = await runner.cancel(job_id)
+        if job is None:
+            raise ResourceNotFoundException("Job")
+        return job
+
+    app.include_router(router)
@@ -0,0 +1,458 @@
+import asyncio
+import functools
+import multiprocessing
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Coroutine
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from enum import StrEnum
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from pathlib import Path
+from typing import Any, NamedTuple, TypeVar
+
+from common_fastapi.config import get_logger
+from common_fastapi.config.settings import app_settings
+from common_fastapi.exceptions.exception_5xx import ServiceOverloadedException
+from common_fastapi.metrics import metrics_registry
+
+from .store import Job, JobStatus, JobStore
+
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+JOB_DURATION_BUCKETS = (0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0)
+
+
+class Executor(StrEnum):
+    ASYNC = "async"  # a coroutine function, run on the event loop
+    THREAD = "thread"  # a blocking function, run in the runner's thread pool
+    PROCESS = "process"  # a CPU-bound function, run in a new process
+
+
+class JobError(Exception):
+    """Raise from a job to fail it with this message, without a traceback in the logs."""
+
+
+class JobCancelledError(Exception):
+    """Raised by `JobContext.raise_if_cancelled` once the job is cancelled."""
+
+
+class JobContext:
+    """
+    Handle passed to a running job as its first argument, to report progress and notice cancellation.
+
+    Async jobs are cancelled with `asyncio.CancelledError` at their next `await`, and process jobs are
+    terminated; thread jobs cannot be interrupted and should call `raise_if_cancelled` between steps.
+
+    Attributes
+    ----------
+    job_id (str): Id of the running job.
+
+    """
+
+    def __init__(self, job_id: str, store: JobStore | None, loop: asyncio.AbstractEventLoop | None = None, interval: float = 0.5) -> None:
+        self.job_id = job_id
+        self._store = store
+        self._loop = loop
+        self._interval = interval
+        self._reported = 0.0
+        self._message: str | None = None
+        self._held: tuple[float, str | None] | None = None
+        self._cancelled = threading.Event()
+
+    def progress(self, fraction: float, message: str | None = None) -> None:
+        """
+        Report progress; reports are recorded at most once per `interval` seconds, unless their message changed.
+
+        A report held back is recorded by a later one, or when the job ends, so the latest progress is never lost.
+
+        Args:
+        ----
+        fraction (float): Fraction of the work done, between 0 and 1.
+        message (str | None): Optional description of the current step.
+
+        """
+        fraction = min(max(fraction, 0.0), 1.0)
+        now = time.monotonic()
+        if now - self._reported >= self._interval or (message is not None and message != self._message):
+            self._record(now, fraction, message)
+        else:
+            self._held = (fraction, message)
+
+    def _record(self, now: float, fraction: float, message: str | None) -> None:
+        self._reported = now
+        self._held = None
+        if message is not None:
+            self._message = message
+        self._report(fraction, message)
+
+    def _flush(self) -> None:
+        """Record the latest report held back by the throttling, if any."""
+        if self._held is not None:
+            self._record(time.monotonic(), *self._held)
+
+    def _report(self, fraction: float, message: str | None) -> None:
+        # A single-row update of a local WAL database: short enough to run on the event loop for async jobs
+        self._store.progress(self.job_id, fraction, message)  # type: ignore[union-attr]
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self.cancelled:
+            raise JobCancelledError
+
+    def run_coroutine(self, coroutine: Coroutine[Any, Any, T]) -> T:
+        """Run a coroutine on the server's event loop from a thread job, e.g. to invalidate cached responses, and return its result."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            coroutine.close()
+            raise RuntimeError("run_coroutine would block the event loop: await the coroutine instead")
+        if self._loop is None:
+            coroutine.close()
+            raise RuntimeError("Process jobs cannot run coroutines on the server's event loop")
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def _cancel(self) -> None:
+        self._cancelled.set()
+
+
+class _ChildJobContext(JobContext):
+    """Context of a process job: progress goes to the parent, which is also who terminates the job."""
+
+    def __init__(self, job_id: str, conn: Connection) -> None:
+        super().__init__(job_id, None)
+        self._conn = conn
+
+    def _report(self, fraction: float, message: str | None) -> None:
+        self._conn.send(("progress", fraction, message))
+
+
+def _process_main(conn: Connection, job_id: str, func: Callable[..., Any], params: dict[str, Any]) -> None:
+    context = _ChildJobContext(job_id, conn)
+    try:
+        result = func(context, **params)
+    except BaseException as exc:  # pylint: disable=broad-except
+        context._flush()  # pylint: disable=protected-access
+        conn.send(("error", _describe(exc)))
+    else:
+        context._flush()  # pylint: disable=protected-access
+        conn.send(("result", result))
+    finally:
+        conn.close()
+
+
+def _describe(exc: BaseException) -> str:
+    return str(exc) if isinstance(exc, JobError) else f"{type(exc).__name__}: {exc}"
+
+
+def _set_ready(future: asyncio.Future[None]) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+async def _receive(conn: Connection) -> Any:
+    """Receive a message from a pipe without blocking the event loop while waiting for it."""
+    loop = asyncio.get_running_loop()
+    while not conn.poll():
+        readable: asyncio.Future[None] = loop.create_future()
+        loop.add_reader(conn.fileno(), functools.partial(_set_ready, readable))
+        try:
+            await readable
+        finally:
+            loop.remove_reader(conn.fileno())
+    return conn.recv()
+
+
+class _JobType(NamedTuple):
+    func: Callable[..., Any]
+    executor: Executor
+    concurrency: int
+
+
+class _LocalJob:
+    def __init__(self, kind: str, context: JobContext) -> None:
+        self.kind = kind
+        self.context = context
+        self.started = False
+        self.task: asyncio.Task[None] | None = None
+        self.process: BaseProcess | None = None
+
+
+class JobRunner:
+    """
+    Runs long operations in the background of the server process that accepts them.
+
+    A job kind is registered with a function and the executor matching its work: `async` for I/O-bound
+    coroutines, `thread` for blocking I/O, `process` for CPU-bound work that would otherwise hold the GIL
+    for every request of the worker. Job functions receive a `JobContext` followed by the keyword arguments
+    given to `submit`; the arguments of process jobs, their return value and the function itself must be
+    picklable, and the function importable. Return values are stored as JSON.
+
+    `submit` stores the job and returns at once; the job waits for a slot of the runner (`max_concurrency`,
+    per process) and one of its kind before running. The `concurrency` of a kind holds across every process
+    sharing the store: a slot is claimed in the store, and a job whose kind is busy in other workers retries
+    every `CLAIM_POLL_INTERVAL` seconds. Thread jobs use a pool of their own, so they never hold the threads
+    that serve sync endpoints. A worker holds at most `max_pending` unfinished jobs; further submissions are
+    refused with 503.
+
+    Job states live in a `JobStore` shared by every worker of the server, so any worker reports a job, and a
+    cancellation requested from any worker is picked up by the owning one within `cancel_poll_interval`.
+
+    Attributes
+    ----------
+    store (JobStore): Where job states are kept.
+    max_pending (int): Unfinished jobs accepted per process.
+
+    """
+
+    # Seconds between attempts to claim a slot of a kind whose slots are all held, possibly by other processes
+    CLAIM_POLL_INTERVAL = 0.5
+
+    def __init__(
+        self,
+        store: JobStore,
+        max_concurrency: int = app_settings.JOBS_MAX_CONCURRENCY,
+        thread_workers: int = app_settings.JOBS_THREAD_WORKERS,
+        max_pending: int = app_settings.JOBS_MAX_PENDING,
+        retention: float = app_settings.JOBS_RETENTION,
+        cancel_poll_interval: float = app_settings.JOBS_CANCEL_POLL_INTERVAL,
+    ) -> None:
+        self.store = store
+        self.max_pending = max_pending
+        self._retention = retention
+        self._cancel_poll_interval = cancel_poll_interval
+        self._max_concurrency = max_concurrency
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._kind_slots: dict[str, asyncio.Semaphore] = {}
+        self._thread_workers = thread_workers
+        self._threads: ThreadPoolExecutor | None = None
+        self._types: dict[str, _JobType] = {}
+        self._jobs: dict[str, _LocalJob] = {}
+        self._watcher: asyncio.Task[None] | None = None
+        self._stopping = False
+        self._finished = metrics_registry.counter("jobs_finished_total", "Finished background jobs by kind and status", ("kind", "status"))
+        self._duration = metrics_registry.histogram("job_duration_seconds", "Run time of background jobs by kind", ("kind",), JOB_DURATION_BUCKETS)
+        metrics_registry.gauge("jobs_active", "Queued and running background jobs by kind and status", ("kind", "status"), collect=self._active)
+
+    def _active(self) -> dict[tuple[str, ...], float]:
+        counts: dict[tuple[str, ...], float] = {}
+        for job in list(self._jobs.values()):
+            labels = (job.kind, JobStatus.RUNNING.value if job.started else JobStatus.QUEUED.value)
+            counts[labels] = counts.get(labels, 0) + 1
+        return counts
+
+    def register(self, kind: str, func: Callable[..., Any], executor: Executor | str = Executor.ASYNC, concurrency: int = 1) -> None:
+        """
+        Register a job kind.
+
+        Args:
+        ----
+        kind (str): Unique name of the kind, e.g. "solar_panel.create".
+        func (Callable[..., Any]): The job, called with a `JobContext` and the keyword arguments of `submit`.
+        executor (Executor | str): How the job runs: "async", "thread" or "process".
+        concurrency (int): Jobs of this kind run at once, across the processes sharing the store; the others wait.
+
+        """
+        self._types[kind] = _JobType(func, Executor(executor), concurrency)
+
+    async def start(self) -> None:
+        """Fail the jobs orphaned by exited processes, prune old jobs and watch for cancellation requests."""
+        self._stopping = False
+        # Semaphores bind to the loop that first waits on them: new ones for every loop the runner starts in
+        self._slots = asyncio.Semaphore(self._max_concurrency)
+        self._kind_slots = {}
+        recovered = await asyncio.to_thread(self.store.recover)
+        if recovered:
+            logger.warning("Failed jobs interrupted by a restart", jobs=recovered)
+        await asyncio.to_thread(self.store.prune, self._retention)
+        self._watcher = asyncio.create_task(self._watch_cancellations(), name="job-cancellation-watcher")
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """
+        Interrupt the jobs of this process, which are recorded as failed, and release the thread pool.
+
+        Args:
+        ----
+        timeout (float): Seconds thread jobs get to notice the cancellation before they are abandoned.
+
+        """
+        self._stopping = True
+        if self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+        jobs = list(self._jobs.values())
+        for job in jobs:
+            self._interrupt(job)
+        tasks = [job.task for job in jobs if job.task is not None]
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        if self._threads is not None:
+            # Thread jobs that ignore cancellation are left to finish; their results are not recorded
+            self._threads.shutdown(wait=False, cancel_futures=True)
+            self._threads = None
+        self.store.close()
+
+    async def submit(self, kind: str, **params: Any) -> Job:
+        """
+        Store a job and schedule it.
+
+        Args:
+        ----
+        kind (str): Registered kind of the job.
+        **params (Any): Keyword arguments of the job function.
+
+        Returns:
+        -------
+        Job: The queued job.
+
+        """
+        job_type = self._types.get(kind)
+        if job_type is None:
+            raise KeyError(f"Unknown job kind: {kind}")
+        if len(self._jobs) >= self.max_pending:
+            raise ServiceOverloadedException(retry_after=10)
+        job = await asyncio.to_thread(self.store.create, kind)
+        local = _LocalJob(kind, JobContext(job.id, self.store, asyncio.get_running_loop()))
+        self._jobs[job.id] = local
+        local.task = asyncio.create_task(self._run(job, job_type, params, local), name=f"job-{kind}-{job.id}")
+        local.task.add_done_callback(lambda _: self._jobs.pop(job.id, None))
+        logger.info("Job submitted", job_id=job.id, kind=kind)
+        return job
+
+    async def get(self, job_id: str) -> Job | None:
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def recent(self, kind: str | None = None, status: JobStatus | None = None, limit: int = 100) -> list[Job]:
+        return await asyncio.to_thread(self.store.recent, kind, status, limit)
+
+    async def cancel(self, job_id: str) -> Job | None:
+        """Request the cancellation of a job, of this process or another; finished jobs are left as they are."""
+        job = await asyncio.to_thread(self.store.request_cancel, job_id)
+        local = self._jobs.get(job_id)
+        if local is not None:
+            self._interrupt(local)
+        return job
+
+    def _interrupt(self, job: _LocalJob) -> None:
+        job.context._cancel()  # pylint: disable=protected-access
+        if job.task is None:
+            return
+        if not job.started or self._types[job.kind].executor == Executor.ASYNC:
+            job.task.cancel()
+        elif job.process is not None:
+            job.process.terminate()
+
+    async def _watch_cancellations(self) -> None:
+        while True:
+            await asyncio.sleep(self._cancel_poll_interval)
+            try:
+                pending = [job_id for job_id, job in self._jobs.items() if not job.context.cancelled]
+                for job_id in await asyncio.to_thread(self.store.cancel_requested, pending):
+                    if (job := self._jobs.get(job_id)) is not None:
+                        self._interrupt(job)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Failed to check for job cancellations")
+
+    async def _run(self, job: Job, job_type: _JobType, params: dict[str, Any], local: _LocalJob) -> None:
+        status, result, error = JobStatus.FAILED, None, None
+        start = time.perf_counter()
+        try:
+            async with self._slot(job, job_type):
+                local.started = True
+                start = time.perf_counter()
+                if job_type.executor == Executor.ASYNC:
+                    result = await job_type.func(local.context, **params)
+                elif job_type.executor == Executor.THREAD:
+                    loop = asyncio.get_running_loop()
+                    result = await loop.run_in_executor(self._thread_pool(), functools.partial(job_type.func, local.context, **params))
+                else:
+                    result = await self._run_process(job.id, job_type.func, params, local)
+            status = JobStatus.SUCCEEDED
+        except (asyncio.CancelledError, JobCancelledError):
+            if self._stopping:
+                error = "Interrupted: the server stopped"
+            else:
+                status = JobStatus.CANCELLED
+        except Exception as exc:  # pylint: disable=broad-except
+            error = _describe(exc)
+            if isinstance(exc, JobError):
+                logger.warning("Job failed", job_id=job.id, kind=job.kind, error=error)
+            else:
+                logger.exception("Job failed", job_id=job.id, kind=job.kind)
+        duration = time.perf_counter() - start
+        try:
+            await asyncio.to_thread(self._record_end, job.id, local.context, status, result, error)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Failed to record the end of a job", job_id=job.id, kind=job.kind, status=status.value)
+        self._finished.inc((job.kind, status.value))
+        if local.started:
+            self._duration.observe(duration, (job.kind,))
+        logger.info("Job finished", job_id=job.id, kind=job.kind, status=status.value, duration_ms=int(duration * 1000))
+
+    @asynccontextmanager
+    async def _slot(self, job: Job, job_type: _JobType) -> AsyncIterator[None]:
+        """Hold a slot of the runner and one of the job's kind, claimed in the store, which starts the job."""
+        # Local jobs of a kind queue here rather than all polling the store
+        async with self._kind_slots.setdefault(job.kind, asyncio.Semaphore(job_type.concurrency)):
+            while True:
+                async with self._slots:
+                    if await asyncio.to_thread(self.store.claim, job.id, job.kind, job_type.concurrency):
+                        yield
+                        return
+                # The kind's slots are held by other processes; the runner slot is left to jobs of other kinds meanwhile
+                await asyncio.sleep(self.CLAIM_POLL_INTERVAL)
+
+    def _record_end(self, job_id: str, context: JobContext, status: JobStatus, result: Any, error: str | None) -> None:
+        # The latest progress report may have been held back by the throttling
+        context._flush()  # pylint: disable=protected-access
+        self.store.finished(job_id, status, result, error)
+
+    def _thread_pool(self) -> ThreadPoolExecutor:
+        # Created on first use, in the worker process: never inherited through a fork
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(self._thread_workers, thread_name_prefix="job")
+        return self._threads
+
+    async def _run_process(self, job_id: str, func: Callable[..., Any], params: dict[str, Any], local: _LocalJob) -> Any:
+        # Spawned rather than forked: a fork of a process running an event loop and threads may deadlock
+        context = multiprocessing.get_context("spawn")
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(target=_process_main, args=(sender, job_id, func, params), name=f"job-{job_id}")
+        local.process = process
+        process.start()
+        sender.close()
+        try:
+            while True:
+                message = await _receive(receiver)
+                if message[0] == "progress":
+                    local.context._report(*message[1:])  # pylint: disable=protected-access
+                elif message[0] == "result":
+                    return message[1]
+                else:
+                    raise JobError(message[1])
+        except EOFError:
+            if local.context.cancelled:
+                raise JobCancelledError from None
+            await asyncio.to_thread(process.join)
+            raise JobError(f"The job process exited with code {process.exitcode}") from None
+        finally:
+            receiver.close()
+            if process.is_alive():
+                process.terminate()
+            await asyncio.to_thread(process.join)
+
+
+# Process-wide default job runner, whose jobs are served by the application's /jobs endpoints
+job_runner = JobRunner(JobStore(Path(app_settings.JOBS_DB_PATH)))
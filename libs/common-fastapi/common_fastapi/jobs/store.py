@@ -0,0 +1,245 @@
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import UTC, datetime
+from enum import StrEnum
+from pathlib import Path
+from typing import Any
+
+import orjson
+from pydantic import BaseModel
+
+
+class JobStatus(StrEnum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+FINISHED = (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+class Job(BaseModel):
+    """State of a background job, as stored and as returned by the jobs endpoints."""
+
+    id: str
+    kind: str
+    status: JobStatus
+    progress: float = 0.0
+    message: str | None = None
+    result: Any = None
+    error: str | None = None
+    cancel_requested: bool = False
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    result BLOB,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    pid INTEGER NOT NULL,
+    pid_start TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_created_at ON jobs (created_at);
+CREATE INDEX IF NOT EXISTS jobs_kind_status ON jobs (kind, status);
+"""
+
+# Columns added after the first release, created in databases that predate them
+_MIGRATIONS = {"pid_start": "ALTER TABLE jobs ADD COLUMN pid_start TEXT"}
+
+_COLUMNS = "id, kind, status, progress, message, result, error, cancel_requested, created_at, started_at, finished_at"
+
+
+def _timestamp(value: float | None) -> datetime | None:
+    return None if value is None else datetime.fromtimestamp(value, UTC)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _process_start(pid: int) -> str | None:
+    """Start time of a process, telling it apart from a later one reusing its pid; None where /proc is unavailable."""
+    try:
+        stat = Path(f"/proc/{pid}/stat").read_text(encoding="ascii", errors="replace")
+    except OSError:
+        return None
+    # Field 22, starttime; the fields are counted after the command name, which may contain spaces and parentheses
+    return stat.rpartition(")")[2].split()[19]
+
+
+def _process_alive(pid: int, start: str | None) -> bool:
+    """Whether the process that stored `pid` and `start` still runs, rather than another one with the same pid."""
+    return _pid_alive(pid) and (start is None or _process_start(pid) == start)
+
+
+class JobStore:
+    """
+    Job states in a local SQLite database, shared by every worker process of a server.
+
+    A job is owned by the process that accepted it and runs there; any process can read its state or request
+    its cancellation. The owner is recorded by pid and process start time, since pids are reused, e.g. by the
+    workers of a restarted container. The database is opened lazily, in the process that uses it, so a store
+    created before the server forks its workers is safe. Calls block on disk I/O: call them from threads, not
+    the event loop.
+
+    Attributes
+    ----------
+    path (Path): The SQLite database file.
+
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._pid: int | None = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            # WAL lets workers read while another writes; commits are not fsynced, a crash loses at most the latest updates
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, migration in _MIGRATIONS.items():
+                if column not in columns:
+                    conn.execute(migration)
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def _execute(self, sql: str, parameters: tuple[Any, ...] = ()) -> list[tuple[Any, ...]]:
+        with self._lock:
+            return self._connection().execute(sql, parameters).fetchall()
+
+    @staticmethod
+    def _job(row: tuple[Any, ...]) -> Job:
+        id_, kind, status, progress, message, result, error, cancel_requested, created_at, started_at, finished_at = row
+        return Job(
+            id=id_,
+            kind=kind,
+            status=status,
+            progress=progress,
+            message=message,
+            result=None if result is None else orjson.loads(result),
+            error=error,
+            cancel_requested=bool(cancel_requested),
+            created_at=_timestamp(created_at),
+            started_at=_timestamp(started_at),
+            finished_at=_timestamp(finished_at),
+        )
+
+    def create(self, kind: str) -> Job:
+        """Store a new queued job owned by this process."""
+        job_id = uuid.uuid4().hex
+        self._execute(
+            "INSERT INTO jobs (id, kind, status, pid, pid_start, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, kind, JobStatus.QUEUED.value, os.getpid(), _process_start(os.getpid()), time.time()),
+        )
+        return self.get(job_id)  # type: ignore[return-value]
+
+    def get(self, job_id: str) -> Job | None:
+        rows = self._execute(f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,))  # noqa: S608  # only column names and placeholders are interpolated
+        return self._job(rows[0]) if rows else None
+
+    def recent(self, kind: str | None = None, status: JobStatus | None = None, limit: int = 100) -> list[Job]:
+        """Most recent jobs first, optionally of one kind and status."""
+        rows = self._execute(
+            f"SELECT {_COLUMNS} FROM jobs WHERE (?1 IS NULL OR kind = ?1) AND (?2 IS NULL OR status = ?2) ORDER BY created_at DESC LIMIT ?3",  # noqa: S608  # only column names and placeholders are interpolated
+            (kind, None if status is None else status.value, limit),
+        )
+        return [self._job(row) for row in rows]
+
+    def claim(self, job_id: str, kind: str, concurrency: int) -> bool:
+        """
+        Start a queued job if fewer than `concurrency` jobs of its kind are running, in any process of the server.
+
+        The count and the update are one statement, which SQLite runs under its write lock, so processes
+        claiming slots of the same kind at once never exceed the limit together.
+
+        Args:
+        ----
+        job_id (str): Id of the queued job.
+        kind (str): Kind of the job.
+        concurrency (int): Jobs of the kind allowed to run at once.
+
+        Returns:
+        -------
+        bool: Whether the job was started; if not, it stays queued and the claim can be retried.
+
+        """
+        rows = self._execute(
+            "UPDATE jobs SET status = ?1, started_at = ?2 WHERE id = ?3 AND status = ?4"
+            " AND (SELECT count(*) FROM jobs WHERE kind = ?5 AND status = ?1) < ?6 RETURNING id",
+            (JobStatus.RUNNING.value, time.time(), job_id, JobStatus.QUEUED.value, kind, concurrency),
+        )
+        return bool(rows)
+
+    def progress(self, job_id: str, progress: float, message: str | None) -> None:
+        self._execute("UPDATE jobs SET progress = ?, message = COALESCE(?, message) WHERE id = ?", (progress, message, job_id))
+
+    def finished(self, job_id: str, status: JobStatus, result: Any = None, error: str | None = None) -> None:
+        self._execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, progress = CASE WHEN ? THEN 1.0 ELSE progress END WHERE id = ?",
+            (
+                status.value,
+                None if result is None else orjson.dumps(result, default=str),
+                error,
+                time.time(),
+                status == JobStatus.SUCCEEDED,
+                job_id,
+            ),
+        )
+
+    def request_cancel(self, job_id: str) -> Job | None:
+        """Flag a job for cancellation, unless it has finished; its owner cancels it."""
+        self._execute(f"UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status NOT IN ({','.join('?' * len(FINISHED))})", (job_id, *FINISHED))  # noqa: S608  # only column names and placeholders are interpolated
+        return self.get(job_id)
+
+    def cancel_requested(self, job_ids: list[str]) -> list[str]:
+        """Those of `job_ids` whose cancellation was requested."""
+        if not job_ids:
+            return []
+        rows = self._execute(f"SELECT id FROM jobs WHERE cancel_requested = 1 AND id IN ({','.join('?' * len(job_ids))})", tuple(job_ids))  # noqa: S608  # only column names and placeholders are interpolated
+        return [row[0] for row in rows]
+
+    def recover(self) -> int:
+        """Fail the unfinished jobs of processes that no longer exist, e.g. before a restart; returns how many."""
+        rows = self._execute("SELECT id, pid, pid_start FROM jobs WHERE status IN (?, ?)", (JobStatus.QUEUED.value, JobStatus.RUNNING.value))
+        orphaned = [job_id for job_id, pid, pid_start in rows if not _process_alive(pid, pid_start)]
+        for job_id in orphaned:
+            self.finished(job_id, JobStatus.FAILED, error="Interrupted: the process running the job exited")
+        return len(orphaned)
+
+    def prune(self, older_than: float) -> None:
+        """Delete finished jobs created more than `older_than` seconds ago."""
+        self._execute(f"DELETE FROM jobs WHERE created_at < ? AND status IN ({','.join('?' * len(FINISHED))})", (time.time() - older_than, *FINISHED))  # noqa: S608  # only column names and placeholders are interpolated
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
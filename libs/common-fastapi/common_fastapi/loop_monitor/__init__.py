@@ -0,0 +1,12 @@
+from .middleware import EventLoopBlockedError, LoopMonitorMiddleware
+from .monitor import LAG_BUCKETS, BlockedLoop, LoopMonitor, RequestInfo
+
+
+__all__ = [
+    "LAG_BUCKETS",
+    "BlockedLoop",
+    "LoopMonitor",
+    "RequestInfo",
+    "EventLoopBlockedError",
+    "LoopMonitorMiddleware",
+]
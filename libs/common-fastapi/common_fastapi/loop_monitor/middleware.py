@@ -0,0 +1,55 @@
+import asyncio
+
+from asgi_correlation_id.context import correlation_id
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .monitor import BlockedLoop, LoopMonitor, RequestInfo
+
+
+class EventLoopBlockedError(RuntimeError):
+    """Raised in strict mode by a request that blocked the event loop."""
+
+    def __init__(self, route: str, blocked: BlockedLoop) -> None:
+        super().__init__(f"{route} blocked the event loop:\n  " + "\n  ".join(blocked.stack))
+        self.route = route
+        self.blocked = blocked
+
+
+class LoopMonitorMiddleware:
+    """
+    Pure ASGI middleware telling the `LoopMonitor` which request each task serves.
+
+    Blocking episodes are then attributed to the route and correlation id of the request that blocked the loop.
+    Add it inside `CorrelationIdMiddleware`, so the correlation id is already set.
+
+    In strict mode, meant for tests, a request that blocked the loop raises `EventLoopBlockedError` once the
+    app is done with it; the test client re-raises it in the test.
+
+    Attributes
+    ----------
+    app (ASGIApp): The wrapped ASGI application.
+    monitor (LoopMonitor): The monitor requests are registered with.
+    strict (bool): Whether a request that blocked the loop fails.
+
+    """
+
+    def __init__(self, app: ASGIApp, monitor: LoopMonitor, strict: bool = False) -> None:
+        self.app = app
+        self.monitor = monitor
+        self.strict = strict
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        task = asyncio.current_task()
+        if scope["type"] != "http" or task is None:
+            await self.app(scope, receive, send)
+            return
+
+        info = RequestInfo(scope, correlation_id.get())
+        self.monitor.requests[task] = info
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            del self.monitor.requests[task]
+            blocked = self.monitor.blocked_tasks.pop(task, None)
+        if blocked is not None and self.strict:
+            raise EventLoopBlockedError(info.route, blocked)
@@ -0,0 +1,144 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from typing import NamedTuple
+
+from starlette.types import Scope
+
+from common_fastapi.config import get_logger
+from common_fastapi.metrics import metrics_registry
+from common_fastapi.metrics.middleware import UNMATCHED_ROUTE
+
+
+logger = get_logger(__name__)
+
+# Lag buckets in seconds, from scheduling jitter to multi-second stalls
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Route label of blocking code that ran outside any request, e.g. in a background task or at startup
+NO_ROUTE = "<none>"
+
+
+class RequestInfo(NamedTuple):
+    """What the loop monitor knows of the request a task is serving."""
+
+    scope: Scope
+    correlation_id: str | None
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class BlockedLoop(NamedTuple):
+    """One episode of the event loop being blocked, as captured while it was blocked."""
+
+    stack: list[str]
+    task: asyncio.Task | None
+    request: RequestInfo | None
+
+
+class LoopMonitor:
+    """
+    Continuous event loop lag measurement and blocking-call detection.
+
+    A heartbeat task sleeps for `interval` and records how late it wakes up in the `event_loop_lag_seconds`
+    histogram. A watchdog thread notices when the heartbeat has been late for more than `threshold`, that is the
+    loop is blocked right now, and captures the event loop thread's stack and the task running on it. Once the
+    loop runs again, the episode is logged with its duration, stack, and the route and correlation id of the
+    request the task was serving (see `LoopMonitorMiddleware`), and counted in `event_loop_blocked_total`.
+
+    Attributes
+    ----------
+    interval (float): Seconds between heartbeats.
+    threshold (float): Loop lag, in seconds, above which the loop counts as blocked.
+    stack_limit (int): Innermost frames kept of a captured stack.
+    requests (dict[asyncio.Task, RequestInfo]): Request served by each task, maintained by the middleware.
+    blocked_tasks (dict[asyncio.Task, BlockedLoop]): Tasks that blocked the loop, for strict mode to check.
+
+    """
+
+    def __init__(self, interval: float = 0.05, threshold: float = 0.1, stack_limit: int = 20) -> None:
+        self.interval = interval
+        self.threshold = threshold
+        self.stack_limit = stack_limit
+        self.requests: dict[asyncio.Task, RequestInfo] = {}
+        self.blocked_tasks: dict[asyncio.Task, BlockedLoop] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread = 0
+        self._heartbeat: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._last_beat = 0.0
+        self._captured: BlockedLoop | None = None
+        self._lag = metrics_registry.histogram("event_loop_lag_seconds", "Delay of event loop heartbeats", buckets=LAG_BUCKETS)
+        self._blocked_total = metrics_registry.counter(
+            "event_loop_blocked_total", "Times the event loop was blocked longer than the threshold", ("route",)
+        )
+
+    def start(self) -> None:
+        """Start monitoring the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._captured = None
+        self._stop.clear()
+        self._heartbeat = self._loop.create_task(self._beat(), name="loop-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            try:
+                await self._heartbeat
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog is not None:
+            self._watchdog.join()
+        self._heartbeat = self._watchdog = None
+
+    async def _beat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._last_beat = now
+            lag = max(0.0, now - expected)
+            self._lag.observe(lag)
+            if lag > self.threshold:
+                self._report(lag)
+
+    def _watch(self) -> None:
+        # Checked several times per threshold, so the stack is captured while the loop is still blocked
+        while not self._stop.wait(self.threshold / 4):
+            last_beat = self._last_beat
+            if self._captured is None and time.monotonic() - last_beat > self.interval + self.threshold:
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is None or self._last_beat != last_beat:
+                    continue
+                task = asyncio.current_task(self._loop)
+                stack = traceback.StackSummary.extract(traceback.walk_stack(frame), limit=self.stack_limit)
+                stack.reverse()
+                request = None if task is None else self.requests.get(task)
+                self._captured = BlockedLoop([f"{entry.filename}:{entry.lineno} in {entry.name}" for entry in stack], task, request)
+                if task is not None and request is not None:
+                    # Set while the task is still blocking, so the middleware sees it however the request ends
+                    self.blocked_tasks[task] = self._captured
+
+    def _report(self, lag: float) -> None:
+        captured, self._captured = self._captured, None
+        request = captured.request if captured is not None else None
+        route = request.route if request is not None else NO_ROUTE
+        self._blocked_total.inc((route,))
+        logger.warning(
+            "Event loop blocked",
+            blocked_ms=round(lag * 1000, 1),
+            route=route,
+            path=request.scope["path"] if request is not None else None,
+            req_id=request.correlation_id if request is not None else None,
+            blocking_stack=captured.stack if captured is not None else None,
+        )
@@ -0,0 +1,22 @@
+from .endpoint import CONTENT_TYPE, get_collector, register_metrics_endpoint
+from .middleware import MetricsMiddleware, sample_thread_limiter
+from .multiprocess import MultiprocessCollector, merge_snapshots
+from .registry import DEFAULT_BUCKETS, Counter, Gauge, Histogram, MetricsRegistry, metrics_registry, render
+
+
+__all__ = [
+    "DEFAULT_BUCKETS",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsRegistry",
+    "metrics_registry",
+    "render",
+    "MetricsMiddleware",
+    "sample_thread_limiter",
+    "MultiprocessCollector",
+    "merge_snapshots",
+    "CONTENT_TYPE",
+    "get_collector",
+    "register_metrics_endpoint",
+]
@@ -0,0 +1,62 @@
+import atexit
+from pathlib import Path
+
+from anyio import to_thread
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+
+from common_fastapi.config.settings import app_settings
+
+from .middleware import sample_thread_limiter
+from .multiprocess import MultiprocessCollector
+from .registry import metrics_registry, render
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_collector: MultiprocessCollector | None = None
+
+
+def get_collector() -> MultiprocessCollector | None:
+    """
+    Return the multi-process collector when METRICS_MULTIPROC_DIR is configured, starting it in this process.
+
+    Returns
+    -------
+    MultiprocessCollector | None: The collector, or None when metrics are served from this process only.
+
+    """
+    global _collector
+    if not app_settings.METRICS_MULTIPROC_DIR:
+        return None
+    if _collector is None:
+        _collector = MultiprocessCollector(metrics_registry, Path(app_settings.METRICS_MULTIPROC_DIR), app_settings.METRICS_FLUSH_INTERVAL)
+        atexit.register(_collector.stop)
+    _collector.start()
+    return _collector
+
+
+def register_metrics_endpoint(app: FastAPI, path: str = "/metrics") -> None:
+    """
+    Add the Prometheus scrape endpoint to an application.
+
+    With METRICS_MULTIPROC_DIR set, the endpoint merges the snapshots of every worker process, so a scrape
+    routed to any worker reports the whole server.
+
+    Args:
+    ----
+    app (FastAPI): The application to add the endpoint to.
+    path (str): The endpoint path.
+
+    """
+
+    @app.get(path, include_in_schema=False)
+    async def metrics() -> PlainTextResponse:
+        sample_thread_limiter()
+        collector = get_collector()
+        if collector is None:
+            snapshot = metrics_registry.snapshot()
+        else:
+            # Reads every worker's snapshot file; keep the file I/O off the event loop
+            snapshot = await to_thread.run_sync(collector.collect)
+        return PlainTextResponse(render(snapshot), media_type=CONTENT_TYPE)
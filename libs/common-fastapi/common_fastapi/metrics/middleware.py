@@ -0,0 +1,82 @@
+import time
+
+from anyio import to_thread
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .registry import MetricsRegistry, metrics_registry
+
+
+# Route label of requests that did not match any route; keeps scanners from creating a series per URL
+UNMATCHED_ROUTE = "<unmatched>"
+# How often, in seconds, the thread-pool limiter is sampled from the request path
+THREADPOOL_SAMPLE_INTERVAL = 1.0
+
+
+def sample_thread_limiter(registry: MetricsRegistry = metrics_registry) -> None:
+    """
+    Record the state of AnyIO's default thread limiter, which runs sync endpoints and dependencies.
+
+    Must be called from the event loop; the limiter is per-loop state.
+    """
+    stats = to_thread.current_default_thread_limiter().statistics()
+    gauge = registry.gauge("threadpool_tokens", "Worker threads of the default thread pool by state", ("state",))
+    gauge.set(stats.borrowed_tokens, ("busy",))
+    gauge.set(stats.total_tokens, ("total",))
+    gauge.set(stats.tasks_waiting, ("waiting",))
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request count, latency and concurrency.
+
+    Requests are labelled by method, route template (e.g. `/books/{uid}` rather than the concrete URL) and
+    response status. The template is read from the route Starlette stores in the scope once it has matched
+    the request. Latency covers the full response, including streamed bodies.
+
+    Attributes
+    ----------
+    app (ASGIApp): The wrapped ASGI application.
+    registry (MetricsRegistry): Registry the metrics are recorded in.
+    exclude_paths (frozenset[str]): Paths that are not recorded, such as the metrics endpoint itself.
+
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry = metrics_registry, exclude_paths: frozenset[str] = frozenset({"/metrics"})) -> None:
+        self.app = app
+        self.registry = registry
+        self.exclude_paths = exclude_paths
+        self.requests = registry.counter("http_requests_total", "HTTP requests by method, route and status", ("method", "route", "status"))
+        self.latency = registry.histogram(
+            "http_request_duration_seconds", "HTTP request latency by method, route and status", ("method", "route", "status")
+        )
+        self.in_progress = registry.gauge("http_requests_in_progress", "HTTP requests currently being served", ("method",))
+        self._next_sample = 0.0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.in_progress.inc((method,))
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - start
+            self.in_progress.dec((method,))
+            route = scope.get("route")
+            labels = (method, getattr(route, "path", None) or UNMATCHED_ROUTE, str(status))
+            self.requests.inc(labels)
+            self.latency.observe(duration, labels)
+            if start >= self._next_sample:
+                self._next_sample = start + THREADPOOL_SAMPLE_INTERVAL
+                sample_thread_limiter(self.registry)
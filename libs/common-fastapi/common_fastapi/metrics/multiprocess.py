@@ -0,0 +1,139 @@
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import orjson
+
+from .registry import MetricsRegistry
+
+
+logger = logging.getLogger(__name__)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def merge_snapshots(snapshots: list[tuple[bool, dict[str, dict[str, Any]]]]) -> dict[str, dict[str, Any]]:
+    """
+    Merge registry snapshots from several processes into one.
+
+    Counters and histograms are summed over every process, including exited ones, so totals never go
+    backwards when a worker restarts. Gauges describe current state and are summed over live processes only.
+
+    Args:
+    ----
+    snapshots (list): (process is alive, registry snapshot) pairs.
+
+    Returns:
+    -------
+    dict: A snapshot in the same format as `MetricsRegistry.snapshot`.
+
+    """
+    merged: dict[str, dict[str, Any]] = {}
+    values: dict[str, dict[tuple[str, ...], Any]] = {}
+    for alive, snapshot in snapshots:
+        for name, metric in snapshot.items():
+            if metric["kind"] == "gauge" and not alive:
+                continue
+            target = merged.setdefault(name, {**metric, "samples": []})
+            if metric["kind"] == "histogram" and metric["buckets"] != target["buckets"]:
+                logger.warning("Skipping %s from a process with different histogram buckets", name)
+                continue
+            samples = values.setdefault(name, {})
+            for labels, value in metric["samples"]:
+                key = tuple(labels)
+                current = samples.get(key)
+                if current is None:
+                    samples[key] = [list(value[0]), value[1], value[2]] if metric["kind"] == "histogram" else value
+                elif metric["kind"] == "histogram":
+                    current[0] = [a + b for a, b in zip(current[0], value[0], strict=True)]
+                    current[1] += value[1]
+                    current[2] += value[2]
+                else:
+                    samples[key] = current + value
+    for name, metric in merged.items():
+        metric["samples"] = [[list(labels), value] for labels, value in values.get(name, {}).items()]
+    return merged
+
+
+class MultiprocessCollector:
+    """
+    Shares metrics between the worker processes of one server through snapshot files.
+
+    Every process writes its registry snapshot to `<directory>/<pid>.json` every `flush_interval` seconds
+    and at exit. A scrape flushes the scraping process, then merges the files of all processes, so any
+    worker can answer `/metrics` for the whole server. Other workers' numbers may be up to one flush
+    interval old.
+
+    The directory must be emptied when the server (not an individual worker) starts, or counters of a
+    previous run are carried over.
+
+    Attributes
+    ----------
+    registry (MetricsRegistry): The registry of this process.
+    directory (Path): Directory shared by every worker process.
+    flush_interval (float): Seconds between background snapshot writes.
+
+    """
+
+    def __init__(self, registry: MetricsRegistry, directory: Path, flush_interval: float = 5.0) -> None:
+        self.registry = registry
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._pid: int | None = None
+        self._stop = threading.Event()
+
+    @property
+    def path(self) -> Path:
+        return self.directory / f"{os.getpid()}.json"
+
+    def start(self) -> None:
+        """Start the background flusher of the current process (idempotent, and safe to call after fork)."""
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        thread = threading.Thread(target=self._run, name="metrics-flusher", daemon=True)
+        thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except OSError:
+                logger.exception("Could not write metrics snapshot to %s", self.directory)
+
+    def stop(self) -> None:
+        """Stop the flusher after writing a final snapshot."""
+        self._stop.set()
+        self.flush()
+
+    def flush(self) -> None:
+        """Atomically write this process's snapshot."""
+        path = self.path
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(orjson.dumps({"pid": os.getpid(), "time": time.time(), "metrics": self.registry.snapshot()}))
+        os.replace(tmp, path)
+
+    def collect(self) -> dict[str, dict[str, Any]]:
+        """Return the metrics of every process that has written a snapshot, merged."""
+        self.flush()
+        snapshots = []
+        for path in self.directory.glob("*.json"):
+            try:
+                data = orjson.loads(path.read_bytes())
+            except (OSError, orjson.JSONDecodeError):
+                # Removed or replaced between glob and read
+                continue
+            snapshots.append((_pid_alive(data["pid"]), data["metrics"]))
+        return merge_snapshots(snapshots)
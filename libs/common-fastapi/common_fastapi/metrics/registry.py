@@ -0,0 +1,230 @@
+import bisect
+import math
+import threading
+from collections.abc import Callable, Iterable
+from typing import Any
+
+
+# Latency buckets in seconds, from sub-millisecond cache hits to multi-second batch requests
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = tuple[str, ...]
+
+
+class Metric:
+    """
+    Base class of a labelled metric family.
+
+    Samples are stored per tuple of label values. Updates take a lock, so metrics can be updated from
+    worker threads as well as from the event loop.
+
+    Attributes
+    ----------
+    name (str): Metric name as exposed to Prometheus.
+    documentation (str): HELP text.
+    labelnames (tuple[str, ...]): Label names; label values are passed positionally in the same order.
+
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: dict[LabelValues, Any] = {}
+
+    def samples(self) -> dict[LabelValues, Any]:
+        """Return a point-in-time copy of every sample, keyed by label values."""
+        with self._lock:
+            return {labels: self._copy(value) for labels, value in self._values.items()}
+
+    @staticmethod
+    def _copy(value: Any) -> Any:
+        return value
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the metric as a JSON-serialisable dict (used to share metrics across processes)."""
+        return {
+            "kind": self.kind,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "samples": [[list(labels), value] for labels, value in self.samples().items()],
+        }
+
+
+class Counter(Metric):
+    """Monotonically increasing counter."""
+
+    kind = "counter"
+
+    def inc(self, labels: LabelValues = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+
+class Gauge(Metric):
+    """
+    Value that can go up and down.
+
+    A gauge can also be computed on demand: `collect` is called whenever the gauge is read and returns
+    the current value per tuple of label values.
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        collect: Callable[[], dict[LabelValues, float]] | None = None,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+
+    def set(self, value: float, labels: LabelValues = ()) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, labels: LabelValues = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, labels: LabelValues = (), amount: float = 1.0) -> None:
+        self.inc(labels, -amount)
+
+    def samples(self) -> dict[LabelValues, Any]:
+        values = super().samples()
+        if self.collect is not None:
+            values.update(self.collect())
+        return values
+
+
+class Histogram(Metric):
+    """
+    Cumulative histogram with fixed bucket upper bounds.
+
+    Each sample stores per-bucket counts (the last bucket is +Inf), the sum and the count of observations.
+    Buckets are made cumulative only when the metric is rendered.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: LabelValues = ()) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            sample = self._values.get(labels)
+            if sample is None:
+                sample = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            sample[0][index] += 1
+            sample[1] += value
+            sample[2] += 1
+
+    @staticmethod
+    def _copy(value: Any) -> Any:
+        return [list(value[0]), value[1], value[2]]
+
+    def snapshot(self) -> dict[str, Any]:
+        return {**super().snapshot(), "buckets": list(self.buckets)}
+
+
+class MetricsRegistry:
+    """
+    Collection of metric families rendered together in the Prometheus text format.
+
+    The `counter`, `gauge` and `histogram` methods return the existing metric when one with the same name is
+    already registered, so modules can declare the metrics they update without coordinating.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls: type[Metric], name: str, *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(
+        self, name: str, documentation: str, labelnames: Iterable[str] = (), collect: Callable[[], dict[LabelValues, float]] | None = None
+    ) -> Gauge:
+        gauge = self._get_or_create(Gauge, name, documentation, labelnames)
+        if collect is not None:
+            gauge.collect = collect
+        return gauge
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Return every metric as JSON-serialisable data."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _format_labels(labelnames: Iterable[str], labels: Iterable[Any], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(labelnames, labels, strict=False)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render(snapshot: dict[str, dict[str, Any]]) -> str:
+    """
+    Render metric snapshots in the Prometheus text exposition format (version 0.0.4).
+
+    Args:
+    ----
+    snapshot (dict): Output of `MetricsRegistry.snapshot`, possibly merged across processes.
+
+    Returns:
+    -------
+    str: The exposition text.
+
+    """
+    lines: list[str] = []
+    for name, metric in sorted(snapshot.items()):
+        labelnames = metric["labelnames"]
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['kind']}")
+        for labels, value in sorted(metric["samples"], key=lambda sample: sample[0]):
+            if metric["kind"] != "histogram":
+                lines.append(f"{name}{_format_labels(labelnames, labels)} {_format_value(value)}")
+                continue
+            counts, total, count = value
+            cumulative = 0
+            for bound, bucket_count in zip([*metric["buckets"], math.inf], counts, strict=True):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{name}_bucket{_format_labels(labelnames, labels, le)} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{name}_count{_format_labels(labelnames, labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+# Process-wide default registry
+metrics_registry = MetricsRegistry()
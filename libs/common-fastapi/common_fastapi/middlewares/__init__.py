@@ -1,3 +1,5 @@
+from .compression import CompressionMiddleware, skip_compression
+from .concurrency_limit import AdaptiveLimit, ConcurrencyLimitMiddleware
 from .log_context import LogContextMiddleware
 from .response_time import ResponseTimeMiddleware
 from .security_headers import SecurityHeadersMiddleware
@@ -7,4 +9,8 @@ __all__ = [
     "SecurityHeadersMiddleware",
     "ResponseTimeMiddleware",
     "LogContextMiddleware",
+    "CompressionMiddleware",
+    "skip_compression",
+    "AdaptiveLimit",
+    "ConcurrencyLimitMiddleware",
 ]
@@ -0,0 +1,251 @@
+import zlib
+from collections.abc import Callable, Iterable
+from typing import TYPE_CHECKING, Any
+
+from anyio import to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+if TYPE_CHECKING:
+    brotli: Any
+    zstandard: Any
+else:
+    try:
+        import brotli
+    except ImportError:  # Optional: pip install common-fastapi[compression]
+        brotli = None
+
+    try:
+        import zstandard
+    except ImportError:  # Optional: pip install common-fastapi[compression]
+        zstandard = None
+
+
+# Content types that are already compressed, or that clients must receive byte for byte
+INCOMPRESSIBLE_CONTENT_TYPES = (
+    "image/",
+    "audio/",
+    "video/",
+    "font/woff",
+    "application/gzip",
+    "application/x-gzip",
+    "application/zip",
+    "application/zstd",
+    "application/vnd.apache.parquet",
+    "text/event-stream",
+)
+
+# Compression levels favouring speed: most responses are compressed once and sent once
+DEFAULT_LEVELS = {"zstd": 3, "br": 4, "gzip": 6}
+
+
+def skip_compression[F: Callable[..., Any]](endpoint: F) -> F:
+    """Decorator opting an endpoint out of response compression."""
+    endpoint.__skip_compression__ = True  # type: ignore[attr-defined]
+    return endpoint
+
+
+class _Gzip:
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip container
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class _Brotli:
+    def __init__(self, level: int) -> None:
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+class _Zstd:
+    def __init__(self, level: int) -> None:
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+def available_encodings() -> dict[str, type]:
+    """Supported encodings in order of preference; brotli and zstd need their optional packages."""
+    encodings: dict[str, type] = {}
+    if zstandard is not None:
+        encodings["zstd"] = _Zstd
+    if brotli is not None:
+        encodings["br"] = _Brotli
+    encodings["gzip"] = _Gzip
+    return encodings
+
+
+def negotiate(accept_encoding: str, encodings: Iterable[str]) -> str | None:
+    """
+    Pick the preferred encoding the client accepts.
+
+    Args:
+    ----
+    accept_encoding (str): The Accept-Encoding request header.
+    encodings (Iterable[str]): Supported encodings, most preferred first.
+
+    Returns:
+    -------
+    str | None: The encoding to use, or None to send the response uncompressed.
+
+    """
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip()] = q
+    wildcard = accepted.get("*", 0.0)
+    candidates = [(accepted.get(encoding, wildcard), -rank, encoding) for rank, encoding in enumerate(encodings)]
+    q, _, encoding = max(candidates, default=(0.0, 0, None))
+    return encoding if q > 0 else None
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware compressing responses with zstd, brotli or gzip, as negotiated from Accept-Encoding.
+
+    Bodies are compressed message by message as they are sent, so streamed responses stay streamed: every
+    chunk is flushed to the client as soon as it is compressed. Chunks of at least `offload_size` bytes are
+    compressed in a worker thread (the compressors release the GIL), so large bodies do not block the event loop.
+
+    Responses are sent unchanged when they answer a HEAD request, are smaller than `minimum_size`, already
+    encoded, of an incompressible content type, under one of `exclude_paths`, or served by an endpoint
+    decorated with `skip_compression`.
+
+    Attributes
+    ----------
+    app (ASGIApp): The wrapped ASGI application.
+    minimum_size (int): Smallest body, in bytes, worth compressing.
+    exclude_paths (tuple[str, ...]): Path prefixes that are never compressed.
+    levels (dict[str, int]): Compression level per encoding.
+    offload_size (int): Smallest chunk, in bytes, compressed in a worker thread.
+
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        exclude_paths: Iterable[str] = (),
+        levels: dict[str, int] | None = None,
+        offload_size: int = 64 * 1024,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.exclude_paths = tuple(exclude_paths)
+        self.levels = {**DEFAULT_LEVELS, **(levels or {})}
+        self.offload_size = offload_size
+        self.encoders = available_encodings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # A HEAD response has the headers of a GET but no body; compressing that empty body would replace its
+        # Content-Length with the size of an empty compressed stream
+        if scope["type"] != "http" or scope["method"] == "HEAD" or (self.exclude_paths and scope["path"].startswith(self.exclude_paths)):
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.encoders)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        encoder: Any = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, encoder, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                # Held back until the first body message shows whether the response is worth compressing
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                # e.g. http.response.pathsend: the server sends the file itself
+                passthrough = True
+                if start is not None:
+                    await send(start)
+                await send(message)
+                return
+
+            if encoder is None:
+                if start is None:
+                    raise RuntimeError("Response body sent before http.response.start")
+                encoder = await self._send_first_body(scope, send, start, message, encoding)
+                passthrough = encoder is None
+                return
+            await self._send_compressed(send, encoder, message)
+
+        await self.app(scope, receive, send_compressed)
+
+    async def _send_first_body(self, scope: Scope, send: Send, start: Message, message: Message, encoding: str) -> Any:
+        """Send the held back start message and the first body message; return the encoder, or None if uncompressed."""
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        headers = MutableHeaders(raw=start.setdefault("headers", []))
+        if not self._should_compress(scope, start, headers, body, more_body):
+            await send(start)
+            await send(message)
+            return None
+        encoder = self.encoders[encoding](self.levels[encoding])
+        headers["content-encoding"] = encoding
+        headers.add_vary_header("Accept-Encoding")
+        del headers["content-length"]
+        if not more_body:
+            data = await self._run(encoder.finish, body)
+            headers["content-length"] = str(len(data))
+            await send(start)
+            await send({"type": "http.response.body", "body": data})
+            return encoder
+        await send(start)
+        await self._send_compressed(send, encoder, message)
+        return encoder
+
+    async def _send_compressed(self, send: Send, encoder: Any, message: Message) -> None:
+        body = message.get("body", b"")
+        if message.get("more_body", False):
+            if body:
+                await send({"type": "http.response.body", "body": await self._run(encoder.compress, body), "more_body": True})
+        else:
+            await send({"type": "http.response.body", "body": await self._run(encoder.finish, body)})
+
+    def _should_compress(self, scope: Scope, start: Message, headers: MutableHeaders, body: bytes, more_body: bool) -> bool:
+        if start["status"] < 200 or start["status"] in (204, 304) or "content-encoding" in headers:
+            return False
+        if headers.get("content-type", "").startswith(INCOMPRESSIBLE_CONTENT_TYPES):
+            return False
+        endpoint = getattr(scope.get("route"), "endpoint", None)
+        if getattr(endpoint, "__skip_compression__", False):
+            return False
+        content_length = headers.get("content-length")
+        size = int(content_length) if content_length is not None and content_length.isdigit() else None
+        if size is None and not more_body:
+            size = len(body)
+        return size is None or size >= self.minimum_size
+
+    async def _run(self, compress: Callable[[bytes], bytes], data: bytes) -> bytes:
+        if len(data) >= self.offload_size:
+            return await to_thread.run_sync(compress, data)
+        return compress(data)
@@ -0,0 +1,207 @@
+import time
+from collections.abc import Iterable, Mapping
+
+import orjson
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from common_fastapi.exceptions.exception_5xx import ServiceOverloadedException
+from common_fastapi.metrics import metrics_registry
+
+
+GLOBAL_GROUP = "global"
+
+
+class AdaptiveLimit:
+    """
+    Concurrency limit adjusted by additive increase / multiplicative decrease (AIMD) from request latency.
+
+    Latency is judged relative to what is normal for each route, so one limit can cover fast and slow routes:
+    every completed request reports the ratio of its latency to its route's long-term average. The limit shrinks
+    by `backoff` when the smoothed ratio exceeds `tolerance`, or a request failed, at most once per request
+    round trip, so a burst of slow completions counts as one congestion signal. While latency stays normal and
+    at least half the limit is in use, it grows by about one per `limit` completed requests.
+
+    Attributes
+    ----------
+    name (str): Name of the limit in metrics.
+    limit (float): Current limit; `int(limit)` requests may run at once.
+    min_limit (int): The limit never shrinks below this.
+    max_limit (int): The limit never grows above this.
+    tolerance (float): Smoothed latency ratio above which the limit shrinks.
+    backoff (float): Factor the limit is multiplied by when it shrinks.
+    inflight (int): Requests currently holding a slot.
+    ratio (float): Smoothed latency ratio of recent requests; 1.0 means normal latency.
+
+    """
+
+    def __init__(
+        self, name: str, initial: int, min_limit: int, max_limit: int, tolerance: float = 2.0, backoff: float = 0.9, smoothing: float = 0.1
+    ) -> None:
+        self.name = name
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.smoothing = smoothing
+        self.inflight = 0
+        self.ratio = 1.0
+        self._next_decrease = 0.0
+
+    def try_acquire(self) -> bool:
+        if self.inflight >= int(self.limit):
+            return False
+        self.inflight += 1
+        return True
+
+    def release(self, ratio: float | None, latency: float, failed: bool) -> None:
+        """
+        Free a slot and adjust the limit.
+
+        Args:
+        ----
+        ratio (float | None): Latency of the request relative to its route's average; None adds no latency sample.
+        latency (float): Latency of the request in seconds.
+        failed (bool): Whether the request failed with a server error.
+
+        """
+        self.inflight -= 1
+        if ratio is not None:
+            self.ratio += self.smoothing * (ratio - self.ratio)
+        now = time.monotonic()
+        if failed or self.ratio > self.tolerance:
+            if now >= self._next_decrease:
+                self.limit = max(float(self.min_limit), self.limit * self.backoff)
+                self._next_decrease = now + latency
+        elif ratio is not None and self.inflight + 1 >= self.limit / 2:
+            self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+
+
+class ConcurrencyLimitMiddleware:
+    """
+    Pure ASGI middleware shedding load once too many requests are in flight in this worker.
+
+    Every request takes a slot of the global limit and, when its path falls under a route group, of that
+    group's limit too; both are `AdaptiveLimit`s. A request finding either limit full is rejected at once with
+    503 and Retry-After, in the same shape as `ServiceOverloadedException`, instead of queueing behind
+    requests that are already slow. Latency is measured to the start of the response, so slow clients reading
+    a stream do not count as slow service; the slot is held until the response is complete.
+
+    The limits are exported as the `concurrency_limit` and `concurrency_inflight` gauges and rejections as
+    `concurrency_rejected_total`, all labelled by group.
+
+    Attributes
+    ----------
+    app (ASGIApp): The wrapped ASGI application.
+    groups (Mapping[str, Iterable[str]]): Path prefixes per route group, each group limited separately.
+    exclude_paths (tuple[str, ...]): Path prefixes never limited, such as health checks and metrics.
+    retry_after (int): Seconds clients are asked to wait before retrying.
+
+    """
+
+    # Weight of a new latency sample in a route's long-term average; the first samples weigh more to warm it up
+    BASELINE_SMOOTHING = 0.01
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        initial_limit: int = 100,
+        min_limit: int = 10,
+        max_limit: int = 1000,
+        groups: Mapping[str, Iterable[str]] | None = None,
+        exclude_paths: Iterable[str] = ("/health", "/metrics"),
+        tolerance: float = 2.0,
+        backoff: float = 0.9,
+        retry_after: int = 1,
+    ) -> None:
+        self.app = app
+        self.exclude_paths = tuple(exclude_paths)
+        self.retry_after = retry_after
+
+        def new_limit(name: str) -> AdaptiveLimit:
+            return AdaptiveLimit(name, initial_limit, min_limit, max_limit, tolerance, backoff)
+
+        self.global_limit = new_limit(GLOBAL_GROUP)
+        self.group_limits = {name: new_limit(name) for name in (groups or {})}
+        self._prefixes = [(prefix, self.group_limits[name]) for name, prefixes in (groups or {}).items() for prefix in prefixes]
+        self._baselines: dict[str, tuple[float, int]] = {}
+
+        # The body the exception handler would render for ServiceOverloadedException, built once
+        self._reject_body = orjson.dumps({"error": ServiceOverloadedException.message, "error_code": ServiceOverloadedException.error_code})
+        self._reject_headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(self._reject_body)).encode("latin-1")),
+            (b"retry-after", str(retry_after).encode("latin-1")),
+        ]
+
+        limits = [self.global_limit, *self.group_limits.values()]
+        metrics_registry.gauge(
+            "concurrency_limit",
+            "Current adaptive concurrency limit by group",
+            ("group",),
+            collect=lambda: {(limit.name,): int(limit.limit) for limit in limits},
+        )
+        metrics_registry.gauge(
+            "concurrency_inflight",
+            "Requests holding a concurrency slot by group",
+            ("group",),
+            collect=lambda: {(limit.name,): limit.inflight for limit in limits},
+        )
+        self._rejected_total = metrics_registry.counter(
+            "concurrency_rejected_total", "Requests rejected by the concurrency limit by group", ("group",)
+        )
+
+    def group_for(self, path: str) -> AdaptiveLimit | None:
+        for prefix, limit in self._prefixes:
+            if path.startswith(prefix):
+                return limit
+        return None
+
+    def _latency_ratio(self, route: str, latency: float) -> float:
+        """Ratio of `latency` to the route's long-term average latency, which it then updates."""
+        average, count = self._baselines.get(route, (latency, 0))
+        count += 1
+        self._baselines[route] = (average + max(self.BASELINE_SMOOTHING, 1 / count) * (latency - average), count)
+        return latency / average if average > 0 else 1.0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+
+        group = self.group_for(scope["path"])
+        if not self.global_limit.try_acquire():
+            await self._reject(self.global_limit, send)
+            return
+        if group is not None and not group.try_acquire():
+            self.global_limit.release(None, 0.0, False)
+            await self._reject(group, send)
+            return
+
+        start = time.perf_counter()
+        latency: float | None = None
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal latency, status
+            if message["type"] == "http.response.start":
+                latency = time.perf_counter() - start
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            if latency is None:
+                latency = time.perf_counter() - start
+            route = getattr(scope.get("route"), "path", None)
+            ratio = None if route is None else self._latency_ratio(route, latency)
+            failed = status >= 500
+            self.global_limit.release(ratio, latency, failed)
+            if group is not None:
+                group.release(ratio, latency, failed)
+
+    async def _reject(self, limit: AdaptiveLimit, send: Send) -> None:
+        self._rejected_total.inc((limit.name,))
+        await send({"type": "http.response.start", "status": 503, "headers": self._reject_headers})
+        await send({"type": "http.response.body", "body": self._reject_body})
@@ -1,23 +1,23 @@
-from collections.abc import Awaitable, Callable
-
 from asgi_correlation_id.context import correlation_id
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from common_fastapi.config import add_to_log_context, clear_log_context
 
 
-class LogContextMiddleware(BaseHTTPMiddleware):
+class LogContextMiddleware:
     """
-    Middleware for managing logging context and correlation IDs for every HTTP request.
+    Pure ASGI middleware for managing logging context and correlation IDs for every HTTP request.
 
     This middleware clears the existing log context at the beginning of request processing,
     sets up a correlation ID in the log context, and maintains the log context until
-    after the request has been processed.
+    after the request has been processed. The endpoint runs in the same task, so context
+    variables bound here are visible to it.
     """
 
-    async def dispatch(self, request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Sets up correlation ID in the logging context and processes the request.
 
@@ -25,22 +25,20 @@ class LogContextMiddleware(BaseHTTPMiddleware):
         1. Clears the existing log context.
         2. Retrieves and sets the correlation ID in the log context.
         3. Passes the request to the next middleware or endpoint in the processing chain.
-        4. Returns the response generated by the subsequent middleware or endpoint.
 
         Args:
         ----
-        request (Request): The incoming HTTP request to process.
-        call_next (Callable): A function that processes the request and returns a response.
-
-        Returns:
-        -------
-        Response: The HTTP response resulting from processing the request.
+        scope (Scope): The ASGI connection scope.
+        receive (Receive): The ASGI receive channel.
+        send (Send): The ASGI send channel.
 
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # https://www.structlog.org/en/stable/contextvars.html
         clear_log_context()
-        req_id = correlation_id.get()
-        add_to_log_context(key="req_id", value=req_id)
+        add_to_log_context(key="req_id", value=correlation_id.get())
 
-        response = await call_next(request)
-        return response
+        await self.app(scope, receive, send)
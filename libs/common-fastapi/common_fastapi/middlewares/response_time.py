@@ -1,81 +1,124 @@
+import random
 import time
-from typing import Callable
-from collections.abc import Awaitable
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from common_fastapi._build_info import BUILD_TIME
 from common_fastapi._version import __version__
-from common_fastapi.config import get_logger
+from common_fastapi.config import app_settings, get_logger
+
+from .security_headers import replace_headers
+
 
 logger = get_logger(__name__)
 
+# Server name based on version and build time; it never changes, so it is encoded once
+SERVER_NAME_HEADER = (b"x-server-name", f"{__version__}/{BUILD_TIME}".encode("latin-1"))
+_HEADER_NAMES = frozenset({b"x-response-time", b"x-server-name"})
 
 
-class ResponseTimeMiddleware(BaseHTTPMiddleware):
+class ResponseTimeMiddleware:
     """
-    Middleware to measure and include the response time in the HTTP headers.
+    Pure ASGI middleware to measure and include the response time in the HTTP headers.
 
-    This middleware calculates the time taken to process a request and adds it to the response headers
-    as 'x-response-time' in milliseconds.
+    This middleware calculates the time taken until the response starts and adds it to the response headers
+    as 'x-response-time' in milliseconds, along with an 'x-server-name' header. Because it only wraps the
+    `send` callable, streaming responses pass through untouched.
+
+    Access logs (the REQUEST and RESPONSE lines) can be sampled by outcome, e.g. 1% of successful requests
+    and every failed one. Since the outcome is only known once the response starts, a sampled request logs
+    its REQUEST line together with its RESPONSE line, and both carry the `sample_rate` they were kept at.
+    With both rates at 1.0 the REQUEST line is logged as soon as the request arrives.
 
     Attributes
     ----------
-    None
+    app (ASGIApp): The wrapped ASGI application.
+    sample_rate (float): Fraction of requests with status < 400 that are logged.
+    error_sample_rate (float): Fraction of requests with status >= 400, or that raised, that are logged.
+
     """
 
-    async def dispatch(self, request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float = app_settings.LOG_ACCESS_SAMPLE_RATE,
+        error_sample_rate: float = app_settings.LOG_ACCESS_ERROR_SAMPLE_RATE,
+    ) -> None:
+        self.app = app
+        self.sample_rate = sample_rate
+        self.error_sample_rate = error_sample_rate
+        self.sampled = sample_rate < 1.0 or error_sample_rate < 1.0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
-        Measures the time taken to process the request and adds the response time to the headers.
+        Measures the time taken to start the response and adds the response time to the headers.
 
         Args:
         ----
-        request (Request): The incoming HTTP request object.
-        call_next (Callable): A function to process the request and return a response.
+        scope (Scope): The ASGI connection scope.
+        receive (Receive): The ASGI receive channel.
+        send (Send): The ASGI send channel.
 
-        Returns:
-        -------
-        response (Response): The HTTP response object with the response time header added.
         """
-        # Record the start time before processing the request
-        start_time = time.time()
-
-        await log_request(request)
-
-        # Call the next middleware or endpoint handler
-        response = await call_next(request)
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        # Calculate the time taken to process the request
-        process_time = time.time() - start_time
-
-        # Add the response time to the response headers in milliseconds
-        response.headers["x-response-time"] = f"{process_time * 1000:.3f}ms"
-
-        # Add server name based on version and build time
-        response.headers["x-server-name"] = f"{__version__}/{BUILD_TIME}"
-
-        await log_response(request, response, process_time)
-
-        return response
-
-
-async def log_request(request: Request) -> None:
-    client = request.client  # This can be None
+        # Record the start time before processing the request
+        start_time = time.perf_counter()
+        sampled = self.sampled
+        if not sampled:
+            log_request(scope)
+        responded = False
+
+        async def send_with_response_time(message: Message) -> None:
+            nonlocal responded
+            if message["type"] == "http.response.start":
+                responded = True
+                # Calculate the time taken to process the request
+                process_time = time.perf_counter() - start_time
+                extra = [(b"x-response-time", f"{process_time * 1000:.3f}ms".encode("latin-1")), SERVER_NAME_HEADER]
+                message["headers"] = replace_headers(message.get("headers"), extra, _HEADER_NAMES)
+                status = message["status"]
+                if not sampled:
+                    log_response(scope, status, process_time)
+                else:
+                    rate = self.error_sample_rate if status >= 400 else self.sample_rate
+                    if random.random() < rate:  # noqa: S311
+                        log_request(scope, rate)
+                        log_response(scope, status, process_time, rate)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_response_time)
+        except BaseException:
+            # The response is sent by the server error handler outside this middleware; keep the REQUEST line
+            if sampled and not responded and random.random() < self.error_sample_rate:  # noqa: S311
+                log_request(scope, self.error_sample_rate)
+            raise
+
+
+def log_request(scope: Scope, sample_rate: float | None = None) -> None:
+    client = scope.get("client")  # This can be None
     req = {
-        "method": request.method,
-        "url": str(request.url.path),
-        "remoteAddress": client.host if client else "unknown",
-        "remotePort": client.port if client else "unknown",
+        "method": scope["method"],
+        "url": scope["path"],
+        "remoteAddress": client[0] if client else "unknown",
+        "remotePort": client[1] if client else "unknown",
     }
-    logger.info("REQUEST", req=req)
+    if sample_rate is None:
+        logger.info("REQUEST", req=req)
+    else:
+        logger.info("REQUEST", req=req, sample_rate=sample_rate)
 
 
-async def log_response(request: Request, response: Response, response_time: float) -> None:
+def log_response(scope: Scope, status_code: int, response_time: float, sample_rate: float | None = None) -> None:
     res = {
-        "url": request.url.path,
-        "status_code": response.status_code,
+        "url": scope["path"],
+        "status_code": status_code,
         "response_time": response_time,
     }
-    logger.info("RESPONSE", res=res)
\ No newline at end of file
+    if sample_rate is None:
+        logger.info("RESPONSE", res=res)
+    else:
+        logger.info("RESPONSE", res=res, sample_rate=sample_rate)
@@ -1,89 +1,134 @@
-from collections.abc import Awaitable, Callable
+from collections.abc import Mapping
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+# Default CSP for paths other than '/openapi' and '/redoc'
+CSP_DEFAULT = "default-src 'self';"
+
+# Specific CSP for Swagger UI paths
+CSP_SWAGGER_UI = (
+    "default-src 'self'; "
+    "style-src 'self' https://cdn.jsdelivr.net; "
+    "script-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
+    "img-src 'self' data: https://fastapi.tiangolo.com; "
+    "connect-src 'self'; "
+    "frame-src 'self'; "
+    "frame-ancestors 'self'; "
+    "base-uri 'self';"
+)
+
+# Specific CSP for ReDoc documentation paths
+CSP_REDOC = (
+    "default-src 'self'; "
+    "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; "
+    "script-src 'self' https://cdn.jsdelivr.net; "
+    "font-src 'self' https://fonts.googleapis.com https://fonts.gstatic.com; "
+    "img-src 'self' data: https://fastapi.tiangolo.com https://cdn.redoc.ly; "
+    "connect-src 'self'; "
+    "worker-src 'self' blob:; "  # Allow workers from blob URLs
+    "frame-src 'self'; "
+    "frame-ancestors 'self'; "
+    "base-uri 'self';"
+)
+
+CSP_BY_PATH_PREFIX = {
+    "/openapi": CSP_SWAGGER_UI,
+    "/redoc": CSP_REDOC,
+}
+
+SECURITY_HEADERS = {
+    "Cross-Origin-Opener-Policy": "same-origin",  # Restrict the ability of cross-origin documents to interact with the page
+    "Cross-Origin-Resource-Policy": "same-origin",  # Restrict cross-origin resource sharing
+    "Origin-Agent-Cluster": "?1",  # Enable origin-agent-cluster
+    "Referrer-Policy": "no-referrer",  # Do not send referrer information
+    "Strict-Transport-Security": "max-age=31536000; includeSubDomains; preload",  # Enforce HTTPS for future requests
+    "X-Content-Type-Options": "nosniff",  # Prevent MIME type sniffing
+    "X-DNS-Prefetch-Control": "off",  # Disable DNS prefetching
+    "X-Download-Options": "noopen",  # Prevent downloads from being opened automatically
+    "X-Frame-Options": "DENY",  # Prevent the page from being displayed in frames
+    "X-Permitted-Cross-Domain-Policies": "none",  # Prevent Adobe Flash and Acrobat from accessing the domain
+    "X-XSS-Protection": "1; mode=block",  # Enable cross-site scripting filter
+}
+
+
+def encode_headers(headers: Mapping[str, str]) -> list[tuple[bytes, bytes]]:
+    """Encode headers once into the raw (lower-cased name, value) pairs used by ASGI messages."""
+    return [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()]
+
+
+def replace_headers(
+    headers: list[tuple[bytes, bytes]] | None, extra: list[tuple[bytes, bytes]], names: frozenset[bytes]
+) -> list[tuple[bytes, bytes]]:
+    """Return `headers` with every header named in `names` replaced by the pre-encoded `extra` headers."""
+    if not headers:
+        return list(extra)
+    return [header for header in headers if header[0].lower() not in names] + extra
+
+
+class SecurityHeadersMiddleware:
     """
-    Middleware to enforce security headers and Content Security Policy (CSP) for FastAPI applications.
+    Pure ASGI middleware to enforce security headers and Content Security Policy (CSP) for FastAPI applications.
 
     This middleware sets various security-related HTTP headers to enhance the security of the application.
     It applies a default Content Security Policy (CSP) to all routes except those starting with '/openapi'
     or '/redoc', which have specific CSPs tailored for Swagger UI and ReDoc documentation.
 
+    The complete header list for every path prefix is encoded once at start-up and spliced into the
+    `http.response.start` message, so a request costs one prefix match and one list concatenation. Headers
+    with the same name set by the endpoint are replaced, as before.
+
     Attributes
     ----------
-    csp_default (str): Default Content Security Policy applied to all paths not matching specific rules.
+    app (ASGIApp): The wrapped ASGI application.
+    csp_default (str): Default Content Security Policy applied to all paths not matching a prefix.
+    csp_by_path_prefix (Mapping[str, str]): Content Security Policy per path prefix, checked in order.
 
     """
 
-    async def dispatch(self, request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+    def __init__(
+        self,
+        app: ASGIApp,
+        csp_default: str = CSP_DEFAULT,
+        csp_by_path_prefix: Mapping[str, str] = CSP_BY_PATH_PREFIX,
+        headers: Mapping[str, str] = SECURITY_HEADERS,
+    ) -> None:
+        self.app = app
+        self._default_headers = encode_headers({"Content-Security-Policy": csp_default, **headers})
+        self._prefix_headers = [
+            (prefix, encode_headers({"Content-Security-Policy": csp, **headers})) for prefix, csp in csp_by_path_prefix.items()
+        ]
+        self._names = frozenset(name for name, _ in self._default_headers)
+
+    def headers_for(self, path: str) -> list[tuple[bytes, bytes]]:
         """
-        Processes the incoming request, applies the security headers, and returns the response.
+        Select the precomputed security headers for a request path.
 
         Args:
         ----
-        request (Request): The incoming HTTP request object.
-        call_next (Callable): A function to process the request and return a response.
+        path (str): The request path.
 
         Returns:
         -------
-        response (Response): The HTTP response object with security headers applied.
+        list[tuple[bytes, bytes]]: Encoded header pairs to add to the response.
 
         """
-        # Call the next middleware or endpoint handler
-        response = await call_next(request)
-
-        # Default CSP for paths other than '/openapi' and '/redoc'
-        csp_default = "default-src 'self';"
-
-        # Determine the CSP based on the request path
-        if request.url.path.startswith("/openapi"):
-            # Specific CSP for Swagger UI paths
-            csp = (
-                "default-src 'self'; "
-                "style-src 'self' https://cdn.jsdelivr.net; "
-                "script-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
-                "img-src 'self' data: https://fastapi.tiangolo.com; "
-                "connect-src 'self'; "
-                "frame-src 'self'; "
-                "frame-ancestors 'self'; "
-                "base-uri 'self';"
-            )
-        elif request.url.path.startswith("/redoc"):
-            # Specific CSP for ReDoc documentation paths
-            csp = (
-                "default-src 'self'; "
-                "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; "
-                "script-src 'self' https://cdn.jsdelivr.net; "
-                "font-src 'self' https://fonts.googleapis.com https://fonts.gstatic.com; "
-                "img-src 'self' data: https://fastapi.tiangolo.com https://cdn.redoc.ly; "
-                "connect-src 'self'; "
-                "worker-src 'self' blob:; "  # Allow workers from blob URLs
-                "frame-src 'self'; "
-                "frame-ancestors 'self'; "
-                "base-uri 'self';"
-            )
-        else:
-            # Apply default CSP for other paths
-            csp = csp_default
-
-        # Apply security headers to the response
-        response.headers["Content-Security-Policy"] = csp
-        response.headers["Cross-Origin-Opener-Policy"] = "same-origin"  # Restrict the ability of cross-origin documents to interact with the page
-        response.headers["Cross-Origin-Resource-Policy"] = "same-origin"  # Restrict cross-origin resource sharing
-        response.headers["Origin-Agent-Cluster"] = "?1"  # Enable origin-agent-cluster
-        response.headers["Referrer-Policy"] = "no-referrer"  # Do not send referrer information
-        response.headers["Strict-Transport-Security"] = (
-            "max-age=31536000; includeSubDomains; preload"  # Enforce HTTPS for future requests
-        )
-        response.headers["X-Content-Type-Options"] = "nosniff"  # Prevent MIME type sniffing
-        response.headers["X-DNS-Prefetch-Control"] = "off"  # Disable DNS prefetching
-        response.headers["X-Download-Options"] = "noopen"  # Prevent downloads from being opened automatically
-        response.headers["X-Frame-Options"] = "DENY"  # Prevent the page from being displayed in frames
-        response.headers["X-Permitted-Cross-Domain-Policies"] = "none"  # Prevent Adobe Flash and Acrobat from accessing the domain
-        response.headers["X-XSS-Protection"] = "1; mode=block"  # Enable cross-site scripting filter
-
-        return response
+        for prefix, headers in self._prefix_headers:
+            if path.startswith(prefix):
+                return headers
+        return self._default_headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        extra = self.headers_for(scope["path"])
+        names = self._names
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = replace_headers(message.get("headers"), extra, names)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
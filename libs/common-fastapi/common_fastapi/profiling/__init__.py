@@ -0,0 +1,17 @@
+from .endpoint import register_profiling_endpoints
+from .middleware import PROFILE_HEADER, PROFILE_ID_HEADER, ProfilingMiddleware
+from .sampler import StackSampler
+from .store import ProfileStore
+from .token import sign_profile_token, verify_profile_token
+
+
+__all__ = [
+    "ProfilingMiddleware",
+    "PROFILE_HEADER",
+    "PROFILE_ID_HEADER",
+    "ProfileStore",
+    "StackSampler",
+    "register_profiling_endpoints",
+    "sign_profile_token",
+    "verify_profile_token",
+]
@@ -0,0 +1,56 @@
+from typing import Annotated, Any
+
+from anyio import to_thread
+from fastapi import FastAPI, Header
+from fastapi.responses import Response
+
+from common_fastapi.exceptions.exception_4xx import ForbiddenException, ResourceNotFoundException
+
+from .store import ProfileStore
+from .token import verify_profile_token
+
+
+MEDIA_TYPES = {
+    "collapsed": "text/plain; charset=utf-8",
+    "prof": "application/octet-stream",
+}
+
+
+def register_profiling_endpoints(app: FastAPI, store: ProfileStore, secret: str | None, prefix: str = "/admin/profiles") -> None:
+    """
+    Add endpoints to list and download stored profiles.
+
+    Both require an `X-Profile-Token` header signed with the profiling secret (see `sign_profile_token`), and
+    refuse every request when no secret is configured.
+
+    Args:
+    ----
+    app (FastAPI): The application to add the endpoints to.
+    store (ProfileStore): The store the profiling middleware writes to.
+    secret (str | None): The profiling secret.
+    prefix (str): Path of the list endpoint; profiles are downloaded from `<prefix>/{profile_id}`.
+
+    """
+
+    def authorize(token: str | None) -> None:
+        if not verify_profile_token(secret, token):
+            raise ForbiddenException("A valid X-Profile-Token header is required")
+
+    @app.get(prefix, include_in_schema=False)
+    async def list_profiles(x_profile_token: Annotated[str | None, Header()] = None) -> list[dict[str, Any]]:
+        authorize(x_profile_token)
+        return await to_thread.run_sync(store.list)
+
+    @app.get(f"{prefix}/{{profile_id}}", include_in_schema=False)
+    async def download_profile(profile_id: str, x_profile_token: Annotated[str | None, Header()] = None) -> Response:
+        authorize(x_profile_token)
+        profile = await to_thread.run_sync(store.get, profile_id)
+        if profile is None:
+            raise ResourceNotFoundException("Profile")
+        metadata, data = profile
+        filename = f"{profile_id}.{metadata['format']}"
+        return Response(
+            data,
+            media_type=MEDIA_TYPES.get(metadata["format"], "application/octet-stream"),
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
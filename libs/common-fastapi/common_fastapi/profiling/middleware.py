@@ -0,0 +1,137 @@
+import cProfile
+import marshal
+import random
+import threading
+import time
+from collections.abc import Iterable
+from typing import Any
+
+from anyio import to_thread
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from common_fastapi.config import get_logger
+from common_fastapi.config.enums.profile_mode import ProfileMode
+
+from .sampler import StackSampler
+from .store import ProfileStore
+from .token import verify_profile_token
+
+
+logger = get_logger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware profiling selected requests into a `ProfileStore`.
+
+    A request is profiled when it carries a valid signed `X-Profile` token (see `sign_profile_token`), or when
+    its path starts with one of `routes` (any path if `routes` is empty) and it is picked at `sample_rate`.
+    Profiled responses carry an `X-Profile-Id` header naming the stored profile.
+
+    Profiles cover everything the process does while the request is in flight, including concurrent requests
+    on the same event loop, so only one request per process is profiled at a time; requests arriving meanwhile
+    are not profiled. The middleware is only installed when profiling is enabled, so it costs nothing otherwise.
+
+    Attributes
+    ----------
+    app (ASGIApp): The wrapped ASGI application.
+    store (ProfileStore): Where profiles are written.
+    secret (str | None): Secret the X-Profile tokens are signed with; header triggering is off without one.
+    sample_rate (float): Fraction of eligible requests profiled without a token.
+    routes (tuple[str, ...]): Path prefixes eligible for sampling; empty means every path.
+    mode (ProfileMode): Statistical sampling or cProfile.
+    interval (float): Seconds between stack samples in sampling mode.
+
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: ProfileStore,
+        secret: str | None = None,
+        sample_rate: float = 0.0,
+        routes: Iterable[str] = (),
+        mode: ProfileMode = ProfileMode.SAMPLE,
+        interval: float = 0.001,
+    ) -> None:
+        self.app = app
+        self.store = store
+        self.secret = secret
+        self.sample_rate = sample_rate
+        self.routes = tuple(routes)
+        self.mode = mode
+        self.interval = interval
+        self._busy = threading.Lock()
+
+    def _should_profile(self, scope: Scope) -> str | None:
+        """Return what triggered profiling of this request, or None."""
+        if self.secret:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    return "header" if verify_profile_token(self.secret, value.decode("latin-1")) else None
+        if self.sample_rate > 0 and (not self.routes or scope["path"].startswith(self.routes)) and random.random() < self.sample_rate:  # noqa: S311
+            return "sample"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trigger = self._should_profile(scope)
+        if trigger is None or not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = self.store.new_id()
+        status = 500
+
+        async def send_with_profile_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []), (PROFILE_ID_HEADER, profile_id.encode())]
+            await send(message)
+
+        profiler: Any = StackSampler(self.interval) if self.mode == ProfileMode.SAMPLE else cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            if self.mode == ProfileMode.SAMPLE:
+                profiler.start()
+            else:
+                profiler.enable()
+            try:
+                await self.app(scope, receive, send_with_profile_id)
+            finally:
+                if self.mode == ProfileMode.SAMPLE:
+                    profiler.stop()
+                else:
+                    profiler.disable()
+        finally:
+            self._busy.release()
+            # Also store profiles of requests that raised; a slow failure is as interesting as a slow success
+            route = scope.get("route")
+            metadata = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(route, "path", None),
+                "status": status,
+                "duration": time.perf_counter() - start,
+                "mode": self.mode.value,
+                "trigger": trigger,
+                "time": time.time(),
+            }
+            await to_thread.run_sync(self._save, profile_id, profiler, metadata)
+
+    def _save(self, profile_id: str, profiler: Any, metadata: dict[str, Any]) -> None:
+        try:
+            if isinstance(profiler, StackSampler):
+                self.store.save(profile_id, profiler.collapsed(), "collapsed", metadata)
+            else:
+                profiler.create_stats()
+                # The format written by pstats.Stats.dump_stats, readable by pstats, snakeviz and flameprof
+                self.store.save(profile_id, marshal.dumps(profiler.stats), "prof", metadata)
+        except OSError:
+            logger.exception("Could not store profile", profile_id=profile_id)
@@ -0,0 +1,68 @@
+import sys
+import threading
+from collections import Counter
+from types import FrameType
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    # The last two path components identify the module without the environment-specific prefix
+    filename = "/".join(code.co_filename.rsplit("/", 2)[-2:])
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})"
+
+
+def _is_idle(frame: FrameType) -> bool:
+    # Idle pool workers and background threads sit in threading.Condition.wait
+    return frame.f_code.co_name == "wait" and frame.f_code.co_filename.endswith("threading.py")
+
+
+class StackSampler:
+    """
+    Statistical profiler sampling the Python stack of every busy thread at a fixed interval.
+
+    Samples are aggregated as collapsed stacks (`thread;outer;...;inner count` per line), the input format of
+    flamegraph.pl and speedscope. Threads that are idle waiting on a condition are skipped, except the thread
+    that started the sampler (the event loop), whose idle time is shown waiting in the selector.
+
+    Attributes
+    ----------
+    interval (float): Seconds between samples.
+    samples (Counter[str]): Sample count per collapsed stack.
+
+    """
+
+    def __init__(self, interval: float = 0.001) -> None:
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._main_thread = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Counter[str]:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (ident != self._main_thread and _is_idle(frame)):
+                    continue
+                stack = []
+                current: FrameType | None = frame
+                while current is not None:
+                    stack.append(_frame_label(current))
+                    current = current.f_back
+                if ident not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stack.append(names.get(ident, str(ident)))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> bytes:
+        """Return the samples as collapsed stacks, one `stack count` line each."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common()).encode()
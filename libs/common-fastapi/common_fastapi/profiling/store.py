@@ -0,0 +1,75 @@
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import orjson
+
+
+# Profile ids are generated by ProfileStore.new_id; anything else is rejected before touching the filesystem
+PROFILE_ID_PATTERN = re.compile(r"^\d{13}-\d+-\d+$")
+
+
+class ProfileStore:
+    """
+    Bounded on-disk ring of request profiles.
+
+    Each profile is a data file (`<id>.collapsed` or `<id>.prof`) plus a `<id>.json` metadata file. Ids start with
+    a millisecond timestamp, so sorting them sorts profiles by age; once more than `max_profiles` are stored,
+    the oldest are deleted. Several worker processes can share one directory.
+
+    Attributes
+    ----------
+    directory (Path): Directory the profiles are written to.
+    max_profiles (int): Number of profiles kept.
+
+    """
+
+    def __init__(self, directory: Path, max_profiles: int = 50) -> None:
+        self.directory = directory
+        self.max_profiles = max_profiles
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def new_id(self) -> str:
+        with self._lock:
+            self._counter += 1
+            return f"{int(time.time() * 1000):013d}-{os.getpid()}-{self._counter}"
+
+    def save(self, profile_id: str, data: bytes, extension: str, metadata: dict[str, Any]) -> None:
+        """Write a profile and its metadata, then evict the oldest profiles beyond `max_profiles`."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / f"{profile_id}.{extension}").write_bytes(data)
+        # The metadata file is written last; list() only shows complete profiles
+        tmp = self.directory / f"{profile_id}.json.tmp"
+        tmp.write_bytes(orjson.dumps({"id": profile_id, "format": extension, "size": len(data), **metadata}))
+        os.replace(tmp, self.directory / f"{profile_id}.json")
+        self._evict()
+
+    def _evict(self) -> None:
+        for path in sorted(self.directory.glob("*.json"))[: -self.max_profiles]:
+            for stale in self.directory.glob(f"{path.stem}.*"):
+                stale.unlink(missing_ok=True)
+
+    def list(self) -> list[dict[str, Any]]:
+        """Return the metadata of every stored profile, newest first."""
+        profiles = []
+        for path in sorted(self.directory.glob("*.json"), reverse=True):
+            try:
+                profiles.append(orjson.loads(path.read_bytes()))
+            except (OSError, orjson.JSONDecodeError):
+                # Evicted by another process while listing
+                continue
+        return profiles
+
+    def get(self, profile_id: str) -> tuple[dict[str, Any], bytes] | None:
+        """Return the metadata and data of a profile, or None if it does not exist (anymore)."""
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        try:
+            metadata = orjson.loads((self.directory / f"{profile_id}.json").read_bytes())
+            return metadata, (self.directory / f"{profile_id}.{metadata['format']}").read_bytes()
+        except (OSError, orjson.JSONDecodeError):
+            return None
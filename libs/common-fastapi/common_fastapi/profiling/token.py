@@ -0,0 +1,32 @@
+import hashlib
+import hmac
+import time
+
+
+def sign_profile_token(secret: str, ttl: float = 300.0) -> str:
+    """
+    Create a token that authorizes profiling requests and reading profiles until it expires.
+
+    Args:
+    ----
+    secret (str): The shared PROFILING_SECRET.
+    ttl (float): Seconds until the token expires.
+
+    Returns:
+    -------
+    str: The token, `<expiry epoch seconds>.<hex HMAC-SHA256 of the expiry>`.
+
+    """
+    expires = str(int(time.time() + ttl))
+    return f"{expires}.{hmac.new(secret.encode(), expires.encode(), hashlib.sha256).hexdigest()}"
+
+
+def verify_profile_token(secret: str | None, token: str | None) -> bool:
+    """Check that a token was signed with `secret` and has not expired; always False without a secret."""
+    if not secret or not token:
+        return False
+    expires, _, signature = token.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    expected = hmac.new(secret.encode(), expires.encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(signature, expected)
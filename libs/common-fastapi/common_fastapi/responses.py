@@ -0,0 +1,95 @@
+import functools
+import inspect
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+import pydantic_core
+from fastapi import Response
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Name of the parameter through which trusted endpoints receive FastAPI's sub-response
+_SUB_RESPONSE = "trusted_sub_response"
+
+
+def dump_json(content: Any) -> bytes:
+    """
+    Serialize `content` to JSON in one pass, without validating it.
+
+    Pydantic (and SQLModel) objects are serialized by their own compiled serializers, in Rust, straight to
+    bytes. orjson cannot serialize them without a Python callback per object, which makes it slower here.
+    """
+    return pydantic_core.to_json(content)
+
+
+class TrustedJSONResponse(Response):
+    """JSON response rendered by `dump_json`: objects are serialized as they are, without validation."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
+
+def trusted_response(status_code: int = 200) -> Callable[[F], F]:
+    """
+    Decorator serializing the return value of an endpoint once, straight to JSON bytes.
+
+    FastAPI validates the return value against `response_model` and dumps it to Python objects before
+    rendering them, even when the endpoint returns models that were validated when they were built, such as
+    repository entities. Put this decorator below the route decorator to skip both steps: the return value
+    is rendered by `dump_json` and returned as a response, which FastAPI passes through. `response_model`
+    still documents the endpoint in the OpenAPI schema.
+
+    The endpoint is trusted to return objects of the shape `response_model` describes: every field of the
+    returned models is serialized (by alias, as FastAPI does), and `response_model_exclude_*`/`include`
+    options do not apply. Status code and headers set on an injected `Response` parameter are applied as usual.
+    Combine it with `cache_response` in either order.
+
+    Args:
+    ----
+    status_code (int): Status code of the response; must match the status code of the route.
+
+    Returns:
+    -------
+    Callable[[F], F]: The decorator.
+
+    """
+
+    def decorator(endpoint: F) -> F:
+        signature = inspect.signature(endpoint)
+        # FastAPI injects its sub-response into a single `Response` parameter: the endpoint's own, or one added here
+        own = next((name for name, param in signature.parameters.items() if param.annotation is Response), None)
+        name = own or _SUB_RESPONSE
+
+        def respond(content: Any, sub_response: Response) -> Any:
+            if isinstance(content, Response):
+                return content
+            response = TrustedJSONResponse(content, status_code=sub_response.status_code or status_code)
+            response.headers.raw.extend(
+                (header, value) for header, value in sub_response.headers.raw if header not in (b"content-length", b"content-type")
+            )
+            return response
+
+        if inspect.iscoroutinefunction(endpoint):
+
+            @functools.wraps(endpoint)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                sub_response = kwargs[name] if own else kwargs.pop(name)
+                return respond(await endpoint(*args, **kwargs), sub_response)
+
+        else:
+
+            @functools.wraps(endpoint)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                sub_response = kwargs[name] if own else kwargs.pop(name)
+                return respond(endpoint(*args, **kwargs), sub_response)
+
+        if own is None:
+            parameters = [*signature.parameters.values(), inspect.Parameter(name, inspect.Parameter.KEYWORD_ONLY, annotation=Response)]
+            # Keyword-only parameters go before **kwargs
+            wrapper.__signature__ = signature.replace(parameters=sorted(parameters, key=lambda param: param.kind))  # type: ignore[attr-defined]
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
@@ -0,0 +1,346 @@
+"""
+Production server: a pre-forking supervisor running uvicorn workers.
+
+Run from the application directory:
+
+    python -m common_fastapi.server app.main:app [--host 0.0.0.0] [--port 8000] [--workers N]
+
+The supervisor imports the application once, builds the eager services of `service_registry` (e.g. loading
+a model), calls `gc.freeze()` and then forks the workers. The workers share the imported modules and the
+preloaded services with the supervisor copy-on-write, instead of each holding a private copy, and start
+serving without loading them again. Each worker runs uvicorn with uvloop and httptools when they are
+installed (the `server` extra) on the socket bound by the supervisor.
+
+The worker count defaults to the CPUs available to the process, honouring CPU affinity and the container's
+cgroup CPU quota; the workers read it with `server_workers()` to divide resources. The supervisor restarts
+workers that exit; workers exit on their own, gracefully, after SERVER_MAX_REQUESTS requests (plus a random
+jitter so they do not all restart at once). Signals:
+- SIGTERM, SIGINT: stop the workers gracefully, waiting up to SERVER_GRACEFUL_TIMEOUT seconds, and exit.
+- SIGHUP: replace every worker with a fresh one, one at a time.
+"""
+
+import argparse
+import gc
+import math
+import os
+import random
+import signal
+import socket
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import uvicorn
+from uvicorn.importer import import_from_string
+
+from .config import get_logger
+from .config.settings import app_settings
+from .service_registry import service_registry
+
+
+logger = get_logger(__name__)
+
+# Exit code of a worker whose application failed to start; restarting it would fail the same way
+STARTUP_FAILURE = 3
+# Environment variable through which the workers learn how many they are: "<supervisor pid>:<workers>"
+WORKERS_ENV = "COMMON_FASTAPI_SERVER_WORKERS"
+
+
+def available_cpus() -> int:
+    """CPUs this process may use: its CPU affinity, capped by the cgroup (v2 or v1) CPU quota of the container."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on macOS
+        cpus = os.cpu_count() or 1
+    quota = None
+    try:
+        limit, period = Path("/sys/fs/cgroup/cpu.max").read_text(encoding="ascii").split()
+        if limit != "max":
+            quota = int(limit) / int(period)
+    except (OSError, ValueError):
+        try:
+            quota_us = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us").read_text(encoding="ascii"))
+            period_us = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us").read_text(encoding="ascii"))
+            if quota_us > 0:
+                quota = quota_us / period_us
+        except (OSError, ValueError):
+            pass
+    if quota is not None:
+        cpus = min(cpus, math.ceil(quota))
+    return max(1, cpus)
+
+
+def server_workers() -> int | None:
+    """
+    Worker count of the server, in its supervisor and workers, for dividing resources; None in any other process.
+
+    Processes spawned by a worker, such as process jobs, inherit the environment variable but are not workers.
+    """
+    supervisor, _, workers = os.environ.get(WORKERS_ENV, "").partition(":")
+    if supervisor not in (str(os.getpid()), str(os.getppid())):
+        return None
+    return int(workers)
+
+
+def clear_metrics_dir() -> None:
+    """Empty METRICS_MULTIPROC_DIR, so counters of a previous server run are not carried over."""
+    if not app_settings.METRICS_MULTIPROC_DIR:
+        return
+    directory = Path(app_settings.METRICS_MULTIPROC_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    for path in directory.glob("*.json"):
+        path.unlink(missing_ok=True)
+    for path in directory.glob("*.tmp"):
+        path.unlink(missing_ok=True)
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class Supervisor:
+    """
+    Forks, watches and replaces the uvicorn worker processes of one server.
+
+    Attributes
+    ----------
+    config (uvicorn.Config): Configuration shared by every worker; its app is already imported.
+    sock (socket.socket): Listening socket inherited by the workers.
+    workers (int): Number of worker processes.
+    max_requests (int): Requests after which a worker exits and is replaced; 0 means never.
+    max_requests_jitter (int): Upper bound of the random number of requests added to `max_requests` per worker.
+    graceful_timeout (float): Seconds workers get to finish in-flight requests when stopping.
+
+    """
+
+    def __init__(
+        self, config: uvicorn.Config, sock: socket.socket, workers: int, max_requests: int, max_requests_jitter: int, graceful_timeout: float
+    ) -> None:
+        self.config = config
+        self.sock = sock
+        self.workers = workers
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.children: dict[int, float] = {}  # pid -> start time
+        self._retiring: set[int] = set()
+        self._stopping = False
+        self._reload = False
+        self._stop_signal: int | None = None
+        self._exit_code = 0
+
+    def spawn(self) -> int:
+        pid = os.fork()
+        if pid:
+            self.children[pid] = time.monotonic()
+            return pid
+        self._run_worker()  # never returns
+        return 0
+
+    def _run_worker(self) -> None:
+        code = 1
+        try:
+            for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGCHLD):
+                signal.signal(sig, signal.SIG_DFL)
+            gc.enable()
+            if self.max_requests:
+                self.config.limit_max_requests = self.max_requests + random.randint(0, self.max_requests_jitter)  # noqa: S311
+            server = uvicorn.Server(self.config)
+            server.run(sockets=[self.sock])
+            code = 0 if server.started else STARTUP_FAILURE
+        except BaseException:  # pylint: disable=broad-except
+            logger.exception("Worker crashed")
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_reload)
+        for _ in range(self.workers):
+            self.spawn()
+        logger.info("Started workers", workers=self.workers, pids=sorted(self.children))
+
+        while not self._stopping:
+            self._reap()
+            if self._reload:
+                self._reload = False
+                logger.info("Replacing workers", signal=signal.SIGHUP.name)
+                self._replace_all()
+            while not self._stopping and len(self.children) < self.workers:
+                self.spawn()
+            time.sleep(0.2)
+
+        if self._stop_signal is not None:
+            logger.info("Stopping server", signal=signal.Signals(self._stop_signal).name)
+        self._stop_children()
+        return self._exit_code
+
+    # The signal handlers only set flags for the supervision loop: a handler runs between two bytecodes of
+    # whatever the main thread was doing, which may be logging while holding the lock of the log queue or stream
+
+    def _on_stop(self, signum: int, _: Any) -> None:
+        self._stop_signal = signum
+        self._stopping = True
+
+    def _on_reload(self, *_: Any) -> None:
+        self._reload = True
+
+    def _reap(self) -> list[int]:
+        exited = []
+        while self.children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                break
+            self.children.pop(pid, None)
+            exited.append(pid)
+            code = os.waitstatus_to_exitcode(status)
+            if pid in self._retiring:
+                # Stopped by us; uvicorn re-raises the SIGTERM it handled, so the exit code tells nothing
+                self._retiring.discard(pid)
+            elif code == STARTUP_FAILURE:
+                logger.error("Worker failed to start, stopping server", pid=pid)
+                self._stopping = True
+                self._exit_code = STARTUP_FAILURE
+            elif code != 0 and not self._stopping:
+                logger.warning("Worker exited unexpectedly, restarting it", pid=pid, exit_code=code)
+            elif not self._stopping:
+                logger.info("Worker recycled", pid=pid)
+        return exited
+
+    def _replace_all(self) -> None:
+        """Replace every worker with a fresh one, starting each replacement before stopping the old worker."""
+        for pid in list(self.children):
+            self.spawn()
+            self._terminate([pid])
+            if self._stopping:
+                return
+
+    def _terminate(self, pids: list[int]) -> None:
+        self._retiring.update(pids)
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        remaining = set(pids)
+        while remaining and time.monotonic() < deadline:
+            remaining.difference_update(self._reap())
+            remaining.intersection_update(self.children)
+            time.sleep(0.05)
+        for pid in remaining:
+            logger.warning("Worker did not stop in time, killing it", pid=pid)
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        for pid in remaining:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+            self.children.pop(pid, None)
+            self._retiring.discard(pid)
+
+    def _stop_children(self) -> None:
+        self._terminate(list(self.children))
+        logger.info("Server stopped")
+
+
+def serve(
+    app: str,
+    host: str = "0.0.0.0",  # noqa: S104
+    port: int = 8000,
+    workers: int | None = None,
+    preload: bool = app_settings.SERVICES_PRELOAD,
+    backlog: int = 2048,
+    max_requests: int = app_settings.SERVER_MAX_REQUESTS,
+    max_requests_jitter: int = app_settings.SERVER_MAX_REQUESTS_JITTER,
+    graceful_timeout: float = app_settings.SERVER_GRACEFUL_TIMEOUT,
+) -> int:
+    """
+    Run the application with pre-forked uvicorn workers until stopped.
+
+    Args:
+    ----
+    app (str): Import string of the ASGI application, e.g. "app.main:app".
+    host (str): Interface to bind.
+    port (int): Port to bind.
+    workers (int | None): Number of worker processes; defaults to SERVER_WORKERS, or the available CPUs.
+    preload (bool): Whether eager services are built in the supervisor, to be shared by every worker.
+    backlog (int): Maximum number of pending connections.
+    max_requests (int): Requests after which a worker is replaced; 0 means never.
+    max_requests_jitter (int): Random extra requests per worker, so workers are not replaced all at once.
+    graceful_timeout (float): Seconds workers get to finish in-flight requests when stopping.
+
+    Returns:
+    -------
+    int: The exit code of the server.
+
+    """
+    workers = workers or app_settings.SERVER_WORKERS or available_cpus()
+    # Before the app is imported, so whatever it sizes by server_workers(), in the supervisor or a worker, sees it
+    os.environ[WORKERS_ENV] = f"{os.getpid()}:{workers}"
+    clear_metrics_dir()
+
+    # Nothing the supervisor allocates from here on is ever freed, so collections would only dirty shared pages
+    gc.disable()
+    asgi_app = import_from_string(app)
+    if preload:
+        service_registry.preload()
+    # Move every object allocated so far out of the collector's reach: collections in the workers then never
+    # write to these objects' headers, and the pages holding them stay shared
+    gc.freeze()
+
+    config = uvicorn.Config(
+        asgi_app,
+        loop="auto",  # uvloop when installed
+        http="auto",  # httptools when installed
+        lifespan="on",
+        log_config=None,  # Logging is configured by create_app
+        access_log=False,  # Requests are logged by ResponseTimeMiddleware
+        server_header=False,
+        proxy_headers=True,
+        timeout_graceful_shutdown=math.ceil(graceful_timeout),  # uvicorn takes whole seconds
+    )
+    sock = bind_socket(host, port, backlog)
+    logger.info(
+        "Starting server",
+        app=app,
+        address=f"{host}:{port}",
+        workers=workers,
+        preloaded=sorted(service_registry.built()),
+        frozen_objects=gc.get_freeze_count(),
+    )
+    try:
+        return Supervisor(config, sock, workers, max_requests, max_requests_jitter, graceful_timeout).run()
+    finally:
+        sock.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("app", help="Import string of the ASGI application, e.g. app.main:app")
+    parser.add_argument("--host", default="0.0.0.0")  # noqa: S104
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, help="Worker processes (default: SERVER_WORKERS, or the available CPUs)")
+    parser.add_argument("--no-preload", dest="preload", action="store_false", help="Build eager services in every worker instead")
+    parser.set_defaults(preload=app_settings.SERVICES_PRELOAD)
+    parser.add_argument("--backlog", type=int, default=2048)
+    args = parser.parse_args(argv)
+    sys.path.insert(0, os.getcwd())
+    sys.exit(serve(args.app, args.host, args.port, args.workers, args.preload, args.backlog))
+
+
+if __name__ == "__main__":
+    main()
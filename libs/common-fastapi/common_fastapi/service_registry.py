@@ -0,0 +1,120 @@
+import inspect
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from anyio import to_thread
+
+from .config import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class ServiceRegistry:
+    """
+    Registry of lazily constructed, application-wide services.
+
+    Routers register a factory per service instead of constructing the service at import time, and receive it
+    through `dependency`. Importing a router therefore only imports what its route definitions need; the
+    service module (and the heavy libraries behind it) is imported when the service is first built.
+
+    Services registered with `eager=True` are built by `startup`, called from the application lifespan, so
+    expensive construction (loading a model, opening a connection pool) happens before the first request.
+    The others are built on first use, in a worker thread. `shutdown` releases every built service, in reverse
+    order of construction, through its `shutdown`, `close` or `aclose` method.
+    """
+
+    def __init__(self) -> None:
+        self._factories: dict[str, Callable[[], Any]] = {}
+        self._eager: set[str] = set()
+        self._services: dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.build_seconds: dict[str, float] = {}
+
+    def register(self, name: str, factory: Callable[[], Any], eager: bool = False) -> None:
+        """
+        Register the factory of a service.
+
+        Args:
+        ----
+        name (str): Unique service name.
+        factory (Callable[[], Any]): Builds the service. Import heavy modules inside it, not at module level.
+        eager (bool): Build the service at startup rather than on first use.
+
+        """
+        self._factories[name] = factory
+        if eager:
+            self._eager.add(name)
+
+    def get(self, name: str) -> Any:
+        """Return the service, building it on first use (blocking; prefer `dependency` in endpoints)."""
+        service = self._services.get(name)
+        if service is not None:
+            return service
+        with self._lock:
+            if name not in self._services:
+                start = time.perf_counter()
+                self._services[name] = self._factories[name]()
+                self.build_seconds[name] = time.perf_counter() - start
+                logger.info("Built service", service=name, seconds=round(self.build_seconds[name], 3))
+            return self._services[name]
+
+    def dependency(self, name: str) -> Callable[[], Any]:
+        """
+        Return a FastAPI dependency resolving to the service.
+
+        Once built, the service is returned without leaving the event loop; the first build runs in a worker thread.
+        """
+
+        async def resolve() -> Any:
+            service = self._services.get(name)
+            if service is None:
+                service = await to_thread.run_sync(self.get, name)
+            return service
+
+        return resolve
+
+    def built(self) -> list[str]:
+        """Names of the services built so far, in order of construction."""
+        return list(self._services)
+
+    def preload(self) -> None:
+        """
+        Build the eager services in the calling thread, before any event loop runs.
+
+        The production server calls this before forking its workers, so they share the services built once by
+        the parent instead of each building its own; `startup` then finds them already built.
+        """
+        for name in self._factories:
+            if name in self._eager:
+                self.get(name)
+
+    async def startup(self, preload: bool = True) -> None:
+        """Build the eager services; with `preload=False` every service is built on first use instead."""
+        if not preload:
+            return
+        for name in self._factories:
+            if name in self._eager:
+                await to_thread.run_sync(self.get, name)
+
+    async def shutdown(self) -> None:
+        """Release every built service, most recently built first, and forget it."""
+        while self._services:
+            name, service = self._services.popitem()
+            for method in ("shutdown", "close", "aclose"):
+                release = getattr(service, method, None)
+                if release is None:
+                    continue
+                try:
+                    result = release()
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception:  # pylint: disable=broad-except
+                    logger.exception("Failed to shut down service", service=name)
+                break
+
+
+# Process-wide default registry, managed by the lifespan of create_app
+service_registry = ServiceRegistry()
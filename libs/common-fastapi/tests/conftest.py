@@ -0,0 +1,69 @@
+import asyncio
+import os
+import tempfile
+from collections.abc import Awaitable, Callable, Iterable
+from pathlib import Path
+
+import pytest
+from starlette.types import ASGIApp, Message
+
+
+# common_fastapi reads its settings from .env.development in the working directory when it is imported. Every
+# library setting has a default, so the tests run from an empty one.
+_ENV_DIR = tempfile.mkdtemp(prefix="common-fastapi-tests-")
+Path(_ENV_DIR, ".env.development").touch()
+os.chdir(_ENV_DIR)
+
+
+class Response:
+    """Status, headers and body of a response collected from an ASGI application."""
+
+    def __init__(self, status: int, headers: list[tuple[bytes, bytes]], body: bytes) -> None:
+        self.status = status
+        self.headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in headers}
+        self.body = body
+
+
+async def asgi_get(app: ASGIApp, path: str, query: str = "", headers: Iterable[tuple[str, str]] = (), method: str = "GET") -> Response:
+    """Send a request without a body (GET by default) straight to an ASGI application, without a server or an HTTP client."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers],
+        "client": ("127.0.0.1", 50000),
+        "server": ("test", 80),
+    }
+    messages: list[Message] = []
+    requested = False
+    finished = asyncio.Event()
+
+    async def receive() -> Message:
+        nonlocal requested
+        if requested:
+            # Like a server, report the disconnect only once the response is over; streaming responses listen for it
+            await finished.wait()
+            return {"type": "http.disconnect"}
+        requested = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        messages.append(message)
+        if message["type"] == "http.response.body" and not message.get("more_body", False):
+            finished.set()
+
+    await app(scope, receive, send)
+    start = next(message for message in messages if message["type"] == "http.response.start")
+    body = b"".join(message.get("body", b"") for message in messages if message["type"] == "http.response.body")
+    return Response(start["status"], start.get("headers", []), body)
+
+
+@pytest.fixture
+def get() -> Callable[..., Awaitable[Response]]:
+    return asgi_get
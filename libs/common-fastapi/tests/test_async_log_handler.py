@@ -0,0 +1,20 @@
+import io
+import logging
+
+import pytest
+
+from common_fastapi.config import async_log_handler
+from common_fastapi.config.async_log_handler import AsyncBytesWriter, AsyncLogHandler
+from common_fastapi.metrics import metrics_registry
+
+
+def test_log_queue_size_reports_every_queue(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(async_log_handler, "_queue_sizes", {})
+    # Both queues exist in the fast log profile with LOG_ASYNC
+    handler = AsyncLogHandler(logging.NullHandler())
+    writer = AsyncBytesWriter(io.BytesIO())
+    handler.queue.put_nowait(logging.makeLogRecord({}))
+    handler.queue.put_nowait(logging.makeLogRecord({}))
+    writer.queue.put_nowait(b"line\n")
+    gauge = metrics_registry.gauge("log_queue_size", "Log records waiting for the writer thread by queue", ("queue",))
+    assert gauge.samples() == {("logging",): 2, ("structlog",): 1}
@@ -0,0 +1,215 @@
+import asyncio
+from typing import Any
+
+import pytest
+from fastapi import FastAPI
+
+from common_fastapi.cache import MemoryCacheBackend, ResponseCache, ResponseCacheMiddleware, cache_response, coalesce_requests
+from common_fastapi.coalescing import SingleFlight, coalesce
+
+
+class Call:
+    """Call counting its runs, which wait for `release` before returning or raising `error`."""
+
+    def __init__(self, error: Exception | None = None) -> None:
+        self.runs = 0
+        self.error = error
+        self.release = asyncio.Event()
+
+    async def __call__(self) -> dict[str, int]:
+        self.runs += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return {"run": self.runs}
+
+
+async def settle() -> None:
+    """Let the tasks started so far reach their first await."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_followers_share_the_leaders_result() -> None:
+    async def scenario() -> None:
+        flights = SingleFlight("test")
+        call = Call()
+        tasks = [asyncio.create_task(flights.run("key", call)) for _ in range(5)]
+        await settle()
+        assert flights.in_flight("key")
+        call.release.set()
+        results = await asyncio.gather(*tasks)
+        assert call.runs == 1
+        assert all(result is results[0] for result in results)
+        assert not flights.in_flight("key")
+        # Nothing is kept once the call returned
+        assert await flights.run("key", call) == {"run": 2}
+
+    asyncio.run(scenario())
+
+
+def test_different_keys_do_not_share() -> None:
+    async def scenario() -> None:
+        flights = SingleFlight("test")
+        call = Call()
+        call.release.set()
+        assert await asyncio.gather(flights.run("a", call), flights.run("b", call)) == [{"run": 1}, {"run": 2}]
+
+    asyncio.run(scenario())
+
+
+def test_a_follower_runs_the_call_again_when_the_leader_is_cancelled() -> None:
+    async def scenario() -> None:
+        flights = SingleFlight("test")
+        call = Call()
+        leader = asyncio.create_task(flights.run("key", call))
+        await settle()
+        followers = [asyncio.create_task(flights.run("key", call)) for _ in range(3)]
+        await settle()
+        leader.cancel()
+        await settle()
+        call.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        results = await asyncio.gather(*followers)
+        # One follower took the lead; the others shared its result
+        assert call.runs == 2
+        assert results == [{"run": 2}] * 3
+
+    asyncio.run(scenario())
+
+
+def test_a_cancelled_follower_does_not_cancel_the_flight() -> None:
+    async def scenario() -> None:
+        flights = SingleFlight("test")
+        call = Call()
+        leader = asyncio.create_task(flights.run("key", call))
+        await settle()
+        follower = asyncio.create_task(flights.run("key", call))
+        await settle()
+        follower.cancel()
+        call.release.set()
+        assert await leader == {"run": 1}
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+
+    asyncio.run(scenario())
+
+
+def test_the_leaders_exception_is_raised_to_every_caller() -> None:
+    async def scenario() -> None:
+        flights = SingleFlight("test")
+        call = Call(ValueError("backend down"))
+        tasks = [asyncio.create_task(flights.run("key", call)) for _ in range(3)]
+        await settle()
+        call.release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert call.runs == 1
+        assert all(isinstance(result, ValueError) and str(result) == "backend down" for result in results)
+        assert not flights.in_flight("key")
+
+    asyncio.run(scenario())
+
+
+def test_coalesce_decorator_keys_calls_by_their_arguments() -> None:
+    class Service:
+        def __init__(self) -> None:
+            self.reads: list[int] = []
+
+        @coalesce()
+        async def read(self, uid: int) -> dict[str, int]:
+            self.reads.append(uid)
+            await asyncio.sleep(0.01)
+            return {"uid": uid}
+
+    async def scenario() -> None:
+        service = Service()
+        results = await asyncio.gather(service.read(1), service.read(1), service.read(uid=1), service.read(2))
+        assert results == [{"uid": 1}, {"uid": 1}, {"uid": 1}, {"uid": 2}]
+        # Positional and keyword arguments make different keys
+        assert sorted(service.reads) == [1, 1, 2]
+
+    asyncio.run(scenario())
+
+
+def test_coalesce_rejects_functions_that_are_not_coroutine_functions() -> None:
+    def read() -> None:
+        pass
+
+    with pytest.raises(TypeError, match="coroutine functions"):
+        coalesce()(read)
+
+
+# ---------------------------------------------------------------------------
+# Middleware
+# ---------------------------------------------------------------------------
+
+
+def make_app() -> tuple[FastAPI, dict[str, int]]:
+    calls = {"cached": 0, "coalesced": 0, "failing": 0}
+    app = FastAPI()
+
+    @app.get("/cached")
+    @cache_response(ttl=60)
+    async def cached() -> dict[str, int]:
+        calls["cached"] += 1
+        await asyncio.sleep(0.05)
+        return {"calls": calls["cached"]}
+
+    @app.get("/coalesced")
+    @coalesce_requests()
+    async def coalesced() -> dict[str, int]:
+        calls["coalesced"] += 1
+        await asyncio.sleep(0.05)
+        return {"calls": calls["coalesced"]}
+
+    @app.get("/failing")
+    @cache_response(ttl=60)
+    async def failing() -> dict[str, int]:
+        calls["failing"] += 1
+        await asyncio.sleep(0.05)
+        if calls["failing"] == 1:
+            raise RuntimeError("First call fails")
+        return {"calls": calls["failing"]}
+
+    app.add_middleware(ResponseCacheMiddleware, cache=ResponseCache(MemoryCacheBackend()))
+    return app, calls
+
+
+def test_middleware_answers_concurrent_misses_with_one_response(get: Any) -> None:
+    app, calls = make_app()
+
+    async def scenario() -> None:
+        responses = await asyncio.gather(*(get(app, "/cached") for _ in range(4)))
+        assert sorted(response.headers["x-cache"] for response in responses) == ["COALESCED", "COALESCED", "COALESCED", "MISS"]
+        assert {response.body for response in responses} == {b'{"calls":1}'}
+        assert (await get(app, "/cached")).headers["x-cache"] == "HIT"
+        assert calls["cached"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_middleware_coalesces_uncached_endpoints_without_storing(get: Any) -> None:
+    app, calls = make_app()
+
+    async def scenario() -> None:
+        responses = await asyncio.gather(*(get(app, "/coalesced") for _ in range(3)))
+        assert sorted(response.headers["x-cache"] for response in responses) == ["COALESCED", "COALESCED", "MISS"]
+        assert (await get(app, "/coalesced")).headers["x-cache"] == "MISS"
+        assert calls["coalesced"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_followers_of_a_failed_request_are_answered_on_their_own(get: Any) -> None:
+    app, calls = make_app()
+
+    async def scenario() -> None:
+        responses = await asyncio.gather(*(get(app, "/failing") for _ in range(3)), return_exceptions=True)
+        failed = [response for response in responses if isinstance(response, Exception)]
+        answered = [response for response in responses if not isinstance(response, Exception)]
+        assert [str(exc) for exc in failed] == ["First call fails"]
+        assert [response.status for response in answered] == [200, 200]
+        assert calls["failing"] == 3
+
+    asyncio.run(scenario())
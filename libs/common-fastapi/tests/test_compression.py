@@ -0,0 +1,149 @@
+import asyncio
+import zlib
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+import brotli
+import pytest
+import zstandard
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.types import Message, Receive, Scope, Send
+
+from common_fastapi.middlewares import CompressionMiddleware, skip_compression
+from common_fastapi.middlewares.compression import negotiate
+
+
+BODY = "solar panel " * 500
+
+# Incremental decoders, so every streamed chunk can be checked to be decodable on its own
+DECODERS: dict[str, Callable[[], Callable[[bytes], bytes]]] = {
+    "gzip": lambda: zlib.decompressobj(31).decompress,
+    "br": lambda: brotli.Decompressor().process,
+    "zstd": lambda: zstandard.ZstdDecompressor().decompressobj().decompress,
+}
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected"),
+    [
+        ("gzip", "gzip"),
+        ("gzip, deflate, br", "br"),
+        ("gzip;q=1.0, br;q=0.5", "gzip"),
+        # Equal q-values fall back to the server's preference
+        ("br;q=0.8, gzip;q=0.8, zstd;q=0.8", "zstd"),
+        ("*", "zstd"),
+        ("*;q=0.1, gzip", "gzip"),
+        # An explicit q=0 refuses an encoding the wildcard would allow
+        ("zstd;q=0, *", "br"),
+        ("gzip;q=0", None),
+        ("gzip;q=high", None),
+        ("deflate", None),
+        ("", None),
+        # Forbidding identity without accepting anything else still gets an uncompressed response
+        ("identity;q=0", None),
+        ("identity;q=0, gzip", "gzip"),
+    ],
+)
+def test_negotiate_honours_q_values_and_wildcards(accept_encoding: str, expected: str | None) -> None:
+    assert negotiate(accept_encoding, ["zstd", "br", "gzip"]) == expected
+
+
+def test_responses_are_compressed_with_the_negotiated_encoding(get: Any) -> None:
+    app = FastAPI()
+
+    @app.get("/text")
+    async def text() -> PlainTextResponse:
+        return PlainTextResponse(BODY)
+
+    app.add_middleware(CompressionMiddleware)
+
+    async def scenario() -> None:
+        for encoding, decoder in DECODERS.items():
+            response = await get(app, "/text", headers=[("Accept-Encoding", encoding)])
+            assert response.headers["content-encoding"] == encoding
+            assert response.headers["vary"] == "Accept-Encoding"
+            assert response.headers["content-length"] == str(len(response.body))
+            assert decoder()(response.body).decode() == BODY
+        identity = await get(app, "/text")
+        assert "content-encoding" not in identity.headers
+        assert identity.body.decode() == BODY
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("encoding", list(DECODERS))
+def test_streamed_chunks_are_compressed_and_flushed_one_by_one(encoding: str) -> None:
+    chunks = [f"chunk {i} ".encode() * 200 for i in range(3)]
+
+    async def stream_app(scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+        for chunk in chunks:
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    app = CompressionMiddleware(stream_app, offload_size=len(chunks[0]))
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", encoding.encode())]}
+    messages: list[Message] = []
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start, *bodies = messages
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == encoding.encode()
+    assert b"content-length" not in headers
+    assert [message.get("more_body", False) for message in bodies] == [True, True, True, False]
+    decode = DECODERS[encoding]()
+    # Each chunk reaches the client as soon as it is sent, not when the response ends
+    assert [decode(message["body"]) for message in bodies[:3]] == chunks
+    assert decode(bodies[3]["body"]) == b""
+
+
+def test_opted_out_responses_are_sent_unchanged(get: Any) -> None:
+    app = FastAPI()
+
+    @app.api_route("/text", methods=["GET", "HEAD"])
+    async def text() -> PlainTextResponse:
+        return PlainTextResponse(BODY)
+
+    @app.get("/raw")
+    @skip_compression
+    async def raw() -> PlainTextResponse:
+        return PlainTextResponse(BODY)
+
+    @app.get("/exports/file")
+    async def export() -> PlainTextResponse:
+        return PlainTextResponse(BODY)
+
+    @app.get("/small")
+    async def small() -> PlainTextResponse:
+        return PlainTextResponse("ok")
+
+    @app.get("/events")
+    async def events() -> StreamingResponse:
+        async def stream() -> AsyncIterator[str]:
+            yield BODY
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    app.add_middleware(CompressionMiddleware, exclude_paths=["/exports"])
+    gzip = [("Accept-Encoding", "gzip")]
+
+    async def scenario() -> None:
+        assert (await get(app, "/text", headers=gzip)).headers["content-encoding"] == "gzip"
+        for path in ("/raw", "/exports/file", "/small", "/events"):
+            response = await get(app, path, headers=gzip)
+            assert "content-encoding" not in response.headers, path
+            assert response.body.decode() in (BODY, "ok")
+        # A HEAD response keeps the Content-Length of the uncompressed GET
+        head = await get(app, "/text", headers=gzip, method="HEAD")
+        assert head.status == 200
+        assert "content-encoding" not in head.headers
+        assert head.headers["content-length"] == str(len(BODY))
+
+    asyncio.run(scenario())
@@ -0,0 +1,113 @@
+import asyncio
+from typing import Any
+
+import orjson
+import pytest
+from fastapi import FastAPI
+
+from common_fastapi.middlewares import concurrency_limit
+from common_fastapi.middlewares.concurrency_limit import AdaptiveLimit, ConcurrencyLimitMiddleware
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(concurrency_limit.time, "monotonic", clock)
+    return clock
+
+
+def acquire(limit: AdaptiveLimit, count: int) -> None:
+    for _ in range(count):
+        assert limit.try_acquire()
+
+
+def test_the_limit_shrinks_at_most_once_per_round_trip(clock: Clock) -> None:
+    # No smoothing, so every ratio takes effect at once
+    limit = AdaptiveLimit("test", 100, 10, 1000, tolerance=2.0, backoff=0.5, smoothing=1.0)
+    acquire(limit, 4)
+    limit.release(3.0, latency=1.0, failed=False)
+    assert limit.limit == 50
+    # Slow requests completing within the same round trip are one congestion signal
+    limit.release(3.0, latency=1.0, failed=False)
+    clock.now += 0.5
+    limit.release(3.0, latency=1.0, failed=False)
+    assert limit.limit == 50
+    clock.now += 0.5
+    limit.release(3.0, latency=1.0, failed=False)
+    assert limit.limit == 25
+
+
+def test_failures_shrink_the_limit_even_at_normal_latency(clock: Clock) -> None:
+    limit = AdaptiveLimit("test", 100, 10, 1000, backoff=0.5, smoothing=1.0)
+    acquire(limit, 1)
+    limit.release(1.0, latency=0.1, failed=True)
+    assert limit.limit == 50
+
+
+def test_the_limit_grows_while_latency_is_normal_and_the_limit_is_in_use(clock: Clock) -> None:
+    limit = AdaptiveLimit("test", 10, 1, 1000, smoothing=1.0)
+    acquire(limit, 10)
+    limit.release(1.0, latency=0.1, failed=False)
+    assert limit.limit == pytest.approx(10.1)
+    # Requests without a latency sample, e.g. unmatched routes, do not count
+    limit.release(None, latency=0.1, failed=False)
+    assert limit.limit == pytest.approx(10.1)
+    # Less than half the limit in use: the limit is not what holds requests back
+    for _ in range(7):
+        limit.release(1.0, latency=0.1, failed=False)
+    grown = limit.limit
+    limit.release(1.0, latency=0.1, failed=False)
+    assert limit.limit == grown
+
+
+def test_the_limit_stays_within_its_bounds(clock: Clock) -> None:
+    limit = AdaptiveLimit("test", 12, 10, 12, backoff=0.5, smoothing=1.0)
+    for _ in range(3):
+        acquire(limit, 1)
+        limit.release(5.0, latency=1.0, failed=False)
+        clock.now += 1.0
+    assert limit.limit == 10
+    acquire(limit, 10)
+    # Every completion grows the limit by about 1 / limit, while the limit stays in use
+    for _ in range(100):
+        limit.release(0.5, latency=0.1, failed=False)
+        limit.try_acquire()
+    assert limit.limit == 12
+
+
+def test_requests_over_the_limit_are_rejected_with_retry_after(get: Any) -> None:
+    app = FastAPI()
+    entered = asyncio.Event()
+    proceed = asyncio.Event()
+
+    @app.get("/slow")
+    async def slow() -> dict[str, bool]:
+        entered.set()
+        await proceed.wait()
+        return {"ok": True}
+
+    middleware = ConcurrencyLimitMiddleware(app, initial_limit=1, min_limit=1, max_limit=1, retry_after=3)
+
+    async def scenario() -> None:
+        first = asyncio.create_task(get(middleware, "/slow"))
+        await entered.wait()
+        rejected = await get(middleware, "/slow")
+        assert rejected.status == 503
+        assert rejected.headers["retry-after"] == "3"
+        assert orjson.loads(rejected.body)["error_code"]
+        # Excluded paths are never limited
+        assert (await get(middleware, "/health")).status == 404
+        proceed.set()
+        assert (await first).status == 200
+        assert (await get(middleware, "/slow")).status == 200
+
+    asyncio.run(scenario())
+    assert middleware.global_limit.inflight == 0
@@ -0,0 +1,96 @@
+import asyncio
+import time
+
+from common_fastapi.health import DOWN, UP, HealthChecks
+
+
+class CountingCheck:
+    """Async check taking `delay` seconds and counting its runs."""
+
+    def __init__(self, delay: float = 0.05) -> None:
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return f"run {self.calls}"
+
+
+def test_concurrent_callers_share_one_run() -> None:
+    checks = HealthChecks(ttl=60)
+    check = CountingCheck()
+    checks.register("db", check)
+
+    async def scenario() -> None:
+        results = await asyncio.gather(*(checks.run() for _ in range(5)))
+        assert check.calls == 1
+        assert all(result == results[0] for result in results)
+        assert results[0]["db"].status == UP
+        assert results[0]["db"].message == "run 1"
+
+    asyncio.run(scenario())
+
+
+def test_results_are_reused_until_the_ttl_expires() -> None:
+    checks = HealthChecks(ttl=0.2)
+    check = CountingCheck(delay=0)
+    checks.register("db", check)
+
+    async def scenario() -> None:
+        await checks.run()
+        await checks.run()
+        assert check.calls == 1
+        await asyncio.sleep(0.25)
+        assert (await checks.run())["db"].message == "run 2"
+        # Registering a check drops the cached results
+        checks.register("cache", CountingCheck(delay=0))
+        assert set(await checks.run()) == {"db", "cache"}
+        assert check.calls == 3
+
+    asyncio.run(scenario())
+
+
+def test_a_cancelled_probe_does_not_cancel_the_shared_run() -> None:
+    checks = HealthChecks(ttl=60)
+    check = CountingCheck(delay=0.1)
+    checks.register("db", check)
+
+    async def scenario() -> None:
+        first = asyncio.create_task(checks.run())
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert (await checks.run())["db"].status == UP
+        assert check.calls == 1
+
+    asyncio.run(scenario())
+
+
+def test_failures_and_timeouts_are_reported_per_check() -> None:
+    checks = HealthChecks(ttl=60)
+
+    def broken() -> None:
+        raise ConnectionError("refused")
+
+    def slow_sync() -> None:
+        time.sleep(0.2)
+
+    checks.register("db", CountingCheck(delay=0))
+    checks.register("cache", broken, critical=False)
+    checks.register("search", CountingCheck(delay=1), timeout=0.05)
+    checks.register("disk", slow_sync, timeout=0.05, critical=False)
+
+    async def scenario() -> None:
+        start = time.perf_counter()
+        results = await checks.run()
+        # Checks run concurrently, each bounded by its own timeout
+        assert time.perf_counter() - start < 0.5
+        assert {name: result.status for name, result in results.items()} == {"db": UP, "cache": DOWN, "search": DOWN, "disk": DOWN}
+        assert results["cache"].message == "refused"
+        assert results["search"].message == "Timed out after 0.05s"
+        assert not HealthChecks.is_ready(results)
+        # Failed checks registered with critical=False do not make the application unready
+        del results["search"]
+        assert HealthChecks.is_ready(results)
+
+    asyncio.run(scenario())
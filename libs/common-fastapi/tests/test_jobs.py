@@ -0,0 +1,140 @@
+import asyncio
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from common_fastapi.jobs import Job, JobContext, JobError, JobRunner, JobStatus, JobStore
+
+
+class RecordingContext(JobContext):
+    def __init__(self, interval: float) -> None:
+        super().__init__("job", None, interval=interval)
+        self.reports: list[tuple[float, str | None]] = []
+
+    def _report(self, fraction: float, message: str | None) -> None:
+        self.reports.append((fraction, message))
+
+
+def test_progress_is_throttled_unless_the_message_changes() -> None:
+    context = RecordingContext(interval=60)
+    context.progress(0.1, "loading")
+    context.progress(0.2, "loading")
+    context.progress(0.3)
+    context.progress(0.4, "scoring")
+    context.progress(1.5)
+    assert context.reports == [(0.1, "loading"), (0.4, "scoring")]
+    context._flush()
+    context._flush()
+    assert context.reports == [(0.1, "loading"), (0.4, "scoring"), (1.0, None)]
+
+
+def fail_after_progress(context: JobContext) -> None:
+    context.progress(0.3, "loading")
+    context.progress(0.5, "scoring")
+    context.progress(0.8)
+    raise JobError("Scoring failed")
+
+
+def run_job(tmp_path: Path, executor: str, func: Any) -> Job:
+    async def scenario() -> Job:
+        runner = JobRunner(JobStore(tmp_path / "jobs.db"))
+        runner.register("test", func, executor)
+        await runner.start()
+        try:
+            job = await runner.submit("test")
+            await runner._jobs[job.id].task
+            return await runner.get(job.id)
+        finally:
+            await runner.stop()
+
+    return asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_latest_progress_is_recorded_when_the_job_ends(tmp_path: Path, executor: str) -> None:
+    job = run_job(tmp_path, executor, fail_after_progress)
+    assert job.status == JobStatus.FAILED
+    assert job.error == "Scoring failed"
+    # Recorded because its message changed, then flushed although it came within the interval of the previous one
+    assert (job.progress, job.message) == (0.8, "scoring")
+
+
+def test_kind_concurrency_holds_across_stores_of_one_database(tmp_path: Path) -> None:
+    # Each worker process has a store of its own on the server's database
+    first, second = JobStore(tmp_path / "jobs.db"), JobStore(tmp_path / "jobs.db")
+    jobs = [store.create("import") for store in (first, second, first)]
+    other = second.create("export")
+    assert first.claim(jobs[0].id, "import", 2)
+    assert second.claim(jobs[1].id, "import", 2)
+    assert not first.claim(jobs[2].id, "import", 2)
+    assert first.get(jobs[2].id).status == JobStatus.QUEUED  # type: ignore[union-attr]
+    # Other kinds have slots of their own, and a job is claimed only once
+    assert second.claim(other.id, "export", 1)
+    assert not first.claim(other.id, "export", 2)
+    second.finished(jobs[1].id, JobStatus.SUCCEEDED)
+    assert first.claim(jobs[2].id, "import", 2)
+
+
+def test_runners_sharing_a_database_share_the_kind_concurrency(tmp_path: Path) -> None:
+    running: list[str] = []
+    overlapped = False
+
+    async def work(context: JobContext) -> None:
+        nonlocal overlapped
+        running.append(context.job_id)
+        overlapped = overlapped or len(running) > 1
+        await asyncio.sleep(0.1)
+        running.remove(context.job_id)
+
+    async def scenario() -> list[Job]:
+        runners = [JobRunner(JobStore(tmp_path / "jobs.db")) for _ in range(2)]
+        for runner in runners:
+            runner.CLAIM_POLL_INTERVAL = 0.02
+            runner.register("import", work)
+            await runner.start()
+        try:
+            submitted = [(runner, await runner.submit("import")) for runner in runners for _ in range(2)]
+            await asyncio.gather(*(runner._jobs[job.id].task for runner, job in submitted))
+            return [await runner.get(job.id) for runner, job in submitted]  # type: ignore[misc]
+        finally:
+            for runner in runners:
+                await runner.stop()
+
+    jobs = asyncio.run(scenario())
+    assert [job.status for job in jobs] == [JobStatus.SUCCEEDED] * 4
+    assert not overlapped
+
+
+def test_recover_fails_jobs_of_exited_processes_even_if_their_pid_was_reused(tmp_path: Path) -> None:
+    store = JobStore(tmp_path / "jobs.db")
+    alive, reused, exited = (store.create("import") for _ in range(3))
+    # The pid of this process, recorded with the start time of another one
+    store._execute("UPDATE jobs SET pid_start = 'earlier' WHERE id = ?", (reused.id,))
+    store._execute("UPDATE jobs SET pid = 2147483647 WHERE id = ?", (exited.id,))
+    assert store.recover() == 2
+    assert store.get(alive.id).status == JobStatus.QUEUED  # type: ignore[union-attr]
+    for job in (reused, exited):
+        recovered = store.get(job.id)
+        assert recovered.status == JobStatus.FAILED  # type: ignore[union-attr]
+        assert recovered.error == "Interrupted: the process running the job exited"  # type: ignore[union-attr]
+
+
+def test_databases_without_the_process_start_column_are_migrated(tmp_path: Path) -> None:
+    path = tmp_path / "jobs.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE jobs (id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, progress REAL NOT NULL DEFAULT 0,"
+            " message TEXT, result BLOB, error TEXT, cancel_requested INTEGER NOT NULL DEFAULT 0, pid INTEGER NOT NULL,"
+            " created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+        )
+        conn.execute("INSERT INTO jobs (id, kind, status, pid, created_at) VALUES ('old', 'import', 'running', ?, 0)", (os.getpid(),))
+    conn.close()
+    store = JobStore(path)
+    # Jobs stored before the migration have no start time, and are told apart by pid only
+    assert store.recover() == 0
+    assert store.get("old").status == JobStatus.RUNNING  # type: ignore[union-attr]
+    job = store.create("import")
+    assert store._execute("SELECT pid_start FROM jobs WHERE id = ?", (job.id,))[0][0] is not None
@@ -0,0 +1,65 @@
+import asyncio
+import time
+from typing import Any
+
+import pytest
+from fastapi import FastAPI
+
+from common_fastapi.app_factory import create_app
+from common_fastapi.config import app_settings
+from common_fastapi.loop_monitor import EventLoopBlockedError, LoopMonitor, LoopMonitorMiddleware
+
+
+@pytest.fixture
+def strict_app(monkeypatch: pytest.MonkeyPatch) -> tuple[FastAPI, LoopMonitor]:
+    """App built by create_app under LOOP_MONITOR_STRICT, with a short threshold, and its loop monitor."""
+    monkeypatch.setattr(app_settings, "LOOP_MONITOR_STRICT", True)
+    monkeypatch.setattr(app_settings, "LOOP_MONITOR_INTERVAL", 0.01)
+    monkeypatch.setattr(app_settings, "LOOP_MONITOR_THRESHOLD", 0.05)
+    app = create_app("test")
+
+    @app.get("/blocking")
+    async def blocking() -> dict[str, bool]:
+        time.sleep(0.5)  # Synchronous work inside an async endpoint
+        return {"ok": True}
+
+    @app.get("/awaiting")
+    async def awaiting() -> dict[str, bool]:
+        await asyncio.sleep(0.5)
+        return {"ok": True}
+
+    @app.get("/threadpool")
+    def threadpool() -> dict[str, bool]:
+        time.sleep(0.5)
+        return {"ok": True}
+
+    monitor = next(middleware.kwargs["monitor"] for middleware in app.user_middleware if middleware.cls is LoopMonitorMiddleware)
+    return app, monitor
+
+
+def run_monitored(monitor: LoopMonitor, request: Any) -> Any:
+    async def scenario() -> Any:
+        monitor.start()
+        try:
+            return await request
+        finally:
+            await monitor.stop()
+
+    return asyncio.run(scenario())
+
+
+def test_strict_mode_fails_requests_that_block_the_loop(strict_app: tuple[FastAPI, LoopMonitor], get: Any) -> None:
+    app, monitor = strict_app
+    with pytest.raises(EventLoopBlockedError) as exc_info:
+        run_monitored(monitor, get(app, "/blocking"))
+    assert exc_info.value.route == "/blocking"
+    assert any("in blocking" in frame for frame in exc_info.value.blocked.stack)
+    assert not monitor.requests
+    assert not monitor.blocked_tasks
+
+
+@pytest.mark.parametrize("path", ["/awaiting", "/threadpool"])
+def test_strict_mode_passes_requests_that_do_not_block(strict_app: tuple[FastAPI, LoopMonitor], get: Any, path: str) -> None:
+    app, monitor = strict_app
+    assert run_monitored(monitor, get(app, path)).status == 200
+    assert not monitor.blocked_tasks
@@ -0,0 +1,81 @@
+import asyncio
+import os
+from pathlib import Path
+from typing import Any
+
+import orjson
+from fastapi import FastAPI
+
+from common_fastapi.metrics import MetricsMiddleware, MetricsRegistry, MultiprocessCollector, merge_snapshots, render
+
+
+def test_histograms_render_cumulative_buckets() -> None:
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value, ("/items",))
+    assert render(registry.snapshot()).splitlines() == [
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/items",le="0.1"} 2',
+        'latency_seconds_bucket{route="/items",le="1.0"} 3',
+        'latency_seconds_bucket{route="/items",le="+Inf"} 4',
+        'latency_seconds_sum{route="/items"} 2.65',
+        'latency_seconds_count{route="/items"} 4',
+    ]
+
+
+def test_label_values_are_escaped() -> None:
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests", ("path",)).inc(('a"b\\c\n',))
+    assert 'requests_total{path="a\\"b\\\\c\\n"} 1.0' in render(registry.snapshot())
+
+
+def test_middleware_labels_requests_by_route_template(get: Any) -> None:
+    registry = MetricsRegistry()
+    app = FastAPI()
+
+    @app.get("/items/{uid}")
+    async def read_item(uid: int) -> dict[str, int]:
+        return {"uid": uid}
+
+    app.add_middleware(MetricsMiddleware, registry=registry)
+
+    async def scenario() -> None:
+        for path in ("/items/1", "/items/2", "/items/x", "/unknown/1", "/metrics"):
+            await get(app, path)
+
+    asyncio.run(scenario())
+    requests = registry.counter("http_requests_total", "")
+    assert requests.samples() == {
+        ("GET", "/items/{uid}", "200"): 2.0,
+        ("GET", "/items/{uid}", "422"): 1.0,
+        ("GET", "<unmatched>", "404"): 1.0,
+    }
+    assert registry.gauge("http_requests_in_progress", "").samples() == {("GET",): 0.0}
+
+
+def test_merged_snapshots_keep_totals_of_exited_processes_but_not_their_gauges() -> None:
+    def snapshot(requests: float, in_progress: float, latency: float) -> dict[str, Any]:
+        registry = MetricsRegistry()
+        registry.counter("requests_total", "Requests").inc(amount=requests)
+        registry.gauge("in_progress", "In progress").set(in_progress)
+        registry.histogram("latency_seconds", "Latency", buckets=(1.0,)).observe(latency)
+        return registry.snapshot()
+
+    merged = merge_snapshots([(True, snapshot(3, 2, 0.5)), (False, snapshot(4, 7, 5.0))])
+    assert merged["requests_total"]["samples"] == [[[], 7.0]]
+    assert merged["in_progress"]["samples"] == [[[], 2.0]]
+    assert merged["latency_seconds"]["samples"] == [[[], [[1, 1], 5.5, 2]]]
+
+
+def test_collector_merges_the_snapshot_files_of_every_worker(tmp_path: Path) -> None:
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests").inc(amount=2)
+    other = MetricsRegistry()
+    other.counter("requests_total", "Requests").inc(amount=5)
+    # Snapshot written by another worker of the same server
+    (tmp_path / f"{os.getppid()}.json").write_bytes(orjson.dumps({"pid": os.getppid(), "time": 0, "metrics": other.snapshot()}))
+    collector = MultiprocessCollector(registry, tmp_path, flush_interval=60)
+    assert collector.collect()["requests_total"]["samples"] == [[[], 7.0]]
+    assert (tmp_path / f"{os.getpid()}.json").exists()
@@ -0,0 +1,61 @@
+import asyncio
+from pathlib import Path
+from typing import Any
+
+import pytest
+from fastapi import FastAPI
+
+from common_fastapi.config.enums.profile_mode import ProfileMode
+from common_fastapi.exceptions.exception_handler import register_exception_handlers
+from common_fastapi.profiling import ProfileStore, ProfilingMiddleware, register_profiling_endpoints, sign_profile_token, verify_profile_token
+from common_fastapi.profiling import token as profile_token
+
+
+SECRET = "test-secret"  # noqa: S105  # signs the tokens of these tests only
+
+
+def test_tokens_are_only_valid_for_their_secret_until_they_expire(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(profile_token.time, "time", lambda: 1_000_000.0)
+    token = sign_profile_token(SECRET, ttl=60)
+    assert verify_profile_token(SECRET, token)
+    assert not verify_profile_token("other", token)
+    assert not verify_profile_token(None, token)
+    assert not verify_profile_token(SECRET, None)
+    # The expiry is covered by the signature
+    assert not verify_profile_token(SECRET, f"2000000.{token.partition('.')[2]}")
+    assert not verify_profile_token(SECRET, "soon.0")
+    monkeypatch.setattr(profile_token.time, "time", lambda: 1_000_061.0)
+    assert not verify_profile_token(SECRET, token)
+
+
+def test_requests_with_a_token_are_profiled_and_served_to_token_holders(tmp_path: Path, get: Any) -> None:
+    store = ProfileStore(tmp_path)
+    app = FastAPI()
+    register_exception_handlers(app)
+
+    @app.get("/items")
+    async def items() -> list[int]:
+        return [1, 2]
+
+    register_profiling_endpoints(app, store, SECRET)
+    app.add_middleware(ProfilingMiddleware, store=store, secret=SECRET, mode=ProfileMode.CPROFILE)
+    token = sign_profile_token(SECRET)
+
+    async def scenario() -> None:
+        plain = await get(app, "/items")
+        assert "x-profile-id" not in plain.headers
+        forged = await get(app, "/items", headers=[("X-Profile", sign_profile_token("other"))])
+        assert "x-profile-id" not in forged.headers
+
+        profiled = await get(app, "/items", headers=[("X-Profile", token)])
+        profile_id = profiled.headers["x-profile-id"]
+        assert (await get(app, "/admin/profiles")).status == 403
+        listed = await get(app, "/admin/profiles", headers=[("X-Profile-Token", token)])
+        assert listed.status == 200
+        download = await get(app, f"/admin/profiles/{profile_id}", headers=[("X-Profile-Token", token)])
+        assert download.status == 200
+        assert download.headers["content-disposition"] == f'attachment; filename="{profile_id}.prof"'
+
+    asyncio.run(scenario())
+    [metadata] = store.list()
+    assert (metadata["route"], metadata["status"], metadata["mode"], metadata["trigger"]) == ("/items", 200, "cprofile", "header")
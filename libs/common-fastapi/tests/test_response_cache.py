@@ -0,0 +1,338 @@
+import asyncio
+import os
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from fastapi import APIRouter, FastAPI, Response
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from common_fastapi import app_factory
+from common_fastapi.cache import (
+    CachedResponse,
+    CachePolicy,
+    MemoryCacheBackend,
+    RedisCacheBackend,
+    ResponseCache,
+    ResponseCacheMiddleware,
+    cache_key,
+    cache_response,
+)
+from common_fastapi.cache.backends import CacheBackend
+from common_fastapi.cache.middleware import is_storable
+from common_fastapi.config import app_settings
+from common_fastapi.server import WORKERS_ENV
+
+
+RESPONSE = CachedResponse(200, [(b"content-type", b"application/json")], b'{"ok":true}')
+
+
+@pytest.fixture(params=["memory", "redis"])
+def make_backend(request: pytest.FixtureRequest) -> Callable[[], CacheBackend]:
+    """Backend factory; backends are made inside the test's event loop, which the Redis client binds to."""
+    if request.param == "redis":
+        fakeredis = pytest.importorskip("fakeredis")
+        return lambda: RedisCacheBackend(fakeredis.FakeAsyncRedis(), prefix="test:")
+    return MemoryCacheBackend
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+
+def test_backend_stores_and_returns_responses(make_backend: Callable[[], CacheBackend]) -> None:
+    async def scenario() -> None:
+        backend = make_backend()
+        assert await backend.get("/items") is None
+        await backend.set("/items", RESPONSE, 60, ("items",), await backend.tag_versions(("items",)))
+        assert await backend.get("/items") == RESPONSE
+
+    asyncio.run(scenario())
+
+
+def test_backend_invalidates_by_tag(make_backend: Callable[[], CacheBackend]) -> None:
+    async def scenario() -> None:
+        backend = make_backend()
+        await backend.set("/items/1", RESPONSE, 60, ("items", "item:1"), await backend.tag_versions(("items", "item:1")))
+        await backend.set("/items/2", RESPONSE, 60, ("items", "item:2"), await backend.tag_versions(("items", "item:2")))
+        await backend.invalidate(["item:1"])
+        assert await backend.get("/items/1") is None
+        assert await backend.get("/items/2") == RESPONSE
+        await backend.invalidate(["items"])
+        assert await backend.get("/items/2") is None
+
+    asyncio.run(scenario())
+
+
+def test_backend_drops_responses_computed_before_an_invalidation(make_backend: Callable[[], CacheBackend]) -> None:
+    async def scenario() -> None:
+        backend = make_backend()
+        # A request reads the versions, a write invalidates while the response is computed, then the request stores it
+        versions = await backend.tag_versions(("items",))
+        await backend.invalidate(["items"])
+        await backend.set("/items", RESPONSE, 60, ("items",), versions)
+        assert await backend.get("/items") is None
+        await backend.set("/items", RESPONSE, 60, ("items",), await backend.tag_versions(("items",)))
+        assert await backend.get("/items") == RESPONSE
+
+    asyncio.run(scenario())
+
+
+def test_backend_skips_responses_over_max_entry_bytes(make_backend: Callable[[], CacheBackend]) -> None:
+    async def scenario() -> None:
+        backend = make_backend()
+        backend.max_entry_bytes = 16
+        await backend.set("/items", RESPONSE, 60, (), await backend.tag_versions(()))
+        assert await backend.get("/items") is None
+
+    asyncio.run(scenario())
+
+
+def test_backend_clear_drops_every_response(make_backend: Callable[[], CacheBackend]) -> None:
+    async def scenario() -> None:
+        backend = make_backend()
+        await backend.set("/items", RESPONSE, 60, ("items",), await backend.tag_versions(("items",)))
+        await backend.set("/other", RESPONSE, 60, (), await backend.tag_versions(()))
+        await backend.clear()
+        assert await backend.get("/items") is None
+        assert await backend.get("/other") is None
+
+    asyncio.run(scenario())
+
+
+def test_memory_backend_expires_and_evicts() -> None:
+    async def scenario() -> None:
+        backend = MemoryCacheBackend(max_bytes=2 * (RESPONSE.nbytes + 16 + MemoryCacheBackend.ENTRY_OVERHEAD), max_entry_bytes=1024)
+        await backend.set("/expiring", RESPONSE, 0.01, (), await backend.tag_versions(()))
+        await asyncio.sleep(0.02)
+        assert await backend.get("/expiring") is None
+        for key in ("/a", "/b", "/c"):
+            await backend.set(key, RESPONSE, 60, (), await backend.tag_versions(()))
+        # The least recently used entry is evicted once the size bound is exceeded
+        assert await backend.get("/a") is None
+        assert await backend.get("/c") == RESPONSE
+        assert backend.nbytes <= backend.max_bytes
+
+    asyncio.run(scenario())
+
+
+def test_redis_backend_sets_expiry_and_prefix() -> None:
+    fakeredis = pytest.importorskip("fakeredis")
+
+    async def scenario() -> None:
+        client = fakeredis.FakeAsyncRedis()
+        backend = RedisCacheBackend(client, prefix="app:cache:")
+        await backend.set("/items", RESPONSE, 30, ("items",), await backend.tag_versions(("items",)))
+        assert 0 < await client.ttl("app:cache:/items") <= 30
+        assert 0 < await client.ttl("app:cache:tag:items") <= 30
+        assert CachedResponse.decode(await client.get("app:cache:/items")) == RESPONSE
+        await backend.close()
+
+    asyncio.run(scenario())
+
+
+def test_cached_response_round_trips() -> None:
+    response = CachedResponse(404, [(b"x-header", b"\xe9t\xe9")], b"\x00binary")
+    assert CachedResponse.decode(response.encode()) == response
+
+
+# ---------------------------------------------------------------------------
+# Cache keys and storable responses
+# ---------------------------------------------------------------------------
+
+
+def _scope(path: str = "/items", query: bytes = b"", headers: list[tuple[bytes, bytes]] | None = None) -> Scope:
+    return {"type": "http", "method": "GET", "path": path, "query_string": query, "headers": headers or []}
+
+
+def test_cache_key_ignores_query_parameter_order() -> None:
+    policy = CachePolicy(60, (), True, ())
+    assert cache_key(_scope(query=b"a=1&b=2"), policy) == cache_key(_scope(query=b"b=2&a=1"), policy)
+    assert cache_key(_scope(query=b"a=1"), policy) != cache_key(_scope(query=b"a=2"), policy)
+    assert cache_key(_scope(query=b"a=1"), CachePolicy(60, (), False, ())) == "/items"
+
+
+def test_cache_key_varies_by_listed_headers_only() -> None:
+    policy = CachePolicy(60, (), True, (b"accept-language",))
+    english = cache_key(_scope(headers=[(b"accept-language", b"en")]), policy)
+    french = cache_key(_scope(headers=[(b"accept-language", b"fr"), (b"user-agent", b"x")]), policy)
+    assert english != french
+    assert cache_key(_scope(headers=[(b"user-agent", b"y")]), CachePolicy(60, (), True, ())) == "/items"
+
+
+def test_requests_with_credentials_are_not_cached_unless_varied_by() -> None:
+    credentials = [(b"authorization", b"Bearer token")]
+    assert cache_key(_scope(headers=credentials), CachePolicy(60, (), True, ())) is None
+    assert cache_key(_scope(headers=[(b"cookie", b"session=1")]), CachePolicy(60, (), True, ())) is None
+    assert cache_key(_scope(headers=credentials), CachePolicy(60, (), True, (b"authorization",))) is not None
+
+
+@pytest.mark.parametrize(
+    ("headers", "storable"),
+    [
+        ([(b"content-type", b"application/json")], True),
+        ([(b"cache-control", b"max-age=60")], True),
+        ([(b"set-cookie", b"session=1")], False),
+        ([(b"Set-Cookie", b"session=1")], False),
+        ([(b"cache-control", b"no-store")], False),
+        ([(b"cache-control", b"private, max-age=60")], False),
+    ],
+)
+def test_is_storable(headers: list[tuple[bytes, bytes]], storable: bool) -> None:
+    assert is_storable(headers) is storable
+
+
+# ---------------------------------------------------------------------------
+# Middleware
+# ---------------------------------------------------------------------------
+
+
+class RouteRecorder:
+    """Outer middleware recording the route the inner application set in the scope, as MetricsMiddleware reads it."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.routes: list[Any] = []
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.app(scope, receive, send)
+        self.routes.append(scope.get("route"))
+
+
+def make_app(backend: CacheBackend | None = None, prefix: str = "") -> tuple[FastAPI, ResponseCache, dict[str, int]]:
+    calls = {"items": 0, "status": 0, "cookie": 0}
+    cache = ResponseCache(backend or MemoryCacheBackend())
+    router = APIRouter(prefix="/items")
+
+    @router.get("/{uid}")
+    @cache_response(ttl=60, tags=("items", "item:{uid}"))
+    async def read_item(uid: int, q: str = "") -> dict[str, Any]:
+        calls["items"] += 1
+        return {"uid": uid, "q": q}
+
+    @router.get("/status/{code}")
+    @cache_response(ttl=60)
+    async def read_status(code: int, response: Response) -> dict[str, int]:
+        calls["status"] += 1
+        response.status_code = code
+        return {"code": code}
+
+    @router.get("/cookie/")
+    @cache_response(ttl=60)
+    async def read_cookie(response: Response) -> dict[str, bool]:
+        calls["cookie"] += 1
+        response.set_cookie("session", "1")
+        return {"ok": True}
+
+    app = FastAPI()
+    # Included, so on recent FastAPI versions the routes sit in a nested router
+    app.include_router(router, prefix=prefix)
+    app.add_middleware(ResponseCacheMiddleware, cache=cache)
+    return app, cache, calls
+
+
+def test_middleware_serves_hits_from_the_cache(get: Any) -> None:
+    app, _, calls = make_app()
+
+    async def scenario() -> None:
+        miss = await get(app, "/items/1", "q=a&r=b")
+        hit = await get(app, "/items/1", "r=b&q=a")
+        other = await get(app, "/items/1", "q=other")
+        assert (miss.headers["x-cache"], hit.headers["x-cache"], other.headers["x-cache"]) == ("MISS", "HIT", "MISS")
+        assert hit.body == miss.body
+        assert hit.headers["content-type"] == "application/json"
+        assert calls["items"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_middleware_finds_routes_of_prefixed_routers(get: Any) -> None:
+    app, _, calls = make_app(prefix="/v1")
+
+    async def scenario() -> None:
+        assert (await get(app, "/v1/items/1")).headers["x-cache"] == "MISS"
+        assert (await get(app, "/v1/items/1")).headers["x-cache"] == "HIT"
+        assert calls["items"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_middleware_invalidates_by_tag(get: Any, make_backend: Callable[[], CacheBackend]) -> None:
+    async def scenario() -> None:
+        app, cache, calls = make_app(make_backend())
+        await get(app, "/items/1")
+        await get(app, "/items/2")
+        await cache.invalidate("item:1")
+        assert (await get(app, "/items/1")).headers["x-cache"] == "MISS"
+        assert (await get(app, "/items/2")).headers["x-cache"] == "HIT"
+        assert calls["items"] == 3
+
+    asyncio.run(scenario())
+
+
+def test_middleware_stores_only_storable_responses(get: Any) -> None:
+    app, _, calls = make_app()
+
+    async def scenario() -> None:
+        for _ in range(2):
+            assert (await get(app, "/items/status/404")).status == 404
+            assert (await get(app, "/items/cookie/")).headers["x-cache"] == "MISS"
+            assert (await get(app, "/items/1", headers=[("Authorization", "Bearer token")])).headers.get("x-cache") is None
+        assert calls == {"items": 2, "status": 2, "cookie": 2}
+
+    asyncio.run(scenario())
+
+
+def test_middleware_sets_the_route_of_hits(get: Any) -> None:
+    app, _, _ = make_app()
+    recorder = RouteRecorder(app)
+
+    async def scenario() -> None:
+        await get(recorder, "/items/1")
+        await get(recorder, "/items/1")
+
+    asyncio.run(scenario())
+    miss_route, hit_route = recorder.routes
+    assert hit_route is not None
+    assert hit_route.path == miss_route.path == "/items/{uid}"
+
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize(
+    ("enabled", "workers", "expected"),
+    [
+        (None, None, False),
+        (None, 1, True),
+        (None, 4, False),
+        (True, 4, True),
+        (False, 1, False),
+    ],
+)
+def test_in_process_cache_is_only_enabled_by_default_for_a_single_worker(
+    monkeypatch: pytest.MonkeyPatch, enabled: bool | None, workers: int | None, expected: bool
+) -> None:
+    cache = ResponseCache()
+    monkeypatch.setattr(app_factory, "response_cache", cache)
+    monkeypatch.setattr(app_settings, "CACHE_ENABLED", enabled)
+    monkeypatch.setattr(app_settings, "CACHE_REDIS_URL", None)
+    if workers is not None:
+        monkeypatch.setenv(WORKERS_ENV, f"{os.getpid()}:{workers}")
+    else:
+        monkeypatch.delenv(WORKERS_ENV, raising=False)
+    assert app_factory._configure_response_cache("test") is expected
+
+
+def test_redis_cache_is_enabled_by_default_for_any_number_of_workers(monkeypatch: pytest.MonkeyPatch) -> None:
+    pytest.importorskip("redis")
+    cache = ResponseCache()
+    monkeypatch.setattr(app_factory, "response_cache", cache)
+    monkeypatch.setattr(app_settings, "CACHE_ENABLED", None)
+    monkeypatch.setattr(app_settings, "CACHE_REDIS_URL", "redis://localhost:6379/0")
+    monkeypatch.setenv(WORKERS_ENV, f"{os.getpid()}:4")
+    assert app_factory._configure_response_cache("test") is True
+    assert isinstance(cache.backend, RedisCacheBackend)
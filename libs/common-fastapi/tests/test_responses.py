@@ -0,0 +1,99 @@
+import asyncio
+from typing import Any
+
+import orjson
+from fastapi import FastAPI, Response
+from pydantic import BaseModel, Field
+
+from common_fastapi import cache_response, trusted_response
+from common_fastapi.cache import MemoryCacheBackend, ResponseCache, ResponseCacheMiddleware
+
+
+class Item(BaseModel):
+    uid: int
+    display_name: str = Field(serialization_alias="displayName")
+    tags: list[str] = []
+
+
+ITEMS = [Item(uid=1, display_name="one", tags=["a"]), Item(uid=2, display_name="two")]
+
+
+def test_trusted_responses_match_the_validated_ones(get: Any) -> None:
+    app = FastAPI()
+
+    @app.get("/validated", response_model=list[Item])
+    async def validated() -> list[Item]:
+        return ITEMS
+
+    @app.get("/trusted", response_model=list[Item])
+    @trusted_response()
+    async def trusted() -> list[Item]:
+        return ITEMS
+
+    @app.get("/trusted-sync", response_model=list[Item])
+    @trusted_response()
+    def trusted_sync() -> list[Item]:
+        return ITEMS
+
+    async def scenario() -> None:
+        expected = await get(app, "/validated")
+        for path in ("/trusted", "/trusted-sync"):
+            response = await get(app, path)
+            assert response.status == 200
+            assert response.headers["content-type"] == "application/json"
+            assert orjson.loads(response.body) == orjson.loads(expected.body)
+        assert orjson.loads(expected.body)[0] == {"uid": 1, "displayName": "one", "tags": ["a"]}
+
+    asyncio.run(scenario())
+    # The response model still documents the endpoint, and the added parameter stays out of it
+    operation = app.openapi()["paths"]["/trusted"]["get"]
+    assert operation["responses"]["200"]["content"]["application/json"]["schema"]["items"] == {"$ref": "#/components/schemas/Item"}
+    assert "parameters" not in operation
+
+
+def test_status_and_headers_of_the_injected_response_are_kept(get: Any) -> None:
+    app = FastAPI()
+
+    @app.get("/own/{uid}", response_model=Item)
+    @trusted_response()
+    async def own(uid: int, response: Response) -> Item | Response:
+        if uid == 0:
+            return Response(status_code=204)
+        response.status_code = 203
+        response.headers["x-source"] = "replica"
+        return ITEMS[0]
+
+    async def scenario() -> None:
+        response = await get(app, "/own/1")
+        assert response.status == 203
+        assert response.headers["x-source"] == "replica"
+        assert response.headers["content-length"] == str(len(response.body))
+        assert orjson.loads(response.body)["displayName"] == "one"
+        # Responses returned by the endpoint are passed through
+        assert (await get(app, "/own/0")).status == 204
+
+    asyncio.run(scenario())
+
+
+def test_trusted_responses_can_be_cached(get: Any) -> None:
+    app = FastAPI()
+    calls = 0
+
+    @app.get("/items", response_model=list[Item])
+    @cache_response(ttl=60)
+    @trusted_response()
+    async def items() -> list[Item]:
+        nonlocal calls
+        calls += 1
+        return ITEMS
+
+    app.add_middleware(ResponseCacheMiddleware, cache=ResponseCache(MemoryCacheBackend()))
+
+    async def scenario() -> None:
+        miss = await get(app, "/items")
+        hit = await get(app, "/items")
+        assert (miss.headers["x-cache"], hit.headers["x-cache"]) == ("MISS", "HIT")
+        assert hit.body == miss.body
+        assert calls == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,104 @@
+import os
+import signal
+import time
+from typing import Any
+
+import pytest
+
+from common_fastapi import server
+from common_fastapi.server import WORKERS_ENV, Supervisor, server_workers
+
+
+class Recorder:
+    """Stands in for the module logger and records the events logged."""
+
+    def __init__(self) -> None:
+        self.events: list[tuple[str, dict[str, Any]]] = []
+
+    def _log(self, event: str, **kwargs: Any) -> None:
+        self.events.append((event, kwargs))
+
+    info = warning = error = exception = _log
+
+
+class SleepingSupervisor(Supervisor):
+    """Supervisor whose workers sleep until they are stopped, instead of running uvicorn."""
+
+    def __init__(self, workers: int) -> None:
+        super().__init__(None, None, workers, max_requests=0, max_requests_jitter=0, graceful_timeout=1.0)  # type: ignore[arg-type]
+
+    def _run_worker(self) -> None:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        time.sleep(30)
+        os._exit(0)
+
+
+@pytest.fixture
+def events(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, dict[str, Any]]]:
+    recorder = Recorder()
+    monkeypatch.setattr(server, "logger", recorder)
+    return recorder.events
+
+
+@pytest.fixture
+def restore_signals() -> Any:
+    handlers = {sig: signal.getsignal(sig) for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGALRM)}
+    yield
+    for sig, handler in handlers.items():
+        signal.signal(sig, handler)
+
+
+def test_server_workers_is_only_known_to_the_supervisor_and_its_workers(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv(WORKERS_ENV, f"{os.getpid()}:4")
+    assert server_workers() == 4
+    monkeypatch.setenv(WORKERS_ENV, f"{os.getppid()}:4")
+    assert server_workers() == 4
+    # A process spawned by a worker inherits the variable, but is not a worker
+    monkeypatch.setenv(WORKERS_ENV, "1:4")
+    assert server_workers() is None
+    monkeypatch.delenv(WORKERS_ENV)
+    assert server_workers() is None
+
+
+def test_signal_handlers_only_set_flags(events: list[tuple[str, dict[str, Any]]]) -> None:
+    supervisor = SleepingSupervisor(1)
+    supervisor._on_reload(signal.SIGHUP, None)
+    supervisor._on_stop(signal.SIGTERM, None)
+    assert (supervisor._reload, supervisor._stopping) == (True, True)
+    assert events == []
+
+
+@pytest.mark.usefixtures("restore_signals")
+def test_supervisor_replaces_workers_on_sighup_and_stops_them_on_sigterm(events: list[tuple[str, dict[str, Any]]]) -> None:
+    supervisor = SleepingSupervisor(2)
+    spawned: list[int] = []
+    spawn = supervisor.spawn
+
+    def record_spawn() -> int:
+        pid = spawn()
+        spawned.append(pid)
+        return pid
+
+    supervisor.spawn = record_spawn  # type: ignore[method-assign]
+
+    # Sent from an interval timer rather than a thread: the supervisor must not fork while other threads run
+    pending = [signal.SIGHUP, signal.SIGTERM]
+
+    def send_next_signal(*_: Any) -> None:
+        if pending:
+            os.kill(os.getpid(), pending.pop(0))
+
+    signal.signal(signal.SIGALRM, send_next_signal)
+    signal.setitimer(signal.ITIMER_REAL, 0.5, 1.0)
+    try:
+        assert supervisor.run() == 0
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+    assert len(spawned) == 4
+    assert supervisor.children == {}
+    for pid in spawned:
+        with pytest.raises(ChildProcessError):
+            os.waitpid(pid, os.WNOHANG)
+    logged = [(event, kwargs.get("signal")) for event, kwargs in events]
+    assert logged == [("Started workers", None), ("Replacing workers", "SIGHUP"), ("Stopping server", "SIGTERM"), ("Server stopped", None)]